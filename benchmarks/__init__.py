@@ -0,0 +1,3 @@
+"""
+性能基准和负载测试（bench_*.py 可直接运行，http_load 由 wg-toolkit bench http 调用）
+"""
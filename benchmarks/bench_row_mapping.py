@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+节点行映射微基准
+对比旧路径（sqlite3.Row -> dict -> fromisoformat -> dataclass -> to_dict）
+与新路径（元组行工厂 -> __slots__ 实体，时间字段惰性解析）的单行开销
+
+用法:
+    python benchmarks/bench_row_mapping.py [--rows 100000] [--repeat 3]
+"""
+import argparse
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.domain.node import Node
+from core.models.database import Database
+
+
+@dataclass
+class LegacyNode:
+    """重构前的 dataclass 节点实体（仅用于对比）"""
+    id: Optional[int] = None
+    node_name: str = ''
+    virtual_ip: str = ''
+    public_key: str = ''
+    private_key: str = ''
+    platform: str = ''
+    description: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'node_name': self.node_name,
+            'virtual_ip': self.virtual_ip,
+            'public_key': self.public_key,
+            'platform': self.platform,
+            'description': self.description,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'private_key': self.private_key,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LegacyNode':
+        created_at = data.get('created_at')
+        updated_at = data.get('updated_at')
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        if isinstance(updated_at, str):
+            updated_at = datetime.fromisoformat(updated_at)
+        return cls(
+            id=data.get('id'),
+            node_name=data.get('node_name', ''),
+            virtual_ip=data.get('virtual_ip', ''),
+            public_key=data.get('public_key', ''),
+            private_key=data.get('private_key', ''),
+            platform=data.get('platform', ''),
+            description=data.get('description'),
+            created_at=created_at,
+            updated_at=updated_at
+        )
+
+
+def build_database(rows: int) -> Database:
+    """构建内存数据库并写入合成节点"""
+    db = Database(':memory:')
+    db.connect()
+    db.init_database()
+    db.conn.executemany(
+        'INSERT INTO nodes (node_name, virtual_ip, public_key, private_key, platform) '
+        'VALUES (?, ?, ?, ?, ?)',
+        (
+            (f'node-{i}', f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}',
+             f'pub{i:041d}=', f'priv{i:040d}=', 'linux' if i % 2 else 'windows')
+            for i in range(rows)
+        )
+    )
+    db.conn.commit()
+    return db
+
+
+def legacy_path(db: Database) -> int:
+    """旧路径：逐行转换并展开为配置生成所需字典"""
+    cursor = db.conn.cursor()
+    cursor.execute('SELECT * FROM nodes ORDER BY id')
+    nodes = [LegacyNode.from_dict(dict(row)) for row in cursor.fetchall()]
+    total = 0
+    for data in [node.to_dict() for node in nodes]:
+        total += len(data['public_key']) + len(data['virtual_ip'])
+    return total
+
+
+def slotted_path(db: Database) -> int:
+    """新路径：行工厂直接构造实体，配置生成直接读属性"""
+    total = 0
+    for node in db.select_nodes(Node.COLUMNS, Node.from_row):
+        total += len(node.public_key) + len(node.virtual_ip)
+    return total
+
+
+def measure(func, db: Database, repeat: int) -> float:
+    """返回多次运行中的最短耗时（秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(db)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='节点行映射微基准')
+    parser.add_argument('--rows', type=int, default=100_000, help='合成节点数量 (默认: 100000)')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数，取最优 (默认: 3)')
+    args = parser.parse_args()
+
+    db = build_database(args.rows)
+    try:
+        assert legacy_path(db) == slotted_path(db)
+        legacy = measure(legacy_path, db, args.repeat)
+        slotted = measure(slotted_path, db, args.repeat)
+    finally:
+        db.close()
+
+    print(f"行数: {args.rows}")
+    print(f"旧路径: {legacy:.3f}s  ({legacy / args.rows * 1e9:,.0f} ns/行)")
+    print(f"新路径: {slotted:.3f}s  ({slotted / args.rows * 1e9:,.0f} ns/行)")
+    print(f"加速比: {legacy / slotted:.2f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+服务端配置渲染基准
+对比整串拼接写入（旧）与从数据库游标流式写入临时文件（新）的耗时和峰值内存
+
+用法:
+    python benchmarks/bench_server_render.py [--sizes 1000,10000,50000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import base as config
+from core.domain.server import Server
+from core.models.database import Database
+from core.models.repositories.node_repo import NodeRepository
+from core.utils.config_generator import ConfigGenerator
+from core.utils.privileged_executor import get_executor
+
+
+def build_database(rows: int) -> Database:
+    """构建内存数据库并写入合成节点"""
+    db = Database(':memory:')
+    db.connect()
+    db.init_database()
+    db.conn.executemany(
+        'INSERT INTO nodes (node_name, virtual_ip, public_key, private_key, platform) '
+        'VALUES (?, ?, ?, ?, ?)',
+        (
+            (f'node-{i}', f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}',
+             f'pub{i:041d}=', f'priv{i:040d}=', 'linux')
+            for i in range(rows)
+        )
+    )
+    db.conn.commit()
+    return db
+
+
+def legacy_render(server: Server, repo: NodeRepository, target_path: str):
+    """旧路径：载入全部节点，逐行追加到列表后整串写入"""
+    lines = [
+        '[Interface]',
+        f"PrivateKey = {server.private_key}",
+        f"Address = {server.virtual_ip}/{server.prefix_length}",
+        f"ListenPort = {server.listen_port}",
+        'SaveConfig = false',
+        '',
+    ]
+    for node in repo.list_all():
+        lines.append('[Peer]')
+        lines.append(f"# {node.node_name} - {node.platform}")
+        lines.append(f"PublicKey = {node.public_key}")
+        lines.append(f"AllowedIPs = {node.virtual_ip}/32")
+        lines.append(f"PersistentKeepalive = {config.PERSISTENT_KEEPALIVE}")
+        lines.append('')
+    content = '\n'.join(lines)
+    with open(target_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def streaming_render(server: Server, repo: NodeRepository, target_path: str):
+    """新路径：从游标流式渲染并原子写入"""
+    get_executor().write_privileged_stream(
+        ConfigGenerator.iter_server_config(server, repo.iter_all()),
+        target_path
+    )
+
+
+def run(func, server: Server, repo: NodeRepository, target_path: str):
+    """返回 (耗时秒, 峰值内存字节)"""
+    start = time.perf_counter()
+    func(server, repo, target_path)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(server, repo, target_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='服务端配置渲染基准')
+    parser.add_argument('--sizes', default='1000,10000,50000', help='节点数量列表，逗号分隔')
+    args = parser.parse_args()
+
+    server = Server(public_key='S' * 44, private_key='P' * 44, virtual_ip='10.0.0.1',
+                    network_cidr='10.0.0.0/8')
+
+    print(f"{'节点数':>8} {'旧耗时':>10} {'旧峰值':>12} {'新耗时':>10} {'新峰值':>12} {'新 us/节点':>10}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        target_path = os.path.join(tmp_dir, 'wg0.conf')
+        for size in (int(value) for value in args.sizes.split(',')):
+            db = build_database(size)
+            try:
+                repo = NodeRepository(db)
+                legacy_time, legacy_peak = run(legacy_render, server, repo, target_path)
+                stream_time, stream_peak = run(streaming_render, server, repo, target_path)
+            finally:
+                db.close()
+            print(
+                f"{size:>8} {legacy_time:>9.3f}s {legacy_peak / 1024:>10,.0f}KB "
+                f"{stream_time:>9.3f}s {stream_peak / 1024:>10,.0f}KB "
+                f"{stream_time / size * 1e6:>10.2f}"
+            )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
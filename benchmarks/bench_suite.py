@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+端到端基准套件
+在 1k/10k/100k 节点的合成数据库上测量节点注册/删除、节点列表、服务端/客户端配置生成、
+进程内 API 请求和 CLI 启动耗时。wg / sudo 等命令由 fake_backend 的替身脚本代替，
+结果写入 JSON，可与另一次提交的结果对比。
+
+用法:
+    python benchmarks/bench_suite.py [--sizes 1000,10000,100000] [--repeat 5]
+                                     [--output results.json] [--only register_node,list_nodes]
+                                     [--compare baseline.json] [--threshold 0.2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import fake_backend
+
+OPERATIONS = (
+    'register_node', 'delete_node', 'list_nodes', 'generate_server_config',
+    'generate_server_config_cold', 'generate_client_config',
+    'api_list_nodes', 'api_get_node', 'api_node_config', 'api_server_status',
+    'cli_help', 'cli_list',
+)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """耗时样本（秒）-> 统计值（毫秒）"""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {
+        'n': len(ordered),
+        'min_ms': ordered[0] * 1000,
+        'median_ms': statistics.median(ordered) * 1000,
+        'p95_ms': p95 * 1000,
+        'mean_ms': statistics.fmean(ordered) * 1000,
+    }
+
+
+def measure(func: Callable[[int], None], repeat: int) -> Dict[str, float]:
+    """调用 func(第几次) repeat 次并统计耗时"""
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        func(i)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def bench_services(size: int, repeat: int, wanted) -> Dict[str, dict]:
+    """服务层操作：节点注册/删除、列表、配置生成"""
+    from core.models.database import Database
+    from core.services.config_service import ConfigService
+    from core.services.node_service import NodeService
+    from core.utils.fragment_cache import get_peer_fragment_cache
+
+    results = {}
+    rng = random.Random(size)
+    with Database() as db:
+        node_service = NodeService(db)
+        config_service = ConfigService(db)
+        interface_id = config_service.interface_repo.list_by_network(None)[0].id
+
+        # 删除基准删除的是注册基准新建的节点，两者成对运行，数据库规模保持不变
+        if 'register_node' in wanted or 'delete_node' in wanted:
+            registered = []
+
+            def register(i):
+                registered.append(node_service.register_node(f'bench-{i}', 'linux')['node_id'])
+            results['register_node'] = measure(register, repeat)
+            results['delete_node'] = measure(lambda i: node_service.delete_node(registered[i]), repeat)
+
+        if 'list_nodes' in wanted:
+            results['list_nodes'] = measure(lambda i: node_service.list_nodes(), repeat)
+        if 'generate_server_config' in wanted:
+            config_service.generate_server_config()
+            results['generate_server_config'] = measure(
+                lambda i: config_service.generate_server_config(), repeat
+            )
+        if 'generate_server_config_cold' in wanted:
+            def cold(i):
+                get_peer_fragment_cache(interface_id).clear()
+                config_service.generate_server_config()
+            results['generate_server_config_cold'] = measure(cold, repeat)
+        if 'generate_client_config' in wanted:
+            node_ids = [rng.randint(1, size) for _ in range(repeat)]
+            results['generate_client_config'] = measure(
+                lambda i: config_service.generate_client_config(node_ids[i]), repeat
+            )
+    return results
+
+
+def bench_api(size: int, repeat: int, wanted) -> Dict[str, dict]:
+    """进程内 API 请求（httpx ASGITransport，不经过网络，不触发后台任务）"""
+    paths = {
+        'api_list_nodes': lambda i: '/nodes',
+        'api_get_node': lambda i: f'/nodes/{i * 7919 % size + 1}',
+        'api_node_config': lambda i: f'/nodes/{i * 7919 % size + 1}/config',
+        'api_server_status': lambda i: '/server/status',
+    }
+    if not wanted & paths.keys():
+        # 未选择任何 api_* 操作时不导入 httpx 和 Web 应用
+        return {}
+
+    import httpx
+    from web.backend.main import app
+    from config import web as web_config
+
+    async def run() -> Dict[str, dict]:
+        results = {}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+            for name, path in paths.items():
+                if name not in wanted:
+                    continue
+                samples = []
+                for i in range(repeat):
+                    start = time.perf_counter()
+                    response = await client.get(web_config.API_PREFIX + path(i))
+                    samples.append(time.perf_counter() - start)
+                    if response.status_code != 200:
+                        raise RuntimeError(f"{name} 返回 {response.status_code}: {response.text[:200]}")
+                results[name] = summarize(samples)
+        return results
+
+    return asyncio.run(run())
+
+
+def bench_cli(root: str, repeat: int, wanted) -> Dict[str, dict]:
+    """CLI 启动：新进程执行 --help 和 list（输出丢弃）"""
+    code = fake_backend.bootstrap_code(root)
+    commands = {'cli_help': ['--help'], 'cli_list': ['list']}
+    results = {}
+    for name, argv in commands.items():
+        if name not in wanted:
+            continue
+
+        def run(i, argv=argv):
+            subprocess.run([sys.executable, '-c', code, *argv], check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        results[name] = measure(run, repeat)
+    return results
+
+
+def git_commit() -> Optional[str]:
+    """当前提交（非 git 仓库时为 None）"""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, cwd=Path(__file__).parent.parent)
+        return result.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results: List[dict], baseline_path: str, threshold: float) -> int:
+    """与基线结果对比中位数，返回变慢超过阈值的项数"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    previous = {(item['size'], item['operation']): item for item in baseline['results']}
+
+    regressions = 0
+    print(f"\n对比基线 {baseline_path}（{baseline['meta'].get('commit') or '-'}）")
+    print(f"{'节点数':>8} {'操作':<28} {'基线中位数':>12} {'本次中位数':>12} {'变化':>8}")
+    for item in results:
+        before = previous.get((item['size'], item['operation']))
+        if not before:
+            continue
+        change = item['median_ms'] / before['median_ms'] - 1 if before['median_ms'] else 0.0
+        flag = ''
+        if change > threshold:
+            regressions += 1
+            flag = ' ← 变慢'
+        print(f"{item['size']:>8} {item['operation']:<28} {before['median_ms']:>10.2f}ms "
+              f"{item['median_ms']:>10.2f}ms {change:>+7.1%}{flag}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='端到端基准套件')
+    parser.add_argument('--sizes', default='1000,10000,100000', help='节点数量列表，逗号分隔')
+    parser.add_argument('--repeat', type=int, default=5, help='每项操作的重复次数（默认 5）')
+    parser.add_argument('--only', help=f"仅运行指定操作，逗号分隔（可选: {', '.join(OPERATIONS)}）")
+    parser.add_argument('-o', '--output', help='结果 JSON 文件路径')
+    parser.add_argument('--compare', metavar='BASELINE', help='与之前的结果 JSON 对比')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='中位数变慢超过此比例视为退化（默认 0.2，配合 --compare）')
+    args = parser.parse_args()
+
+    wanted = set(args.only.split(',')) if args.only else set(OPERATIONS)
+    unknown = wanted - set(OPERATIONS)
+    if unknown:
+        parser.error(f"未知操作: {', '.join(sorted(unknown))}")
+
+    results = []
+    print(f"{'节点数':>8} {'操作':<28} {'次数':>4} {'最小':>10} {'中位数':>10} {'p95':>10}")
+    with tempfile.TemporaryDirectory(prefix='wg-bench-') as root:
+        fake_backend.install(root)
+        for size in (int(value) for value in args.sizes.split(',')):
+            start = time.perf_counter()
+            fake_backend.build_fleet(os.path.join(root, f'fleet-{size}.db'), size)
+            print(f"{size:>8} {'(构建合成数据库)':<28} {'':>4} {time.perf_counter() - start:>9.2f}s")
+
+            measured = {}
+            measured.update(bench_services(size, args.repeat, wanted))
+            measured.update(bench_api(size, args.repeat, wanted))
+            measured.update(bench_cli(root, args.repeat, wanted))
+            for operation in OPERATIONS:
+                if operation not in measured:
+                    continue
+                stats = measured[operation]
+                results.append({'size': size, 'operation': operation, **stats})
+                print(f"{size:>8} {operation:<28} {stats['n']:>4} {stats['min_ms']:>8.2f}ms "
+                      f"{stats['median_ms']:>8.2f}ms {stats['p95_ms']:>8.2f}ms")
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入 {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"{regressions} 项操作变慢超过 {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
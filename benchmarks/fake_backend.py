@@ -0,0 +1,161 @@
+"""
+基准测试用的模拟 WireGuard 环境
+在临时目录中放置 wg / wg-quick / sudo / ip / iptables / nft / tc 的替身脚本并加入 PATH，
+将数据库和配置目录指向临时目录，再写入合成的服务端和节点，使基准不依赖真实的
+WireGuard 和 root 权限，也不会改动本机网络配置。
+
+被 bench_*.py 脚本导入使用，不单独运行。
+"""
+import ipaddress
+import os
+import stat
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import base as config
+
+# 合成网络段：/14 可容纳约 26 万个节点
+FLEET_NETWORK_CIDR = '10.0.0.0/14'
+FLEET_SERVER_IP = '10.0.0.1'
+
+# 替身脚本：只消费必要的标准输入，不做任何实际变更
+SHIMS = {
+    'wg': r'''#!/bin/sh
+case "$1" in
+  genkey) head -c 32 /dev/urandom | base64 ;;
+  pubkey) read k; printf '%s' "$k" | sha256sum | head -c 32 | base64 ;;
+  syncconf|setconf|addconf) cat "$3" > /dev/null ;;
+esac
+exit 0
+''',
+    'wg-quick': '#!/bin/sh\nexit 0\n',
+    'sudo': '#!/bin/sh\nexec "$@"\n',
+    'ip': r'''#!/bin/sh
+[ "$1 $2 $3" = "route show default" ] && echo "default via 192.0.2.1 dev eth0"
+exit 0
+''',
+    'iptables': '#!/bin/sh\nexit 0\n',
+    'ip6tables': '#!/bin/sh\nexit 0\n',
+    'iptables-save': '#!/bin/sh\nexit 0\n',
+    'nft': '#!/bin/sh\nfor arg; do last="$arg"; done\n[ "$last" = "-" ] && cat > /dev/null\nexit 0\n',
+    'tc': '#!/bin/sh\nfor arg; do last="$arg"; done\n[ "$last" = "-" ] && cat > /dev/null\nexit 0\n',
+}
+
+
+def install(root: str) -> str:
+    """在 root 下安装替身脚本并把数据库、配置目录指向 root
+
+    修改当前进程的 PATH 和配置模块，子进程通过环境变量 PATH 继承替身脚本。
+
+    Args:
+        root: 临时目录
+
+    Returns:
+        替身脚本所在目录
+    """
+    bin_dir = os.path.join(root, 'bin')
+    os.makedirs(bin_dir, exist_ok=True)
+    for name, content in SHIMS.items():
+        path = os.path.join(bin_dir, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    os.environ['PATH'] = bin_dir + os.pathsep + os.environ.get('PATH', '')
+
+    config.WG_CONFIG_DIR = os.path.join(root, 'wireguard')
+    os.makedirs(config.WG_CONFIG_DIR, exist_ok=True)
+    return bin_dir
+
+
+def environment(root: str, db_path: str) -> dict:
+    """子进程（如 uvicorn 及其 worker）使用的环境变量
+
+    通过环境变量而非修改配置模块传递路径，worker 进程重新导入配置时同样生效；
+    同时关闭 Web 服务的后台任务，避免干扰测量。
+
+    Args:
+        root: install 使用的临时目录
+        db_path: 数据库文件路径
+    """
+    env = dict(os.environ)
+    env.update({
+        'PATH': os.path.join(root, 'bin') + os.pathsep + os.environ.get('PATH', ''),
+        'PYTHONPATH': str(Path(__file__).parent.parent),
+        'WG_CONFIG_DIR': os.path.join(root, 'wireguard'),
+        'WG_DATABASE_PATH': db_path,
+        'MESH_ANALYZER_INTERVAL': '0',
+        'NODE_SWEEP_INTERVAL': '0',
+    })
+    return env
+
+
+def bootstrap_code(root: str) -> str:
+    """生成 `python -c` 启动代码：与 install 相同的路径覆盖后运行 CLI 入口
+
+    Args:
+        root: install 使用的临时目录
+    """
+    project_dir = str(Path(__file__).parent.parent)
+    return (
+        f"import sys; sys.path.insert(0, {project_dir!r})\n"
+        "from config import base as config\n"
+        f"config.WG_CONFIG_DIR = {os.path.join(root, 'wireguard')!r}\n"
+        f"config.DATABASE_PATH = {config.DATABASE_PATH!r}\n"
+        "import wg_toolkit_cli\n"
+        "sys.argv[0] = 'wg-toolkit'\n"
+        "sys.exit(wg_toolkit_cli.main())\n"
+    )
+
+
+def build_fleet(db_path: str, size: int):
+    """创建数据库并写入服务端、接口分片和 size 个合成节点
+
+    服务端和接口分片走 ServerService 的规划逻辑（密钥由替身 wg 生成），节点直接
+    批量写入 nodes 表，虚拟 IP 从网络段第 2 个主机地址起连续分配。
+
+    Args:
+        db_path: 数据库文件路径（已存在时覆盖）
+        size: 节点数量
+    """
+    from core.domain.server import Server
+    from core.models.database import Database, PREFIXES_COUNTER
+    from core.services.server_service import ServerService
+    from core.utils.key_manager import KeyManager
+
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    config.DATABASE_PATH = db_path
+
+    with Database() as db:
+        db.init_database()
+        server_service = ServerService(db)
+        private_key, public_key = KeyManager.generate_keypair()
+        server = Server(
+            public_key=public_key,
+            private_key=private_key,
+            virtual_ip=FLEET_SERVER_IP,
+            listen_port=config.DEFAULT_LISTEN_PORT,
+            network_cidr=FLEET_NETWORK_CIDR,
+            public_endpoint='vpn.example.com:51820'
+        )
+        server_service.server_repo.save(server)
+        server_service._replace_interfaces(server_service._plan_interfaces(server, 1))
+        interface_id = server_service.list_interfaces()[0].id
+
+        first = int(ipaddress.ip_address(FLEET_SERVER_IP)) + 1
+        db.conn.executemany(
+            'INSERT INTO nodes (node_name, virtual_ip, public_key, private_key, platform, '
+            'interface_id) VALUES (?, ?, ?, ?, ?, ?)',
+            (
+                (f'node-{i}', str(ipaddress.ip_address(first + i)),
+                 f'{i:043d}=', f'{i:043d}=', 'linux' if i % 4 else 'windows', interface_id)
+                for i in range(size)
+            )
+        )
+        db._bump_counter(PREFIXES_COUNTER)
+        db.conn.commit()
+        server_service.update_wireguard_config()
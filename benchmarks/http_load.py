@@ -0,0 +1,253 @@
+"""
+HTTP 负载测试
+在本机启动 web.backend.main:app（uvicorn，可指定 worker 数量），使用 fake_backend 的
+模拟 WireGuard 环境和合成节点，以 asyncio 按固定速率（开环）发送混合请求，统计每类
+请求的延迟分位数、错误率和吞吐量。
+
+由 `wg-toolkit bench http` 调用。延迟从计划发送时刻起算：服务端处理不过来时排队
+的时间也计入延迟，不会因为发送方被拖慢而低估（coordinated omission）。
+"""
+import asyncio
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks import fake_backend
+from config import web as web_config
+
+# 请求类型：名称 -> (方法, 说明)
+ENDPOINTS = {
+    'download': ('GET', '/nodes/{id}/config'),
+    'show': ('GET', '/nodes/{id}'),
+    'list': ('GET', '/nodes'),
+    'status': ('GET', '/server/status'),
+    'info': ('GET', '/server/info'),
+    'register': ('POST', '/nodes'),
+}
+
+DEFAULT_MIX = 'download=80,status=15,register=5'
+
+# 等待服务启动的最长时间（秒）
+STARTUP_TIMEOUT = 30
+
+
+def parse_mix(text: str) -> List[Tuple[str, float]]:
+    """解析请求比例（如 download=80,status=15,register=5）
+
+    Returns:
+        [(请求类型, 权重), ...]
+
+    Raises:
+        ValueError: 格式错误或请求类型未知
+    """
+    mix = []
+    for item in text.split(','):
+        name, sep, weight = item.strip().partition('=')
+        if not sep:
+            raise ValueError(f"请求比例格式错误: {item}（应为 类型=权重）")
+        if name not in ENDPOINTS:
+            raise ValueError(f"未知请求类型: {name}（可选: {', '.join(ENDPOINTS)}）")
+        try:
+            value = float(weight)
+        except ValueError:
+            raise ValueError(f"权重必须为数字: {item}")
+        if value < 0:
+            raise ValueError(f"权重不能为负数: {item}")
+        mix.append((name, value))
+    if not mix or sum(weight for _, weight in mix) <= 0:
+        raise ValueError("请求比例的权重之和必须大于 0")
+    return mix
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    """已排序样本的分位数（最近秩）"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def summarize(samples: Dict[str, list], elapsed: float) -> List[dict]:
+    """汇总每类请求及总体的延迟分位数、错误率和吞吐量
+
+    Args:
+        samples: 请求类型 -> [(延迟秒, 是否成功, 错误描述), ...]
+        elapsed: 压测持续时间（秒）
+    """
+    rows = []
+    combined = []
+    for name in list(samples) + ['total']:
+        entries = combined if name == 'total' else samples[name]
+        if name != 'total':
+            combined.extend(entries)
+        latencies = sorted(latency for latency, _, _ in entries)
+        errors = [detail for _, ok, detail in entries if not ok]
+        kinds: Dict[str, int] = {}
+        for detail in errors:
+            kinds[detail] = kinds.get(detail, 0) + 1
+        rows.append({
+            'endpoint': name,
+            'requests': len(entries),
+            'errors': len(errors),
+            'error_rate': len(errors) / len(entries) if entries else 0.0,
+            'error_kinds': kinds,
+            'throughput_rps': (len(entries) - len(errors)) / elapsed if elapsed else 0.0,
+            'p50_ms': _percentile(latencies, 0.50) * 1000,
+            'p90_ms': _percentile(latencies, 0.90) * 1000,
+            'p99_ms': _percentile(latencies, 0.99) * 1000,
+            'max_ms': (latencies[-1] if latencies else 0.0) * 1000,
+        })
+    return rows
+
+
+async def generate(base_url: str, rps: float, mix: List[Tuple[str, float]], duration: float,
+                   node_count: int, concurrency: int = 256, seed: int = 0) -> dict:
+    """按固定速率发送混合请求
+
+    Args:
+        base_url: 服务地址（如 http://127.0.0.1:8080）
+        rps: 目标请求速率（次/秒）
+        mix: 请求比例
+        duration: 持续时间（秒）
+        node_count: 合成节点数量（下载/查看请求随机选择节点）
+        concurrency: 最大并发连接数
+        seed: 随机种子
+
+    Returns:
+        {'elapsed': 实际耗时, 'sent': 发送数, 'endpoints': 统计行列表}
+    """
+    rng = random.Random(seed)
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    total = int(rps * duration)
+    plan = rng.choices(names, weights=weights, k=total)
+    samples: Dict[str, list] = {name: [] for name in names}
+    run_id = f"{os.getpid()}-{int(time.time())}"
+    prefix = web_config.API_PREFIX
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+
+        async def send(index: int, name: str, scheduled: float):
+            method, path = ENDPOINTS[name]
+            kwargs = {}
+            if name == 'register':
+                kwargs['json'] = {'node_name': f'load-{run_id}-{index}', 'platform': 'linux'}
+            else:
+                path = path.replace('{id}', str(rng.randint(1, node_count)))
+            try:
+                response = await client.request(method, prefix + path, **kwargs)
+                ok = response.status_code < 400
+                detail = None if ok else f"HTTP {response.status_code}"
+            except httpx.HTTPError as e:
+                ok, detail = False, type(e).__name__
+            samples[name].append((time.perf_counter() - scheduled, ok, detail))
+
+        start = time.perf_counter()
+        tasks = []
+        for index, name in enumerate(plan):
+            scheduled = start + index / rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send(index, name, scheduled)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    return {'elapsed': elapsed, 'sent': total, 'endpoints': summarize(samples, elapsed)}
+
+
+def _free_port() -> int:
+    """获取一个空闲的本地端口"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class LocalServer:
+    """本机 uvicorn 进程（上下文管理器），退出时终止"""
+
+    def __init__(self, env: dict, workers: int = 1):
+        self.env = env
+        self.workers = workers
+        self.port = _free_port()
+        self.process: Optional[subprocess.Popen] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'uvicorn', 'web.backend.main:app',
+             '--host', '127.0.0.1', '--port', str(self.port),
+             '--workers', str(self.workers), '--log-level', 'warning', '--no-access-log'],
+            env=self.env,
+            cwd=str(Path(__file__).parent.parent),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Web 服务启动失败: {self.process.stderr.read().strip()}")
+            try:
+                if httpx.get(self.base_url + '/health', timeout=1.0).status_code == 200:
+                    return self
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        self.__exit__(None, None, None)
+        raise RuntimeError(f"Web 服务在 {STARTUP_TIMEOUT} 秒内未就绪")
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+
+def run(rps: float, mix: List[Tuple[str, float]], duration: float, nodes: int,
+        workers: List[int], concurrency: int = 256) -> List[dict]:
+    """构建合成数据库，依次以每个 worker 数量启动服务并压测
+
+    每轮使用同一份合成数据库的副本，注册请求不会影响下一轮。
+
+    Returns:
+        每个 worker 数量一份报告
+    """
+    reports = []
+    with tempfile.TemporaryDirectory(prefix='wg-load-') as root:
+        fake_backend.install(root)
+        template = os.path.join(root, 'template.db')
+        fake_backend.build_fleet(template, nodes)
+
+        for count in workers:
+            db_path = os.path.join(root, f'workers-{count}.db')
+            shutil.copyfile(template, db_path)
+            with LocalServer(fake_backend.environment(root, db_path), count) as server:
+                result = asyncio.run(generate(server.base_url, rps, mix, duration, nodes, concurrency))
+            reports.append({
+                'workers': count,
+                'rps': rps,
+                'duration': duration,
+                'nodes': nodes,
+                'mix': dict(mix),
+                **result,
+            })
+    return reports
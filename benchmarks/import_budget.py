@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+CLI 冷启动导入耗时检查
+用 `python -X importtime` 运行 wg-toolkit，统计入口之后各模块的导入耗时（中位数），
+超过预算或导入了不该导入的模块时以退出码 1 结束，可作为启动性能的回归测试
+（tests/test_import_budget.py 在 pytest 中运行同样的检查）。命令在 fake_backend 的
+模拟环境和临时合成数据库上执行，list / server-info 按监控脚本的实际调用方式运行。
+同时检查导入配置模块没有文件系统副作用（不创建数据目录）。
+
+用法:
+    python benchmarks/import_budget.py [--repeat 5] [--scale 1.0]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+ENTRY = ROOT / 'wg_toolkit_cli.py'
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(ROOT))
+
+from benchmarks import fake_backend
+from config import base as config
+
+# 合成数据库的节点数量
+FLEET_SIZE = 1000
+
+# (命令行参数, 导入耗时预算（毫秒）, 不允许导入的模块前缀)
+SCENARIOS = (
+    (['--help'], 40, ('sqlite3', 'subprocess', 'core.models', 'core.services', 'cli.commands.')),
+    (['list', '--help'], 120, ('core.services.mesh_analyzer', 'benchmarks', 'fastapi')),
+    (['server-info', '--help'], 120, ('core.services.mesh_analyzer', 'benchmarks', 'fastapi')),
+    (['cli', 'show', '--help'], 120, ('benchmarks', 'fastapi')),
+    (['list'], 150, ('core.services.mesh_analyzer', 'benchmarks', 'fastapi')),
+    (['server-info'], 150, ('core.services.mesh_analyzer', 'benchmarks', 'fastapi')),
+)
+
+
+def parse_importtime(stderr: str) -> Tuple[float, Set[str]]:
+    """解析 -X importtime 输出 -> (入口之后导入的总耗时毫秒, 导入的模块名集合)
+
+    解释器启动阶段（site 及之前）的导入不计入；顶层模块的累计耗时之和即为总耗时。
+    """
+    total_us = 0
+    modules = set()
+    started = False
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        if not started:
+            started = name.strip() == 'site'
+            continue
+        modules.add(name.strip())
+        if not name.startswith('  '):
+            total_us += int(parts[1])
+    return total_us / 1000, modules
+
+
+def measure(args: List[str], repeat: int, env: Optional[Dict[str, str]] = None) -> Tuple[float, Set[str]]:
+    """多次运行命令，返回导入耗时中位数和导入的模块"""
+    env = {key: value for key, value in (env or os.environ).items() if key != 'PYTHONDONTWRITEBYTECODE'}
+    cmd = [sys.executable, '-X', 'importtime', str(ENTRY)] + args
+    # 预热一次：写入字节码缓存，并让文件进入页缓存
+    subprocess.run(cmd, capture_output=True, text=True, env=env, cwd=ROOT)
+    samples = []
+    modules: Set[str] = set()
+    for _ in range(repeat):
+        result = subprocess.run(cmd, capture_output=True, text=True, env=env, cwd=ROOT)
+        if result.returncode != 0:
+            raise RuntimeError(f"wg-toolkit {' '.join(args)} 执行失败: {result.stdout[-200:]}")
+        elapsed, imported = parse_importtime(result.stderr)
+        samples.append(elapsed)
+        modules |= imported
+    return statistics.median(samples), modules
+
+
+def check_config_side_effects() -> List[str]:
+    """在临时目录中导入配置模块，返回导入后新出现的文件/目录"""
+    with tempfile.TemporaryDirectory(prefix='wg-import-') as root:
+        shutil.copytree(ROOT / 'config', Path(root) / 'config',
+                        ignore=shutil.ignore_patterns('__pycache__'))
+        env = {**os.environ, 'PYTHONPATH': root, 'PYTHONDONTWRITEBYTECODE': '1'}
+        subprocess.run(
+            [sys.executable, '-c', 'import config.base, config.web'],
+            check=True, env=env, cwd=root
+        )
+        return sorted(set(os.listdir(root)) - {'config'})
+
+
+def run_checks(repeat: int, scale: float = 1.0, verbose: bool = True) -> List[str]:
+    """在模拟环境和临时合成数据库上运行全部场景
+
+    Args:
+        repeat: 每个场景的运行次数
+        scale: 预算倍数
+        verbose: 是否打印结果表
+
+    Returns:
+        未通过的检查说明，全部通过时为空列表
+    """
+    failures = []
+    with tempfile.TemporaryDirectory(prefix='wg-import-budget-') as root:
+        # install 会修改本进程的 PATH 和配置，子进程只使用 environment 给出的环境变量
+        path, config_dir = os.environ.get('PATH', ''), config.WG_CONFIG_DIR
+        database_path = config.DATABASE_PATH
+        try:
+            fake_backend.install(root)
+            db_path = os.path.join(root, 'wg.db')
+            fake_backend.build_fleet(db_path, FLEET_SIZE)
+            env = fake_backend.environment(root, db_path)
+            if verbose:
+                print(f"{'命令':<28} {'导入耗时':>10} {'预算':>10}  结果")
+            for argv, budget_ms, forbidden in SCENARIOS:
+                elapsed, modules = measure(argv, repeat, env)
+                budget = budget_ms * scale
+                unexpected = sorted(
+                    name for name in modules
+                    if any(name == prefix or name.startswith(prefix if prefix.endswith('.') else prefix + '.')
+                           for prefix in forbidden)
+                )
+                command = ' '.join(['wg-toolkit'] + argv)
+                if elapsed > budget:
+                    failures.append(f"{command}: 导入耗时 {elapsed:.1f}ms 超出预算 {budget:.0f}ms")
+                if unexpected:
+                    failures.append(f"{command}: 不应导入的模块 {', '.join(unexpected[:10])}")
+                if verbose:
+                    ok = elapsed <= budget and not unexpected
+                    print(f"{command:<28} {elapsed:>8.1f}ms {budget:>8.0f}ms  {'通过' if ok else '超出'}")
+                    if unexpected:
+                        print(f"    不应导入的模块: {', '.join(unexpected[:10])}")
+        finally:
+            os.environ['PATH'] = path
+            config.WG_CONFIG_DIR = config_dir
+            config.DATABASE_PATH = database_path
+
+    created = check_config_side_effects()
+    if created:
+        failures.append(f"导入配置模块时创建了: {', '.join(created)}")
+        if verbose:
+            print(failures[-1])
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='CLI 冷启动导入耗时检查')
+    parser.add_argument('--repeat', type=int, default=5, help='每个场景的运行次数（默认 5）')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='预算倍数（较慢的机器上可放宽，默认 1.0）')
+    args = parser.parse_args()
+
+    failures = run_checks(args.repeat, args.scale)
+    if failures:
+        print(f"\n{len(failures)} 项检查未通过")
+        return 1
+    print("\n全部通过")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
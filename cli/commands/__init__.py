@@ -0,0 +1,58 @@
+"""
+CLI 命令表
+命令名 -> (所在模块, 帮助文本)。入口只按此表注册命令名称，命令模块（及其依赖的服务层）
+在执行该命令时才导入；新增命令时需同时在此登记。
+"""
+import importlib
+
+COMMANDS = {
+    'init': ('init', '初始化服务端'),
+    'register': ('node', '注册新节点'),
+    'list': ('node', '列出所有节点'),
+    'show': ('node', '显示节点详情'),
+    'delete': ('node', '删除节点'),
+    'server-info': ('server', '显示服务端信息'),
+    'status': ('server', '显示 WireGuard 接口运行状态'),
+    'ipv6': ('server', 'IPv6 双栈管理'),
+    'hub': ('hub', '多中心部署：管理共享节点注册表的中心节点'),
+    'mesh': ('mesh', '节点直连（网状拓扑）管理'),
+    'route': ('route', '节点路由子网（站点互联）管理'),
+    'whois': ('route', '查询 IP 地址归属的节点、子网或网络段'),
+    'policy': ('policy', '客户端分流策略（AllowedIPs）管理'),
+    'group': ('policy', '节点组管理'),
+    'acl': ('acl', '节点组访问控制（nftables）'),
+    'shaping': ('shaping', '中心节点对节点的带宽限速（tc）'),
+    'peer-profile': ('peer_profile', '节点保活间隔 / MTU 配置'),
+    'sweep': ('sweep', '清理过期或闲置的节点'),
+    'network': ('network', '多租户：管理相互隔离的虚拟网络'),
+    'export': ('export', '导出节点配置'),
+    'bench': ('bench', '性能测试（使用模拟 WireGuard 环境）'),
+    'shell': ('shell', '交互式命令行（补全命令和节点名称，命令共用一个数据库连接）'),
+    'run': ('shell', '批量执行脚本中的命令（单个事务，提交后统一下发配置）'),
+}
+
+
+def register_commands(subparsers, command=None):
+    """注册 CLI 命令
+
+    要执行的命令所在的模块被导入并注册完整参数（含同模块的其他命令）；其余命令只注册
+    名称和帮助，用于 --help 列表，不会被执行。
+
+    Args:
+        subparsers: argparse 子命令集合
+        command: 将要执行的命令名，None 表示不执行任何命令（如只显示帮助）
+    """
+    target = COMMANDS[command][0] if command in COMMANDS else None
+    loaded = False
+    for name, (module, help_text) in COMMANDS.items():
+        if module != target:
+            subparsers.add_parser(name, help=help_text)
+        elif not loaded:
+            importlib.import_module(f"{__name__}.{module}").register_command(subparsers)
+            loaded = True
+
+
+def register_all_commands(subparsers):
+    """注册全部命令的完整参数（交互式 shell 和批处理使用）"""
+    for module in dict.fromkeys(module for module, _ in COMMANDS.values()):
+        importlib.import_module(f"{__name__}.{module}").register_command(subparsers)
@@ -0,0 +1,159 @@
+"""
+访问控制命令
+"""
+from core.models.database import Database
+from core.services.acl_service import AclService, ACL_MODES
+
+
+def register_command(subparsers):
+    """注册访问控制命令"""
+    parser_acl = subparsers.add_parser('acl', help='节点组访问控制（nftables）')
+    acl_subparsers = parser_acl.add_subparsers(dest='acl_command', help='访问控制子命令')
+    parser_acl.set_defaults(func=lambda args: parser_acl.print_help() or 1)
+
+    # acl mode 命令
+    parser_mode = acl_subparsers.add_parser('mode', help='查看或设置访问控制模式')
+    parser_mode.add_argument('mode', nargs='?', choices=ACL_MODES, help='访问控制模式')
+    parser_mode.set_defaults(func=cmd_acl_mode)
+
+    # acl allow / deny 命令
+    parser_allow = acl_subparsers.add_parser('allow', help='允许源节点组访问目的节点组')
+    parser_allow.add_argument('src', help='源节点组')
+    parser_allow.add_argument('dst', help='目的节点组')
+    parser_allow.add_argument('-b', '--both', action='store_true', help='同时添加反方向规则')
+    parser_allow.add_argument('-d', '--description', help='规则描述')
+    parser_allow.set_defaults(func=cmd_acl_allow)
+
+    parser_deny = acl_subparsers.add_parser('deny', help='删除放行规则')
+    parser_deny.add_argument('src', help='源节点组')
+    parser_deny.add_argument('dst', help='目的节点组')
+    parser_deny.add_argument('-b', '--both', action='store_true', help='同时删除反方向规则')
+    parser_deny.set_defaults(func=cmd_acl_deny)
+
+    # acl list 命令
+    parser_list = acl_subparsers.add_parser('list', help='列出所有放行规则')
+    parser_list.set_defaults(func=cmd_acl_list)
+
+    # acl show 命令
+    parser_show = acl_subparsers.add_parser('show', help='输出编译后的 nftables 规则集（不下发）')
+    parser_show.set_defaults(func=cmd_acl_show)
+
+    # acl apply 命令
+    parser_apply = acl_subparsers.add_parser('apply', help='按当前模式重新下发规则（如重启后）')
+    parser_apply.set_defaults(func=cmd_acl_apply)
+
+
+def _directions(args):
+    """规则方向列表"""
+    pairs = [(args.src, args.dst)]
+    if args.both and args.src != args.dst:
+        pairs.append((args.dst, args.src))
+    return pairs
+
+
+def cmd_acl_mode(args):
+    """查看或设置访问控制模式"""
+    try:
+        with Database() as db:
+            acl_service = AclService(db)
+            if args.mode:
+                acl_service.set_mode(args.mode)
+                print(f"✓ 访问控制模式已设置为: {args.mode}")
+            else:
+                print(f"当前访问控制模式: {acl_service.get_mode()}")
+            return 0
+
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_acl_allow(args):
+    """添加放行规则"""
+    try:
+        with Database() as db:
+            acl_service = AclService(db)
+            for src, dst in _directions(args):
+                acl_service.add_rule(src, dst, args.description)
+                print(f"✓ 已允许 {src} -> {dst}")
+            return 0
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_acl_deny(args):
+    """删除放行规则"""
+    try:
+        with Database() as db:
+            acl_service = AclService(db)
+            for src, dst in _directions(args):
+                acl_service.remove_rule(src, dst)
+                print(f"✓ 已删除 {src} -> {dst}")
+            return 0
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_acl_list(args):
+    """列出所有放行规则"""
+    try:
+        with Database() as db:
+            acl_service = AclService(db)
+            rules = acl_service.list_rules()
+            print(f"访问控制模式: {acl_service.get_mode()}")
+
+            if not rules:
+                print("暂无放行规则")
+                return 0
+
+            print("========================================")
+            print(f"{'源节点组':<16} {'目的节点组':<16} {'描述'}")
+            print("-" * 50)
+            for rule in rules:
+                print(f"{rule['src_group']:<16} {rule['dst_group']:<16} {rule['description'] or ''}")
+            print("========================================")
+            print(f"共 {len(rules)} 条放行规则")
+            return 0
+
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_acl_show(args):
+    """输出编译后的规则集"""
+    try:
+        with Database() as db:
+            print(AclService(db).compile(), end='')
+            return 0
+
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_acl_apply(args):
+    """重新下发规则"""
+    try:
+        with Database() as db:
+            acl_service = AclService(db)
+            acl_service.apply()
+            if acl_service.get_mode() == 'enforce':
+                print("✓ 访问控制规则已下发")
+            else:
+                print("✓ 访问控制未启用，已删除规则表")
+            return 0
+
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
@@ -0,0 +1,76 @@
+"""
+性能测试命令
+"""
+import json
+
+
+def register_command(subparsers):
+    """注册性能测试命令"""
+    parser_bench = subparsers.add_parser('bench', help='性能测试（使用模拟 WireGuard 环境）')
+    bench_subparsers = parser_bench.add_subparsers(dest='bench_command', help='性能测试子命令')
+    parser_bench.set_defaults(func=lambda args: parser_bench.print_help() or 1)
+
+    # bench http 命令
+    parser_http = bench_subparsers.add_parser('http', help='对本机启动的 Web API 服务进行负载测试')
+    parser_http.add_argument('--rps', type=float, default=100, help='目标请求速率（次/秒，默认 100）')
+    parser_http.add_argument('--mix', default='download=80,status=15,register=5',
+                             help='请求比例（可选类型: download/show/list/status/info/register，'
+                                  '默认 download=80,status=15,register=5）')
+    parser_http.add_argument('--duration', type=float, default=10, help='每轮持续时间（秒，默认 10）')
+    parser_http.add_argument('--nodes', type=int, default=1000, help='合成节点数量（默认 1000）')
+    parser_http.add_argument('--workers', default='1',
+                             help='uvicorn worker 数量，逗号分隔时依次测试（如 1,2,4）')
+    parser_http.add_argument('--concurrency', type=int, default=256, help='最大并发连接数（默认 256）')
+    parser_http.add_argument('-o', '--output', help='结果 JSON 文件路径')
+    parser_http.set_defaults(func=cmd_bench_http)
+
+
+def cmd_bench_http(args):
+    """对本机启动的 Web API 服务进行负载测试"""
+    try:
+        try:
+            from benchmarks import http_load
+        except ImportError as e:
+            if e.name != 'httpx':
+                raise
+            print("错误: bench http 需要 httpx，请安装开发依赖（uv sync --extra dev 或 pip install httpx）")
+            return 1
+
+        mix = http_load.parse_mix(args.mix)
+        try:
+            workers = [int(value) for value in args.workers.split(',')]
+        except ValueError:
+            raise ValueError(f"worker 数量必须为整数: {args.workers}")
+        if args.rps <= 0 or args.duration <= 0 or args.nodes < 1 or min(workers) < 1:
+            raise ValueError("--rps、--duration、--nodes 和 --workers 必须大于 0")
+
+        print(f"合成节点 {args.nodes} 个，目标速率 {args.rps:g} 次/秒，每轮 {args.duration:g} 秒")
+        reports = http_load.run(args.rps, mix, args.duration, args.nodes, workers, args.concurrency)
+
+        for report in reports:
+            print("========================================")
+            print(f"workers={report['workers']}  发送 {report['sent']} 个请求，耗时 {report['elapsed']:.1f}s")
+            print(f"{'请求类型':<10} {'请求数':>8} {'错误率':>8} {'吞吐量':>10} "
+                  f"{'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}")
+            print("-" * 80)
+            for row in report['endpoints']:
+                print(f"{row['endpoint']:<10} {row['requests']:>8} {row['error_rate']:>8.2%} "
+                      f"{row['throughput_rps']:>8.1f}/s {row['p50_ms']:>7.1f}ms {row['p90_ms']:>7.1f}ms "
+                      f"{row['p99_ms']:>7.1f}ms {row['max_ms']:>7.1f}ms")
+                for kind, count in row['error_kinds'].items():
+                    if row['endpoint'] != 'total':
+                        print(f"{'':<10} {kind}: {count}")
+        print("========================================")
+
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(reports, f, ensure_ascii=False, indent=2)
+            print(f"✓ 结果已写入 {args.output}")
+        return 0
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
@@ -1,10 +1,6 @@
 """
 导出命令
 """
-import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-
 from core.models.database import Database
 from core.services.node_service import NodeService
 
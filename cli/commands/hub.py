@@ -0,0 +1,157 @@
+"""
+中心节点管理命令
+"""
+import sys
+from core.models.database import Database
+from core.services.config_service import ConfigService
+from core.services.hub_service import HubService, PLACEMENT_POLICIES
+
+
+def register_command(subparsers):
+    """注册中心节点管理命令"""
+    parser_hub = subparsers.add_parser('hub', help='多中心部署：管理共享节点注册表的中心节点')
+    hub_subparsers = parser_hub.add_subparsers(dest='hub_command', help='中心节点子命令')
+    parser_hub.set_defaults(func=lambda args: parser_hub.print_help() or 1)
+    
+    # hub add 命令
+    parser_add = hub_subparsers.add_parser('add', help='添加远端中心节点')
+    parser_add.add_argument('name', help='中心节点名称')
+    parser_add.add_argument('--endpoint', required=True, help='公网地址 (格式: IP:Port 或 domain:Port)')
+    parser_add.add_argument('--public-key', required=True, help='中心节点公钥')
+    parser_add.add_argument('--network', required=True, help='中心节点负责的网络段（不得与其他中心节点重叠）')
+    parser_add.add_argument('--hub-ip', help='中心节点虚拟 IP (默认: 网络段第一个地址)')
+    parser_add.add_argument('--weight', type=float, default=1.0, help='容量权重 (默认: 1.0)')
+    parser_add.add_argument('--region', help='区域标签')
+    parser_add.set_defaults(func=cmd_hub_add)
+    
+    # hub list 命令
+    parser_list = hub_subparsers.add_parser('list', help='列出所有中心节点')
+    parser_list.set_defaults(func=cmd_hub_list)
+    
+    # hub remove 命令
+    parser_remove = hub_subparsers.add_parser('remove', help='删除远端中心节点')
+    parser_remove.add_argument('name', help='中心节点名称')
+    parser_remove.set_defaults(func=cmd_hub_remove)
+    
+    # hub policy 命令
+    parser_policy = hub_subparsers.add_parser('policy', help='查看或设置新节点归属策略')
+    parser_policy.add_argument('policy', nargs='?', choices=PLACEMENT_POLICIES, help='归属策略')
+    parser_policy.set_defaults(func=cmd_hub_policy)
+    
+    # hub peers 命令
+    parser_peers = hub_subparsers.add_parser('peers', help='输出远端中心节点应加载的 [Peer] 段')
+    parser_peers.add_argument('name', help='远端中心节点名称')
+    parser_peers.set_defaults(func=cmd_hub_peers)
+
+
+def cmd_hub_add(args):
+    """添加远端中心节点"""
+    try:
+        with Database() as db:
+            hub = HubService(db).add_hub(
+                name=args.name,
+                public_endpoint=args.endpoint,
+                public_key=args.public_key,
+                network_cidr=args.network,
+                virtual_ip=args.hub_ip,
+                capacity_weight=args.weight,
+                region=args.region
+            )
+            
+            print(f"✓ 中心节点 '{hub.name}' 添加成功")
+            print(f"  网络段: {hub.network_cidr}")
+            print(f"  虚拟 IP: {hub.virtual_ip}")
+            print(f"  公网地址: {hub.public_endpoint}")
+            return 0
+            
+    except (ValueError, RuntimeError) as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_hub_list(args):
+    """列出所有中心节点"""
+    try:
+        with Database() as db:
+            hub_service = HubService(db)
+            hubs = hub_service.get_hub_stats()
+            
+            if not hubs:
+                print("服务端未初始化")
+                return 1
+                
+            print("========================================")
+            print(f"中心节点列表（归属策略: {hub_service.get_placement_policy()}）")
+            print("========================================")
+            print(f"{'名称':<15} {'网络段':<18} {'节点数':<8} {'权重':<6} {'区域':<10} {'公网地址'}")
+            print("-" * 80)
+            
+            for hub in hubs:
+                name = f"{hub['name']}*" if hub['is_local'] else hub['name']
+                print(f"{name:<15} {hub['network_cidr']:<18} {hub['total_nodes']:<8} "
+                      f"{hub['capacity_weight']:<6g} {hub['region'] or '-':<10} "
+                      f"{hub['public_endpoint'] or '-'}")
+                
+            print("========================================")
+            print("* 本地中心节点")
+            return 0
+            
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_hub_remove(args):
+    """删除远端中心节点"""
+    try:
+        with Database() as db:
+            if HubService(db).remove_hub(args.name):
+                print(f"✓ 中心节点 '{args.name}' 删除成功")
+                return 0
+            print("错误: 删除失败")
+            return 1
+            
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_hub_policy(args):
+    """查看或设置新节点归属策略"""
+    try:
+        with Database() as db:
+            hub_service = HubService(db)
+            if args.policy:
+                db.set_config_param('hub_placement_policy', args.policy, '新节点归属中心节点的策略')
+                print(f"✓ 归属策略已设置为: {args.policy}")
+            else:
+                print(f"当前归属策略: {hub_service.get_placement_policy()}")
+            return 0
+            
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_hub_peers(args):
+    """输出远端中心节点应加载的 [Peer] 段"""
+    try:
+        with Database() as db:
+            peer_settings = ConfigService(db).get_peer_settings()
+            blocks = HubService(db).iter_hub_peers(args.name, peer_settings.default_keepalive, peer_settings)
+            for block in blocks:
+                sys.stdout.write(block)
+            return 0
+            
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
@@ -1,10 +1,6 @@
 """
 服务端初始化命令
 """
-import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-
 from core.models.database import Database
 from core.services.server_service import ServerService
 from config import base as config_base
@@ -17,6 +13,9 @@ def register_command(subparsers):
     parser_init.add_argument('--network', help=f'虚拟网络段 (默认: {config_base.DEFAULT_NETWORK_CIDR})')
     parser_init.add_argument('--server-ip', help=f'服务端虚拟 IP (默认: {config_base.DEFAULT_SERVER_IP})')
     parser_init.add_argument('--endpoint', help='公网地址 (格式: IP:Port 或 domain:Port)')
+    parser_init.add_argument('--shards', type=int, help=f'接口分片数量，网络段等分到 wg0..wgN-1 (默认: {config_base.DEFAULT_SHARD_COUNT})')
+    parser_init.add_argument('--ipv6', nargs='?', const='auto', metavar='PREFIX',
+                             help='启用 IPv6 双栈，可指定网络段，不指定时生成随机 ULA /64')
     parser_init.add_argument('-f', '--force', action='store_true', help='强制重新初始化')
     parser_init.set_defaults(func=cmd_init)
 
@@ -37,7 +36,9 @@ def cmd_init(args):
                 network_cidr=args.network,
                 server_ip=args.server_ip,
                 public_endpoint=args.endpoint,
-                force=args.force
+                force=args.force,
+                shards=args.shards,
+                ipv6=args.ipv6
             )
             
             print("========================================")
@@ -47,8 +48,16 @@ def cmd_init(args):
             print(f"服务端虚拟 IP: {server.virtual_ip}")
             print(f"监听端口: {server.listen_port}")
             print(f"虚拟网络段: {server.network_cidr}")
+            if server.network6_cidr:
+                print(f"服务端虚拟 IPv6: {server.virtual_ip6}")
+                print(f"IPv6 网络段: {server.network6_cidr}")
             if server.public_endpoint:
                 print(f"公网地址: {server.public_endpoint}")
+            interfaces = server_service.list_interfaces()
+            if len(interfaces) > 1:
+                print(f"接口分片: {len(interfaces)} 个")
+                for interface in interfaces:
+                    print(f"  {interface.name}: {interface.network_cidr} 端口 {interface.listen_port}")
             print()
             print(f"服务端公钥: {server.public_key}")
             print()
@@ -0,0 +1,196 @@
+"""
+网状拓扑命令
+"""
+import time
+from core.models.database import Database
+from core.services.mesh_analyzer import MeshAnalyzer
+from core.services.mesh_service import MeshService, MESH_MODES
+from core.services.node_service import NodeService
+from config import base as config
+
+
+def register_command(subparsers):
+    """注册网状拓扑命令"""
+    parser_mesh = subparsers.add_parser('mesh', help='节点直连（网状拓扑）管理')
+    mesh_subparsers = parser_mesh.add_subparsers(dest='mesh_command', help='网状拓扑子命令')
+    parser_mesh.set_defaults(func=lambda args: parser_mesh.print_help() or 1)
+    
+    # mesh mode 命令
+    parser_mode = mesh_subparsers.add_parser('mode', help='查看或设置拓扑模式')
+    parser_mode.add_argument('mode', nargs='?', choices=MESH_MODES, help='拓扑模式')
+    parser_mode.set_defaults(func=cmd_mesh_mode)
+    
+    # mesh endpoint 命令
+    parser_endpoint = mesh_subparsers.add_parser('endpoint', help='设置节点公网地址')
+    parser_endpoint.add_argument('node', help='节点名称')
+    parser_endpoint.add_argument('endpoint', nargs='?', help='公网地址 (格式: IP:Port)，省略表示清除')
+    parser_endpoint.set_defaults(func=cmd_mesh_endpoint)
+    
+    # mesh link 命令
+    parser_link = mesh_subparsers.add_parser('link', help='添加直连节点对（partial 模式）')
+    parser_link.add_argument('node_a', help='节点名称')
+    parser_link.add_argument('node_b', help='节点名称')
+    parser_link.set_defaults(func=cmd_mesh_link)
+    
+    # mesh unlink 命令
+    parser_unlink = mesh_subparsers.add_parser('unlink', help='删除直连节点对')
+    parser_unlink.add_argument('node_a', help='节点名称')
+    parser_unlink.add_argument('node_b', help='节点名称')
+    parser_unlink.set_defaults(func=cmd_mesh_unlink)
+    
+    # mesh analyze 命令
+    parser_analyze = mesh_subparsers.add_parser('analyze', help='按中心节点转发流量提升/降级直连节点对（auto 模式）')
+    parser_analyze.add_argument('--window', type=int, default=10, help='采样窗口（秒，默认: 10）')
+    parser_analyze.add_argument('--rounds', type=int, default=config.MESH_PROMOTE_AFTER,
+                                help=f'采样窗口数 (默认: {config.MESH_PROMOTE_AFTER})')
+    parser_analyze.add_argument('--dry-run', action='store_true', help='只输出报告，不修改直连节点对')
+    parser_analyze.set_defaults(func=cmd_mesh_analyze)
+    
+    # mesh show 命令
+    parser_show = mesh_subparsers.add_parser('show', help='显示节点的直连对端')
+    parser_show.add_argument('node', help='节点名称')
+    parser_show.set_defaults(func=cmd_mesh_show)
+
+
+def _get_node(db: Database, name: str):
+    """按名称获取节点，不存在时抛出 ValueError"""
+    node = NodeService(db).get_node(node_name=name)
+    if not node:
+        raise ValueError(f"节点 '{name}' 不存在")
+    return node
+
+
+def cmd_mesh_mode(args):
+    """查看或设置拓扑模式"""
+    try:
+        with Database() as db:
+            mesh_service = MeshService(db)
+            if args.mode:
+                mesh_service.set_mode(args.mode)
+                print(f"✓ 拓扑模式已设置为: {args.mode}")
+            else:
+                print(f"当前拓扑模式: {mesh_service.get_mode()}")
+            return 0
+            
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_mesh_endpoint(args):
+    """设置节点公网地址"""
+    try:
+        with Database() as db:
+            node = _get_node(db, args.node)
+            node = MeshService(db).set_endpoint(node.id, args.endpoint)
+            if node.endpoint:
+                print(f"✓ 节点 '{node.node_name}' 公网地址已设置为: {node.endpoint}")
+            else:
+                print(f"✓ 节点 '{node.node_name}' 公网地址已清除")
+            return 0
+            
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_mesh_link(args):
+    """添加直连节点对"""
+    try:
+        with Database() as db:
+            node_a = _get_node(db, args.node_a)
+            node_b = _get_node(db, args.node_b)
+            if MeshService(db).link(node_a.id, node_b.id):
+                print(f"✓ 已添加直连: {node_a.node_name} <-> {node_b.node_name}")
+            else:
+                print(f"直连已存在: {node_a.node_name} <-> {node_b.node_name}")
+            return 0
+            
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_mesh_unlink(args):
+    """删除直连节点对"""
+    try:
+        with Database() as db:
+            node_a = _get_node(db, args.node_a)
+            node_b = _get_node(db, args.node_b)
+            if MeshService(db).unlink(node_a.id, node_b.id):
+                print(f"✓ 已删除直连: {node_a.node_name} <-> {node_b.node_name}")
+                return 0
+            print(f"错误: 直连不存在: {node_a.node_name} <-> {node_b.node_name}")
+            return 1
+            
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_mesh_show(args):
+    """显示节点的直连对端"""
+    try:
+        with Database() as db:
+            mesh_service = MeshService(db)
+            node = _get_node(db, args.node)
+            peers = mesh_service.get_direct_peers(node)
+            
+            print("========================================")
+            print(f"节点 '{node.node_name}' 直连对端（模式: {mesh_service.get_mode()}）")
+            print("========================================")
+            print(f"公网地址: {node.endpoint or '-'}")
+            print("-" * 40)
+            for peer in peers:
+                print(f"  {peer.node_name:<20} {peer.virtual_ip:<15} {peer.endpoint or '(对端发起)'}")
+            print("========================================")
+            print(f"共 {len(peers)} 个直连对端，其余节点经中心节点转发")
+            return 0
+            
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_mesh_analyze(args):
+    """按中心节点转发流量提升/降级直连节点对"""
+    try:
+        with Database() as db:
+            analyzer = MeshAnalyzer()
+            # 第一次采样只建立基线
+            report = analyzer.run_once(db, dry_run=args.dry_run)
+            for round_index in range(args.rounds):
+                time.sleep(args.window)
+                report = analyzer.run_once(db, dry_run=args.dry_run)
+                print(f"窗口 {round_index + 1}/{args.rounds}: 候选 {len(report['candidates'])} 个")
+            
+            print("========================================")
+            print(f"直连流量分析（模式: {report['mode']}，数据来源: {report['flow_source']}）")
+            print("========================================")
+            for title, key in (('提升', 'promoted'), ('降级', 'demoted'), ('候选', 'candidates')):
+                for item in report[key]:
+                    print(f"  {title}: {item['nodes'][0]} <-> {item['nodes'][1]} "
+                          f"{item['rate'] / 1024:.1f} KiB/s")
+            if not report['applied']:
+                print("未修改直连节点对（dry-run 或非 auto 模式）")
+            elif report['flow_source'] != 'conntrack' and report['candidates']:
+                print("没有 conntrack 节点对流量，候选仅按 peer 计数器估计，不自动提升；")
+                print("确认后可用 mesh link 手动直连")
+            print("========================================")
+            return 0
+            
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
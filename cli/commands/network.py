@@ -0,0 +1,93 @@
+"""
+租户网络管理命令
+"""
+from core.models.database import Database
+from core.services.network_service import NetworkService
+
+
+def register_command(subparsers):
+    """注册租户网络管理命令"""
+    parser_network = subparsers.add_parser('network', help='多租户：管理相互隔离的虚拟网络')
+    network_subparsers = parser_network.add_subparsers(dest='network_command', help='租户网络子命令')
+    parser_network.set_defaults(func=lambda args: parser_network.print_help() or 1)
+
+    # network add 命令
+    parser_add = network_subparsers.add_parser('add', help='创建租户网络（独立接口、端口和网络段）')
+    parser_add.add_argument('name', help='网络名称')
+    parser_add.add_argument('cidr', help='网络段（如 10.20.0.0/24，不得与已有网络段重叠）')
+    parser_add.add_argument('-p', '--port', type=int, help='监听端口（默认: 已用端口的下一个）')
+    parser_add.add_argument('-d', '--description', help='网络描述')
+    parser_add.set_defaults(func=cmd_network_add)
+
+    # network remove 命令
+    parser_remove = network_subparsers.add_parser('remove', help='删除租户网络（网络内须已无节点）')
+    parser_remove.add_argument('name', help='网络名称')
+    parser_remove.set_defaults(func=cmd_network_remove)
+
+    # network list 命令
+    parser_list = network_subparsers.add_parser('list', help='列出所有网络')
+    parser_list.set_defaults(func=cmd_network_list)
+
+
+def cmd_network_add(args):
+    """创建租户网络"""
+    try:
+        with Database() as db:
+            network = NetworkService(db).create_network(
+                args.name, args.cidr, listen_port=args.port, description=args.description
+            )
+            print(f"✓ 网络 '{network['name']}' 创建成功")
+            print(f"  网络段: {network['network_cidr']}")
+            print(f"  接口: {network['interface']}（端口 {network['listen_port']}）")
+            return 0
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_network_remove(args):
+    """删除租户网络"""
+    try:
+        with Database() as db:
+            if NetworkService(db).delete_network(args.name):
+                print(f"✓ 网络 '{args.name}' 删除成功")
+                return 0
+            print("错误: 删除失败")
+            return 1
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_network_list(args):
+    """列出所有网络"""
+    try:
+        with Database() as db:
+            networks = NetworkService(db).list_networks()
+
+            if not networks:
+                print("暂无网络（服务端未初始化）")
+                return 0
+
+            print("========================================")
+            print(f"{'名称':<16} {'网络段':<18} {'接口':<8} {'端口':<7} {'节点数':<8} {'描述'}")
+            print("-" * 72)
+            for network in networks:
+                print(f"{network['name']:<16} {network['network_cidr']:<18} "
+                      f"{network['interface'] or '-':<8} {network['listen_port'] or '-':<7} "
+                      f"{network['node_count']:<8} {network['description'] or ''}")
+            print("========================================")
+            print(f"共 {len(networks)} 个网络")
+            return 0
+
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
@@ -1,10 +1,7 @@
 """
 节点管理命令
 """
-import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-
+from cli.ui.output import add_output_argument, print_error, write_record, write_records
 from core.models.database import Database
 from core.services.node_service import NodeService
 from config import base as config
@@ -17,11 +14,20 @@ def register_command(subparsers):
     parser_register.add_argument('name', help='节点名称')
     parser_register.add_argument('platform', choices=['linux', 'windows'], help='平台类型')
     parser_register.add_argument('-d', '--description', help='节点描述')
+    parser_register.add_argument('-r', '--region', help='区域标签（多中心部署按区域选择中心节点）')
+    parser_register.add_argument('--endpoint', help='节点公网地址 (格式: IP:Port)，网状模式下可被其他节点直连')
+    parser_register.add_argument('--route', action='append', dest='routes', metavar='CIDR',
+                                 help='节点后方的子网（可重复指定），经该节点路由')
+    parser_register.add_argument('-g', '--group', help='所属节点组（使用节点组的分流策略）')
+    parser_register.add_argument('-n', '--network', help='所属租户网络（默认为 default 网络）')
+    parser_register.add_argument('--ttl', metavar='DURATION', help='有效期（如 12h、7d），到期后由节点清理删除或停用')
     parser_register.add_argument('-e', '--export', action='store_true', help='导出配置到文件')
     parser_register.set_defaults(func=cmd_register)
     
     # list 命令
     parser_list = subparsers.add_parser('list', help='列出所有节点')
+    parser_list.add_argument('-n', '--network', help='仅列出指定租户网络的节点')
+    add_output_argument(parser_list)
     parser_list.set_defaults(func=cmd_list)
     
     # show 命令
@@ -30,6 +36,7 @@ def register_command(subparsers):
     group.add_argument('--id', type=int, help='节点 ID')
     group.add_argument('--name', help='节点名称')
     parser_show.add_argument('-k', '--show-private-key', action='store_true', help='显示私钥')
+    add_output_argument(parser_show)
     parser_show.set_defaults(func=cmd_show)
     
     # delete 命令
@@ -48,7 +55,13 @@ def cmd_register(args):
             result = node_service.register_node(
                 node_name=args.name,
                 platform=args.platform,
-                description=args.description
+                description=args.description,
+                region=args.region,
+                endpoint=args.endpoint,
+                routes=args.routes,
+                group=args.group,
+                network=args.network,
+                ttl=args.ttl
             )
             
             print("========================================")
@@ -57,7 +70,18 @@ def cmd_register(args):
             print(f"节点 ID: {result['node_id']}")
             print(f"节点名称: {result['node_name']}")
             print(f"虚拟 IP: {result['virtual_ip']}")
+            if result['virtual_ip6']:
+                print(f"虚拟 IPv6: {result['virtual_ip6']}")
             print(f"平台: {result['platform']}")
+            print(f"中心节点: {result['hub']}")
+            if result['network'] != config.DEFAULT_NETWORK_NAME:
+                print(f"网络: {result['network']}")
+            if result['group']:
+                print(f"节点组: {result['group']}")
+            if result['routed_subnets']:
+                print(f"路由子网: {', '.join(result['routed_subnets'])}")
+            if result['expires_at']:
+                print(f"过期时间: {result['expires_at']} (UTC)")
             print(f"公钥: {result['public_key']}")
             if result['description']:
                 print(f"描述: {result['description']}")
@@ -84,32 +108,38 @@ def cmd_register(args):
 
 
 def cmd_list(args):
-    """列出所有节点"""
+    """列出所有节点（逐行读取数据库游标并输出，节点数量不影响内存占用）"""
     try:
         with Database() as db:
-            node_service = NodeService(db)
-            nodes = node_service.list_nodes()
+            nodes = NodeService(db).iter_nodes(network=args.network)
             
-            if not nodes:
-                print("暂无节点")
+            if args.output != 'text':
+                write_records((node.to_dict() for node in nodes), args.output)
                 return 0
-                
-            print("========================================")
-            print("节点列表")
-            print("========================================")
-            print(f"{'ID':<5} {'名称':<20} {'虚拟IP':<15} {'平台':<10}")
-            print("-" * 60)
             
+            count = 0
             for node in nodes:
-                print(f"{node.id:<5} {node.node_name:<20} {node.virtual_ip:<15} {node.platform:<10}")
+                if not count:
+                    print("========================================")
+                    print("节点列表")
+                    print("========================================")
+                    print(f"{'ID':<5} {'名称':<20} {'虚拟IP':<15} {'平台':<10}")
+                    print("-" * 60)
+                status = '已停用' if node.disabled_at else ''
+                print(f"{node.id:<5} {node.node_name:<20} {node.virtual_ip:<15} {node.platform:<10} {status}")
+                count += 1
+                
+            if not count:
+                print("暂无节点")
+                return 0
                       
             print("========================================")
-            print(f"共 {len(nodes)} 个节点")
+            print(f"共 {count} 个节点")
             print("========================================")
             return 0
             
     except Exception as e:
-        print(f"错误: {str(e)}")
+        print_error(str(e), args.output)
         return 1
 
 
@@ -121,8 +151,12 @@ def cmd_show(args):
             node = node_service.get_node(node_id=args.id, node_name=args.name)
                 
             if not node:
-                print("错误: 节点不存在")
+                print_error("节点不存在", args.output)
                 return 1
+            
+            if args.output != 'text':
+                write_record(node.to_dict(include_private_key=args.show_private_key), args.output)
+                return 0
                 
             print("========================================")
             print("节点详情")
@@ -130,8 +164,16 @@ def cmd_show(args):
             print(f"节点 ID: {node.id}")
             print(f"节点名称: {node.node_name}")
             print(f"虚拟 IP: {node.virtual_ip}")
+            if node.virtual_ip6:
+                print(f"虚拟 IPv6: {node.virtual_ip6}")
             print(f"平台: {node.platform}")
             print(f"公钥: {node.public_key}")
+            if node.routes:
+                print(f"路由子网: {', '.join(node.routes)}")
+            if node.expires_at:
+                print(f"过期时间: {node.expires_at} (UTC)")
+            if node.disabled_at:
+                print(f"已停用: {node.disabled_at} (UTC)")
             
             if args.show_private_key:
                 print(f"私钥: {node.private_key}")
@@ -143,7 +185,7 @@ def cmd_show(args):
             return 0
             
     except Exception as e:
-        print(f"错误: {str(e)}")
+        print_error(str(e), args.output)
         return 1
 
 
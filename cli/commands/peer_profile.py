@@ -0,0 +1,262 @@
+"""
+对端参数命令
+"""
+from core.models.database import Database
+from core.services.node_service import NodeService
+from core.services.peer_profile_service import PeerProfileService, KEEPALIVE_MODES, PLATFORMS
+
+
+def register_command(subparsers):
+    """注册对端参数命令"""
+    parser_peer = subparsers.add_parser('peer-profile', help='节点保活间隔 / MTU 配置')
+    peer_subparsers = parser_peer.add_subparsers(dest='peer_profile_command', help='对端参数子命令')
+    parser_peer.set_defaults(func=lambda args: parser_peer.print_help() or 1)
+
+    # peer-profile add 命令
+    parser_add = peer_subparsers.add_parser('add', help='创建对端参数配置')
+    parser_add.add_argument('name', help='配置名称')
+    parser_add.add_argument('--keepalive', metavar='SECONDS', help='保活间隔（秒，off 表示关闭）')
+    parser_add.add_argument('--mtu', type=int, help='客户端接口 MTU')
+    parser_add.add_argument('-d', '--description', help='配置描述')
+    parser_add.set_defaults(func=cmd_peer_profile_add)
+
+    # peer-profile update 命令
+    parser_update = peer_subparsers.add_parser('update', help='修改对端参数配置并重载接口')
+    parser_update.add_argument('name', help='配置名称')
+    parser_update.add_argument('--keepalive', metavar='SECONDS', help='保活间隔（off 关闭，none 改为继承）')
+    parser_update.add_argument('--mtu', help='客户端接口 MTU（none 改为继承）')
+    parser_update.add_argument('-d', '--description', help='配置描述')
+    parser_update.set_defaults(func=cmd_peer_profile_update)
+
+    # peer-profile remove 命令
+    parser_remove = peer_subparsers.add_parser('remove', help='删除对端参数配置')
+    parser_remove.add_argument('name', help='配置名称')
+    parser_remove.set_defaults(func=cmd_peer_profile_remove)
+
+    # peer-profile list 命令
+    parser_list = peer_subparsers.add_parser('list', help='列出所有对端参数配置')
+    parser_list.set_defaults(func=cmd_peer_profile_list)
+
+    # peer-profile attach / detach 命令
+    parser_attach = peer_subparsers.add_parser('attach', help='为节点或平台设置对端参数配置')
+    parser_attach.add_argument('name', help='配置名称')
+    target = parser_attach.add_mutually_exclusive_group(required=True)
+    target.add_argument('--node', help='节点名称')
+    target.add_argument('--platform', choices=PLATFORMS, help='平台（作为该平台节点的默认配置）')
+    parser_attach.set_defaults(func=cmd_peer_profile_attach)
+
+    parser_detach = peer_subparsers.add_parser('detach', help='清除节点或平台的对端参数配置')
+    target = parser_detach.add_mutually_exclusive_group(required=True)
+    target.add_argument('--node', help='节点名称')
+    target.add_argument('--platform', choices=PLATFORMS, help='平台')
+    parser_detach.set_defaults(func=cmd_peer_profile_detach)
+
+    # peer-profile observe 命令
+    parser_observe = peer_subparsers.add_parser('observe', help='采样一次节点公网地址（适合 cron 定期执行）')
+    parser_observe.set_defaults(func=cmd_peer_profile_observe)
+
+    # peer-profile recommend 命令
+    parser_recommend = peer_subparsers.add_parser('recommend', help='根据地址观测结果给出保活建议')
+    parser_recommend.add_argument('--apply', action='store_true', help='应用建议并重载接口')
+    parser_recommend.set_defaults(func=cmd_peer_profile_recommend)
+
+    # peer-profile mode 命令
+    parser_mode = peer_subparsers.add_parser('mode', help='查看或设置保活建议模式')
+    parser_mode.add_argument('mode', nargs='?', choices=KEEPALIVE_MODES,
+                             help='manual 仅给出建议，auto 每次观测后自动应用')
+    parser_mode.set_defaults(func=cmd_peer_profile_mode)
+
+
+def _format_keepalive(value):
+    """保活间隔 -> 显示文本"""
+    if value is None:
+        return '-'
+    return 'off' if value == 0 else f"{value}s"
+
+
+def cmd_peer_profile_add(args):
+    """创建对端参数配置"""
+    try:
+        with Database() as db:
+            profile = PeerProfileService(db).create_profile(
+                args.name, args.keepalive, args.mtu, args.description
+            )
+            print(f"✓ 对端参数配置 '{profile.name}' 创建成功（保活 {_format_keepalive(profile.persistent_keepalive)}，"
+                  f"MTU {profile.mtu or '-'}）")
+            return 0
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_peer_profile_update(args):
+    """修改对端参数配置"""
+    try:
+        with Database() as db:
+            profile = PeerProfileService(db).update_profile(
+                args.name, args.keepalive, args.mtu, args.description
+            )
+            print(f"✓ 对端参数配置 '{profile.name}' 已更新（保活 {_format_keepalive(profile.persistent_keepalive)}，"
+                  f"MTU {profile.mtu or '-'}）")
+            return 0
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_peer_profile_remove(args):
+    """删除对端参数配置"""
+    try:
+        with Database() as db:
+            if PeerProfileService(db).delete_profile(args.name):
+                print(f"✓ 对端参数配置 '{args.name}' 删除成功")
+                return 0
+            print("错误: 删除失败")
+            return 1
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_peer_profile_list(args):
+    """列出所有对端参数配置"""
+    try:
+        with Database() as db:
+            profiles = PeerProfileService(db).list_profiles()
+
+            if not profiles:
+                print("暂无对端参数配置")
+                return 0
+
+            print("========================================")
+            print(f"{'名称':<18} {'保活':<8} {'MTU':<6} {'平台默认':<10} {'描述'}")
+            print("-" * 64)
+            for profile in profiles:
+                print(f"{profile.name:<18} {_format_keepalive(profile.persistent_keepalive):<8} "
+                      f"{profile.mtu or '-':<6} {profile.platform or '-':<10} {profile.description or ''}")
+            print("========================================")
+            print(f"共 {len(profiles)} 个对端参数配置")
+            return 0
+
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_peer_profile_attach(args):
+    """为节点或平台设置对端参数配置"""
+    return _set_profile(args, args.name)
+
+
+def cmd_peer_profile_detach(args):
+    """清除节点或平台的对端参数配置"""
+    return _set_profile(args, None)
+
+
+def _set_profile(args, profile_name):
+    """设置或清除节点/平台的对端参数配置"""
+    try:
+        with Database() as db:
+            peer_service = PeerProfileService(db)
+            if args.node:
+                node = NodeService(db).get_node(node_name=args.node)
+                if not node:
+                    raise ValueError(f"节点 '{args.node}' 不存在")
+                peer_service.set_node_profile(node.id, profile_name)
+                target = f"节点 '{node.node_name}'"
+            else:
+                peer_service.set_platform_profile(args.platform, profile_name)
+                target = f"平台 {args.platform}"
+
+            if profile_name:
+                print(f"✓ {target} 已使用对端参数配置 '{profile_name}'")
+            else:
+                print(f"✓ 已清除 {target} 的对端参数配置")
+            return 0
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_peer_profile_observe(args):
+    """采样一次节点公网地址"""
+    try:
+        with Database() as db:
+            result = PeerProfileService(db).observe()
+            print(f"✓ 已记录 {result['observed']} 个节点的公网地址")
+            for item in result['applied']:
+                print(f"  {_describe(item)}")
+            return 0
+
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_peer_profile_recommend(args):
+    """根据地址观测结果给出保活建议"""
+    try:
+        with Database() as db:
+            peer_service = PeerProfileService(db)
+            if args.apply:
+                recommendations = peer_service.apply_recommendations()
+            else:
+                recommendations = peer_service.recommend()
+
+            if not recommendations:
+                print("暂无保活建议")
+                return 0
+
+            for item in recommendations:
+                print(f"  {_describe(item)}")
+            if args.apply:
+                print(f"✓ 已应用 {len(recommendations)} 条保活建议")
+            else:
+                print(f"共 {len(recommendations)} 条保活建议（使用 --apply 应用）")
+            return 0
+
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def _describe(item):
+    """保活建议 -> 显示文本"""
+    hours = item['observed_seconds'] / 3600
+    if item['action'] == 'disable':
+        return (f"{item['node_name']}: 关闭保活（{item['endpoint']} 在 {hours:.1f} 小时、"
+                f"{item['samples']} 次采样内未变化）")
+    return f"{item['node_name']}: 恢复保活（公网地址变化 {item['changes']} 次）"
+
+
+def cmd_peer_profile_mode(args):
+    """查看或设置保活建议模式"""
+    try:
+        with Database() as db:
+            peer_service = PeerProfileService(db)
+            if args.mode:
+                peer_service.set_mode(args.mode)
+                print(f"✓ 保活建议模式已设置为: {args.mode}")
+            else:
+                print(f"当前保活建议模式: {peer_service.get_mode()}")
+            return 0
+
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
@@ -0,0 +1,352 @@
+"""
+路由策略和节点组命令
+"""
+from core.models.database import Database
+from core.services.node_service import NodeService
+from core.services.policy_service import PolicyService
+from core.utils.cidr_compactor import PREFIX_ALIASES
+
+
+def register_command(subparsers):
+    """注册路由策略和节点组命令"""
+    aliases = ', '.join(PREFIX_ALIASES)
+
+    parser_policy = subparsers.add_parser('policy', help='客户端分流策略（AllowedIPs）管理')
+    policy_subparsers = parser_policy.add_subparsers(dest='policy_command', help='分流策略子命令')
+    parser_policy.set_defaults(func=lambda args: parser_policy.print_help() or 1)
+
+    # policy add 命令
+    parser_add = policy_subparsers.add_parser('add', help='创建分流策略')
+    parser_add.add_argument('name', help='策略名称')
+    parser_add.add_argument('--include', nargs='+', required=True, metavar='PREFIX',
+                            help=f'经隧道转发的前缀（可用别名: {aliases}）')
+    parser_add.add_argument('--exclude', nargs='+', default=[], metavar='PREFIX', help='排除的前缀')
+    parser_add.add_argument('-d', '--description', help='策略描述')
+    parser_add.set_defaults(func=cmd_policy_add)
+
+    # policy update 命令
+    parser_update = policy_subparsers.add_parser('update', help='修改分流策略')
+    parser_update.add_argument('name', help='策略名称')
+    parser_update.add_argument('--include', nargs='+', metavar='PREFIX', help='经隧道转发的前缀')
+    parser_update.add_argument('--exclude', nargs='*', metavar='PREFIX', help='排除的前缀（不带参数表示清空）')
+    parser_update.add_argument('-d', '--description', help='策略描述')
+    parser_update.set_defaults(func=cmd_policy_update)
+
+    # policy remove 命令
+    parser_remove = policy_subparsers.add_parser('remove', help='删除分流策略')
+    parser_remove.add_argument('name', help='策略名称')
+    parser_remove.set_defaults(func=cmd_policy_remove)
+
+    # policy list 命令
+    parser_list = policy_subparsers.add_parser('list', help='列出所有分流策略')
+    parser_list.set_defaults(func=cmd_policy_list)
+
+    # policy show 命令
+    parser_show = policy_subparsers.add_parser('show', help='显示策略编译后的 AllowedIPs')
+    parser_show.add_argument('name', help='策略名称')
+    parser_show.set_defaults(func=cmd_policy_show)
+
+    # policy preview 命令
+    parser_preview = policy_subparsers.add_parser('preview', help='不保存，直接计算包含/排除前缀的压缩结果')
+    parser_preview.add_argument('--include', nargs='+', required=True, metavar='PREFIX', help='包含的前缀')
+    parser_preview.add_argument('--exclude', nargs='+', default=[], metavar='PREFIX', help='排除的前缀')
+    parser_preview.set_defaults(func=cmd_policy_preview)
+
+    # policy attach / detach 命令
+    parser_attach = policy_subparsers.add_parser('attach', help='为节点或节点组设置分流策略')
+    parser_attach.add_argument('name', help='策略名称')
+    target = parser_attach.add_mutually_exclusive_group(required=True)
+    target.add_argument('--node', help='节点名称')
+    target.add_argument('--group', help='节点组名称')
+    parser_attach.set_defaults(func=cmd_policy_attach)
+
+    parser_detach = policy_subparsers.add_parser('detach', help='清除节点或节点组的分流策略')
+    target = parser_detach.add_mutually_exclusive_group(required=True)
+    target.add_argument('--node', help='节点名称')
+    target.add_argument('--group', help='节点组名称')
+    parser_detach.set_defaults(func=cmd_policy_detach)
+
+    parser_group = subparsers.add_parser('group', help='节点组管理')
+    group_subparsers = parser_group.add_subparsers(dest='group_command', help='节点组子命令')
+    parser_group.set_defaults(func=lambda args: parser_group.print_help() or 1)
+
+    # group add 命令
+    parser_group_add = group_subparsers.add_parser('add', help='创建节点组')
+    parser_group_add.add_argument('name', help='节点组名称')
+    parser_group_add.add_argument('--policy', help='组内节点默认使用的分流策略')
+    parser_group_add.add_argument('-d', '--description', help='节点组描述')
+    parser_group_add.set_defaults(func=cmd_group_add)
+
+    # group remove 命令
+    parser_group_remove = group_subparsers.add_parser('remove', help='删除节点组（组内节点变为未分组）')
+    parser_group_remove.add_argument('name', help='节点组名称')
+    parser_group_remove.set_defaults(func=cmd_group_remove)
+
+    # group list 命令
+    parser_group_list = group_subparsers.add_parser('list', help='列出所有节点组')
+    parser_group_list.set_defaults(func=cmd_group_list)
+
+    # group assign / unassign 命令
+    parser_assign = group_subparsers.add_parser('assign', help='将节点加入节点组')
+    parser_assign.add_argument('node', help='节点名称')
+    parser_assign.add_argument('group', help='节点组名称')
+    parser_assign.set_defaults(func=cmd_group_assign)
+
+    parser_unassign = group_subparsers.add_parser('unassign', help='将节点移出节点组')
+    parser_unassign.add_argument('node', help='节点名称')
+    parser_unassign.set_defaults(func=cmd_group_assign, group=None)
+
+
+def _get_node(db: Database, name: str):
+    """按名称获取节点，不存在时抛出 ValueError"""
+    node = NodeService(db).get_node(node_name=name)
+    if not node:
+        raise ValueError(f"节点 '{name}' 不存在")
+    return node
+
+
+def _print_prefixes(prefixes):
+    """逐行输出前缀列表"""
+    for prefix in prefixes:
+        print(f"  {prefix}")
+
+
+def cmd_policy_add(args):
+    """创建分流策略"""
+    try:
+        with Database() as db:
+            policy_service = PolicyService(db)
+            policy = policy_service.create_policy(
+                args.name, args.include, args.exclude, args.description
+            )
+            compiled = policy_service.compile_policy(policy)
+            print(f"✓ 分流策略 '{policy.name}' 创建成功（编译为 {len(compiled)} 个前缀）")
+            return 0
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_policy_update(args):
+    """修改分流策略"""
+    try:
+        with Database() as db:
+            policy_service = PolicyService(db)
+            policy = policy_service.update_policy(
+                args.name, args.include, args.exclude, args.description
+            )
+            compiled = policy_service.compile_policy(policy)
+            print(f"✓ 分流策略 '{policy.name}' 已更新到版本 {policy.version}"
+                  f"（编译为 {len(compiled)} 个前缀）")
+            return 0
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_policy_remove(args):
+    """删除分流策略"""
+    try:
+        with Database() as db:
+            if PolicyService(db).delete_policy(args.name):
+                print(f"✓ 分流策略 '{args.name}' 删除成功")
+                return 0
+            print("错误: 删除失败")
+            return 1
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_policy_list(args):
+    """列出所有分流策略"""
+    try:
+        with Database() as db:
+            policies = PolicyService(db).list_policies()
+
+            if not policies:
+                print("暂无分流策略")
+                return 0
+
+            print("========================================")
+            print(f"{'名称':<16} {'版本':<6} {'包含':<30} {'排除'}")
+            print("-" * 80)
+            for policy in policies:
+                print(f"{policy.name:<16} {policy.version:<6} "
+                      f"{','.join(policy.includes):<30} {','.join(policy.excludes) or '-'}")
+            print("========================================")
+            print(f"共 {len(policies)} 个分流策略")
+            return 0
+
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_policy_show(args):
+    """显示策略编译后的 AllowedIPs"""
+    try:
+        with Database() as db:
+            policy_service = PolicyService(db)
+            policy = policy_service.get_policy(args.name)
+            compiled = policy_service.compile_policy(policy)
+
+            print("========================================")
+            print(f"分流策略 '{policy.name}'（版本 {policy.version}）")
+            print("========================================")
+            print(f"包含: {', '.join(policy.includes)}")
+            print(f"排除: {', '.join(policy.excludes) or '-'}")
+            if policy.description:
+                print(f"描述: {policy.description}")
+            print(f"编译结果（{len(compiled)} 个前缀，另加虚拟网络段和节点路由子网）:")
+            _print_prefixes(compiled)
+            print("========================================")
+            return 0
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_policy_preview(args):
+    """计算包含/排除前缀的压缩结果"""
+    try:
+        compiled = PolicyService.preview(args.include, args.exclude)
+        _print_prefixes(compiled)
+        print(f"共 {len(compiled)} 个前缀")
+        return 0
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_policy_attach(args):
+    """为节点或节点组设置分流策略"""
+    return _set_policy(args, args.name)
+
+
+def cmd_policy_detach(args):
+    """清除节点或节点组的分流策略"""
+    return _set_policy(args, None)
+
+
+def _set_policy(args, policy_name):
+    """设置或清除节点/节点组的分流策略"""
+    try:
+        with Database() as db:
+            policy_service = PolicyService(db)
+            if args.node:
+                node = _get_node(db, args.node)
+                policy_service.set_node_policy(node.id, policy_name)
+                target = f"节点 '{node.node_name}'"
+            else:
+                policy_service.set_group_policy(args.group, policy_name)
+                target = f"节点组 '{args.group}'"
+
+            if policy_name:
+                print(f"✓ {target} 已使用分流策略 '{policy_name}'")
+            else:
+                print(f"✓ 已清除 {target} 的分流策略")
+            return 0
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_group_add(args):
+    """创建节点组"""
+    try:
+        with Database() as db:
+            group = PolicyService(db).create_group(args.name, args.policy, args.description)
+            print(f"✓ 节点组 '{group.name}' 创建成功")
+            return 0
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_group_remove(args):
+    """删除节点组"""
+    try:
+        with Database() as db:
+            if PolicyService(db).delete_group(args.name):
+                print(f"✓ 节点组 '{args.name}' 删除成功")
+                return 0
+            print("错误: 删除失败")
+            return 1
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_group_list(args):
+    """列出所有节点组"""
+    try:
+        with Database() as db:
+            groups = PolicyService(db).list_groups()
+
+            if not groups:
+                print("暂无节点组")
+                return 0
+
+            print("========================================")
+            print(f"{'名称':<16} {'节点数':<8} {'分流策略':<16} {'描述'}")
+            print("-" * 60)
+            for group in groups:
+                print(f"{group['name']:<16} {group['node_count']:<8} "
+                      f"{group['policy'] or '-':<16} {group['description'] or ''}")
+            print("========================================")
+            print(f"共 {len(groups)} 个节点组")
+            return 0
+
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_group_assign(args):
+    """将节点加入或移出节点组"""
+    try:
+        with Database() as db:
+            node = _get_node(db, args.node)
+            PolicyService(db).assign_group(node.id, args.group)
+            if args.group:
+                print(f"✓ 节点 '{node.node_name}' 已加入节点组 '{args.group}'")
+            else:
+                print(f"✓ 节点 '{node.node_name}' 已移出节点组")
+            return 0
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
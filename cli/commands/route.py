@@ -0,0 +1,127 @@
+"""
+路由子网命令
+"""
+from core.models.database import Database
+from core.services.node_service import NodeService
+from core.services.route_service import RouteService
+
+
+def register_command(subparsers):
+    """注册路由子网和地址归属查询命令"""
+    parser_route = subparsers.add_parser('route', help='节点路由子网（站点互联）管理')
+    route_subparsers = parser_route.add_subparsers(dest='route_command', help='路由子网子命令')
+    parser_route.set_defaults(func=lambda args: parser_route.print_help() or 1)
+
+    # route add 命令
+    parser_add = route_subparsers.add_parser('add', help='为节点添加路由子网')
+    parser_add.add_argument('node', help='节点名称')
+    parser_add.add_argument('subnet', help='子网 (CIDR 格式，如 192.168.10.0/24)')
+    parser_add.set_defaults(func=cmd_route_add)
+
+    # route remove 命令
+    parser_remove = route_subparsers.add_parser('remove', help='删除节点的路由子网')
+    parser_remove.add_argument('node', help='节点名称')
+    parser_remove.add_argument('subnet', help='子网 (CIDR 格式)')
+    parser_remove.set_defaults(func=cmd_route_remove)
+
+    # route list 命令
+    parser_list = route_subparsers.add_parser('list', help='列出所有路由子网')
+    parser_list.set_defaults(func=cmd_route_list)
+
+    # whois 命令
+    parser_whois = subparsers.add_parser('whois', help='查询 IP 地址归属的节点、子网或网络段')
+    parser_whois.add_argument('address', help='IP 地址')
+    parser_whois.set_defaults(func=cmd_whois)
+
+
+def _get_node(db: Database, name: str):
+    """按名称获取节点，不存在时抛出 ValueError"""
+    node = NodeService(db).get_node(node_name=name)
+    if not node:
+        raise ValueError(f"节点 '{name}' 不存在")
+    return node
+
+
+def cmd_route_add(args):
+    """为节点添加路由子网"""
+    try:
+        with Database() as db:
+            node = _get_node(db, args.node)
+            node = RouteService(db).add_route(node.id, args.subnet)
+            print(f"✓ 节点 '{node.node_name}' 路由子网: {', '.join(node.routes)}")
+            return 0
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_route_remove(args):
+    """删除节点的路由子网"""
+    try:
+        with Database() as db:
+            node = _get_node(db, args.node)
+            node = RouteService(db).remove_route(node.id, args.subnet)
+            print(f"✓ 已删除节点 '{node.node_name}' 的路由子网 {args.subnet}")
+            return 0
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_route_list(args):
+    """列出所有路由子网"""
+    try:
+        with Database() as db:
+            routes = RouteService(db).list_routes()
+
+            if not routes:
+                print("暂无路由子网")
+                return 0
+
+            print("========================================")
+            print(f"{'子网':<22} {'节点':<20} {'节点 ID':<8}")
+            print("-" * 52)
+            for route in routes:
+                print(f"{route['subnet']:<22} {route['node_name'] or '-':<20} {route['node_id']:<8}")
+            print("========================================")
+            print(f"共 {len(routes)} 个路由子网")
+            return 0
+
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_whois(args):
+    """查询 IP 地址归属"""
+    try:
+        with Database() as db:
+            result = RouteService(db).whois(args.address)
+
+            kind = result['kind']
+            if kind == 'node':
+                print(f"{result['address']}: 节点 {result['name']} (ID: {result['id']})")
+            elif kind == 'route':
+                print(f"{result['address']}: 节点 {result['name']} (ID: {result['id']}) "
+                      f"的路由子网 {result['prefix']}")
+            elif kind == 'network':
+                print(f"{result['address']}: 中心节点 {result['name']} 的网络段 {result['prefix']}（未分配）")
+            else:
+                print(f"{result['address']}: 不属于任何节点、路由子网或网络段")
+                return 1
+            return 0
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
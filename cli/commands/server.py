@@ -1,10 +1,7 @@
 """
 服务端信息命令
 """
-import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-
+from cli.ui.output import add_output_argument, print_error, write_record, write_records
 from core.models.database import Database
 from core.services.server_service import ServerService
 
@@ -13,7 +10,22 @@ def register_command(subparsers):
     """注册服务端命令"""
     parser_info = subparsers.add_parser('server-info', help='显示服务端信息')
     parser_info.add_argument('-k', '--show-private-key', action='store_true', help='显示私钥')
+    add_output_argument(parser_info)
     parser_info.set_defaults(func=cmd_server_info)
+    
+    parser_status = subparsers.add_parser('status', help='显示 WireGuard 接口运行状态')
+    add_output_argument(parser_status)
+    parser_status.set_defaults(func=cmd_status)
+    
+    parser_ipv6 = subparsers.add_parser('ipv6', help='IPv6 双栈管理')
+    ipv6_subparsers = parser_ipv6.add_subparsers(dest='ipv6_command', help='IPv6 子命令')
+    parser_ipv6.set_defaults(func=lambda args: parser_ipv6.print_help() or 1)
+    
+    # ipv6 enable 命令
+    parser_enable = ipv6_subparsers.add_parser('enable', help='为已初始化的服务端启用 IPv6，并为已有节点批量分配地址')
+    parser_enable.add_argument('prefix', nargs='?', default='auto',
+                               help='IPv6 网络段（默认生成随机 ULA /64）')
+    parser_enable.set_defaults(func=cmd_ipv6_enable)
 
 
 def cmd_server_info(args):
@@ -24,9 +36,17 @@ def cmd_server_info(args):
             server = server_service.get_server_info()
             
             if not server:
-                print("服务端未初始化")
-                print("请运行: uv run python cli/main.py init")
+                print_error("服务端未初始化，请运行: uv run wg-toolkit init", args.output)
                 return 1
+            
+            interfaces = server_service.list_interfaces()
+            if args.output != 'text':
+                data = server.to_dict(include_private_key=args.show_private_key)
+                data['interfaces'] = [
+                    interface.to_dict(include_private_key=args.show_private_key) for interface in interfaces
+                ]
+                write_record(data, args.output)
+                return 0
                 
             print("========================================")
             print("服务端信息")
@@ -34,6 +54,9 @@ def cmd_server_info(args):
             print(f"虚拟 IP: {server.virtual_ip}")
             print(f"监听端口: {server.listen_port}")
             print(f"虚拟网络段: {server.network_cidr}")
+            if server.network6_cidr:
+                print(f"虚拟 IPv6: {server.virtual_ip6}")
+                print(f"IPv6 网络段: {server.network6_cidr}")
             
             if server.public_endpoint:
                 print(f"公网地址: {server.public_endpoint}")
@@ -43,9 +66,68 @@ def cmd_server_info(args):
             if args.show_private_key:
                 print(f"私钥: {server.private_key}")
                 
+            if len(interfaces) > 1:
+                print("-" * 40)
+                print(f"接口分片: {len(interfaces)} 个")
+                for interface in interfaces:
+                    print(f"  {interface.name}: {', '.join(interface.networks)} "
+                          f"端口 {interface.listen_port} 公钥 {interface.public_key}")
+                
+            print("========================================")
+            return 0
+            
+    except Exception as e:
+        print_error(str(e), args.output)
+        return 1
+
+
+def cmd_status(args):
+    """显示 WireGuard 接口运行状态"""
+    try:
+        with Database() as db:
+            status = ServerService(db).get_status()
+            
+            if args.output in ('jsonl', 'csv'):
+                # 每个接口一行
+                write_records(status['interfaces'], args.output,
+                              fields=('name', 'listen_port', 'network_cidr', 'running', 'total_nodes'))
+                return 0
+            if args.output == 'json':
+                write_record(status, args.output)
+                return 0
+            
+            print("========================================")
+            print("运行状态")
+            print("========================================")
+            print(f"WireGuard: {'运行中' if status['wireguard_running'] else '未运行'}")
+            print(f"节点总数: {status['total_nodes']}")
+            print("-" * 60)
+            print(f"{'接口':<10} {'端口':<8} {'网络段':<20} {'状态':<8} {'节点数':<8}")
+            for interface in status['interfaces']:
+                state = '运行中' if interface['running'] else '未运行'
+                print(f"{interface['name']:<10} {interface['listen_port']:<8} "
+                      f"{interface['network_cidr']:<20} {state:<8} {interface['total_nodes']:<8}")
             print("========================================")
             return 0
             
+    except Exception as e:
+        print_error(str(e), args.output)
+        return 1
+
+
+def cmd_ipv6_enable(args):
+    """启用 IPv6 双栈"""
+    try:
+        with Database() as db:
+            result = ServerService(db).enable_ipv6(args.prefix)
+            print(f"✓ IPv6 已启用: {result['network6_cidr']}（服务端 {result['virtual_ip6']}）")
+            print(f"已为 {result['assigned']} 个节点分配 IPv6 地址")
+            print("提示: 节点需重新下载客户端配置以获得 IPv6 地址")
+            return 0
+            
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
     except Exception as e:
         print(f"错误: {str(e)}")
         return 1
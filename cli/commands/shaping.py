@@ -0,0 +1,220 @@
+"""
+带宽限速命令
+"""
+from core.models.database import Database
+from core.models.repositories.interface_repo import InterfaceRepository
+from core.services.node_service import NodeService
+from core.services.shaping_service import ShapingService
+from core.utils.tc_compiler import format_rate
+
+
+def register_command(subparsers):
+    """注册带宽限速命令"""
+    parser_shaping = subparsers.add_parser('shaping', help='中心节点对节点的带宽限速（tc）')
+    shaping_subparsers = parser_shaping.add_subparsers(dest='shaping_command', help='限速子命令')
+    parser_shaping.set_defaults(func=lambda args: parser_shaping.print_help() or 1)
+
+    # shaping add 命令
+    parser_add = shaping_subparsers.add_parser('add', help='创建限速配置')
+    parser_add.add_argument('name', help='配置名称')
+    parser_add.add_argument('--download', metavar='RATE', help='下行（中心节点 -> 节点）速率上限，如 50mbit')
+    parser_add.add_argument('--upload', metavar='RATE', help='上行（节点 -> 中心节点）速率上限，如 10mbit')
+    parser_add.add_argument('-d', '--description', help='配置描述')
+    parser_add.set_defaults(func=cmd_shaping_add)
+
+    # shaping update 命令
+    parser_update = shaping_subparsers.add_parser('update', help='修改限速配置并重新下发')
+    parser_update.add_argument('name', help='配置名称')
+    parser_update.add_argument('--download', metavar='RATE', help='下行速率上限（none 表示不限速）')
+    parser_update.add_argument('--upload', metavar='RATE', help='上行速率上限（none 表示不限速）')
+    parser_update.add_argument('-d', '--description', help='配置描述')
+    parser_update.set_defaults(func=cmd_shaping_update)
+
+    # shaping remove 命令
+    parser_remove = shaping_subparsers.add_parser('remove', help='删除限速配置')
+    parser_remove.add_argument('name', help='配置名称')
+    parser_remove.set_defaults(func=cmd_shaping_remove)
+
+    # shaping list 命令
+    parser_list = shaping_subparsers.add_parser('list', help='列出所有限速配置')
+    parser_list.set_defaults(func=cmd_shaping_list)
+
+    # shaping attach / detach 命令
+    parser_attach = shaping_subparsers.add_parser('attach', help='为节点或节点组设置限速配置')
+    parser_attach.add_argument('name', help='配置名称')
+    target = parser_attach.add_mutually_exclusive_group(required=True)
+    target.add_argument('--node', help='节点名称')
+    target.add_argument('--group', help='节点组名称')
+    parser_attach.set_defaults(func=cmd_shaping_attach)
+
+    parser_detach = shaping_subparsers.add_parser('detach', help='清除节点或节点组的限速配置')
+    target = parser_detach.add_mutually_exclusive_group(required=True)
+    target.add_argument('--node', help='节点名称')
+    target.add_argument('--group', help='节点组名称')
+    parser_detach.set_defaults(func=cmd_shaping_detach)
+
+    # shaping show 命令
+    parser_show = shaping_subparsers.add_parser('show', help='显示编译后的 tc 批处理语句（不下发）')
+    parser_show.add_argument('-i', '--interface', help='仅显示指定接口')
+    parser_show.set_defaults(func=cmd_shaping_show)
+
+    # shaping apply 命令
+    parser_apply = shaping_subparsers.add_parser('apply', help='重建全部接口的限速规则')
+    parser_apply.set_defaults(func=cmd_shaping_apply)
+
+
+def cmd_shaping_add(args):
+    """创建限速配置"""
+    try:
+        with Database() as db:
+            profile = ShapingService(db).create_profile(
+                args.name, args.download, args.upload, args.description
+            )
+            print(f"✓ 限速配置 '{profile.name}' 创建成功（下行 {format_rate(profile.download_kbit)}，"
+                  f"上行 {format_rate(profile.upload_kbit)}）")
+            return 0
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_shaping_update(args):
+    """修改限速配置"""
+    try:
+        with Database() as db:
+            profile = ShapingService(db).update_profile(
+                args.name, args.download, args.upload, args.description
+            )
+            print(f"✓ 限速配置 '{profile.name}' 已更新（下行 {format_rate(profile.download_kbit)}，"
+                  f"上行 {format_rate(profile.upload_kbit)}）")
+            return 0
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_shaping_remove(args):
+    """删除限速配置"""
+    try:
+        with Database() as db:
+            if ShapingService(db).delete_profile(args.name):
+                print(f"✓ 限速配置 '{args.name}' 删除成功")
+                return 0
+            print("错误: 删除失败")
+            return 1
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_shaping_list(args):
+    """列出所有限速配置"""
+    try:
+        with Database() as db:
+            profiles = ShapingService(db).describe_profiles()
+
+            if not profiles:
+                print("暂无限速配置")
+                return 0
+
+            print("========================================")
+            print(f"{'名称':<16} {'下行':<10} {'上行':<10} {'节点组':<20} {'描述'}")
+            print("-" * 72)
+            for profile in profiles:
+                print(f"{profile['name']:<16} {format_rate(profile['download_kbit']):<10} "
+                      f"{format_rate(profile['upload_kbit']):<10} "
+                      f"{','.join(profile['groups']) or '-':<20} {profile['description'] or ''}")
+            print("========================================")
+            print(f"共 {len(profiles)} 个限速配置")
+            return 0
+
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_shaping_attach(args):
+    """为节点或节点组设置限速配置"""
+    return _set_profile(args, args.name)
+
+
+def cmd_shaping_detach(args):
+    """清除节点或节点组的限速配置"""
+    return _set_profile(args, None)
+
+
+def _set_profile(args, profile_name):
+    """设置或清除节点/节点组的限速配置"""
+    try:
+        with Database() as db:
+            shaping_service = ShapingService(db)
+            if args.node:
+                node = NodeService(db).get_node(node_name=args.node)
+                if not node:
+                    raise ValueError(f"节点 '{args.node}' 不存在")
+                shaping_service.set_node_profile(node.id, profile_name)
+                target = f"节点 '{node.node_name}'"
+            else:
+                shaping_service.set_group_profile(args.group, profile_name)
+                target = f"节点组 '{args.group}'"
+
+            if profile_name:
+                print(f"✓ {target} 已使用限速配置 '{profile_name}'")
+            else:
+                print(f"✓ 已清除 {target} 的限速配置")
+            return 0
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_shaping_show(args):
+    """显示编译后的 tc 批处理语句"""
+    try:
+        with Database() as db:
+            interface_ids = None
+            if args.interface:
+                interface_ids = [
+                    interface.id for interface in InterfaceRepository(db).list_all()
+                    if interface.name == args.interface
+                ]
+                if not interface_ids:
+                    raise ValueError(f"接口 '{args.interface}' 不存在")
+            print(ShapingService(db).render(interface_ids), end='')
+            return 0
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_shaping_apply(args):
+    """重建全部接口的限速规则"""
+    try:
+        with Database() as db:
+            count = ShapingService(db).apply()
+            print(f"✓ 已重建 {count} 个接口的限速规则")
+            return 0
+
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
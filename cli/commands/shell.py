@@ -0,0 +1,310 @@
+"""
+交互式 shell 与批处理命令
+多条命令在同一进程中执行，共用一个数据库连接；一个批次在单个事务中执行，
+WireGuard 配置和访问控制规则在提交后统一下发一次
+"""
+import argparse
+import shlex
+import sys
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from cli.commands import register_all_commands
+from core.models.database import Database
+from core.services.server_service import ServerService
+from core.utils.deferred_apply import defer_apply
+from core.utils.log import operation
+
+# 不能在 shell / 批处理中执行的命令（init 需要立即写入配置并启动接口）
+UNBATCHABLE_COMMANDS = ('init', 'shell', 'run', 'bench')
+
+# shell 内置命令
+SHELL_COMMANDS = ('help', 'begin', 'commit', 'rollback', 'exit', 'quit')
+
+
+def register_command(subparsers):
+    """注册 shell 和批处理命令"""
+    parser_shell = subparsers.add_parser('shell', help='交互式命令行（补全命令和节点名称，命令共用一个数据库连接）')
+    parser_shell.set_defaults(func=cmd_shell)
+
+    parser_run = subparsers.add_parser('run', help='批量执行脚本中的命令（单个事务，提交后统一下发配置）')
+    parser_run.add_argument('script', nargs='?', default='-',
+                            help='脚本文件，每行一条命令，# 开头为注释（省略或 - 表示从标准输入读取）')
+    parser_run.add_argument('-k', '--keep-going', action='store_true',
+                            help='命令失败时只撤销该命令并继续（默认撤销整个批次并停止）')
+    parser_run.add_argument('-x', '--echo', action='store_true', help='执行前输出每条命令')
+    parser_run.set_defaults(func=cmd_run)
+
+
+class CommandError(Exception):
+    """命令无法解析或不能在批处理中执行"""
+
+
+class _CommandFailed(Exception):
+    """命令返回非 0，用于撤销该命令的保存点"""
+
+    def __init__(self, code: int):
+        super().__init__(code)
+        self.code = code
+
+
+class _Rollback(Exception):
+    """撤销当前批次"""
+
+
+class BatchRunner:
+    """在同一数据库连接上执行多条命令"""
+
+    def __init__(self, db: Database):
+        self.db = db
+        self.parser = argparse.ArgumentParser(prog='wg-toolkit')
+        self.subparsers = self.parser.add_subparsers(dest='command', metavar='<命令>')
+        register_all_commands(self.subparsers)
+
+    def parse(self, line: str) -> Optional[argparse.Namespace]:
+        """解析一行命令
+
+        Returns:
+            参数，空行、注释或只显示了帮助时为 None
+
+        Raises:
+            CommandError: 语法或参数错误、命令不能在批处理中执行
+        """
+        try:
+            argv = shlex.split(line, comments=True)
+        except ValueError as e:
+            raise CommandError(f"无法解析命令: {str(e)}")
+        # 兼容直接从终端复制的完整命令
+        if argv[:1] == ['wg-toolkit']:
+            argv = argv[1:]
+        if argv[:1] == ['cli']:
+            argv = argv[1:]
+        if not argv:
+            return None
+        if argv[0] in UNBATCHABLE_COMMANDS:
+            raise CommandError(f"命令 '{argv[0]}' 不能在 shell 或批处理中执行")
+        try:
+            return self.parser.parse_args(argv)
+        except SystemExit as e:
+            # argparse 已输出帮助或错误信息
+            if e.code:
+                raise CommandError("命令参数无效")
+            return None
+
+    def run_line(self, line: str) -> Optional[int]:
+        """执行一行命令，命令失败时撤销它的全部数据库变更
+
+        Returns:
+            命令返回码，空行或注释为 None
+
+        Raises:
+            CommandError: 命令无法执行
+        """
+        args = self.parse(line)
+        if args is None:
+            return None
+        try:
+            with operation(args.command), Database(self.db.db_path):
+                code = args.func(args) or 0
+                if code:
+                    raise _CommandFailed(code)
+        except _CommandFailed as e:
+            return e.code
+        return 0
+
+    @contextmanager
+    def batch(self):
+        """一个批次：共享连接上的一个事务，期间推迟下发；提交后每个受影响的接口只重载一次
+
+        Yields:
+            结果字典，批次结束后 reloaded 为重载的接口数量
+        """
+        result: Dict[str, Any] = {'reloaded': 0}
+        with self.db.transaction(), defer_apply() as pending:
+            yield result
+        if pending:
+            result['reloaded'] = ServerService(self.db).apply_deferred(pending)
+
+
+def cmd_run(args):
+    """批量执行脚本中的命令"""
+    try:
+        if args.script == '-':
+            lines = sys.stdin.read().splitlines()
+        else:
+            with open(args.script, encoding='utf-8') as f:
+                lines = f.read().splitlines()
+    except OSError as e:
+        print(f"错误: 读取脚本失败: {str(e)}")
+        return 1
+
+    executed = failed = 0
+    try:
+        with Database() as db, db.shared():
+            runner = BatchRunner(db)
+            with runner.batch() as result:
+                for lineno, line in enumerate(lines, 1):
+                    if args.echo and line.strip() and not line.lstrip().startswith('#'):
+                        print(f"[{lineno}] {line.strip()}")
+                    try:
+                        code = runner.run_line(line)
+                    except CommandError as e:
+                        print(f"错误: 第 {lineno} 行: {str(e)}")
+                        code = 1
+                    if code is None:
+                        continue
+                    executed += 1
+                    if code:
+                        failed += 1
+                        if not args.keep_going:
+                            print(f"错误: 第 {lineno} 行命令失败，已撤销本批次的全部变更")
+                            raise _Rollback()
+    except _Rollback:
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+    summary = f"✓ 已执行 {executed} 条命令"
+    if failed:
+        summary += f"（{failed} 条失败，已撤销）"
+    if result['reloaded']:
+        summary += f"，重载 {result['reloaded']} 个接口"
+    print(summary)
+    return 1 if failed else 0
+
+
+class _Completer:
+    """readline 补全：命令名、子命令、选项和节点名称"""
+
+    def __init__(self, runner: BatchRunner):
+        self.runner = runner
+        self.matches: List[str] = []
+
+    def complete(self, text: str, state: int) -> Optional[str]:
+        if state == 0:
+            import readline
+            try:
+                words = shlex.split(readline.get_line_buffer()[:readline.get_begidx()])
+            except ValueError:
+                words = []
+            self.matches = [word for word in self._candidates(words, text) if word.startswith(text)]
+        return self.matches[state] if state < len(self.matches) else None
+
+    def _candidates(self, words: List[str], text: str) -> List[str]:
+        """按已输入的词找到对应的解析器，给出候选词"""
+        parser = self.runner.parser
+        for word in words:
+            choices = self._subcommands(parser)
+            if word in choices:
+                parser = choices[word]
+        if text.startswith('-'):
+            return sorted({option for action in parser._actions for option in action.option_strings})
+        choices = self._subcommands(parser)
+        if choices:
+            extra = SHELL_COMMANDS if parser is self.runner.parser else ()
+            return sorted(set(choices) - set(UNBATCHABLE_COMMANDS)) + list(extra)
+        return [row[0] for row in self.runner.db.select_nodes(['node_name'])]
+
+    @staticmethod
+    def _subcommands(parser: argparse.ArgumentParser) -> Dict[str, argparse.ArgumentParser]:
+        for action in parser._actions:
+            if isinstance(action, argparse._SubParsersAction):
+                return action.choices
+        return {}
+
+
+def _install_completer(runner: BatchRunner):
+    """启用 readline 补全（readline 不可用时，如 Windows，只是没有补全）"""
+    try:
+        import readline
+    except ImportError:
+        return
+    readline.set_completer_delims(' \t\n')
+    readline.set_completer(_Completer(runner).complete)
+    readline.parse_and_bind('tab: complete')
+
+
+def _read(prompt: str) -> Optional[str]:
+    """读取一行输入，EOF 时返回 None，Ctrl-C 时返回空行"""
+    try:
+        return input(prompt).strip()
+    except EOFError:
+        print()
+        return None
+    except KeyboardInterrupt:
+        print()
+        return ''
+
+
+def _execute(runner: BatchRunner, line: str):
+    """在 shell 中执行一行命令并报告错误"""
+    try:
+        runner.run_line(line)
+    except CommandError as e:
+        print(f"错误: {str(e)}")
+    except KeyboardInterrupt:
+        print("\n命令已中断，变更已撤销")
+
+
+def _transaction(runner: BatchRunner) -> bool:
+    """执行 begin 开启的事务，直到 commit / rollback
+
+    Returns:
+        False 表示输入结束（EOF），shell 应退出
+    """
+    print("已开启事务：后续命令在 commit 时一并提交并下发，rollback 撤销")
+    try:
+        with runner.batch() as result:
+            while True:
+                line = _read('wg-toolkit*> ')
+                if line is None or line == 'rollback':
+                    raise _Rollback()
+                if line == 'commit':
+                    break
+                if line in ('begin', 'exit', 'quit'):
+                    print("错误: 请先 commit 或 rollback")
+                elif line == 'help':
+                    runner.parser.print_help()
+                elif line:
+                    _execute(runner, line)
+    except _Rollback:
+        print("已撤销事务中的全部变更")
+        return line is not None
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return True
+    print("✓ 已提交" + (f"，重载 {result['reloaded']} 个接口" if result['reloaded'] else ''))
+    return True
+
+
+def cmd_shell(args):
+    """交互式命令行"""
+    try:
+        with Database() as db, db.shared():
+            runner = BatchRunner(db)
+            _install_completer(runner)
+            print("wg-toolkit shell：输入命令（不带 wg-toolkit 前缀），Tab 补全，help 查看命令，exit 退出")
+            print("每条命令立即提交并下发；begin ... commit 可将多条命令合并为一个事务")
+            while True:
+                line = _read('wg-toolkit> ')
+                if line is None or line in ('exit', 'quit'):
+                    return 0
+                if not line:
+                    continue
+                if line == 'help':
+                    runner.parser.print_help()
+                elif line == 'begin':
+                    if not _transaction(runner):
+                        return 0
+                elif line in ('commit', 'rollback'):
+                    print("错误: 当前没有进行中的事务")
+                else:
+                    try:
+                        with runner.batch():
+                            _execute(runner, line)
+                    except Exception as e:
+                        print(f"错误: {str(e)}")
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
@@ -0,0 +1,157 @@
+"""
+节点清理命令
+"""
+from core.models.database import Database
+from core.services.node_service import NodeService
+from core.services.sweep_service import SweepService, SWEEP_ACTIONS, format_duration
+
+
+def register_command(subparsers):
+    """注册节点清理命令"""
+    parser_sweep = subparsers.add_parser('sweep', help='清理过期或闲置的节点')
+    sweep_subparsers = parser_sweep.add_subparsers(dest='sweep_command', help='清理子命令')
+    parser_sweep.set_defaults(func=lambda args: parser_sweep.print_help() or 1)
+
+    # sweep run 命令
+    parser_run = sweep_subparsers.add_parser('run', help='执行一轮清理（适合由 cron 定期执行）')
+    parser_run.add_argument('--dry-run', action='store_true', help='仅列出将被清理的节点，不做变更')
+    parser_run.set_defaults(func=cmd_sweep_run)
+
+    # sweep policy 命令
+    parser_policy = sweep_subparsers.add_parser('policy', help='查看或设置清理策略')
+    parser_policy.add_argument('--idle-after', metavar='DURATION',
+                               help='最近握手距今超过此时长视为闲置（如 7d，off 表示不按闲置清理）')
+    parser_policy.add_argument('--action', choices=SWEEP_ACTIONS, help='处理方式：删除或停用')
+    parser_policy.set_defaults(func=cmd_sweep_policy)
+
+    # sweep expire 命令
+    parser_expire = sweep_subparsers.add_parser('expire', help='设置节点有效期')
+    parser_expire.add_argument('node', help='节点名称')
+    parser_expire.add_argument('ttl', help='有效期（如 12h、7d，从现在起算），never 表示永不过期')
+    parser_expire.set_defaults(func=cmd_sweep_expire)
+
+    # sweep restore 命令
+    parser_restore = sweep_subparsers.add_parser('restore', help='恢复已停用的节点')
+    parser_restore.add_argument('node', help='节点名称')
+    parser_restore.set_defaults(func=cmd_sweep_restore)
+
+    # sweep history 命令
+    parser_history = sweep_subparsers.add_parser('history', help='查看清理记录')
+    parser_history.add_argument('-n', '--limit', type=int, default=50, help='显示条数（默认 50）')
+    parser_history.set_defaults(func=cmd_sweep_history)
+
+
+def _get_node(db, name):
+    """按名称获取节点，不存在时抛出 ValueError"""
+    node = NodeService(db).get_node(node_name=name)
+    if not node:
+        raise ValueError(f"节点 '{name}' 不存在")
+    return node
+
+
+def cmd_sweep_run(args):
+    """执行一轮清理"""
+    try:
+        with Database() as db:
+            report = SweepService(db).sweep(dry_run=args.dry_run)
+
+            if not report['nodes']:
+                print("没有需要清理的节点")
+                return 0
+
+            verb = '删除' if report['action'] == 'delete' else '停用'
+            for item in report['nodes']:
+                reason = '过期' if item['reason'] == 'expired' else '闲置'
+                print(f"  {item['node_name']:<20} {item['virtual_ip']:<15} {reason}: {item['detail']}")
+            if args.dry_run:
+                print(f"共 {len(report['nodes'])} 个节点将被{verb}（dry-run，未做变更）")
+            else:
+                print(f"✓ 已{verb} {report['swept']} 个节点（{report['batches']} 批）")
+            return 0
+
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_sweep_policy(args):
+    """查看或设置清理策略"""
+    try:
+        with Database() as db:
+            sweep_service = SweepService(db)
+            if args.idle_after is not None or args.action is not None:
+                policy = sweep_service.set_policy(args.action, args.idle_after)
+                print("✓ 清理策略已更新")
+            else:
+                policy = sweep_service.get_policy()
+
+            idle_after = format_duration(policy['idle_after']) if policy['idle_after'] else 'off'
+            print(f"处理方式: {policy['action']}")
+            print(f"闲置阈值: {idle_after}")
+            return 0
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_sweep_expire(args):
+    """设置节点有效期"""
+    try:
+        with Database() as db:
+            node = SweepService(db).set_ttl(_get_node(db, args.node).id, args.ttl)
+            if node.expires_at:
+                print(f"✓ 节点 '{node.node_name}' 将于 {node.expires_at} (UTC) 过期")
+            else:
+                print(f"✓ 节点 '{node.node_name}' 已设置为永不过期")
+            return 0
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_sweep_restore(args):
+    """恢复已停用的节点"""
+    try:
+        with Database() as db:
+            node = SweepService(db).restore(_get_node(db, args.node).id)
+            print(f"✓ 节点 '{node.node_name}' 已恢复")
+            return 0
+
+    except ValueError as e:
+        print(f"错误: {str(e)}")
+        return 1
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
+
+
+def cmd_sweep_history(args):
+    """查看清理记录"""
+    try:
+        with Database() as db:
+            entries = SweepService(db).history(args.limit)
+
+            if not entries:
+                print("暂无清理记录")
+                return 0
+
+            print("========================================")
+            print(f"{'时间':<20} {'操作':<8} {'原因':<8} {'节点':<20} {'虚拟IP':<15} {'详情'}")
+            print("-" * 90)
+            for entry in entries:
+                print(f"{entry['created_at']:<20} {entry['action']:<8} {entry['reason']:<8} "
+                      f"{entry['node_name']:<20} {entry['virtual_ip'] or '-':<15} {entry['detail'] or ''}")
+            print("========================================")
+            return 0
+
+    except Exception as e:
+        print(f"错误: {str(e)}")
+        return 1
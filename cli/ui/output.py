@@ -0,0 +1,102 @@
+"""
+机器可读输出
+查询命令的 --output json|jsonl|csv：记录逐条写出到标准输出，不在内存中汇总，
+列表在读取第一行后即开始输出；错误信息写到标准错误，保证标准输出可直接被解析
+"""
+import csv
+import json
+import os
+import sys
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+OUTPUT_FORMATS = ('text', 'json', 'jsonl', 'csv')
+
+
+def add_output_argument(parser):
+    """为查询命令添加 -o/--output 选项"""
+    parser.add_argument('-o', '--output', choices=OUTPUT_FORMATS, default='text',
+                        help='输出格式：text（默认，人类可读）、json、jsonl（每行一个 JSON 对象）、csv')
+
+
+def print_error(message: str, fmt: str = 'text'):
+    """输出错误信息（机器可读格式下写到标准错误）"""
+    print(f"错误: {message}", file=sys.stdout if fmt == 'text' else sys.stderr)
+
+
+def _csv_value(value: Any) -> Any:
+    """CSV 单元格：None 为空，简单列表以空格分隔，嵌套结构为 JSON，布尔值与 JSON 一致"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (list, tuple)) and not any(isinstance(item, (dict, list)) for item in value):
+        return ' '.join(str(item) for item in value)
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def _detach_stdout():
+    """标准输出的读取端已关闭（如管道到 head）：后续输出丢弃，避免退出时再次报错"""
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
+    os.close(devnull)
+
+
+def write_records(records: Iterable[Dict[str, Any]], fmt: str,
+                  fields: Optional[Sequence[str]] = None) -> int:
+    """逐条输出记录
+
+    json 输出一个数组，但逐元素写出，内存占用与记录数量无关。
+
+    Args:
+        records: 记录迭代器（可以直接来自数据库游标）
+        fmt: json / jsonl / csv
+        fields: CSV 列，None 表示使用第一条记录的键
+
+    Returns:
+        输出的记录数量
+    """
+    out = sys.stdout
+    count = 0
+    try:
+        if fmt == 'csv':
+            writer = None
+            for record in records:
+                if writer is None:
+                    writer = csv.DictWriter(out, fieldnames=list(fields or record),
+                                            extrasaction='ignore', lineterminator='\n')
+                    writer.writeheader()
+                writer.writerow({key: _csv_value(value) for key, value in record.items()})
+                count += 1
+            if writer is None and fields:
+                csv.writer(out, lineterminator='\n').writerow(fields)
+        elif fmt == 'jsonl':
+            for record in records:
+                out.write(json.dumps(record, ensure_ascii=False))
+                out.write('\n')
+                count += 1
+        else:
+            out.write('[')
+            for record in records:
+                out.write(',\n' if count else '\n')
+                out.write(json.dumps(record, ensure_ascii=False))
+                count += 1
+            out.write('\n]\n' if count else ']\n')
+        out.flush()
+    except BrokenPipeError:
+        _detach_stdout()
+    return count
+
+
+def write_record(record: Dict[str, Any], fmt: str):
+    """输出单条记录（json 为缩进的对象，jsonl 为一行，csv 为表头加一行）"""
+    if fmt == 'json':
+        try:
+            json.dump(record, sys.stdout, ensure_ascii=False, indent=2)
+            sys.stdout.write('\n')
+            sys.stdout.flush()
+        except BrokenPipeError:
+            _detach_stdout()
+    else:
+        write_records([record], fmt)
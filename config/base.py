@@ -12,25 +12,87 @@ DATA_DIR = os.path.join(BASE_DIR, 'wg_data')
 EXPORT_DIR = os.path.join(BASE_DIR, 'exports')
 
 # 数据库配置
-DATABASE_PATH = os.path.join(DATA_DIR, 'wg_nodes.db')
+DATABASE_PATH = os.getenv('WG_DATABASE_PATH', os.path.join(DATA_DIR, 'wg_nodes.db'))
 
 # WireGuard 配置
-WG_INTERFACE_NAME = 'wg0'
-WG_CONFIG_PATH = '/etc/wireguard/wg0.conf'
+WG_CONFIG_DIR = os.getenv('WG_CONFIG_DIR', '/etc/wireguard')
+WG_INTERFACE_PREFIX = 'wg'  # 分片接口名前缀（wg0..wgN）
+WG_INTERFACE_NAME = 'wg0'  # 主接口（第 0 个分片）
+WG_CONFIG_PATH = os.path.join(WG_CONFIG_DIR, f'{WG_INTERFACE_NAME}.conf')
+WG_NETWORK_INTERFACE_PREFIX = 'wgn'  # 租户网络接口名前缀（wgn<网络ID>，与 wg+ 通配匹配）
+DEFAULT_NETWORK_NAME = 'default'  # 默认网络（server_info 描述的网络）名称
 
 # 网络默认配置
 DEFAULT_LISTEN_PORT = 51820
 DEFAULT_NETWORK_CIDR = '10.0.0.0/24'
 DEFAULT_SERVER_IP = '10.0.0.1'
+DEFAULT_SHARD_COUNT = 1  # 默认接口分片数量
+DEFAULT_NETWORK6_PREFIXLEN = 64  # 自动生成 ULA 时的 IPv6 网络段长度
+
+# 多中心配置
+WG_HUB_NAME = os.getenv('WG_HUB_NAME', 'primary')  # 本地中心节点名称
+DEFAULT_HUB_PLACEMENT_POLICY = 'least_peers'  # 新节点归属策略（least_peers/least_traffic/region）
+
+# 网状拓扑配置
+DEFAULT_MESH_MODE = 'off'  # 节点直连模式（off/full/partial/auto）
+
+# 访问控制配置
+DEFAULT_ACL_MODE = 'off'  # 节点组访问控制模式（off/enforce）
+NFT_TABLE_NAME = 'wg_toolkit'  # 访问控制规则所在的 nftables 表（inet 族）
+
+# 直连自动提升（auto 模式）：按中心节点转发流量提升/降级节点对
+MESH_ANALYZER_INTERVAL = int(os.getenv('MESH_ANALYZER_INTERVAL', '60'))  # 采样间隔（秒），0 表示不在 Web 服务中后台运行
+MESH_PROMOTE_BPS = 512 * 1024  # 节点对经中心节点的速率（字节/秒）高于此值计为“重”
+MESH_DEMOTE_BPS = 64 * 1024  # 低于此值计为“轻”（与提升阈值之间为滞回区间）
+MESH_PROMOTE_AFTER = 3  # 连续多少个采样窗口为“重”才提升
+MESH_DEMOTE_AFTER = 5  # 连续多少个采样窗口为“轻”才降级
+MESH_MIN_HOLD = 3600  # 提升后至少保持的时间（秒），再次提升时翻倍
+MESH_MAX_HOLD = 24 * 3600  # 保持时间上限（秒）
+MESH_MAX_AUTO_LINKS = 64  # 自动提升的节点对数量上限
+MESH_EWMA_ALPHA = 0.5  # 速率平滑系数
+
+# 保活建议：观测期内公网地址从未变化的节点关闭保活
+DEFAULT_KEEPALIVE_MODE = 'manual'  # manual 仅给出建议，auto 每次观测后自动应用
+KEEPALIVE_STATIC_PROFILE = 'static-endpoint'  # 自动应用时使用的内置配置（保活关闭）
+KEEPALIVE_MIN_SAMPLES = 12  # 至少观测次数
+KEEPALIVE_MIN_OBSERVATION = 24 * 3600  # 首次到最近一次观测的最短时长（秒）
+
+# 节点清理：删除/停用已过期或长时间无握手的节点
+NODE_SWEEP_INTERVAL = int(os.getenv('NODE_SWEEP_INTERVAL', '300'))  # 清理间隔（秒），0 表示不在 Web 服务中后台运行
+NODE_SWEEP_BATCH_SIZE = 200  # 每个数据库事务处理的节点数量
+DEFAULT_SWEEP_ACTION = 'delete'  # 过期/闲置节点的处理方式（delete/disable）
+DEFAULT_SWEEP_IDLE_AFTER = 0  # 最近握手距今超过此时长（秒）视为闲置，0 表示不按闲置清理
+
+# 运行指标（/metrics）
+METRICS_MULTIPROC_DIR = os.getenv('WG_METRICS_DIR')  # 多 worker 部署时各进程写入快照的目录，未设置为单进程模式
+METRICS_FLUSH_INTERVAL = int(os.getenv('WG_METRICS_FLUSH_INTERVAL', '5'))  # 多进程模式下写入快照的间隔（秒）
+METRICS_ACTIVE_HANDSHAKE = 180  # 最近握手距今不超过此时长（秒）的节点计为在线
+
+# 请求剖析（慢操作跨度树和 cProfile 结果）
+PROFILE_ENABLED = os.getenv('WG_PROFILE', '0') == '1'  # 是否在 Web 服务中默认开启，也可运行时通过 API 切换
+PROFILE_THRESHOLD_MS = int(os.getenv('WG_PROFILE_THRESHOLD_MS', '500'))  # 耗时超过此值（毫秒）的请求保存剖析结果
+PROFILE_DIR = os.getenv('WG_PROFILE_DIR', os.path.join(DATA_DIR, 'profiles'))  # 剖析结果目录
+PROFILE_KEEP = 100  # 目录中保留的请求数量（超出时删除最旧的）
+PROFILE_RECENT = 200  # 内存中保留的最近慢操作数量
+PROFILE_MAX_SPANS = 5000  # 单个请求记录的跨度数量上限
+
+# 事件流（/api/v1/events，Server-Sent Events）
+EVENTS_BUFFER_SIZE = 1024  # 进程内保留的最近事件数量，断线重连时按 Last-Event-ID 补发
+EVENTS_HEARTBEAT = 15  # 无事件时发送心跳注释的间隔（秒），避免代理断开空闲连接
+EVENTS_PEER_INTERVAL = int(os.getenv('EVENTS_PEER_INTERVAL', '10'))  # 采集 peer 握手和流量变化的间隔（秒），0 表示不采集
+
+# 变更日志（/api/v1/changes，外部系统按序号增量同步节点和服务端配置）
+CHANGES_RETENTION = int(os.getenv('CHANGES_RETENTION', '604800'))  # 节点删除记录的保留时长（秒），落后更久的客户端需重新全量同步
+CHANGES_COMPACT_INTERVAL = int(os.getenv('CHANGES_COMPACT_INTERVAL', '3600'))  # 压缩间隔（秒），0 表示不在 Web 服务中后台运行
+CHANGES_PAGE_SIZE = 500  # 每次请求最多返回的变更数量
+CHANGES_MAX_WAIT = 60  # 长轮询最长等待时间（秒）
+CHANGES_POLL_INTERVAL = 0.5  # 长轮询期间检查最新序号的间隔（秒），CLI 等其他进程的写入也能及时发现
 
 # 其他默认配置
 PERSISTENT_KEEPALIVE = 25
 DEFAULT_DNS_SERVER = '8.8.8.8'
 
 # 日志配置
-LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
-LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-
-# 确保必要的目录存在
-os.makedirs(DATA_DIR, exist_ok=True)
-os.makedirs(EXPORT_DIR, exist_ok=True)
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')  # 初始日志级别，Web 服务运行时可通过 API 调整
+LOG_FORMAT = os.getenv('LOG_FORMAT')  # json/text/console，未设置时 Web 服务为 json，CLI 为 console
+LOG_TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'  # text 格式的行格式
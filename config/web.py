@@ -9,6 +9,7 @@ API_HOST = os.getenv('API_HOST', '0.0.0.0')
 API_PORT = int(os.getenv('API_PORT', '8080'))
 API_DEBUG = os.getenv('API_DEBUG', 'false').lower() == 'true'
 API_RELOAD = os.getenv('API_RELOAD', 'false').lower() == 'true'
+API_SHUTDOWN_TIMEOUT = int(os.getenv('API_SHUTDOWN_TIMEOUT', '5'))  # 停止服务时等待请求完成的时间（秒），超时后断开事件流等长连接
 
 # API版本
 API_VERSION = 'v1'
@@ -0,0 +1,81 @@
+"""
+访问控制领域模型
+定义节点组之间的放行规则
+"""
+from datetime import datetime
+from typing import Optional
+
+
+class AclRule:
+    """节点组放行规则实体
+
+    规则有方向：允许源节点组的节点主动访问目的节点组的节点（回程流量按连接
+    状态放行）。启用访问控制后，节点之间未被任何规则放行的流量在中心节点被丢弃。
+    """
+
+    # 与 acl_rules 表查询列一一对应，from_row 依赖此顺序
+    COLUMNS = ('id', 'src_group_id', 'dst_group_id', 'description', 'created_at')
+
+    __slots__ = ('id', 'src_group_id', 'dst_group_id', 'description', '_created_at')
+
+    def __init__(self, id: Optional[int] = None, src_group_id: Optional[int] = None,
+                 dst_group_id: Optional[int] = None, description: Optional[str] = None,
+                 created_at: Optional[datetime] = None):
+        self.id = id
+        self.src_group_id = src_group_id
+        self.dst_group_id = dst_group_id
+        self.description = description
+        self._created_at = created_at
+
+    @property
+    def created_at(self) -> Optional[datetime]:
+        """创建时间（惰性解析）"""
+        value = self._created_at
+        if isinstance(value, str):
+            value = self._created_at = datetime.fromisoformat(value)
+        return value
+
+    def __repr__(self) -> str:
+        return (f"AclRule(id={self.id!r}, src_group_id={self.src_group_id!r}, "
+                f"dst_group_id={self.dst_group_id!r})")
+
+    def validate(self) -> tuple[bool, Optional[str]]:
+        """验证规则数据
+
+        Returns:
+            (是否有效, 错误信息)
+        """
+        if self.src_group_id is None or self.dst_group_id is None:
+            return False, "源节点组和目的节点组不能为空"
+
+        return True, None
+
+    def to_dict(self) -> dict:
+        """转换为字典
+
+        Returns:
+            字典表示
+        """
+        created_at = self.created_at
+        return {
+            'id': self.id,
+            'src_group_id': self.src_group_id,
+            'dst_group_id': self.dst_group_id,
+            'description': self.description,
+            'created_at': created_at.isoformat() if created_at else None,
+        }
+
+    @classmethod
+    def from_row(cls, cursor, row: tuple) -> 'AclRule':
+        """sqlite3 行工厂：按 COLUMNS 顺序直接由元组构造规则实体
+
+        Args:
+            cursor: sqlite3 游标（行工厂协议要求，未使用）
+            row: 按 COLUMNS 顺序排列的行元组
+
+        Returns:
+            AclRule实例
+        """
+        rule = cls.__new__(cls)
+        (rule.id, rule.src_group_id, rule.dst_group_id, rule.description, rule._created_at) = row
+        return rule
@@ -0,0 +1,80 @@
+"""
+节点组领域模型
+定义节点组实体，节点组统一承载路由策略、限速配置等按组生效的设置
+"""
+from datetime import datetime
+from typing import Optional
+
+
+class NodeGroup:
+    """节点组实体"""
+
+    # 与 node_groups 表查询列一一对应，from_row 依赖此顺序
+    COLUMNS = ('id', 'name', 'policy_id', 'description', 'created_at', 'shaping_profile_id')
+
+    __slots__ = ('id', 'name', 'policy_id', 'description', '_created_at', 'shaping_profile_id')
+
+    def __init__(self, id: Optional[int] = None, name: str = '',
+                 policy_id: Optional[int] = None, description: Optional[str] = None,
+                 created_at: Optional[datetime] = None,
+                 shaping_profile_id: Optional[int] = None):
+        self.id = id
+        self.name = name
+        self.policy_id = policy_id  # 组内节点默认使用的路由策略
+        self.description = description
+        self._created_at = created_at
+        self.shaping_profile_id = shaping_profile_id  # 组内节点默认使用的限速配置
+
+    @property
+    def created_at(self) -> Optional[datetime]:
+        """创建时间（惰性解析）"""
+        value = self._created_at
+        if isinstance(value, str):
+            value = self._created_at = datetime.fromisoformat(value)
+        return value
+
+    def __repr__(self) -> str:
+        return f"NodeGroup(id={self.id!r}, name={self.name!r}, policy_id={self.policy_id!r})"
+
+    def validate(self) -> tuple[bool, Optional[str]]:
+        """验证节点组数据
+
+        Returns:
+            (是否有效, 错误信息)
+        """
+        if not self.name or not self.name.strip():
+            return False, "节点组名称不能为空"
+
+        return True, None
+
+    def to_dict(self) -> dict:
+        """转换为字典
+
+        Returns:
+            字典表示
+        """
+        created_at = self.created_at
+        return {
+            'id': self.id,
+            'name': self.name,
+            'policy_id': self.policy_id,
+            'description': self.description,
+            'created_at': created_at.isoformat() if created_at else None,
+            'shaping_profile_id': self.shaping_profile_id,
+        }
+
+    @classmethod
+    def from_row(cls, cursor, row: tuple) -> 'NodeGroup':
+        """sqlite3 行工厂：按 COLUMNS 顺序直接由元组构造节点组实体
+
+        Args:
+            cursor: sqlite3 游标（行工厂协议要求，未使用）
+            row: 按 COLUMNS 顺序排列的行元组
+
+        Returns:
+            NodeGroup实例
+        """
+        group = cls.__new__(cls)
+        (group.id, group.name, group.policy_id, group.description, group._created_at,
+         group.shaping_profile_id) = row
+        return group
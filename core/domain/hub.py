@@ -0,0 +1,139 @@
+"""
+中心节点领域模型
+定义多中心部署中的远端中心节点（Hub）实体
+"""
+from datetime import datetime
+from typing import Optional
+
+
+class Hub:
+    """中心节点实体
+
+    多个中心节点共享同一份节点注册表，每个中心节点负责独立的网络子段。
+    本地中心节点由 server_info 描述（id 为 None），hubs 表只记录远端中心节点。
+    """
+
+    # 与 hubs 表查询列一一对应，from_row 依赖此顺序
+    COLUMNS = (
+        'id', 'name', 'public_endpoint', 'public_key', 'virtual_ip', 'network_cidr',
+        'capacity_weight', 'region', 'recent_traffic', 'created_at',
+    )
+
+    __slots__ = (
+        'id', 'name', 'public_endpoint', 'public_key', 'virtual_ip', 'network_cidr',
+        'capacity_weight', 'region', 'recent_traffic', '_created_at',
+    )
+
+    def __init__(self, id: Optional[int] = None, name: str = '',
+                 public_endpoint: Optional[str] = None, public_key: str = '',
+                 virtual_ip: str = '', network_cidr: str = '',
+                 capacity_weight: float = 1.0, region: Optional[str] = None,
+                 recent_traffic: int = 0, created_at: Optional[datetime] = None):
+        self.id = id
+        self.name = name
+        self.public_endpoint = public_endpoint
+        self.public_key = public_key
+        self.virtual_ip = virtual_ip  # 中心节点在虚拟网络中的地址
+        self.network_cidr = network_cidr  # 该中心节点负责分配的网络子段
+        self.capacity_weight = capacity_weight  # 容量权重，越大承载越多节点
+        self.region = region
+        self.recent_traffic = recent_traffic  # 最近统计周期内的流量（字节）
+        self._created_at = created_at
+
+    @property
+    def created_at(self) -> Optional[datetime]:
+        """创建时间（惰性解析）"""
+        value = self._created_at
+        if isinstance(value, str):
+            value = self._created_at = datetime.fromisoformat(value)
+        return value
+
+    @created_at.setter
+    def created_at(self, value):
+        self._created_at = value
+
+    @property
+    def prefix_length(self) -> str:
+        """网络子段前缀长度（如 24）"""
+        return self.network_cidr.split('/')[-1]
+
+    @property
+    def is_local(self) -> bool:
+        """是否为本地中心节点"""
+        return self.id is None
+
+    def __repr__(self) -> str:
+        return (
+            f"Hub(id={self.id!r}, name={self.name!r}, "
+            f"public_endpoint={self.public_endpoint!r}, network_cidr={self.network_cidr!r})"
+        )
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.COLUMNS)
+
+    __hash__ = None
+
+    def validate(self) -> tuple[bool, Optional[str]]:
+        """验证中心节点数据
+
+        Returns:
+            (是否有效, 错误信息)
+        """
+        if not self.name or not self.name.strip():
+            return False, "中心节点名称不能为空"
+
+        if not self.public_key:
+            return False, "公钥不能为空"
+
+        if not self.public_endpoint:
+            return False, "公网地址不能为空"
+
+        if not self.virtual_ip:
+            return False, "虚拟IP不能为空"
+
+        if '/' not in self.network_cidr:
+            return False, "网络段格式错误，应为 CIDR 格式（如 10.0.1.0/24）"
+
+        if self.capacity_weight <= 0:
+            return False, "容量权重必须大于 0"
+
+        return True, None
+
+    def to_dict(self) -> dict:
+        """转换为字典
+
+        Returns:
+            字典表示
+        """
+        created_at = self.created_at
+        return {
+            'id': self.id,
+            'name': self.name,
+            'public_endpoint': self.public_endpoint,
+            'public_key': self.public_key,
+            'virtual_ip': self.virtual_ip,
+            'network_cidr': self.network_cidr,
+            'capacity_weight': self.capacity_weight,
+            'region': self.region,
+            'recent_traffic': self.recent_traffic,
+            'created_at': created_at.isoformat() if created_at else None,
+        }
+
+    @classmethod
+    def from_row(cls, cursor, row: tuple) -> 'Hub':
+        """sqlite3 行工厂：按 COLUMNS 顺序直接由元组构造中心节点实体
+
+        Args:
+            cursor: sqlite3 游标（行工厂协议要求，未使用）
+            row: 按 COLUMNS 顺序排列的行元组
+
+        Returns:
+            Hub实例
+        """
+        hub = cls.__new__(cls)
+        (hub.id, hub.name, hub.public_endpoint, hub.public_key, hub.virtual_ip,
+         hub.network_cidr, hub.capacity_weight, hub.region, hub.recent_traffic,
+         hub._created_at) = row
+        return hub
@@ -0,0 +1,164 @@
+"""
+WireGuard 接口领域模型
+定义服务端接口分片实体
+"""
+from datetime import datetime
+from typing import List, Optional
+
+
+class WgInterface:
+    """WireGuard 接口分片实体
+
+    服务端可运行多个接口（wg0..wgN），每个接口拥有独立的监听端口、密钥、
+    网络子段和配置文件。字段命名与 Server 保持一致，ConfigGenerator 可直接使用。
+    """
+
+    # 与 wg_interfaces 表查询列一一对应，from_row 依赖此顺序
+    COLUMNS = (
+        'id', 'name', 'listen_port', 'public_key', 'private_key',
+        'virtual_ip', 'network_cidr', 'config_path', 'created_at',
+        'network6_cidr', 'virtual_ip6', 'network_id',
+    )
+
+    __slots__ = (
+        'id', 'name', 'listen_port', 'public_key', 'private_key',
+        'virtual_ip', 'network_cidr', 'config_path', '_created_at',
+        'network6_cidr', 'virtual_ip6', 'network_id',
+    )
+
+    def __init__(self, id: Optional[int] = None, name: str = '', listen_port: int = 51820,
+                 public_key: str = '', private_key: str = '', virtual_ip: str = '',
+                 network_cidr: str = '', config_path: str = '',
+                 created_at: Optional[datetime] = None,
+                 network6_cidr: Optional[str] = None,
+                 virtual_ip6: Optional[str] = None,
+                 network_id: Optional[int] = None):
+        self.id = id
+        self.name = name
+        self.listen_port = listen_port
+        self.public_key = public_key
+        self.private_key = private_key
+        self.virtual_ip = virtual_ip
+        self.network_cidr = network_cidr  # 本分片负责的网络子段
+        self.config_path = config_path
+        self._created_at = created_at
+        self.network6_cidr = network6_cidr  # 本分片负责的 IPv6 网络子段
+        self.virtual_ip6 = virtual_ip6
+        self.network_id = network_id  # 所属租户网络，None 表示默认网络
+
+    @property
+    def created_at(self) -> Optional[datetime]:
+        """创建时间（惰性解析）"""
+        value = self._created_at
+        if isinstance(value, str):
+            value = self._created_at = datetime.fromisoformat(value)
+        return value
+
+    @created_at.setter
+    def created_at(self, value):
+        self._created_at = value
+
+    @property
+    def prefix_length(self) -> str:
+        """网络子段前缀长度（如 26）"""
+        return self.network_cidr.split('/')[-1]
+
+    @property
+    def prefix6_length(self) -> Optional[str]:
+        """IPv6 网络段前缀长度（如 64），未启用 IPv6 时为 None"""
+        return self.network6_cidr.split('/')[-1] if self.network6_cidr else None
+
+    @property
+    def networks(self) -> List[str]:
+        """虚拟网络段列表（IPv4 在前，启用 IPv6 时追加 IPv6 网络段）"""
+        if self.network6_cidr:
+            return [self.network_cidr, self.network6_cidr]
+        return [self.network_cidr]
+
+    @property
+    def addresses(self) -> str:
+        """wg-quick 的 Address 字段（双栈时同时包含 IPv4 和 IPv6 地址）"""
+        address = f"{self.virtual_ip}/{self.prefix_length}"
+        if self.virtual_ip6 and self.network6_cidr:
+            address += f", {self.virtual_ip6}/{self.prefix6_length}"
+        return address
+
+    def __repr__(self) -> str:
+        return (
+            f"WgInterface(id={self.id!r}, name={self.name!r}, "
+            f"listen_port={self.listen_port!r}, network_cidr={self.network_cidr!r})"
+        )
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.COLUMNS)
+
+    __hash__ = None
+
+    def validate(self) -> tuple[bool, Optional[str]]:
+        """验证接口数据
+
+        Returns:
+            (是否有效, 错误信息)
+        """
+        if not self.name:
+            return False, "接口名称不能为空"
+
+        if not self.public_key or not self.private_key:
+            return False, "接口密钥不能为空"
+
+        if self.listen_port < 1 or self.listen_port > 65535:
+            return False, "端口号必须在 1-65535 之间"
+
+        if '/' not in self.network_cidr:
+            return False, "网络段格式错误，应为 CIDR 格式（如 10.0.0.0/26）"
+
+        return True, None
+
+    def to_dict(self, include_private_key: bool = False) -> dict:
+        """转换为字典
+
+        Args:
+            include_private_key: 是否包含私钥
+
+        Returns:
+            字典表示
+        """
+        created_at = self.created_at
+        data = {
+            'id': self.id,
+            'name': self.name,
+            'listen_port': self.listen_port,
+            'public_key': self.public_key,
+            'virtual_ip': self.virtual_ip,
+            'network_cidr': self.network_cidr,
+            'config_path': self.config_path,
+            'created_at': created_at.isoformat() if created_at else None,
+            'network6_cidr': self.network6_cidr,
+            'virtual_ip6': self.virtual_ip6,
+            'network_id': self.network_id,
+        }
+
+        if include_private_key:
+            data['private_key'] = self.private_key
+
+        return data
+
+    @classmethod
+    def from_row(cls, cursor, row: tuple) -> 'WgInterface':
+        """sqlite3 行工厂：按 COLUMNS 顺序直接由元组构造接口实体
+
+        Args:
+            cursor: sqlite3 游标（行工厂协议要求，未使用）
+            row: 按 COLUMNS 顺序排列的行元组
+
+        Returns:
+            WgInterface实例
+        """
+        interface = cls.__new__(cls)
+        (interface.id, interface.name, interface.listen_port, interface.public_key,
+         interface.private_key, interface.virtual_ip, interface.network_cidr,
+         interface.config_path, interface._created_at, interface.network6_cidr,
+         interface.virtual_ip6, interface.network_id) = row
+        return interface
@@ -0,0 +1,99 @@
+"""
+租户网络领域模型
+定义同一服务端上相互隔离的虚拟网络实体
+"""
+from datetime import datetime
+from typing import List, Optional
+
+
+class Network:
+    """租户网络实体
+
+    每个租户网络拥有独立的网络段和 WireGuard 接口（地址分配、渲染缓存均按接口
+    隔离），不同网络之间的流量在服务端被丢弃。默认网络由 server_info 描述，
+    不在 networks 表中。字段命名与 Server 保持一致，ConfigGenerator 可直接使用。
+    """
+
+    # 与 networks 表查询列一一对应，from_row 依赖此顺序
+    COLUMNS = ('id', 'name', 'network_cidr', 'description', 'created_at')
+
+    __slots__ = ('id', 'name', 'network_cidr', 'description', '_created_at')
+
+    def __init__(self, id: Optional[int] = None, name: str = '', network_cidr: str = '',
+                 description: Optional[str] = None, created_at: Optional[datetime] = None):
+        self.id = id
+        self.name = name
+        self.network_cidr = network_cidr
+        self.description = description
+        self._created_at = created_at
+
+    @property
+    def created_at(self) -> Optional[datetime]:
+        """创建时间（惰性解析）"""
+        value = self._created_at
+        if isinstance(value, str):
+            value = self._created_at = datetime.fromisoformat(value)
+        return value
+
+    @property
+    def prefix_length(self) -> str:
+        """网络段前缀长度（如 24）"""
+        return self.network_cidr.split('/')[-1]
+
+    @property
+    def prefix6_length(self) -> Optional[str]:
+        """租户网络仅支持 IPv4"""
+        return None
+
+    @property
+    def networks(self) -> List[str]:
+        """虚拟网络段列表"""
+        return [self.network_cidr]
+
+    def __repr__(self) -> str:
+        return f"Network(id={self.id!r}, name={self.name!r}, network_cidr={self.network_cidr!r})"
+
+    def validate(self) -> tuple[bool, Optional[str]]:
+        """验证租户网络数据
+
+        Returns:
+            (是否有效, 错误信息)
+        """
+        if not self.name or not self.name.strip():
+            return False, "网络名称不能为空"
+
+        if not self.network_cidr:
+            return False, "网络段不能为空"
+
+        return True, None
+
+    def to_dict(self) -> dict:
+        """转换为字典
+
+        Returns:
+            字典表示
+        """
+        created_at = self.created_at
+        return {
+            'id': self.id,
+            'name': self.name,
+            'network_cidr': self.network_cidr,
+            'description': self.description,
+            'created_at': created_at.isoformat() if created_at else None,
+        }
+
+    @classmethod
+    def from_row(cls, cursor, row: tuple) -> 'Network':
+        """sqlite3 行工厂：按 COLUMNS 顺序直接由元组构造租户网络实体
+
+        Args:
+            cursor: sqlite3 游标（行工厂协议要求，未使用）
+            row: 按 COLUMNS 顺序排列的行元组
+
+        Returns:
+            Network实例
+        """
+        network = cls.__new__(cls)
+        (network.id, network.name, network.network_cidr, network.description,
+         network._created_at) = row
+        return network
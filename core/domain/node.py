@@ -2,57 +2,201 @@
 节点领域模型
 定义节点实体和业务规则
 """
-from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
-@dataclass
 class Node:
-    """节点实体"""
-    
-    id: Optional[int] = None
-    node_name: str = ''
-    virtual_ip: str = ''
-    public_key: str = ''
-    private_key: str = ''
-    platform: str = ''  # linux 或 windows
-    description: Optional[str] = None
-    created_at: Optional[datetime] = None
-    updated_at: Optional[datetime] = None
-    
+    """节点实体
+
+    使用 __slots__ 存储字段，时间字段保留数据库原始字符串，首次访问时才解析。
+    """
+
+    # 与 nodes 表查询列一一对应，from_row 依赖此顺序
+    COLUMNS = (
+        'id', 'node_name', 'virtual_ip', 'public_key', 'private_key',
+        'platform', 'description', 'created_at', 'updated_at', 'interface_id',
+        'hub_id', 'region', 'endpoint', 'routed_subnets', 'group_id', 'policy_id',
+        'virtual_ip6', 'network_id', 'shaping_profile_id', 'peer_profile_id',
+        'expires_at', 'disabled_at', 'revision',
+    )
+
+    __slots__ = (
+        'id', 'node_name', 'virtual_ip', 'public_key', 'private_key',
+        'platform', 'description', '_created_at', '_updated_at', 'interface_id',
+        'hub_id', 'region', 'endpoint', 'routed_subnets', 'group_id', 'policy_id',
+        'virtual_ip6', 'network_id', 'shaping_profile_id', 'peer_profile_id',
+        '_expires_at', '_disabled_at', 'revision',
+    )
+
+    def __init__(self, id: Optional[int] = None, node_name: str = '',
+                 virtual_ip: str = '', public_key: str = '', private_key: str = '',
+                 platform: str = '', description: Optional[str] = None,
+                 created_at: Optional[datetime] = None,
+                 updated_at: Optional[datetime] = None,
+                 interface_id: Optional[int] = None,
+                 hub_id: Optional[int] = None,
+                 region: Optional[str] = None,
+                 endpoint: Optional[str] = None,
+                 routed_subnets: Optional[str] = None,
+                 group_id: Optional[int] = None,
+                 policy_id: Optional[int] = None,
+                 virtual_ip6: Optional[str] = None,
+                 network_id: Optional[int] = None,
+                 shaping_profile_id: Optional[int] = None,
+                 peer_profile_id: Optional[int] = None,
+                 expires_at: Optional[datetime] = None,
+                 disabled_at: Optional[datetime] = None,
+                 revision: int = 0):
+        self.id = id
+        self.node_name = node_name
+        self.virtual_ip = virtual_ip
+        self.public_key = public_key
+        self.private_key = private_key
+        self.platform = platform  # linux 或 windows
+        self.description = description
+        self._created_at = created_at
+        self._updated_at = updated_at
+        self.interface_id = interface_id  # 所属接口分片（仅本地中心节点）
+        self.hub_id = hub_id  # 归属中心节点，None 表示本地中心节点
+        self.region = region  # 区域标签，用于按区域选择中心节点
+        self.endpoint = endpoint  # 节点公网地址（IP:Port），可被其他节点直连
+        self.routed_subnets = routed_subnets  # 节点后方的子网（逗号分隔 CIDR），用于站点互联
+        self.group_id = group_id  # 所属节点组
+        self.policy_id = policy_id  # 节点自身的路由策略，优先于节点组的策略
+        self.virtual_ip6 = virtual_ip6  # 虚拟 IPv6 地址，服务端启用双栈后分配
+        self.network_id = network_id  # 所属租户网络，None 表示默认网络
+        self.shaping_profile_id = shaping_profile_id  # 节点自身的限速配置，优先于节点组的配置
+        self.peer_profile_id = peer_profile_id  # 节点自身的保活/MTU 配置，优先于平台默认配置
+        self._expires_at = expires_at  # 过期时间（UTC），None 表示永不过期
+        self._disabled_at = disabled_at  # 停用时间，停用的节点保留地址和密钥但不下发 [Peer]
+        self.revision = revision  # 修订号，每次修改节点配置相关的列时由数据库触发器加一，用于缓存校验
+
+    @property
+    def created_at(self) -> Optional[datetime]:
+        """创建时间（惰性解析）"""
+        value = self._created_at
+        if isinstance(value, str):
+            value = self._created_at = datetime.fromisoformat(value)
+        return value
+
+    @created_at.setter
+    def created_at(self, value):
+        self._created_at = value
+
+    @property
+    def updated_at(self) -> Optional[datetime]:
+        """更新时间（惰性解析）"""
+        value = self._updated_at
+        if isinstance(value, str):
+            value = self._updated_at = datetime.fromisoformat(value)
+        return value
+
+    @updated_at.setter
+    def updated_at(self, value):
+        self._updated_at = value
+
+    @property
+    def expires_at(self) -> Optional[datetime]:
+        """过期时间（惰性解析）"""
+        value = self._expires_at
+        if isinstance(value, str):
+            value = self._expires_at = datetime.fromisoformat(value)
+        return value
+
+    @expires_at.setter
+    def expires_at(self, value):
+        self._expires_at = value
+
+    @property
+    def disabled_at(self) -> Optional[datetime]:
+        """停用时间（惰性解析）"""
+        value = self._disabled_at
+        if isinstance(value, str):
+            value = self._disabled_at = datetime.fromisoformat(value)
+        return value
+
+    @disabled_at.setter
+    def disabled_at(self, value):
+        self._disabled_at = value
+
+    @property
+    def listen_port(self) -> Optional[int]:
+        """直连监听端口（取自 endpoint），无公网地址时为 None"""
+        if not self.endpoint or ':' not in self.endpoint:
+            return None
+        port = self.endpoint.rsplit(':', 1)[-1]
+        return int(port) if port.isdigit() else None
+
+    @property
+    def routes(self) -> List[str]:
+        """节点路由的子网列表"""
+        return self.routed_subnets.split(',') if self.routed_subnets else []
+
+    @property
+    def host_prefixes(self) -> List[str]:
+        """节点自身地址的主机前缀（IPv4 /32，双栈时追加 IPv6 /128）"""
+        if self.virtual_ip6:
+            return [f"{self.virtual_ip}/32", f"{self.virtual_ip6}/128"]
+        return [f"{self.virtual_ip}/32"]
+
+    @property
+    def allowed_ips(self) -> str:
+        """作为对端时的 AllowedIPs（主机前缀 + 路由子网）"""
+        return ', '.join(self.host_prefixes + self.routes)
+
+    def __repr__(self) -> str:
+        return (
+            f"Node(id={self.id!r}, node_name={self.node_name!r}, "
+            f"virtual_ip={self.virtual_ip!r}, platform={self.platform!r})"
+        )
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.COLUMNS)
+
+    __hash__ = None
+
     def validate(self) -> tuple[bool, Optional[str]]:
         """验证节点数据
-        
+
         Returns:
             (是否有效, 错误信息)
         """
         if not self.node_name or not self.node_name.strip():
             return False, "节点名称不能为空"
-            
+
         if self.platform not in ['linux', 'windows']:
             return False, "平台类型必须为 linux 或 windows"
-            
+
         if not self.virtual_ip:
             return False, "虚拟IP不能为空"
-            
+
         if not self.public_key:
             return False, "公钥不能为空"
-            
+
         if not self.private_key:
             return False, "私钥不能为空"
-            
+
+        if self.endpoint and self.listen_port is None:
+            return False, "公网地址格式错误，应为 IP:Port 或 域名:Port"
+
         return True, None
-    
+
     def to_dict(self, include_private_key: bool = False) -> dict:
         """转换为字典
-        
+
         Args:
             include_private_key: 是否包含私钥
-            
+
         Returns:
             字典表示
         """
+        created_at = self.created_at
+        updated_at = self.updated_at
+        expires_at = self.expires_at
+        disabled_at = self.disabled_at
         data = {
             'id': self.id,
             'node_name': self.node_name,
@@ -60,34 +204,38 @@ class Node:
             'public_key': self.public_key,
             'platform': self.platform,
             'description': self.description,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'created_at': created_at.isoformat() if created_at else None,
+            'updated_at': updated_at.isoformat() if updated_at else None,
+            'interface_id': self.interface_id,
+            'hub_id': self.hub_id,
+            'region': self.region,
+            'endpoint': self.endpoint,
+            'routed_subnets': self.routes,
+            'group_id': self.group_id,
+            'policy_id': self.policy_id,
+            'virtual_ip6': self.virtual_ip6,
+            'network_id': self.network_id,
+            'shaping_profile_id': self.shaping_profile_id,
+            'peer_profile_id': self.peer_profile_id,
+            'expires_at': expires_at.isoformat() if expires_at else None,
+            'disabled_at': disabled_at.isoformat() if disabled_at else None,
         }
-        
+
         if include_private_key:
             data['private_key'] = self.private_key
-            
+
         return data
-    
+
     @classmethod
     def from_dict(cls, data: dict) -> 'Node':
         """从字典创建节点实例
-        
+
         Args:
             data: 字典数据
-            
+
         Returns:
             Node实例
         """
-        created_at = data.get('created_at')
-        updated_at = data.get('updated_at')
-        
-        # 处理时间字段
-        if isinstance(created_at, str):
-            created_at = datetime.fromisoformat(created_at)
-        if isinstance(updated_at, str):
-            updated_at = datetime.fromisoformat(updated_at)
-            
         return cls(
             id=data.get('id'),
             node_name=data.get('node_name', ''),
@@ -96,6 +244,52 @@ class Node:
             private_key=data.get('private_key', ''),
             platform=data.get('platform', ''),
             description=data.get('description'),
-            created_at=created_at,
-            updated_at=updated_at
+            created_at=data.get('created_at'),
+            updated_at=data.get('updated_at'),
+            interface_id=data.get('interface_id'),
+            hub_id=data.get('hub_id'),
+            region=data.get('region'),
+            endpoint=data.get('endpoint'),
+            routed_subnets=cls._join_routes(data.get('routed_subnets')),
+            group_id=data.get('group_id'),
+            policy_id=data.get('policy_id'),
+            virtual_ip6=data.get('virtual_ip6'),
+            network_id=data.get('network_id'),
+            shaping_profile_id=data.get('shaping_profile_id'),
+            peer_profile_id=data.get('peer_profile_id'),
+            expires_at=data.get('expires_at'),
+            disabled_at=data.get('disabled_at'),
+            revision=data.get('revision', 0)
         )
+
+    @staticmethod
+    def _join_routes(value) -> Optional[str]:
+        """将路由子网列表或逗号分隔字符串规整为存储格式"""
+        if not value:
+            return None
+        if isinstance(value, str):
+            return value
+        return ','.join(value)
+
+    @classmethod
+    def from_row(cls, cursor, row: tuple) -> 'Node':
+        """sqlite3 行工厂：按 COLUMNS 顺序直接由元组构造节点
+
+        可直接赋值给 cursor.row_factory，跳过 sqlite3.Row 和中间字典。
+        时间字段保留原始字符串，访问时再解析。
+
+        Args:
+            cursor: sqlite3 游标（行工厂协议要求，未使用）
+            row: 按 COLUMNS 顺序排列的行元组
+
+        Returns:
+            Node实例
+        """
+        node = cls.__new__(cls)
+        (node.id, node.node_name, node.virtual_ip, node.public_key, node.private_key,
+         node.platform, node.description, node._created_at, node._updated_at,
+         node.interface_id, node.hub_id, node.region, node.endpoint,
+         node.routed_subnets, node.group_id, node.policy_id, node.virtual_ip6,
+         node.network_id, node.shaping_profile_id, node.peer_profile_id,
+         node._expires_at, node._disabled_at, node.revision) = row
+        return node
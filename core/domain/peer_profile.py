@@ -0,0 +1,149 @@
+"""
+对端参数领域模型
+定义节点的保活间隔和 MTU 配置，以及按节点解析生效值的规则
+"""
+from datetime import datetime
+from typing import Dict, Hashable, Iterable, Optional
+
+# 客户端 MTU 的合法范围（IPv4 最小 MTU 576，WireGuard 默认 1420）
+MIN_MTU = 576
+MAX_MTU = 9000
+
+
+class PeerProfile:
+    """对端参数配置实体
+
+    persistent_keepalive 为保活间隔（秒，0 表示关闭），同时用于中心节点配置中该节点的
+    [Peer] 段和节点自身配置中的 [Peer] 段；mtu 写入客户端配置的 [Interface] 段。
+    字段为 None 表示继承下一级（节点配置 -> 平台默认配置 -> 全局参数）。
+    """
+
+    # 与 peer_profiles 表查询列一一对应，from_row 依赖此顺序
+    COLUMNS = ('id', 'name', 'persistent_keepalive', 'mtu', 'platform', 'description', 'created_at')
+
+    __slots__ = ('id', 'name', 'persistent_keepalive', 'mtu', 'platform', 'description', '_created_at')
+
+    def __init__(self, id: Optional[int] = None, name: str = '',
+                 persistent_keepalive: Optional[int] = None, mtu: Optional[int] = None,
+                 platform: Optional[str] = None, description: Optional[str] = None,
+                 created_at: Optional[datetime] = None):
+        self.id = id
+        self.name = name
+        self.persistent_keepalive = persistent_keepalive
+        self.mtu = mtu
+        self.platform = platform  # 作为该平台节点的默认配置
+        self.description = description
+        self._created_at = created_at
+
+    @property
+    def created_at(self) -> Optional[datetime]:
+        """创建时间（惰性解析）"""
+        value = self._created_at
+        if isinstance(value, str):
+            value = self._created_at = datetime.fromisoformat(value)
+        return value
+
+    def __repr__(self) -> str:
+        return (f"PeerProfile(id={self.id!r}, name={self.name!r}, "
+                f"persistent_keepalive={self.persistent_keepalive!r}, mtu={self.mtu!r})")
+
+    def validate(self) -> tuple[bool, Optional[str]]:
+        """验证配置数据
+
+        Returns:
+            (是否有效, 错误信息)
+        """
+        if not self.name or not self.name.strip():
+            return False, "配置名称不能为空"
+
+        if self.persistent_keepalive is None and self.mtu is None:
+            return False, "保活间隔和 MTU 至少需要设置一个"
+
+        if self.persistent_keepalive is not None and not 0 <= self.persistent_keepalive <= 65535:
+            return False, "保活间隔必须在 0-65535 秒之间（0 表示关闭）"
+
+        if self.mtu is not None and not MIN_MTU <= self.mtu <= MAX_MTU:
+            return False, f"MTU 必须在 {MIN_MTU}-{MAX_MTU} 之间"
+
+        return True, None
+
+    def to_dict(self) -> dict:
+        """转换为字典
+
+        Returns:
+            字典表示
+        """
+        created_at = self.created_at
+        return {
+            'id': self.id,
+            'name': self.name,
+            'persistent_keepalive': self.persistent_keepalive,
+            'mtu': self.mtu,
+            'platform': self.platform,
+            'description': self.description,
+            'created_at': created_at.isoformat() if created_at else None,
+        }
+
+    @classmethod
+    def from_row(cls, cursor, row: tuple) -> 'PeerProfile':
+        """sqlite3 行工厂：按 COLUMNS 顺序直接由元组构造配置实体
+
+        Args:
+            cursor: sqlite3 游标（行工厂协议要求，未使用）
+            row: 按 COLUMNS 顺序排列的行元组
+
+        Returns:
+            PeerProfile实例
+        """
+        profile = cls.__new__(cls)
+        (profile.id, profile.name, profile.persistent_keepalive, profile.mtu,
+         profile.platform, profile.description, profile._created_at) = row
+        return profile
+
+
+class PeerSettings:
+    """按节点解析生效的保活间隔和 MTU
+
+    每个字段依次取节点自身的配置、节点平台的默认配置，都未设置时使用全局值。
+    一次渲染只构造一次，之后按节点查找是字典操作。
+    """
+
+    __slots__ = ('default_keepalive', '_profiles', '_platforms', 'signature')
+
+    def __init__(self, default_keepalive: int, profiles: Iterable[PeerProfile] = ()):
+        """初始化
+
+        Args:
+            default_keepalive: 全局保活间隔（秒）
+            profiles: 全部对端参数配置
+        """
+        self.default_keepalive = default_keepalive
+        self._profiles: Dict[int, PeerProfile] = {}
+        self._platforms: Dict[str, PeerProfile] = {}
+        for profile in profiles:
+            self._profiles[profile.id] = profile
+            if profile.platform:
+                self._platforms[profile.platform] = profile
+        # 影响渲染结果的全部参数，供 [Peer] 段缓存判断是否整体失效
+        self.signature: Hashable = (default_keepalive, tuple(
+            (profile.id, profile.persistent_keepalive, profile.mtu, profile.platform)
+            for profile in self._profiles.values()
+        ))
+
+    def _resolve(self, node, field: str):
+        """按节点配置 -> 平台默认配置的顺序取第一个已设置的字段值"""
+        for profile in (self._profiles.get(node.peer_profile_id), self._platforms.get(node.platform)):
+            if profile is not None:
+                value = getattr(profile, field)
+                if value is not None:
+                    return value
+        return None
+
+    def keepalive(self, node) -> int:
+        """节点生效的保活间隔（秒，0 表示关闭）"""
+        value = self._resolve(node, 'persistent_keepalive')
+        return self.default_keepalive if value is None else value
+
+    def mtu(self, node) -> Optional[int]:
+        """节点生效的客户端 MTU，None 表示使用 wg-quick 默认值"""
+        return self._resolve(node, 'mtu')
@@ -0,0 +1,123 @@
+"""
+路由策略领域模型
+定义客户端 AllowedIPs 的分流策略（包含/排除前缀集合）
+"""
+from datetime import datetime
+from typing import List, Optional
+from core.utils.cidr_compactor import expand_prefixes
+
+
+class RoutingPolicy:
+    """路由策略实体
+
+    描述客户端经隧道转发的流量范围：包含前缀集合减去排除前缀集合。
+    前缀可写别名（如 any、rfc1918）。每次修改 version 递增，编译结果按版本缓存。
+    """
+
+    # 与 routing_policies 表查询列一一对应，from_row 依赖此顺序
+    COLUMNS = (
+        'id', 'name', 'include_prefixes', 'exclude_prefixes', 'version',
+        'description', 'created_at', 'updated_at',
+    )
+
+    __slots__ = (
+        'id', 'name', 'include_prefixes', 'exclude_prefixes', 'version',
+        'description', '_created_at', '_updated_at',
+    )
+
+    def __init__(self, id: Optional[int] = None, name: str = '',
+                 include_prefixes: str = '', exclude_prefixes: Optional[str] = None,
+                 version: int = 1, description: Optional[str] = None,
+                 created_at: Optional[datetime] = None,
+                 updated_at: Optional[datetime] = None):
+        self.id = id
+        self.name = name
+        self.include_prefixes = include_prefixes  # 逗号分隔的前缀或别名
+        self.exclude_prefixes = exclude_prefixes
+        self.version = version
+        self.description = description
+        self._created_at = created_at
+        self._updated_at = updated_at
+
+    @property
+    def created_at(self) -> Optional[datetime]:
+        """创建时间（惰性解析）"""
+        value = self._created_at
+        if isinstance(value, str):
+            value = self._created_at = datetime.fromisoformat(value)
+        return value
+
+    @property
+    def updated_at(self) -> Optional[datetime]:
+        """更新时间（惰性解析）"""
+        value = self._updated_at
+        if isinstance(value, str):
+            value = self._updated_at = datetime.fromisoformat(value)
+        return value
+
+    @property
+    def includes(self) -> List[str]:
+        """包含的前缀列表"""
+        return self.include_prefixes.split(',') if self.include_prefixes else []
+
+    @property
+    def excludes(self) -> List[str]:
+        """排除的前缀列表"""
+        return self.exclude_prefixes.split(',') if self.exclude_prefixes else []
+
+    def __repr__(self) -> str:
+        return f"RoutingPolicy(id={self.id!r}, name={self.name!r}, version={self.version!r})"
+
+    def validate(self) -> tuple[bool, Optional[str]]:
+        """验证策略数据
+
+        Returns:
+            (是否有效, 错误信息)
+        """
+        if not self.name or not self.name.strip():
+            return False, "策略名称不能为空"
+
+        if not self.includes:
+            return False, "包含前缀不能为空"
+
+        try:
+            expand_prefixes(self.includes + self.excludes)
+        except ValueError as e:
+            return False, str(e)
+
+        return True, None
+
+    def to_dict(self) -> dict:
+        """转换为字典
+
+        Returns:
+            字典表示
+        """
+        created_at = self.created_at
+        updated_at = self.updated_at
+        return {
+            'id': self.id,
+            'name': self.name,
+            'include': self.includes,
+            'exclude': self.excludes,
+            'version': self.version,
+            'description': self.description,
+            'created_at': created_at.isoformat() if created_at else None,
+            'updated_at': updated_at.isoformat() if updated_at else None,
+        }
+
+    @classmethod
+    def from_row(cls, cursor, row: tuple) -> 'RoutingPolicy':
+        """sqlite3 行工厂：按 COLUMNS 顺序直接由元组构造策略实体
+
+        Args:
+            cursor: sqlite3 游标（行工厂协议要求，未使用）
+            row: 按 COLUMNS 顺序排列的行元组
+
+        Returns:
+            RoutingPolicy实例
+        """
+        policy = cls.__new__(cls)
+        (policy.id, policy.name, policy.include_prefixes, policy.exclude_prefixes,
+         policy.version, policy.description, policy._created_at, policy._updated_at) = row
+        return policy
@@ -2,60 +2,135 @@
 服务端领域模型
 定义服务端实体和业务规则
 """
-from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
-@dataclass
 class Server:
-    """服务端实体"""
-    
-    id: int = 1  # 服务端只有一条记录
-    public_key: str = ''
-    private_key: str = ''
-    virtual_ip: str = ''
-    listen_port: int = 51820
-    network_cidr: str = '10.0.0.0/24'
-    public_endpoint: Optional[str] = None
-    created_at: Optional[datetime] = None
-    
+    """服务端实体
+
+    使用 __slots__ 存储字段，时间字段保留数据库原始字符串，首次访问时才解析。
+    """
+
+    # 与 server_info 表查询列一一对应，from_row 依赖此顺序
+    COLUMNS = (
+        'id', 'public_key', 'private_key', 'virtual_ip', 'listen_port',
+        'network_cidr', 'public_endpoint', 'created_at', 'network6_cidr', 'virtual_ip6',
+    )
+
+    __slots__ = (
+        'id', 'public_key', 'private_key', 'virtual_ip', 'listen_port',
+        'network_cidr', 'public_endpoint', '_created_at', 'network6_cidr', 'virtual_ip6',
+    )
+
+    def __init__(self, id: int = 1, public_key: str = '', private_key: str = '',
+                 virtual_ip: str = '', listen_port: int = 51820,
+                 network_cidr: str = '10.0.0.0/24',
+                 public_endpoint: Optional[str] = None,
+                 created_at: Optional[datetime] = None,
+                 network6_cidr: Optional[str] = None,
+                 virtual_ip6: Optional[str] = None):
+        self.id = id  # 服务端只有一条记录
+        self.public_key = public_key
+        self.private_key = private_key
+        self.virtual_ip = virtual_ip
+        self.listen_port = listen_port
+        self.network_cidr = network_cidr
+        self.public_endpoint = public_endpoint
+        self._created_at = created_at
+        self.network6_cidr = network6_cidr  # IPv6 网络段（ULA 或指定前缀），None 表示仅 IPv4
+        self.virtual_ip6 = virtual_ip6
+
+    @property
+    def created_at(self) -> Optional[datetime]:
+        """创建时间（惰性解析）"""
+        value = self._created_at
+        if isinstance(value, str):
+            value = self._created_at = datetime.fromisoformat(value)
+        return value
+
+    @created_at.setter
+    def created_at(self, value):
+        self._created_at = value
+
+    @property
+    def prefix_length(self) -> str:
+        """网络段前缀长度（如 24）"""
+        return self.network_cidr.split('/')[-1]
+
+    @property
+    def prefix6_length(self) -> Optional[str]:
+        """IPv6 网络段前缀长度（如 64），未启用 IPv6 时为 None"""
+        return self.network6_cidr.split('/')[-1] if self.network6_cidr else None
+
+    @property
+    def networks(self) -> List[str]:
+        """虚拟网络段列表（IPv4 在前，启用 IPv6 时追加 IPv6 网络段）"""
+        if self.network6_cidr:
+            return [self.network_cidr, self.network6_cidr]
+        return [self.network_cidr]
+
+    @property
+    def addresses(self) -> str:
+        """wg-quick 的 Address 字段（双栈时同时包含 IPv4 和 IPv6 地址）"""
+        address = f"{self.virtual_ip}/{self.prefix_length}"
+        if self.virtual_ip6 and self.network6_cidr:
+            address += f", {self.virtual_ip6}/{self.prefix6_length}"
+        return address
+
+    def __repr__(self) -> str:
+        return (
+            f"Server(id={self.id!r}, virtual_ip={self.virtual_ip!r}, "
+            f"listen_port={self.listen_port!r}, network_cidr={self.network_cidr!r})"
+        )
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.COLUMNS)
+
+    __hash__ = None
+
     def validate(self) -> tuple[bool, Optional[str]]:
         """验证服务端数据
-        
+
         Returns:
             (是否有效, 错误信息)
         """
         if not self.public_key:
             return False, "公钥不能为空"
-            
+
         if not self.private_key:
             return False, "私钥不能为空"
-            
+
         if not self.virtual_ip:
             return False, "虚拟IP不能为空"
-            
+
         if not self.network_cidr:
             return False, "网络段不能为空"
-            
+
         if self.listen_port < 1 or self.listen_port > 65535:
             return False, "端口号必须在 1-65535 之间"
-            
+
         # 验证 CIDR 格式
         if '/' not in self.network_cidr:
             return False, "网络段格式错误，应为 CIDR 格式（如 10.0.0.0/24）"
-            
+
+        if self.network6_cidr and not self.virtual_ip6:
+            return False, "启用 IPv6 时服务端虚拟 IPv6 地址不能为空"
+
         return True, None
-    
+
     def to_dict(self, include_private_key: bool = False) -> dict:
         """转换为字典
-        
+
         Args:
             include_private_key: 是否包含私钥
-            
+
         Returns:
             字典表示
         """
+        created_at = self.created_at
         data = {
             'id': self.id,
             'public_key': self.public_key,
@@ -63,30 +138,26 @@ class Server:
             'listen_port': self.listen_port,
             'network_cidr': self.network_cidr,
             'public_endpoint': self.public_endpoint,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'created_at': created_at.isoformat() if created_at else None,
+            'network6_cidr': self.network6_cidr,
+            'virtual_ip6': self.virtual_ip6,
         }
-        
+
         if include_private_key:
             data['private_key'] = self.private_key
-            
+
         return data
-    
+
     @classmethod
     def from_dict(cls, data: dict) -> 'Server':
         """从字典创建服务端实例
-        
+
         Args:
             data: 字典数据
-            
+
         Returns:
             Server实例
         """
-        created_at = data.get('created_at')
-        
-        # 处理时间字段
-        if isinstance(created_at, str):
-            created_at = datetime.fromisoformat(created_at)
-            
         return cls(
             id=data.get('id', 1),
             public_key=data.get('public_key', ''),
@@ -95,5 +166,24 @@ class Server:
             listen_port=data.get('listen_port', 51820),
             network_cidr=data.get('network_cidr', '10.0.0.0/24'),
             public_endpoint=data.get('public_endpoint'),
-            created_at=created_at
+            created_at=data.get('created_at'),
+            network6_cidr=data.get('network6_cidr'),
+            virtual_ip6=data.get('virtual_ip6')
         )
+
+    @classmethod
+    def from_row(cls, cursor, row: tuple) -> 'Server':
+        """sqlite3 行工厂：按 COLUMNS 顺序直接由元组构造服务端实体
+
+        Args:
+            cursor: sqlite3 游标（行工厂协议要求，未使用）
+            row: 按 COLUMNS 顺序排列的行元组
+
+        Returns:
+            Server实例
+        """
+        server = cls.__new__(cls)
+        (server.id, server.public_key, server.private_key, server.virtual_ip,
+         server.listen_port, server.network_cidr, server.public_endpoint,
+         server._created_at, server.network6_cidr, server.virtual_ip6) = row
+        return server
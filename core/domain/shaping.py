@@ -0,0 +1,93 @@
+"""
+限速领域模型
+定义中心节点对节点的带宽限速配置
+"""
+from datetime import datetime
+from typing import Optional
+
+
+class ShapingProfile:
+    """限速配置实体
+
+    下行指中心节点发往节点的流量（节点的下载），上行指节点发往中心节点的流量
+    （节点的上传），速率单位均为 kbit/s，None 表示该方向不限速。配置可挂在节点
+    或节点组上，节点自身的配置优先于节点组的配置，组内每个节点各自独立限速。
+    """
+
+    # 与 shaping_profiles 表查询列一一对应，from_row 依赖此顺序
+    COLUMNS = ('id', 'name', 'download_kbit', 'upload_kbit', 'description', 'created_at')
+
+    __slots__ = ('id', 'name', 'download_kbit', 'upload_kbit', 'description', '_created_at')
+
+    def __init__(self, id: Optional[int] = None, name: str = '',
+                 download_kbit: Optional[int] = None, upload_kbit: Optional[int] = None,
+                 description: Optional[str] = None,
+                 created_at: Optional[datetime] = None):
+        self.id = id
+        self.name = name
+        self.download_kbit = download_kbit
+        self.upload_kbit = upload_kbit
+        self.description = description
+        self._created_at = created_at
+
+    @property
+    def created_at(self) -> Optional[datetime]:
+        """创建时间（惰性解析）"""
+        value = self._created_at
+        if isinstance(value, str):
+            value = self._created_at = datetime.fromisoformat(value)
+        return value
+
+    def __repr__(self) -> str:
+        return (f"ShapingProfile(id={self.id!r}, name={self.name!r}, "
+                f"download_kbit={self.download_kbit!r}, upload_kbit={self.upload_kbit!r})")
+
+    def validate(self) -> tuple[bool, Optional[str]]:
+        """验证限速配置数据
+
+        Returns:
+            (是否有效, 错误信息)
+        """
+        if not self.name or not self.name.strip():
+            return False, "限速配置名称不能为空"
+
+        if self.download_kbit is None and self.upload_kbit is None:
+            return False, "下行和上行速率至少需要设置一个"
+
+        for rate in (self.download_kbit, self.upload_kbit):
+            if rate is not None and rate <= 0:
+                return False, "速率必须大于 0"
+
+        return True, None
+
+    def to_dict(self) -> dict:
+        """转换为字典
+
+        Returns:
+            字典表示
+        """
+        created_at = self.created_at
+        return {
+            'id': self.id,
+            'name': self.name,
+            'download_kbit': self.download_kbit,
+            'upload_kbit': self.upload_kbit,
+            'description': self.description,
+            'created_at': created_at.isoformat() if created_at else None,
+        }
+
+    @classmethod
+    def from_row(cls, cursor, row: tuple) -> 'ShapingProfile':
+        """sqlite3 行工厂：按 COLUMNS 顺序直接由元组构造限速配置实体
+
+        Args:
+            cursor: sqlite3 游标（行工厂协议要求，未使用）
+            row: 按 COLUMNS 顺序排列的行元组
+
+        Returns:
+            ShapingProfile实例
+        """
+        profile = cls.__new__(cls)
+        (profile.id, profile.name, profile.download_kbit, profile.upload_kbit,
+         profile.description, profile._created_at) = row
+        return profile
@@ -2,15 +2,54 @@
 数据库模块
 负责 SQLite 数据库的初始化和操作
 """
+import os
 import sqlite3
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Sequence, Callable
 from config import base as config
+from core.utils.metrics import DB_QUERY_SECONDS, instrument_methods
+
+
+# 地址前缀相关数据（节点 IP、路由子网、网络段）的版本计数名称
+PREFIXES_COUNTER = 'prefixes'
+
+# 影响节点配置的列：只有这些列变化时才记录变更日志并递增节点修订号
+NODE_CONFIG_COLUMNS = (
+    'id', 'node_name', 'virtual_ip', 'virtual_ip6', 'public_key', 'private_key', 'platform',
+    'description', 'interface_id', 'hub_id', 'region', 'endpoint', 'routed_subnets',
+    'group_id', 'policy_id', 'network_id', 'shaping_profile_id', 'peer_profile_id',
+    'expires_at', 'disabled_at',
+)
+
+# 前缀相关对象的表和列（on_prefixes_changed 回调收到的行格式）
+_PREFIX_COLUMNS = {
+    'node': ('nodes', ('id', 'node_name', 'virtual_ip', 'virtual_ip6', 'routed_subnets')),
+    'hub': ('hubs', ('id', 'name', 'network_cidr')),
+    'network': ('networks', ('name', 'network_cidr')),
+    'server': ('server_info', ('network_cidr', 'network6_cidr')),
+}
+
+# 变更日志压缩水位：被压缩删除的最大序号（since 小于它的客户端需重新全量同步）
+CHANGES_COMPACTED_COUNTER = 'changes_compacted'
+
+# 当前上下文的共享连接（CLI 批处理/交互式 shell），见 Database.shared()
+_shared: ContextVar[Optional['Database']] = ContextVar('wg_shared_database', default=None)
 
 
 class Database:
     """数据库操作类"""
     
+    # 本进程内已完成表结构检查/迁移的数据库路径
+    _schema_checked = set()
+    
+    # 回滚了写入时调用的函数（丢弃可能已按回滚前的数据更新的进程内缓存）
+    _rollback_hooks: List[Callable[[], None]] = []
+    
+    # 前缀相关数据变化时调用的函数（在写入路径上增量更新进程内的前缀索引）
+    _prefix_hooks: List[Callable[['Database', int, str, Sequence[tuple], Sequence[tuple]], None]] = []
+    
     def __init__(self, db_path: Optional[str] = None):
         """初始化数据库连接
         
@@ -19,13 +58,28 @@ class Database:
         """
         self.db_path = db_path or config.DATABASE_PATH
         self.conn = None
+        self._owner: Optional['Database'] = None  # 使用共享连接时为连接的所有者
+        self._savepoint: Optional[str] = None
+        self._changes = 0  # 保存点开始时连接的累计变更行数
+        self._depth = 0  # 作为共享连接时，正在使用它的 Database 上下文数量
         
     def connect(self):
         """建立数据库连接"""
+        if self.db_path != ':memory:' and self.db_path not in Database._schema_checked:
+            # 导入配置时不再创建数据目录，首次连接时按需创建
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
         self.conn = sqlite3.connect(self.db_path)
         self.conn.row_factory = sqlite3.Row  # 使结果可以通过列名访问
         # 启用 WAL 模式提高并发性能
         self.conn.execute('PRAGMA journal_mode=WAL')
+        self._ensure_schema()
+        
+    def _ensure_schema(self):
+        """确保表结构为最新版本（每个进程每个数据库只检查一次）"""
+        if self.db_path != ':memory:' and self.db_path in Database._schema_checked:
+            return
+        self.init_database()
+        Database._schema_checked.add(self.db_path)
         
     def close(self):
         """关闭数据库连接"""
@@ -33,19 +87,101 @@ class Database:
             self.conn.close()
             
     def __enter__(self):
-        """上下文管理器入口"""
+        """上下文管理器入口（存在同一路径的共享连接时在其上开启保存点）"""
+        owner = _shared.get()
+        if owner is not None and owner.db_path == self.db_path:
+            owner._depth += 1
+            self._owner = owner
+            self._savepoint = f"db_{owner._depth}"
+            self.conn = owner.conn
+            self.conn.execute(f'SAVEPOINT {self._savepoint}')
+            self._changes = self.conn.total_changes
+            return self
         self.connect()
         return self
         
     def __exit__(self, exc_type, exc_val, exc_tb):
         """上下文管理器退出"""
+        if self._owner is not None:
+            # 共享连接：只回滚/释放自己的保存点，提交由连接所有者决定
+            if exc_type is not None:
+                self.conn.execute(f'ROLLBACK TO {self._savepoint}')
+                if self.conn.total_changes != self._changes:
+                    Database._run_rollback_hooks()
+            self.conn.execute(f'RELEASE {self._savepoint}')
+            self._owner._depth -= 1
+            self._owner = None
+            self.conn = None
+            return
         if self.conn:
             if exc_type is None:
                 self.conn.commit()
             else:
-                self.conn.rollback()
+                self._rollback()
             self.close()
             
+    def _rollback(self):
+        """回滚事务；回滚了写入时通知 on_rollback() 注册的函数"""
+        changed = self.conn.in_transaction
+        self.conn.rollback()
+        if changed:
+            Database._run_rollback_hooks()
+            
+    @classmethod
+    def on_rollback(cls, hook: Callable[[], None]):
+        """注册回滚了写入时调用的函数
+        
+        进程内缓存（前缀索引、[Peer] 段缓存等）以数据库中的版本计数或修订时间校验，
+        回滚后计数回退，之后的新写入可能与缓存的版本重合，因此需要丢弃缓存。
+        """
+        cls._rollback_hooks.append(hook)
+        
+    @classmethod
+    def _run_rollback_hooks(cls):
+        for hook in cls._rollback_hooks:
+            hook()
+            
+    @classmethod
+    def on_prefixes_changed(cls, hook: Callable[['Database', int, str, Sequence[tuple], Sequence[tuple]], None]):
+        """注册前缀相关数据（节点地址和路由子网、中心节点和租户网络的网络段）变化时调用的函数
+        
+        函数以 (数据库, 递增后的版本计数, 对象类型, 变化前的行, 变化后的行) 调用，行格式见
+        _PREFIX_COLUMNS。调用发生在写入所在的事务中，回滚时另由 on_rollback() 通知。
+        """
+        cls._prefix_hooks.append(hook)
+            
+    def _commit(self):
+        """提交事务（使用共享连接时推迟到所有者的事务结束时提交）"""
+        if self._owner is None:
+            self.conn.commit()
+            
+    @contextmanager
+    def shared(self):
+        """将本连接设为当前上下文的共享连接
+        
+        上下文内新建的同一路径的 Database 不再各自建立连接和提交，而是在本连接上
+        以保存点执行：单个 Database 上下文异常时只回滚它自己的变更。用于 CLI
+        批处理和交互式 shell，须配合 transaction() 使用。
+        """
+        token = _shared.set(self)
+        try:
+            yield self
+        finally:
+            _shared.reset(token)
+            
+    @contextmanager
+    def transaction(self):
+        """在本连接上执行一个显式事务：正常结束时提交，异常时回滚"""
+        if self.conn.in_transaction:
+            self.conn.commit()
+        self.conn.execute('BEGIN')
+        try:
+            yield self
+        except BaseException:
+            self._rollback()
+            raise
+        self.conn.commit()
+            
     def init_database(self):
         """初始化数据库表结构"""
         cursor = self.conn.cursor()
@@ -60,7 +196,9 @@ class Database:
                 listen_port INTEGER NOT NULL,
                 network_cidr TEXT NOT NULL,
                 public_endpoint TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                network6_cidr TEXT,
+                virtual_ip6 TEXT
             )
         ''')
         
@@ -75,10 +213,250 @@ class Database:
                 platform TEXT NOT NULL CHECK(platform IN ('linux', 'windows')),
                 description TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                interface_id INTEGER REFERENCES wg_interfaces(id),
+                hub_id INTEGER REFERENCES hubs(id),
+                region TEXT,
+                endpoint TEXT,
+                routed_subnets TEXT,
+                group_id INTEGER REFERENCES node_groups(id),
+                policy_id INTEGER REFERENCES routing_policies(id),
+                virtual_ip6 TEXT,
+                network_id INTEGER REFERENCES networks(id),
+                shaping_profile_id INTEGER REFERENCES shaping_profiles(id),
+                peer_profile_id INTEGER REFERENCES peer_profiles(id),
+                expires_at TIMESTAMP,
+                disabled_at TIMESTAMP,
+                revision INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        
+        # 创建 wg_interfaces 表（服务端接口分片）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS wg_interfaces (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT UNIQUE NOT NULL,
+                listen_port INTEGER UNIQUE NOT NULL,
+                public_key TEXT NOT NULL,
+                private_key TEXT NOT NULL,
+                virtual_ip TEXT NOT NULL,
+                network_cidr TEXT NOT NULL,
+                config_path TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                network6_cidr TEXT,
+                virtual_ip6 TEXT,
+                network_id INTEGER REFERENCES networks(id)
+            )
+        ''')
+        
+        # 创建 networks 表（同一服务端上相互隔离的租户网络，默认网络由 server_info 描述）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS networks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT UNIQUE NOT NULL,
+                network_cidr TEXT NOT NULL,
+                description TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # 创建 hubs 表（多中心部署中的远端中心节点）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS hubs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT UNIQUE NOT NULL,
+                public_endpoint TEXT NOT NULL,
+                public_key TEXT UNIQUE NOT NULL,
+                virtual_ip TEXT NOT NULL,
+                network_cidr TEXT NOT NULL,
+                capacity_weight REAL NOT NULL DEFAULT 1,
+                region TEXT,
+                recent_traffic INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # 创建 routing_policies 表（客户端 AllowedIPs 分流策略）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS routing_policies (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT UNIQUE NOT NULL,
+                include_prefixes TEXT NOT NULL,
+                exclude_prefixes TEXT,
+                version INTEGER NOT NULL DEFAULT 1,
+                description TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
         
+        # 创建 node_groups 表
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS node_groups (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT UNIQUE NOT NULL,
+                policy_id INTEGER REFERENCES routing_policies(id),
+                description TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                shaping_profile_id INTEGER REFERENCES shaping_profiles(id)
+            )
+        ''')
+        
+        # 创建 shaping_profiles 表（中心节点对节点的限速配置，速率单位 kbit/s，NULL 表示该方向不限速）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS shaping_profiles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT UNIQUE NOT NULL,
+                download_kbit INTEGER,
+                upload_kbit INTEGER,
+                description TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # 创建 peer_profiles 表（保活间隔和 MTU，NULL 表示继承；platform 非空时为该平台的默认配置）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS peer_profiles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT UNIQUE NOT NULL,
+                persistent_keepalive INTEGER,
+                mtu INTEGER,
+                platform TEXT UNIQUE,
+                description TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # 创建 endpoint_observations 表（中心节点观测到的节点公网地址，用于保活建议）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS endpoint_observations (
+                node_id INTEGER PRIMARY KEY REFERENCES nodes(id),
+                endpoint TEXT,
+                samples INTEGER NOT NULL DEFAULT 1,
+                changes INTEGER NOT NULL DEFAULT 0,
+                first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # 创建 sweep_audit 表（过期/闲置节点清理记录）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sweep_audit (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                node_id INTEGER NOT NULL,
+                node_name TEXT NOT NULL,
+                virtual_ip TEXT,
+                public_key TEXT,
+                action TEXT NOT NULL CHECK(action IN ('delete', 'disable', 'enable')),
+                reason TEXT NOT NULL,
+                detail TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # 创建 acl_rules 表（节点组之间的放行规则，有方向）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS acl_rules (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                src_group_id INTEGER NOT NULL REFERENCES node_groups(id),
+                dst_group_id INTEGER NOT NULL REFERENCES node_groups(id),
+                description TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (src_group_id, dst_group_id)
+            )
+        ''')
+        
+        # 为旧版本数据库补充新增列
+        self._add_missing_columns('nodes', {
+            'interface_id': 'INTEGER REFERENCES wg_interfaces(id)',
+            'hub_id': 'INTEGER REFERENCES hubs(id)',
+            'region': 'TEXT',
+            'endpoint': 'TEXT',
+            'routed_subnets': 'TEXT',
+            'group_id': 'INTEGER REFERENCES node_groups(id)',
+            'policy_id': 'INTEGER REFERENCES routing_policies(id)',
+            'virtual_ip6': 'TEXT',
+            'network_id': 'INTEGER REFERENCES networks(id)',
+            'shaping_profile_id': 'INTEGER REFERENCES shaping_profiles(id)',
+            'peer_profile_id': 'INTEGER REFERENCES peer_profiles(id)',
+            'expires_at': 'TIMESTAMP',
+            'disabled_at': 'TIMESTAMP',
+            'revision': 'INTEGER NOT NULL DEFAULT 0',
+        })
+        self._add_missing_columns('node_groups', {
+            'shaping_profile_id': 'INTEGER REFERENCES shaping_profiles(id)',
+        })
+        self._add_missing_columns('server_info', {
+            'network6_cidr': 'TEXT',
+            'virtual_ip6': 'TEXT',
+        })
+        self._add_missing_columns('wg_interfaces', {
+            'network6_cidr': 'TEXT',
+            'virtual_ip6': 'TEXT',
+            'network_id': 'INTEGER REFERENCES networks(id)',
+        })
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_nodes_interface ON nodes(interface_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_nodes_hub ON nodes(hub_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_nodes_group ON nodes(group_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_nodes_network ON nodes(network_id)')
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_nodes_endpoint ON nodes(endpoint) '
+            'WHERE endpoint IS NOT NULL'
+        )
+        
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_nodes_expires ON nodes(expires_at) '
+            'WHERE expires_at IS NOT NULL'
+        )
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_nodes_routed ON nodes(id) '
+            'WHERE routed_subnets IS NOT NULL'
+        )
+        cursor.execute(
+            'CREATE UNIQUE INDEX IF NOT EXISTS idx_nodes_ip6 ON nodes(virtual_ip6) '
+            'WHERE virtual_ip6 IS NOT NULL'
+        )
+        
+        # 创建 counters 表（数据版本计数，供进程内索引判断是否需要重建）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS counters (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        
+        # 创建 mesh_links 表（部分网状模式下的直连节点对，node_a < node_b）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS mesh_links (
+                node_a INTEGER NOT NULL REFERENCES nodes(id),
+                node_b INTEGER NOT NULL REFERENCES nodes(id),
+                source TEXT NOT NULL DEFAULT 'manual',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (node_a, node_b),
+                CHECK (node_a < node_b)
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_mesh_links_b ON mesh_links(node_b)')
+        
+        # 创建 changes 表（节点和服务端变更日志，供外部系统按序号增量同步）
+        # 每个对象只保留最新一条：再次变更时删除旧记录并以新序号写入；删除记录保留
+        # 节点的标识字段。AUTOINCREMENT 保证序号单调递增、删除后不复用。
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                entity TEXT NOT NULL,
+                entity_id INTEGER NOT NULL,
+                op TEXT NOT NULL CHECK(op IN ('upsert', 'delete')),
+                name TEXT,
+                virtual_ip TEXT,
+                virtual_ip6 TEXT,
+                public_key TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_changes_entity ON changes(entity, entity_id)')
+        self._create_change_triggers()
+        
         # 创建 config_params 表
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS config_params (
@@ -101,11 +479,106 @@ class Database:
             VALUES (?, ?, ?)
         ''', default_params)
         
-        self.conn.commit()
+        self._migrate_single_interface()
+        
+        self._commit()
+        
+    def _create_change_triggers(self):
+        """创建写入变更日志和节点修订号的触发器
+        
+        由触发器写入，变更日志和修订号与触发它的修改在同一事务中提交或回滚，任何修改
+        nodes 配置相关列（NODE_CONFIG_COLUMNS）或 server_info 的语句（包括批量更新、
+        其他进程的写入）都不会遗漏。
+        """
+        # REPLACE 按 (entity, entity_id) 唯一索引删除该对象的旧记录，新记录取新的序号
+        upsert = "INSERT OR REPLACE INTO changes (entity, entity_id, op) VALUES ('{entity}', NEW.id, 'upsert');"
+        for table, entity in (('nodes', 'node'), ('server_info', 'server')):
+            self.conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS changes_{entity}_insert
+                AFTER INSERT ON {table} BEGIN {upsert.format(entity=entity)} END
+            ''')
+        self.conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS changes_server_update
+            AFTER UPDATE ON server_info BEGIN {upsert.format(entity='server')} END
+        ''')
+        
+        # 旧版本用单独的 nodes_revision 触发器递增修订号，其嵌套 UPDATE 使变更日志再触发一次
+        if self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'nodes_revision'"
+        ).fetchone():
+            self.conn.execute('DROP TRIGGER nodes_revision')
+            self.conn.execute('DROP TRIGGER IF EXISTS changes_node_update')
+        # 只有影响配置的列变化时才记录变更并递增修订号（updated_at 精度只到秒，同一秒内的
+        # 多次修改须以修订号区分）；只改时间戳的写入不触发。递增修订号的 UPDATE 不改这些列，
+        # 不会再次满足条件
+        changed = ' OR '.join(f'NEW.{column} IS NOT OLD.{column}' for column in NODE_CONFIG_COLUMNS)
+        self.conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS changes_node_update AFTER UPDATE ON nodes
+            WHEN {changed} BEGIN
+                UPDATE nodes SET revision = OLD.revision + 1 WHERE id = NEW.id;
+                {upsert.format(entity='node')}
+            END
+        ''')
+        self.conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS changes_node_delete AFTER DELETE ON nodes BEGIN
+                INSERT OR REPLACE INTO changes (entity, entity_id, op, name, virtual_ip, virtual_ip6, public_key)
+                VALUES ('node', OLD.id, 'delete', OLD.node_name, OLD.virtual_ip, OLD.virtual_ip6, OLD.public_key);
+            END
+        ''')
+        
+    def _add_missing_columns(self, table: str, columns: Dict[str, str]):
+        """为已有表补充缺失的列
+        
+        Args:
+            table: 表名
+            columns: 列名 -> 列定义
+        """
+        existing = {row[1] for row in self.conn.execute(f'PRAGMA table_info({table})')}
+        for name, definition in columns.items():
+            if name not in existing:
+                self.conn.execute(f'ALTER TABLE {table} ADD COLUMN {name} {definition}')
+                
+    def _migrate_single_interface(self):
+        """将单接口时代的服务端信息迁移为第 0 个接口分片
+        
+        已初始化但没有接口记录的数据库，按 server_info 生成 wg0，并将所有节点归入其中。
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT COUNT(*) FROM wg_interfaces')
+        if cursor.fetchone()[0]:
+            return
+            
+        cursor.execute('''
+            SELECT public_key, private_key, virtual_ip, listen_port, network_cidr,
+                   network6_cidr, virtual_ip6
+            FROM server_info WHERE id = 1
+        ''')
+        row = cursor.fetchone()
+        if not row:
+            return
+            
+        interface_id = self.add_interface(
+            name=config.WG_INTERFACE_NAME,
+            listen_port=row['listen_port'],
+            public_key=row['public_key'],
+            private_key=row['private_key'],
+            virtual_ip=row['virtual_ip'],
+            network_cidr=row['network_cidr'],
+            config_path=config.WG_CONFIG_PATH,
+            commit=False,
+            network6_cidr=row['network6_cidr'],
+            virtual_ip6=row['virtual_ip6']
+        )
+        cursor.execute(
+            'UPDATE nodes SET interface_id = ? WHERE interface_id IS NULL AND hub_id IS NULL',
+            (interface_id,)
+        )
         
     def save_server_info(self, public_key: str, private_key: str, 
                         virtual_ip: str, listen_port: int, 
-                        network_cidr: str, public_endpoint: Optional[str] = None) -> bool:
+                        network_cidr: str, public_endpoint: Optional[str] = None,
+                        network6_cidr: Optional[str] = None,
+                        virtual_ip6: Optional[str] = None) -> bool:
         """保存服务端信息
         
         Args:
@@ -115,6 +588,8 @@ class Database:
             listen_port: 监听端口
             network_cidr: 网络段
             public_endpoint: 公网地址（IP:Port 或域名:Port）
+            network6_cidr: IPv6 网络段（None 表示仅 IPv4）
+            virtual_ip6: 服务端虚拟 IPv6 地址
             
         Returns:
             是否成功
@@ -124,6 +599,7 @@ class Database:
         # 检查是否已存在服务端信息
         cursor.execute('SELECT id FROM server_info WHERE id = 1')
         exists = cursor.fetchone()
+        before = self._prefix_rows('server', 'id = 1')
         
         if exists:
             # 更新现有信息
@@ -134,18 +610,24 @@ class Database:
                     virtual_ip = ?,
                     listen_port = ?,
                     network_cidr = ?,
-                    public_endpoint = ?
+                    public_endpoint = ?,
+                    network6_cidr = ?,
+                    virtual_ip6 = ?
                 WHERE id = 1
-            ''', (public_key, private_key, virtual_ip, listen_port, network_cidr, public_endpoint))
+            ''', (public_key, private_key, virtual_ip, listen_port, network_cidr, public_endpoint,
+                  network6_cidr, virtual_ip6))
         else:
             # 插入新记录
             cursor.execute('''
                 INSERT INTO server_info (id, public_key, private_key, virtual_ip, 
-                                       listen_port, network_cidr, public_endpoint)
-                VALUES (1, ?, ?, ?, ?, ?, ?)
-            ''', (public_key, private_key, virtual_ip, listen_port, network_cidr, public_endpoint))
+                                       listen_port, network_cidr, public_endpoint,
+                                       network6_cidr, virtual_ip6)
+                VALUES (1, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (public_key, private_key, virtual_ip, listen_port, network_cidr, public_endpoint,
+                  network6_cidr, virtual_ip6))
         
-        self.conn.commit()
+        self._bump_prefixes('server', before, [(network_cidr, network6_cidr)])
+        self._commit()
         return True
         
     def get_server_info(self) -> Optional[Dict[str, Any]]:
@@ -162,8 +644,272 @@ class Database:
             return dict(row)
         return None
         
+    def add_interface(self, name: str, listen_port: int, public_key: str,
+                      private_key: str, virtual_ip: str, network_cidr: str,
+                      config_path: str, commit: bool = True,
+                      network6_cidr: Optional[str] = None,
+                      virtual_ip6: Optional[str] = None,
+                      network_id: Optional[int] = None) -> int:
+        """添加接口分片
+        
+        Args:
+            name: 接口名称（如 wg1）
+            listen_port: 监听端口
+            public_key: 接口公钥
+            private_key: 接口私钥
+            virtual_ip: 接口虚拟 IP
+            network_cidr: 接口负责的网络子段
+            config_path: 配置文件路径
+            commit: 是否立即提交
+            network6_cidr: 接口负责的 IPv6 网络子段
+            virtual_ip6: 接口虚拟 IPv6 地址
+            network_id: 所属租户网络 ID（None 表示默认网络）
+            
+        Returns:
+            新接口的 ID
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            INSERT INTO wg_interfaces (name, listen_port, public_key, private_key,
+                                       virtual_ip, network_cidr, config_path,
+                                       network6_cidr, virtual_ip6, network_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (name, listen_port, public_key, private_key, virtual_ip, network_cidr, config_path,
+              network6_cidr, virtual_ip6, network_id))
+        
+        if commit:
+            self._commit()
+        return cursor.lastrowid
+        
+    def select_interfaces(self, columns: Sequence[str],
+                          row_factory: Optional[Callable] = None,
+                          where: Optional[str] = None,
+                          params: tuple = ()) -> sqlite3.Cursor:
+        """按指定列查询接口分片，返回可迭代游标
+        
+        Args:
+            columns: 查询列（顺序即行元组顺序）
+            row_factory: 游标级行工厂，None 表示返回原始元组
+            where: WHERE 子句（不含 WHERE 关键字）
+            params: 查询参数
+            
+        Returns:
+            已执行查询的游标（按 id 排序）
+        """
+        sql = f"SELECT {', '.join(columns)} FROM wg_interfaces"
+        if where:
+            sql += f" WHERE {where}"
+        sql += " ORDER BY id"
+        
+        cursor = self.conn.cursor()
+        cursor.row_factory = row_factory
+        cursor.execute(sql, params)
+        return cursor
+        
+    def delete_all_interfaces(self) -> int:
+        """删除默认网络的所有接口分片（节点的分片归属同时清空，租户网络不受影响）
+        
+        Returns:
+            删除的接口数量
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('UPDATE nodes SET interface_id = NULL WHERE network_id IS NULL')
+        cursor.execute('DELETE FROM wg_interfaces WHERE network_id IS NULL')
+        self._commit()
+        
+        return cursor.rowcount
+        
+    def get_interface_node_counts(self, network_id: Optional[int] = None) -> Dict[int, int]:
+        """统计网络内每个接口分片上的节点数量
+        
+        Args:
+            network_id: 租户网络 ID（None 表示默认网络）
+            
+        Returns:
+            接口 ID -> 节点数量（没有节点的接口计为 0）
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT i.id, COUNT(n.id) FROM wg_interfaces i
+            LEFT JOIN nodes n ON n.interface_id = i.id
+            WHERE i.network_id IS ?
+            GROUP BY i.id ORDER BY i.id
+        ''', (network_id,))
+        return {row[0]: row[1] for row in cursor.fetchall()}
+        
+    def get_peer_counts(self) -> Dict[str, tuple]:
+        """统计每个接口（含租户网络接口）上的节点数量和已停用节点数量
+        
+        Returns:
+            接口名称 -> (节点数量, 已停用节点数量)
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT i.name, COUNT(n.id), COUNT(n.disabled_at) FROM wg_interfaces i
+            LEFT JOIN nodes n ON n.interface_id = i.id
+            GROUP BY i.id ORDER BY i.id
+        ''')
+        return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+        
+    def get_interface_ips(self, interface_id: int) -> List[str]:
+        """获取接口分片上已分配的全部虚拟 IP
+        
+        Args:
+            interface_id: 接口 ID
+            
+        Returns:
+            虚拟 IP 列表
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT virtual_ip FROM nodes WHERE interface_id = ?', (interface_id,))
+        return [row[0] for row in cursor.fetchall()]
+        
+    def set_node_interface(self, node_id: int, interface_id: int) -> bool:
+        """设置节点所属接口分片
+        
+        Args:
+            node_id: 节点 ID
+            interface_id: 接口 ID
+            
+        Returns:
+            是否成功
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('UPDATE nodes SET interface_id = ? WHERE id = ?', (interface_id, node_id))
+        self._commit()
+        
+        return cursor.rowcount > 0
+        
+    def add_hub(self, name: str, public_endpoint: str, public_key: str,
+                virtual_ip: str, network_cidr: str, capacity_weight: float = 1.0,
+                region: Optional[str] = None) -> int:
+        """添加远端中心节点
+        
+        Args:
+            name: 中心节点名称
+            public_endpoint: 公网地址（IP:Port 或域名:Port）
+            public_key: 中心节点公钥
+            virtual_ip: 中心节点虚拟 IP
+            network_cidr: 中心节点负责的网络子段
+            capacity_weight: 容量权重
+            region: 区域标签
+            
+        Returns:
+            新中心节点的 ID
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            INSERT INTO hubs (name, public_endpoint, public_key, virtual_ip,
+                              network_cidr, capacity_weight, region)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (name, public_endpoint, public_key, virtual_ip, network_cidr,
+              capacity_weight, region))
+        
+        self._bump_prefixes('hub', after=[(cursor.lastrowid, name, network_cidr)])
+        self._commit()
+        return cursor.lastrowid
+        
+    def select_hubs(self, columns: Sequence[str],
+                    row_factory: Optional[Callable] = None,
+                    where: Optional[str] = None,
+                    params: tuple = ()) -> sqlite3.Cursor:
+        """按指定列查询远端中心节点，返回可迭代游标
+        
+        Args:
+            columns: 查询列（顺序即行元组顺序）
+            row_factory: 游标级行工厂，None 表示返回原始元组
+            where: WHERE 子句（不含 WHERE 关键字）
+            params: 查询参数
+            
+        Returns:
+            已执行查询的游标（按 id 排序）
+        """
+        sql = f"SELECT {', '.join(columns)} FROM hubs"
+        if where:
+            sql += f" WHERE {where}"
+        sql += " ORDER BY id"
+        
+        cursor = self.conn.cursor()
+        cursor.row_factory = row_factory
+        cursor.execute(sql, params)
+        return cursor
+        
+    def delete_hub(self, hub_id: int) -> bool:
+        """删除远端中心节点
+        
+        Args:
+            hub_id: 中心节点 ID
+            
+        Returns:
+            是否成功
+        """
+        before = self._prefix_rows('hub', 'id = ?', (hub_id,))
+        cursor = self.conn.cursor()
+        cursor.execute('DELETE FROM hubs WHERE id = ?', (hub_id,))
+        self._bump_prefixes('hub', before)
+        self._commit()
+        
+        return cursor.rowcount > 0
+        
+    def update_hub_traffic(self, hub_id: int, recent_traffic: int) -> bool:
+        """更新中心节点最近流量
+        
+        Args:
+            hub_id: 中心节点 ID
+            recent_traffic: 最近统计周期内的流量（字节）
+            
+        Returns:
+            是否成功
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('UPDATE hubs SET recent_traffic = ? WHERE id = ?',
+                       (recent_traffic, hub_id))
+        self._commit()
+        
+        return cursor.rowcount > 0
+        
+    def get_hub_node_counts(self) -> Dict[Optional[int], int]:
+        """统计每个中心节点上的节点数量
+        
+        Returns:
+            中心节点 ID -> 节点数量（None 表示本地中心节点）
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT hub_id, COUNT(*) FROM nodes GROUP BY hub_id')
+        return {row[0]: row[1] for row in cursor.fetchall()}
+        
+    def get_hub_ips(self, hub_id: int) -> List[str]:
+        """获取远端中心节点上已分配的全部虚拟 IP
+        
+        Args:
+            hub_id: 中心节点 ID
+            
+        Returns:
+            虚拟 IP 列表
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT virtual_ip FROM nodes WHERE hub_id = ?', (hub_id,))
+        return [row[0] for row in cursor.fetchall()]
+        
+    def count_nodes(self) -> int:
+        """统计节点总数
+        
+        Returns:
+            节点数量
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT COUNT(*) FROM nodes')
+        return cursor.fetchone()[0]
+        
     def add_node(self, node_name: str, virtual_ip: str, public_key: str,
-                 private_key: str, platform: str, description: Optional[str] = None) -> int:
+                 private_key: str, platform: str, description: Optional[str] = None,
+                 interface_id: Optional[int] = None, hub_id: Optional[int] = None,
+                 region: Optional[str] = None, endpoint: Optional[str] = None,
+                 routed_subnets: Optional[str] = None,
+                 group_id: Optional[int] = None,
+                 virtual_ip6: Optional[str] = None,
+                 network_id: Optional[int] = None,
+                 expires_at: Optional[str] = None) -> int:
         """添加节点
         
         Args:
@@ -173,6 +919,15 @@ class Database:
             private_key: 私钥
             platform: 平台（linux/windows）
             description: 描述
+            interface_id: 所属接口分片 ID
+            hub_id: 归属远端中心节点 ID（None 表示本地中心节点）
+            region: 区域标签
+            endpoint: 节点公网地址（IP:Port）
+            routed_subnets: 节点路由的子网（逗号分隔 CIDR）
+            group_id: 所属节点组 ID
+            virtual_ip6: 虚拟 IPv6 地址（None 表示仅 IPv4）
+            network_id: 所属租户网络 ID（None 表示默认网络）
+            expires_at: 过期时间（UTC，None 表示永不过期）
             
         Returns:
             新节点的 ID
@@ -180,11 +935,16 @@ class Database:
         cursor = self.conn.cursor()
         cursor.execute('''
             INSERT INTO nodes (node_name, virtual_ip, public_key, private_key, 
-                             platform, description)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (node_name, virtual_ip, public_key, private_key, platform, description))
+                             platform, description, interface_id, hub_id, region,
+                             endpoint, routed_subnets, group_id, virtual_ip6, network_id,
+                             expires_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (node_name, virtual_ip, public_key, private_key, platform, description,
+              interface_id, hub_id, region, endpoint, routed_subnets, group_id, virtual_ip6,
+              network_id, expires_at))
         
-        self.conn.commit()
+        self._bump_prefixes('node', after=[(cursor.lastrowid, node_name, virtual_ip, virtual_ip6, routed_subnets)])
+        self._commit()
         return cursor.lastrowid
         
     def get_node_by_id(self, node_id: int) -> Optional[Dict[str, Any]]:
@@ -242,18 +1002,1118 @@ class Database:
         Returns:
             是否成功
         """
+        before = self._prefix_rows('node', 'id = ?', (node_id,))
         cursor = self.conn.cursor()
+        self.conn.execute(
+            'DELETE FROM mesh_links WHERE node_a = ? OR node_b = ?', (node_id, node_id)
+        )
+        self.conn.execute('DELETE FROM endpoint_observations WHERE node_id = ?', (node_id,))
         cursor.execute('DELETE FROM nodes WHERE id = ?', (node_id,))
-        self.conn.commit()
+        self._bump_prefixes('node', before)
+        self._commit()
         
         return cursor.rowcount > 0
         
-    def get_max_allocated_ip(self, network_prefix: str) -> Optional[str]:
-        """获取已分配的最大 IP 地址
+    def set_node_expiry(self, node_id: int, expires_at: Optional[str]) -> bool:
+        """设置节点过期时间
         
         Args:
-            network_prefix: 网络前缀（如 10.0.0）
-            
+            node_id: 节点 ID
+            expires_at: 过期时间（UTC），None 表示永不过期
+        
+        Returns:
+            是否成功
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            'UPDATE nodes SET expires_at = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+            (expires_at, node_id)
+        )
+        self._commit()
+        
+        return cursor.rowcount > 0
+        
+    def sweep_nodes(self, action: str, entries: Sequence[tuple]) -> int:
+        """批量删除、停用或恢复节点，并在同一事务中写入清理记录
+        
+        Args:
+            action: delete 删除，disable 停用（保留地址和密钥），enable 恢复
+            entries: (节点ID, 节点名称, 虚拟IP, 公钥, 原因, 详情) 列表
+        
+        Returns:
+            处理的节点数量
+        """
+        node_ids = [(entry[0],) for entry in entries]
+        cursor = self.conn.cursor()
+        if action == 'delete':
+            before = [row for params in node_ids for row in self._prefix_rows('node', 'id = ?', params)]
+            cursor.executemany(
+                'DELETE FROM mesh_links WHERE node_a = ? OR node_b = ?', [params * 2 for params in node_ids]
+            )
+            cursor.executemany('DELETE FROM endpoint_observations WHERE node_id = ?', node_ids)
+            cursor.executemany('DELETE FROM nodes WHERE id = ?', node_ids)
+            self._bump_prefixes('node', before)
+        elif action == 'disable':
+            cursor.executemany(
+                'UPDATE nodes SET disabled_at = CURRENT_TIMESTAMP, '
+                'updated_at = CURRENT_TIMESTAMP WHERE id = ?', node_ids
+            )
+        else:
+            # 恢复时一并清除过期时间，避免下一轮清理再次停用
+            cursor.executemany(
+                'UPDATE nodes SET disabled_at = NULL, expires_at = NULL, '
+                'updated_at = CURRENT_TIMESTAMP WHERE id = ?', node_ids
+            )
+        cursor.executemany('''
+            INSERT INTO sweep_audit (node_id, node_name, virtual_ip, public_key,
+                                     action, reason, detail)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', [(*entry[:4], action, *entry[4:]) for entry in entries])
+        self._commit()
+        
+        return len(entries)
+        
+    def select_sweep_audit(self, limit: int = 100) -> List[tuple]:
+        """获取最近的节点清理记录
+        
+        Args:
+            limit: 最多返回的记录数
+        
+        Returns:
+            (ID, 节点ID, 节点名称, 虚拟IP, 公钥, 操作, 原因, 详情, 时间) 列表，最新的在前
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT id, node_id, node_name, virtual_ip, public_key, action, reason, detail, created_at
+            FROM sweep_audit
+            ORDER BY id DESC
+            LIMIT ?
+        ''', (limit,))
+        return cursor.fetchall()
+        
+    def select_nodes(self, columns: Sequence[str],
+                     row_factory: Optional[Callable] = None,
+                     where: Optional[str] = None,
+                     params: tuple = ()) -> sqlite3.Cursor:
+        """按指定列查询节点，返回可迭代游标
+        
+        游标使用独立的行工厂（默认返回元组），调用方可直接传入领域对象的
+        行工厂，避免 sqlite3.Row -> dict -> 实体 的多次转换。
+        
+        Args:
+            columns: 查询列（顺序即行元组顺序）
+            row_factory: 游标级行工厂，None 表示返回原始元组
+            where: WHERE 子句（不含 WHERE 关键字）
+            params: 查询参数
+            
+        Returns:
+            已执行查询的游标（按 id 排序）
+        """
+        sql = f"SELECT {', '.join(columns)} FROM nodes"
+        if where:
+            sql += f" WHERE {where}"
+        sql += " ORDER BY id"
+        
+        cursor = self.conn.cursor()
+        cursor.row_factory = row_factory
+        cursor.execute(sql, params)
+        return cursor
+        
+    def set_node_endpoint(self, node_id: int, endpoint: Optional[str]) -> bool:
+        """设置节点公网地址
+        
+        Args:
+            node_id: 节点 ID
+            endpoint: 公网地址（IP:Port），None 表示清除
+            
+        Returns:
+            是否成功
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            'UPDATE nodes SET endpoint = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+            (endpoint, node_id)
+        )
+        self._commit()
+        
+        return cursor.rowcount > 0
+        
+    def add_mesh_link(self, node_a: int, node_b: int, source: str = 'manual') -> bool:
+        """添加直连节点对
+        
+        Args:
+            node_a: 节点 ID
+            node_b: 节点 ID
+            source: 来源（manual 手工添加，auto 流量分析自动提升）
+            
+        Returns:
+            是否新增或变更来源（已存在且来源相同返回 False）
+        """
+        node_a, node_b = min(node_a, node_b), max(node_a, node_b)
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            INSERT INTO mesh_links (node_a, node_b, source) VALUES (?, ?, ?)
+            ON CONFLICT (node_a, node_b) DO UPDATE SET source = excluded.source
+            WHERE source != excluded.source
+        ''', (node_a, node_b, source))
+        self._commit()
+        
+        return cursor.rowcount > 0
+        
+    def delete_mesh_link(self, node_a: int, node_b: int, source: Optional[str] = None) -> bool:
+        """删除直连节点对
+        
+        Args:
+            node_a: 节点 ID
+            node_b: 节点 ID
+            source: 仅删除指定来源的节点对，None 表示不限
+            
+        Returns:
+            是否成功
+        """
+        node_a, node_b = min(node_a, node_b), max(node_a, node_b)
+        sql = 'DELETE FROM mesh_links WHERE node_a = ? AND node_b = ?'
+        params: tuple = (node_a, node_b)
+        if source is not None:
+            sql += ' AND source = ?'
+            params += (source,)
+        cursor = self.conn.cursor()
+        cursor.execute(sql, params)
+        self._commit()
+        
+        return cursor.rowcount > 0
+        
+    def get_mesh_links(self, node_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """获取直连节点对
+        
+        Args:
+            node_id: 仅返回包含该节点的节点对，None 表示全部
+            
+        Returns:
+            节点对列表（node_a, node_b, source, created_at）
+        """
+        sql = 'SELECT node_a, node_b, source, created_at FROM mesh_links'
+        params: tuple = ()
+        if node_id is not None:
+            sql += ' WHERE node_a = ? OR node_b = ?'
+            params = (node_id, node_id)
+        sql += ' ORDER BY node_a, node_b'
+        
+        cursor = self.conn.cursor()
+        cursor.execute(sql, params)
+        return [dict(row) for row in cursor.fetchall()]
+        
+    def set_node_routes(self, node_id: int, routed_subnets: Optional[str]) -> bool:
+        """设置节点路由的子网
+        
+        Args:
+            node_id: 节点 ID
+            routed_subnets: 逗号分隔的子网（CIDR），None 表示清除
+            
+        Returns:
+            是否成功
+        """
+        before = self._prefix_rows('node', 'id = ?', (node_id,))
+        cursor = self.conn.cursor()
+        cursor.execute(
+            'UPDATE nodes SET routed_subnets = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+            (routed_subnets, node_id)
+        )
+        self._bump_prefixes('node', before, self._prefix_rows('node', 'id = ?', (node_id,)))
+        self._commit()
+        
+        return cursor.rowcount > 0
+        
+    def get_routed_subnets(self) -> List[tuple]:
+        """获取所有带路由子网的节点
+        
+        Returns:
+            (节点 ID, 中心节点 ID, 租户网络 ID, 逗号分隔的子网) 列表
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            'SELECT id, hub_id, network_id, routed_subnets FROM nodes '
+            'WHERE routed_subnets IS NOT NULL ORDER BY id'
+        )
+        return [tuple(row) for row in cursor.fetchall()]
+        
+    def add_network(self, name: str, network_cidr: str,
+                    description: Optional[str] = None) -> int:
+        """添加租户网络
+        
+        Args:
+            name: 网络名称
+            network_cidr: 网络段
+            description: 描述
+            
+        Returns:
+            新网络的 ID
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            'INSERT INTO networks (name, network_cidr, description) VALUES (?, ?, ?)',
+            (name, network_cidr, description)
+        )
+        self._bump_prefixes('network', after=[(name, network_cidr)])
+        self._commit()
+        return cursor.lastrowid
+        
+    def select_networks(self, columns: Sequence[str],
+                        row_factory: Optional[Callable] = None,
+                        where: Optional[str] = None,
+                        params: tuple = ()) -> sqlite3.Cursor:
+        """按指定列查询租户网络，返回可迭代游标
+        
+        Args:
+            columns: 查询列（顺序即行元组顺序）
+            row_factory: 游标级行工厂，None 表示返回原始元组
+            where: WHERE 子句（不含 WHERE 关键字）
+            params: 查询参数
+            
+        Returns:
+            已执行查询的游标（按 id 排序）
+        """
+        sql = f"SELECT {', '.join(columns)} FROM networks"
+        if where:
+            sql += f" WHERE {where}"
+        sql += " ORDER BY id"
+        
+        cursor = self.conn.cursor()
+        cursor.row_factory = row_factory
+        cursor.execute(sql, params)
+        return cursor
+        
+    def delete_network(self, network_id: int) -> bool:
+        """删除租户网络及其接口（调用方需确保网络内已无节点）
+        
+        Args:
+            network_id: 网络 ID
+            
+        Returns:
+            是否成功
+        """
+        before = self._prefix_rows('network', 'id = ?', (network_id,))
+        cursor = self.conn.cursor()
+        cursor.execute('DELETE FROM wg_interfaces WHERE network_id = ?', (network_id,))
+        cursor.execute('DELETE FROM networks WHERE id = ?', (network_id,))
+        self._bump_prefixes('network', before)
+        self._commit()
+        
+        return cursor.rowcount > 0
+        
+    def get_network_node_counts(self) -> Dict[Optional[int], int]:
+        """统计每个网络的节点数量
+        
+        Returns:
+            网络 ID（默认网络为 None）-> 节点数量
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT network_id, COUNT(*) FROM nodes GROUP BY network_id')
+        return {row[0]: row[1] for row in cursor.fetchall()}
+        
+    def add_policy(self, name: str, include_prefixes: str,
+                   exclude_prefixes: Optional[str] = None,
+                   description: Optional[str] = None) -> int:
+        """添加路由策略
+        
+        Args:
+            name: 策略名称
+            include_prefixes: 逗号分隔的包含前缀
+            exclude_prefixes: 逗号分隔的排除前缀
+            description: 描述
+            
+        Returns:
+            新策略的 ID
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            INSERT INTO routing_policies (name, include_prefixes, exclude_prefixes, description)
+            VALUES (?, ?, ?, ?)
+        ''', (name, include_prefixes, exclude_prefixes, description))
+        self._commit()
+        return cursor.lastrowid
+        
+    def update_policy(self, policy_id: int, include_prefixes: str,
+                      exclude_prefixes: Optional[str] = None,
+                      description: Optional[str] = None) -> bool:
+        """更新路由策略（版本号递增）
+        
+        Args:
+            policy_id: 策略 ID
+            include_prefixes: 逗号分隔的包含前缀
+            exclude_prefixes: 逗号分隔的排除前缀
+            description: 描述
+            
+        Returns:
+            是否成功
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            UPDATE routing_policies
+            SET include_prefixes = ?, exclude_prefixes = ?, description = ?,
+                version = version + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (include_prefixes, exclude_prefixes, description, policy_id))
+        self._commit()
+        
+        return cursor.rowcount > 0
+        
+    def select_policies(self, columns: Sequence[str],
+                        row_factory: Optional[Callable] = None,
+                        where: Optional[str] = None,
+                        params: tuple = ()) -> sqlite3.Cursor:
+        """按指定列查询路由策略，返回可迭代游标
+        
+        Args:
+            columns: 查询列（顺序即行元组顺序）
+            row_factory: 游标级行工厂，None 表示返回原始元组
+            where: WHERE 子句（不含 WHERE 关键字）
+            params: 查询参数
+            
+        Returns:
+            已执行查询的游标（按 id 排序）
+        """
+        sql = f"SELECT {', '.join(columns)} FROM routing_policies"
+        if where:
+            sql += f" WHERE {where}"
+        sql += " ORDER BY id"
+        
+        cursor = self.conn.cursor()
+        cursor.row_factory = row_factory
+        cursor.execute(sql, params)
+        return cursor
+        
+    def delete_policy(self, policy_id: int) -> bool:
+        """删除路由策略，并解除节点和节点组对它的引用
+        
+        Args:
+            policy_id: 策略 ID
+            
+        Returns:
+            是否成功
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('UPDATE nodes SET policy_id = NULL WHERE policy_id = ?', (policy_id,))
+        cursor.execute('UPDATE node_groups SET policy_id = NULL WHERE policy_id = ?', (policy_id,))
+        cursor.execute('DELETE FROM routing_policies WHERE id = ?', (policy_id,))
+        self._commit()
+        
+        return cursor.rowcount > 0
+        
+    def add_group(self, name: str, policy_id: Optional[int] = None,
+                  description: Optional[str] = None) -> int:
+        """添加节点组
+        
+        Args:
+            name: 节点组名称
+            policy_id: 组内节点默认使用的路由策略 ID
+            description: 描述
+            
+        Returns:
+            新节点组的 ID
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            'INSERT INTO node_groups (name, policy_id, description) VALUES (?, ?, ?)',
+            (name, policy_id, description)
+        )
+        self._commit()
+        return cursor.lastrowid
+        
+    def select_groups(self, columns: Sequence[str],
+                      row_factory: Optional[Callable] = None,
+                      where: Optional[str] = None,
+                      params: tuple = ()) -> sqlite3.Cursor:
+        """按指定列查询节点组，返回可迭代游标
+        
+        Args:
+            columns: 查询列（顺序即行元组顺序）
+            row_factory: 游标级行工厂，None 表示返回原始元组
+            where: WHERE 子句（不含 WHERE 关键字）
+            params: 查询参数
+            
+        Returns:
+            已执行查询的游标（按 id 排序）
+        """
+        sql = f"SELECT {', '.join(columns)} FROM node_groups"
+        if where:
+            sql += f" WHERE {where}"
+        sql += " ORDER BY id"
+        
+        cursor = self.conn.cursor()
+        cursor.row_factory = row_factory
+        cursor.execute(sql, params)
+        return cursor
+        
+    def delete_group(self, group_id: int) -> bool:
+        """删除节点组，组内节点变为未分组，引用该组的放行规则一并删除
+        
+        Args:
+            group_id: 节点组 ID
+            
+        Returns:
+            是否成功
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('UPDATE nodes SET group_id = NULL WHERE group_id = ?', (group_id,))
+        cursor.execute(
+            'DELETE FROM acl_rules WHERE src_group_id = ? OR dst_group_id = ?', (group_id, group_id)
+        )
+        cursor.execute('DELETE FROM node_groups WHERE id = ?', (group_id,))
+        self._commit()
+        
+        return cursor.rowcount > 0
+        
+    def set_group_policy(self, group_id: int, policy_id: Optional[int]) -> bool:
+        """设置节点组的路由策略
+        
+        Args:
+            group_id: 节点组 ID
+            policy_id: 策略 ID，None 表示清除
+            
+        Returns:
+            是否成功
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('UPDATE node_groups SET policy_id = ? WHERE id = ?', (policy_id, group_id))
+        self._commit()
+        
+        return cursor.rowcount > 0
+        
+    def get_group_node_counts(self) -> Dict[int, int]:
+        """统计每个节点组的节点数量
+        
+        Returns:
+            节点组 ID -> 节点数量
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            'SELECT group_id, COUNT(*) FROM nodes WHERE group_id IS NOT NULL GROUP BY group_id'
+        )
+        return {row[0]: row[1] for row in cursor.fetchall()}
+        
+    def add_shaping_profile(self, name: str, download_kbit: Optional[int] = None,
+                            upload_kbit: Optional[int] = None,
+                            description: Optional[str] = None) -> int:
+        """添加限速配置
+        
+        Args:
+            name: 配置名称
+            download_kbit: 中心节点发往节点方向的速率上限（kbit/s），None 表示不限速
+            upload_kbit: 节点发往中心节点方向的速率上限（kbit/s），None 表示不限速
+            description: 描述
+            
+        Returns:
+            新配置的 ID
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            INSERT INTO shaping_profiles (name, download_kbit, upload_kbit, description)
+            VALUES (?, ?, ?, ?)
+        ''', (name, download_kbit, upload_kbit, description))
+        self._commit()
+        return cursor.lastrowid
+        
+    def update_shaping_profile(self, profile_id: int, download_kbit: Optional[int],
+                               upload_kbit: Optional[int],
+                               description: Optional[str] = None) -> bool:
+        """更新限速配置
+        
+        Args:
+            profile_id: 配置 ID
+            download_kbit: 下行速率上限（kbit/s）
+            upload_kbit: 上行速率上限（kbit/s）
+            description: 描述
+            
+        Returns:
+            是否成功
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            'UPDATE shaping_profiles SET download_kbit = ?, upload_kbit = ?, description = ? WHERE id = ?',
+            (download_kbit, upload_kbit, description, profile_id)
+        )
+        self._commit()
+        
+        return cursor.rowcount > 0
+        
+    def select_shaping_profiles(self, columns: Sequence[str],
+                                row_factory: Optional[Callable] = None,
+                                where: Optional[str] = None,
+                                params: tuple = ()) -> sqlite3.Cursor:
+        """按指定列查询限速配置，返回可迭代游标
+        
+        Args:
+            columns: 查询列（顺序即行元组顺序）
+            row_factory: 游标级行工厂，None 表示返回原始元组
+            where: WHERE 子句（不含 WHERE 关键字）
+            params: 查询参数
+            
+        Returns:
+            已执行查询的游标（按 id 排序）
+        """
+        sql = f"SELECT {', '.join(columns)} FROM shaping_profiles"
+        if where:
+            sql += f" WHERE {where}"
+        sql += " ORDER BY id"
+        
+        cursor = self.conn.cursor()
+        cursor.row_factory = row_factory
+        cursor.execute(sql, params)
+        return cursor
+        
+    def delete_shaping_profile(self, profile_id: int) -> bool:
+        """删除限速配置，并解除节点和节点组对它的引用
+        
+        Args:
+            profile_id: 配置 ID
+            
+        Returns:
+            是否成功
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            'UPDATE nodes SET shaping_profile_id = NULL WHERE shaping_profile_id = ?', (profile_id,)
+        )
+        cursor.execute(
+            'UPDATE node_groups SET shaping_profile_id = NULL WHERE shaping_profile_id = ?', (profile_id,)
+        )
+        cursor.execute('DELETE FROM shaping_profiles WHERE id = ?', (profile_id,))
+        self._commit()
+        
+        return cursor.rowcount > 0
+        
+    def set_group_shaping_profile(self, group_id: int, profile_id: Optional[int]) -> bool:
+        """设置节点组的限速配置
+        
+        Args:
+            group_id: 节点组 ID
+            profile_id: 配置 ID，None 表示清除
+            
+        Returns:
+            是否成功
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            'UPDATE node_groups SET shaping_profile_id = ? WHERE id = ?', (profile_id, group_id)
+        )
+        self._commit()
+        
+        return cursor.rowcount > 0
+        
+    def set_node_shaping_profile(self, node_id: int, profile_id: Optional[int]) -> bool:
+        """设置节点自身的限速配置
+        
+        Args:
+            node_id: 节点 ID
+            profile_id: 配置 ID，None 表示使用节点组的配置
+            
+        Returns:
+            是否成功
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            'UPDATE nodes SET shaping_profile_id = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+            (profile_id, node_id)
+        )
+        self._commit()
+        
+        return cursor.rowcount > 0
+        
+    def get_interface_shaping(self, interface_id: int) -> List[tuple]:
+        """获取接口分片上受限速节点的生效速率（节点自身的配置优先于节点组的配置）
+        
+        Args:
+            interface_id: 接口分片 ID
+            
+        Returns:
+            (节点ID, 虚拟IP, 虚拟IPv6, 路由子网, 下行 kbit/s, 上行 kbit/s) 列表（按节点 ID 排序）
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT n.id, n.virtual_ip, n.virtual_ip6, n.routed_subnets, p.download_kbit, p.upload_kbit
+            FROM nodes n
+            LEFT JOIN node_groups g ON g.id = n.group_id
+            JOIN shaping_profiles p ON p.id = COALESCE(n.shaping_profile_id, g.shaping_profile_id)
+            WHERE n.interface_id = ?
+            ORDER BY n.id
+        ''', (interface_id,))
+        return cursor.fetchall()
+        
+    def add_peer_profile(self, name: str, persistent_keepalive: Optional[int] = None,
+                         mtu: Optional[int] = None,
+                         description: Optional[str] = None) -> int:
+        """添加对端参数配置
+        
+        Args:
+            name: 配置名称
+            persistent_keepalive: 保活间隔（秒，0 表示关闭），None 表示继承
+            mtu: 客户端接口 MTU，None 表示继承
+            description: 描述
+            
+        Returns:
+            新配置的 ID
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            INSERT INTO peer_profiles (name, persistent_keepalive, mtu, description)
+            VALUES (?, ?, ?, ?)
+        ''', (name, persistent_keepalive, mtu, description))
+        self._commit()
+        return cursor.lastrowid
+        
+    def update_peer_profile(self, profile_id: int, persistent_keepalive: Optional[int],
+                            mtu: Optional[int], description: Optional[str] = None) -> bool:
+        """更新对端参数配置
+        
+        Args:
+            profile_id: 配置 ID
+            persistent_keepalive: 保活间隔（秒）
+            mtu: 客户端接口 MTU
+            description: 描述
+            
+        Returns:
+            是否成功
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            'UPDATE peer_profiles SET persistent_keepalive = ?, mtu = ?, description = ? WHERE id = ?',
+            (persistent_keepalive, mtu, description, profile_id)
+        )
+        self._commit()
+        
+        return cursor.rowcount > 0
+        
+    def select_peer_profiles(self, columns: Sequence[str],
+                             row_factory: Optional[Callable] = None,
+                             where: Optional[str] = None,
+                             params: tuple = ()) -> sqlite3.Cursor:
+        """按指定列查询对端参数配置，返回可迭代游标
+        
+        Args:
+            columns: 查询列（顺序即行元组顺序）
+            row_factory: 游标级行工厂，None 表示返回原始元组
+            where: WHERE 子句（不含 WHERE 关键字）
+            params: 查询参数
+            
+        Returns:
+            已执行查询的游标（按 id 排序）
+        """
+        sql = f"SELECT {', '.join(columns)} FROM peer_profiles"
+        if where:
+            sql += f" WHERE {where}"
+        sql += " ORDER BY id"
+        
+        cursor = self.conn.cursor()
+        cursor.row_factory = row_factory
+        cursor.execute(sql, params)
+        return cursor
+        
+    def delete_peer_profile(self, profile_id: int) -> bool:
+        """删除对端参数配置，并解除节点对它的引用
+        
+        Args:
+            profile_id: 配置 ID
+            
+        Returns:
+            是否成功
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            'UPDATE nodes SET peer_profile_id = NULL, updated_at = CURRENT_TIMESTAMP '
+            'WHERE peer_profile_id = ?', (profile_id,)
+        )
+        cursor.execute('DELETE FROM peer_profiles WHERE id = ?', (profile_id,))
+        self._commit()
+        
+        return cursor.rowcount > 0
+        
+    def set_platform_peer_profile(self, platform: str, profile_id: Optional[int]) -> bool:
+        """设置平台默认的对端参数配置（每个平台最多一个）
+        
+        Args:
+            platform: 平台
+            profile_id: 配置 ID，None 表示清除
+            
+        Returns:
+            是否成功
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('UPDATE peer_profiles SET platform = NULL WHERE platform = ?', (platform,))
+        if profile_id is not None:
+            cursor.execute('UPDATE peer_profiles SET platform = ? WHERE id = ?', (platform, profile_id))
+        self._commit()
+        
+        return profile_id is None or cursor.rowcount > 0
+        
+    def set_nodes_peer_profile(self, node_ids: Sequence[int], profile_id: Optional[int]) -> int:
+        """在一个事务中设置多个节点自身的对端参数配置
+        
+        修订号随之增加，服务端 [Peer] 段缓存据此失效。
+        
+        Args:
+            node_ids: 节点 ID 列表
+            profile_id: 配置 ID，None 表示使用平台默认配置
+            
+        Returns:
+            更新的节点数量
+        """
+        cursor = self.conn.cursor()
+        cursor.executemany(
+            'UPDATE nodes SET peer_profile_id = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+            [(profile_id, node_id) for node_id in node_ids]
+        )
+        self._commit()
+        
+        return cursor.rowcount
+        
+    def record_endpoints(self, observations: Sequence[tuple]) -> int:
+        """记录一次从中心节点观测到的节点公网地址
+        
+        与上次观测不同则变化次数加一；首次观测记录开始时间。
+        
+        Args:
+            observations: (节点ID, 观测地址) 列表
+            
+        Returns:
+            记录的节点数量
+        """
+        cursor = self.conn.cursor()
+        cursor.executemany('''
+            INSERT INTO endpoint_observations (node_id, endpoint)
+            VALUES (?, ?)
+            ON CONFLICT(node_id) DO UPDATE SET
+                changes = changes + (endpoint IS NOT excluded.endpoint),
+                endpoint = excluded.endpoint,
+                samples = samples + 1,
+                last_seen = CURRENT_TIMESTAMP
+        ''', observations)
+        self._commit()
+        
+        return len(observations)
+        
+    def get_endpoint_observations(self) -> List[tuple]:
+        """获取全部节点的公网地址观测结果
+        
+        Returns:
+            (节点ID, 最近观测地址, 观测次数, 变化次数, 观测时长秒数) 列表
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT node_id, endpoint, samples, changes,
+                   CAST((julianday(last_seen) - julianday(first_seen)) * 86400 AS INTEGER)
+            FROM endpoint_observations
+            ORDER BY node_id
+        ''')
+        return cursor.fetchall()
+        
+    def reset_endpoint_observations(self, node_ids: Sequence[int]) -> int:
+        """清除节点的公网地址观测结果（重新开始观测）
+        
+        Args:
+            node_ids: 节点ID列表
+            
+        Returns:
+            清除的记录数量
+        """
+        cursor = self.conn.cursor()
+        cursor.executemany(
+            'DELETE FROM endpoint_observations WHERE node_id = ?',
+            [(node_id,) for node_id in node_ids]
+        )
+        self._commit()
+        
+        return cursor.rowcount
+        
+    def add_acl_rule(self, src_group_id: int, dst_group_id: int,
+                     description: Optional[str] = None) -> int:
+        """添加节点组之间的放行规则
+        
+        Args:
+            src_group_id: 源节点组 ID
+            dst_group_id: 目的节点组 ID
+            description: 描述
+            
+        Returns:
+            新规则的 ID
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            'INSERT INTO acl_rules (src_group_id, dst_group_id, description) VALUES (?, ?, ?)',
+            (src_group_id, dst_group_id, description)
+        )
+        self._commit()
+        return cursor.lastrowid
+        
+    def select_acl_rules(self, columns: Sequence[str],
+                         row_factory: Optional[Callable] = None,
+                         where: Optional[str] = None,
+                         params: tuple = ()) -> sqlite3.Cursor:
+        """按指定列查询放行规则，返回可迭代游标
+        
+        Args:
+            columns: 查询列（顺序即行元组顺序）
+            row_factory: 游标级行工厂，None 表示返回原始元组
+            where: WHERE 子句（不含 WHERE 关键字）
+            params: 查询参数
+            
+        Returns:
+            已执行查询的游标（按 id 排序）
+        """
+        sql = f"SELECT {', '.join(columns)} FROM acl_rules"
+        if where:
+            sql += f" WHERE {where}"
+        sql += " ORDER BY id"
+        
+        cursor = self.conn.cursor()
+        cursor.row_factory = row_factory
+        cursor.execute(sql, params)
+        return cursor
+        
+    def delete_acl_rule(self, rule_id: int) -> bool:
+        """删除放行规则
+        
+        Args:
+            rule_id: 规则 ID
+            
+        Returns:
+            是否成功
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('DELETE FROM acl_rules WHERE id = ?', (rule_id,))
+        self._commit()
+        
+        return cursor.rowcount > 0
+        
+    def set_node_group(self, node_id: int, group_id: Optional[int]) -> bool:
+        """设置节点所属节点组
+        
+        Args:
+            node_id: 节点 ID
+            group_id: 节点组 ID，None 表示移出节点组
+            
+        Returns:
+            是否成功
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            'UPDATE nodes SET group_id = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+            (group_id, node_id)
+        )
+        self._commit()
+        
+        return cursor.rowcount > 0
+        
+    def set_node_policy(self, node_id: int, policy_id: Optional[int]) -> bool:
+        """设置节点自身的路由策略
+        
+        Args:
+            node_id: 节点 ID
+            policy_id: 策略 ID，None 表示使用节点组的策略
+            
+        Returns:
+            是否成功
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            'UPDATE nodes SET policy_id = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+            (policy_id, node_id)
+        )
+        self._commit()
+        
+        return cursor.rowcount > 0
+        
+    def set_server_ipv6(self, network6_cidr: Optional[str], virtual_ip6: Optional[str],
+                        interfaces: Sequence[tuple] = (),
+                        node_addresses: Sequence[tuple] = ()) -> int:
+        """在一个事务中写入服务端、接口分片和节点的 IPv6 地址
+        
+        Args:
+            network6_cidr: 服务端 IPv6 网络段，None 表示关闭 IPv6
+            virtual_ip6: 服务端虚拟 IPv6 地址
+            interfaces: (network6_cidr, virtual_ip6, 接口ID) 列表
+            node_addresses: (virtual_ip6, 节点ID) 列表
+            
+        Returns:
+            更新的节点数量
+        """
+        server_before = self._prefix_rows('server', 'id = 1')
+        nodes_before = [row for _, node_id in node_addresses
+                        for row in self._prefix_rows('node', 'id = ?', (node_id,))]
+        cursor = self.conn.cursor()
+        cursor.execute(
+            'UPDATE server_info SET network6_cidr = ?, virtual_ip6 = ? WHERE id = 1',
+            (network6_cidr, virtual_ip6)
+        )
+        cursor.executemany(
+            'UPDATE wg_interfaces SET network6_cidr = ?, virtual_ip6 = ? WHERE id = ?',
+            interfaces
+        )
+        cursor.executemany(
+            'UPDATE nodes SET virtual_ip6 = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+            node_addresses
+        )
+        updated = cursor.rowcount if node_addresses else 0
+        self._bump_prefixes('server', server_before, self._prefix_rows('server', 'id = 1'))
+        if node_addresses:
+            self._bump_prefixes('node', nodes_before, [
+                row for _, node_id in node_addresses
+                for row in self._prefix_rows('node', 'id = ?', (node_id,))
+            ])
+        self._commit()
+        return updated
+        
+    def get_allocated_ip6(self) -> List[str]:
+        """获取所有已分配的节点 IPv6 地址
+        
+        Returns:
+            IPv6 地址列表
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT virtual_ip6 FROM nodes WHERE virtual_ip6 IS NOT NULL')
+        return [row[0] for row in cursor.fetchall()]
+        
+    def get_counter(self, name: str) -> int:
+        """读取数据版本计数
+        
+        Args:
+            name: 计数名称
+            
+        Returns:
+            当前值，不存在时为 0
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT value FROM counters WHERE name = ?', (name,))
+        row = cursor.fetchone()
+        return row[0] if row else 0
+        
+    def _bump_counter(self, name: str):
+        """递增数据版本计数（随调用方事务一起提交）
+        
+        Args:
+            name: 计数名称
+        """
+        self.conn.execute(
+            'INSERT INTO counters (name, value) VALUES (?, 1) '
+            'ON CONFLICT (name) DO UPDATE SET value = value + 1',
+            (name,)
+        )
+        
+    def _bump_prefixes(self, entity: str, before: Sequence[tuple] = (), after: Sequence[tuple] = ()):
+        """递增前缀版本计数，并把变化的行交给 on_prefixes_changed() 注册的函数
+        
+        Args:
+            entity: 对象类型（node/hub/network/server）
+            before: 变化前的行（删除、修改时）
+            after: 变化后的行（新增、修改时）
+        """
+        self._bump_counter(PREFIXES_COUNTER)
+        if Database._prefix_hooks:
+            version = self.get_counter(PREFIXES_COUNTER)
+            for hook in Database._prefix_hooks:
+                hook(self, version, entity, before, after)
+                
+    def _prefix_rows(self, entity: str, where: Optional[str] = None, params: tuple = ()) -> List[tuple]:
+        """读取前缀相关对象的行（没有注册 on_prefixes_changed 回调时不查询，返回空列表）
+        
+        Args:
+            entity: 对象类型（node/hub/network/server）
+            where: WHERE 子句（不含 WHERE 关键字）
+            params: 查询参数
+        """
+        if not Database._prefix_hooks:
+            return []
+        table, columns = _PREFIX_COLUMNS[entity]
+        sql = f"SELECT {', '.join(columns)} FROM {table}"
+        if where:
+            sql += f" WHERE {where}"
+        return [tuple(row) for row in self.conn.execute(sql, params)]
+        
+    def select_changes(self, since: int, limit: int) -> List[tuple]:
+        """查询序号不小于 since 的变更
+        
+        since 大于最新序号时返回最新一条变更，调用方据此判断 since 是否有效；每行最后
+        一列为压缩水位。整条语句是主键范围查找：已是最新的客户端只需这一次查询。
+        
+        Args:
+            since: 客户端已同步到的序号
+            limit: 最多返回的变更数量
+            
+        Returns:
+            (seq, entity, entity_id, op, name, virtual_ip, virtual_ip6, public_key, 压缩水位)
+            元组列表，按序号排列
+        """
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        cursor.execute('''
+            SELECT seq, entity, entity_id, op, name, virtual_ip, virtual_ip6, public_key,
+                   (SELECT value FROM counters WHERE name = ?)
+            FROM changes
+            WHERE seq >= (SELECT MIN(MAX(seq), ?) FROM changes)
+            ORDER BY seq LIMIT ?
+        ''', (CHANGES_COMPACTED_COUNTER, since, limit))
+        return cursor.fetchall()
+        
+    def get_change_seq(self) -> int:
+        """最新的变更序号，没有变更时为 0"""
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT MAX(seq) FROM changes')
+        return cursor.fetchone()[0] or 0
+        
+    def compact_changes(self, before: str) -> int:
+        """删除早于指定时间的节点删除记录，并提高压缩水位
+        
+        节点和服务端的最新状态记录不删除（每个对象只有一条）；最新一条变更始终保留，
+        用于确认客户端的 since 有效。
+        
+        Args:
+            before: 时间（UTC，与 created_at 格式相同）
+            
+        Returns:
+            删除的记录数量
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT MAX(seq), COUNT(*) FROM changes
+            WHERE op = 'delete' AND created_at < ? AND seq < (SELECT MAX(seq) FROM changes)
+        ''', (before,))
+        watermark, count = cursor.fetchone()
+        if not count:
+            return 0
+        cursor.execute(
+            "DELETE FROM changes WHERE op = 'delete' AND created_at < ? AND seq <= ?",
+            (before, watermark)
+        )
+        self.conn.execute(
+            'INSERT INTO counters (name, value) VALUES (?, ?) '
+            'ON CONFLICT (name) DO UPDATE SET value = MAX(value, excluded.value)',
+            (CHANGES_COMPACTED_COUNTER, watermark)
+        )
+        self._commit()
+        return cursor.rowcount
+        
+    def select_server_info(self, columns: Sequence[str],
+                           row_factory: Optional[Callable] = None) -> Optional[Any]:
+        """按指定列查询服务端信息
+        
+        Args:
+            columns: 查询列（顺序即行元组顺序）
+            row_factory: 游标级行工厂，None 表示返回原始元组
+            
+        Returns:
+            行工厂构造的对象，如果不存在返回 None
+        """
+        cursor = self.conn.cursor()
+        cursor.row_factory = row_factory
+        cursor.execute(f"SELECT {', '.join(columns)} FROM server_info WHERE id = 1")
+        return cursor.fetchone()
+        
+    def get_max_allocated_ip(self, network_prefix: str) -> Optional[str]:
+        """获取已分配的最大 IP 地址
+        
+        Args:
+            network_prefix: 网络前缀（如 10.0.0）
+            
         Returns:
             最大 IP 地址，如果没有返回 None
         """
@@ -304,5 +2164,9 @@ class Database:
             VALUES (?, ?, ?, CURRENT_TIMESTAMP)
         ''', (key, value, description))
         
-        self.conn.commit()
+        self._commit()
         return True
+
+
+# 按方法统计耗时（连接和事务管理方法除外）
+instrument_methods(Database, DB_QUERY_SECONDS, exclude=('connect', 'close', 'shared', 'transaction'))
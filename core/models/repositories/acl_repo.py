@@ -0,0 +1,83 @@
+"""
+访问控制规则仓储
+封装节点组放行规则的存储操作
+"""
+from typing import Optional, List
+from core.domain.acl import AclRule
+from core.models.database import Database
+
+
+class AclRepository:
+    """访问控制规则仓储"""
+
+    def __init__(self, db: Database):
+        """初始化
+
+        Args:
+            db: 数据库实例
+        """
+        self.db = db
+
+    def add(self, rule: AclRule) -> int:
+        """添加放行规则
+
+        Args:
+            rule: 规则实体
+
+        Returns:
+            新规则的ID
+        """
+        rule_id = self.db.add_acl_rule(
+            src_group_id=rule.src_group_id,
+            dst_group_id=rule.dst_group_id,
+            description=rule.description
+        )
+        rule.id = rule_id
+        return rule_id
+
+    def get_by_id(self, rule_id: int) -> Optional[AclRule]:
+        """根据ID获取放行规则
+
+        Args:
+            rule_id: 规则ID
+
+        Returns:
+            规则实体，不存在返回None
+        """
+        return self.db.select_acl_rules(
+            AclRule.COLUMNS, AclRule.from_row, where='id = ?', params=(rule_id,)
+        ).fetchone()
+
+    def get_by_groups(self, src_group_id: int, dst_group_id: int) -> Optional[AclRule]:
+        """根据源、目的节点组获取放行规则
+
+        Args:
+            src_group_id: 源节点组ID
+            dst_group_id: 目的节点组ID
+
+        Returns:
+            规则实体，不存在返回None
+        """
+        return self.db.select_acl_rules(
+            AclRule.COLUMNS, AclRule.from_row,
+            where='src_group_id = ? AND dst_group_id = ?', params=(src_group_id, dst_group_id)
+        ).fetchone()
+
+    def list_all(self) -> List[AclRule]:
+        """查询所有放行规则
+
+        Returns:
+            规则实体列表（按ID排序）
+        """
+        return self.db.select_acl_rules(AclRule.COLUMNS, AclRule.from_row).fetchall()
+
+    def delete(self, rule_id: int) -> bool:
+        """删除放行规则
+
+        Args:
+            rule_id: 规则ID
+
+        Returns:
+            是否成功
+        """
+        return self.db.delete_acl_rule(rule_id)
@@ -0,0 +1,113 @@
+"""
+节点组仓储
+封装节点组的存储操作
+"""
+from typing import Optional, List, Dict
+from core.domain.group import NodeGroup
+from core.models.database import Database
+
+
+class GroupRepository:
+    """节点组仓储"""
+
+    def __init__(self, db: Database):
+        """初始化
+
+        Args:
+            db: 数据库实例
+        """
+        self.db = db
+
+    def add(self, group: NodeGroup) -> int:
+        """添加节点组
+
+        Args:
+            group: 节点组实体
+
+        Returns:
+            新节点组的ID
+        """
+        group_id = self.db.add_group(
+            name=group.name,
+            policy_id=group.policy_id,
+            description=group.description
+        )
+        group.id = group_id
+        return group_id
+
+    def get_by_id(self, group_id: int) -> Optional[NodeGroup]:
+        """根据ID获取节点组
+
+        Args:
+            group_id: 节点组ID
+
+        Returns:
+            节点组实体，不存在返回None
+        """
+        return self.db.select_groups(
+            NodeGroup.COLUMNS, NodeGroup.from_row, where='id = ?', params=(group_id,)
+        ).fetchone()
+
+    def get_by_name(self, name: str) -> Optional[NodeGroup]:
+        """根据名称获取节点组
+
+        Args:
+            name: 节点组名称
+
+        Returns:
+            节点组实体，不存在返回None
+        """
+        return self.db.select_groups(
+            NodeGroup.COLUMNS, NodeGroup.from_row, where='name = ?', params=(name,)
+        ).fetchone()
+
+    def list_all(self) -> List[NodeGroup]:
+        """查询所有节点组
+
+        Returns:
+            节点组实体列表（按ID排序）
+        """
+        return self.db.select_groups(NodeGroup.COLUMNS, NodeGroup.from_row).fetchall()
+
+    def set_policy(self, group_id: int, policy_id: Optional[int]) -> bool:
+        """设置节点组的路由策略
+
+        Args:
+            group_id: 节点组ID
+            policy_id: 策略ID，None 表示清除
+
+        Returns:
+            是否成功
+        """
+        return self.db.set_group_policy(group_id, policy_id)
+
+    def set_shaping_profile(self, group_id: int, profile_id: Optional[int]) -> bool:
+        """设置节点组的限速配置
+
+        Args:
+            group_id: 节点组ID
+            profile_id: 限速配置ID，None 表示清除
+
+        Returns:
+            是否成功
+        """
+        return self.db.set_group_shaping_profile(group_id, profile_id)
+
+    def delete(self, group_id: int) -> bool:
+        """删除节点组
+
+        Args:
+            group_id: 节点组ID
+
+        Returns:
+            是否成功
+        """
+        return self.db.delete_group(group_id)
+
+    def node_counts(self) -> Dict[int, int]:
+        """统计每个节点组的节点数量
+
+        Returns:
+            节点组ID -> 节点数量
+        """
+        return self.db.get_group_node_counts()
@@ -0,0 +1,105 @@
+"""
+中心节点仓储
+封装多中心部署中远端中心节点的存储操作
+"""
+from typing import Optional, List, Dict
+from core.domain.hub import Hub
+from core.models.database import Database
+
+
+class HubRepository:
+    """中心节点仓储"""
+
+    def __init__(self, db: Database):
+        """初始化
+
+        Args:
+            db: 数据库实例
+        """
+        self.db = db
+
+    def add(self, hub: Hub) -> int:
+        """添加远端中心节点
+
+        Args:
+            hub: 中心节点实体
+
+        Returns:
+            新中心节点的ID
+        """
+        hub_id = self.db.add_hub(
+            name=hub.name,
+            public_endpoint=hub.public_endpoint,
+            public_key=hub.public_key,
+            virtual_ip=hub.virtual_ip,
+            network_cidr=hub.network_cidr,
+            capacity_weight=hub.capacity_weight,
+            region=hub.region
+        )
+        hub.id = hub_id
+        return hub_id
+
+    def get_by_id(self, hub_id: int) -> Optional[Hub]:
+        """根据ID获取远端中心节点
+
+        Args:
+            hub_id: 中心节点ID
+
+        Returns:
+            中心节点实体，不存在返回None
+        """
+        return self.db.select_hubs(
+            Hub.COLUMNS, Hub.from_row, where='id = ?', params=(hub_id,)
+        ).fetchone()
+
+    def get_by_name(self, name: str) -> Optional[Hub]:
+        """根据名称获取远端中心节点
+
+        Args:
+            name: 中心节点名称
+
+        Returns:
+            中心节点实体，不存在返回None
+        """
+        return self.db.select_hubs(
+            Hub.COLUMNS, Hub.from_row, where='name = ?', params=(name,)
+        ).fetchone()
+
+    def list_all(self) -> List[Hub]:
+        """查询所有远端中心节点
+
+        Returns:
+            中心节点实体列表（按ID排序）
+        """
+        return self.db.select_hubs(Hub.COLUMNS, Hub.from_row).fetchall()
+
+    def delete(self, hub_id: int) -> bool:
+        """删除远端中心节点
+
+        Args:
+            hub_id: 中心节点ID
+
+        Returns:
+            是否成功
+        """
+        return self.db.delete_hub(hub_id)
+
+    def update_traffic(self, hub_id: int, recent_traffic: int) -> bool:
+        """更新中心节点最近流量
+
+        Args:
+            hub_id: 中心节点ID
+            recent_traffic: 最近统计周期内的流量（字节）
+
+        Returns:
+            是否成功
+        """
+        return self.db.update_hub_traffic(hub_id, recent_traffic)
+
+    def node_counts(self) -> Dict[Optional[int], int]:
+        """统计每个中心节点上的节点数量
+
+        Returns:
+            中心节点ID -> 节点数量（None 为本地中心节点）
+        """
+        return self.db.get_hub_node_counts()
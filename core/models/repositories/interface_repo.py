@@ -0,0 +1,112 @@
+"""
+接口分片仓储
+封装 WireGuard 接口分片的存储操作
+"""
+from typing import Optional, List, Dict
+from core.domain.interface import WgInterface
+from core.models.database import Database
+
+
+class InterfaceRepository:
+    """接口分片仓储"""
+
+    def __init__(self, db: Database):
+        """初始化
+
+        Args:
+            db: 数据库实例
+        """
+        self.db = db
+
+    def add(self, interface: WgInterface) -> int:
+        """添加接口分片
+
+        Args:
+            interface: 接口实体
+
+        Returns:
+            新接口的ID
+        """
+        interface_id = self.db.add_interface(
+            name=interface.name,
+            listen_port=interface.listen_port,
+            public_key=interface.public_key,
+            private_key=interface.private_key,
+            virtual_ip=interface.virtual_ip,
+            network_cidr=interface.network_cidr,
+            config_path=interface.config_path,
+            network6_cidr=interface.network6_cidr,
+            virtual_ip6=interface.virtual_ip6,
+            network_id=interface.network_id
+        )
+        interface.id = interface_id
+        return interface_id
+
+    def get_by_id(self, interface_id: int) -> Optional[WgInterface]:
+        """根据ID获取接口分片
+
+        Args:
+            interface_id: 接口ID
+
+        Returns:
+            接口实体，不存在返回None
+        """
+        return self.db.select_interfaces(
+            WgInterface.COLUMNS, WgInterface.from_row, where='id = ?', params=(interface_id,)
+        ).fetchone()
+
+    def list_all(self) -> List[WgInterface]:
+        """查询所有接口分片
+
+        Returns:
+            接口实体列表（按ID排序，第一个为主接口）
+        """
+        return self.db.select_interfaces(WgInterface.COLUMNS, WgInterface.from_row).fetchall()
+
+    def list_by_network(self, network_id: Optional[int] = None) -> List[WgInterface]:
+        """查询指定网络的接口分片
+
+        Args:
+            network_id: 租户网络ID，None 表示默认网络
+
+        Returns:
+            接口实体列表（按ID排序，默认网络的第一个为主接口）
+        """
+        return self.db.select_interfaces(
+            WgInterface.COLUMNS, WgInterface.from_row,
+            where='network_id IS ?', params=(network_id,)
+        ).fetchall()
+
+    def delete_all(self) -> int:
+        """删除默认网络的所有接口分片
+
+        Returns:
+            删除的接口数量
+        """
+        return self.db.delete_all_interfaces()
+
+    def node_counts(self, network_id: Optional[int] = None) -> Dict[int, int]:
+        """统计网络内每个接口分片上的节点数量
+
+        Args:
+            network_id: 租户网络ID，None 表示默认网络
+
+        Returns:
+            接口ID -> 节点数量
+        """
+        return self.db.get_interface_node_counts(network_id)
+
+    def get_least_loaded(self, network_id: Optional[int] = None) -> Optional[WgInterface]:
+        """获取网络内节点最少的接口分片（数量相同时取ID最小者）
+
+        Args:
+            network_id: 租户网络ID，None 表示默认网络
+
+        Returns:
+            接口实体，网络没有任何接口时返回None
+        """
+        counts = self.node_counts(network_id)
+        if not counts:
+            return None
+        interface_id = min(counts, key=lambda key: (counts[key], key))
+        return self.get_by_id(interface_id)
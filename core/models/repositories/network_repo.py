@@ -0,0 +1,89 @@
+"""
+租户网络仓储
+封装租户网络的存储操作
+"""
+from typing import Optional, List, Dict
+from core.domain.network import Network
+from core.models.database import Database
+
+
+class NetworkRepository:
+    """租户网络仓储"""
+
+    def __init__(self, db: Database):
+        """初始化
+
+        Args:
+            db: 数据库实例
+        """
+        self.db = db
+
+    def add(self, network: Network) -> int:
+        """添加租户网络
+
+        Args:
+            network: 租户网络实体
+
+        Returns:
+            新网络的ID
+        """
+        network_id = self.db.add_network(
+            name=network.name,
+            network_cidr=network.network_cidr,
+            description=network.description
+        )
+        network.id = network_id
+        return network_id
+
+    def get_by_id(self, network_id: int) -> Optional[Network]:
+        """根据ID获取租户网络
+
+        Args:
+            network_id: 网络ID
+
+        Returns:
+            租户网络实体，不存在返回None
+        """
+        return self.db.select_networks(
+            Network.COLUMNS, Network.from_row, where='id = ?', params=(network_id,)
+        ).fetchone()
+
+    def get_by_name(self, name: str) -> Optional[Network]:
+        """根据名称获取租户网络
+
+        Args:
+            name: 网络名称
+
+        Returns:
+            租户网络实体，不存在返回None
+        """
+        return self.db.select_networks(
+            Network.COLUMNS, Network.from_row, where='name = ?', params=(name,)
+        ).fetchone()
+
+    def list_all(self) -> List[Network]:
+        """查询所有租户网络
+
+        Returns:
+            租户网络实体列表（按ID排序）
+        """
+        return self.db.select_networks(Network.COLUMNS, Network.from_row).fetchall()
+
+    def delete(self, network_id: int) -> bool:
+        """删除租户网络及其接口
+
+        Args:
+            network_id: 网络ID
+
+        Returns:
+            是否成功
+        """
+        return self.db.delete_network(network_id)
+
+    def node_counts(self) -> Dict[Optional[int], int]:
+        """统计每个网络的节点数量
+
+        Returns:
+            网络ID（默认网络为None）-> 节点数量
+        """
+        return self.db.get_network_node_counts()
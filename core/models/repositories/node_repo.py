@@ -2,7 +2,7 @@
 节点仓储
 封装节点数据的CRUD操作
 """
-from typing import Optional, List
+from typing import Optional, Dict, List, Iterator, Sequence
 from core.domain.node import Node
 from core.models.database import Database
 
@@ -33,7 +33,16 @@ class NodeRepository:
             public_key=node.public_key,
             private_key=node.private_key,
             platform=node.platform,
-            description=node.description
+            description=node.description,
+            interface_id=node.interface_id,
+            hub_id=node.hub_id,
+            region=node.region,
+            endpoint=node.endpoint,
+            routed_subnets=node.routed_subnets,
+            group_id=node.group_id,
+            virtual_ip6=node.virtual_ip6,
+            network_id=node.network_id,
+            expires_at=node._expires_at
         )
         node.id = node_id
         return node_id
@@ -47,10 +56,9 @@ class NodeRepository:
         Returns:
             节点实体，不存在返回None
         """
-        data = self.db.get_node_by_id(node_id)
-        if data:
-            return Node.from_dict(data)
-        return None
+        return self.db.select_nodes(
+            Node.COLUMNS, Node.from_row, where='id = ?', params=(node_id,)
+        ).fetchone()
     
     def get_by_name(self, name: str) -> Optional[Node]:
         """根据名称获取节点
@@ -61,10 +69,9 @@ class NodeRepository:
         Returns:
             节点实体，不存在返回None
         """
-        data = self.db.get_node_by_name(name)
-        if data:
-            return Node.from_dict(data)
-        return None
+        return self.db.select_nodes(
+            Node.COLUMNS, Node.from_row, where='node_name = ?', params=(name,)
+        ).fetchone()
     
     def list_all(self) -> List[Node]:
         """查询所有节点
@@ -72,8 +79,190 @@ class NodeRepository:
         Returns:
             节点实体列表
         """
-        data_list = self.db.get_all_nodes()
-        return [Node.from_dict(data) for data in data_list]
+        return self.db.select_nodes(Node.COLUMNS, Node.from_row).fetchall()
+    
+    def iter_all(self) -> Iterator[Node]:
+        """逐行迭代所有节点（不一次性载入内存）
+        
+        Returns:
+            节点实体迭代器
+        """
+        return iter(self.db.select_nodes(Node.COLUMNS, Node.from_row))
+    
+    def iter_by_interface(self, interface_id: int, include_disabled: bool = False) -> Iterator[Node]:
+        """逐行迭代指定接口分片上的节点
+        
+        Args:
+            interface_id: 接口ID
+            include_disabled: 是否包含已停用的节点（默认只返回需要下发 [Peer] 的节点）
+            
+        Returns:
+            节点实体迭代器
+        """
+        where = 'interface_id = ?' if include_disabled else 'interface_id = ? AND disabled_at IS NULL'
+        return iter(self.db.select_nodes(
+            Node.COLUMNS, Node.from_row, where=where, params=(interface_id,)
+        ))
+    
+    def iter_by_network(self, network_id: Optional[int] = None) -> Iterator[Node]:
+        """逐行迭代指定网络的节点
+        
+        Args:
+            network_id: 租户网络ID，None 表示默认网络
+            
+        Returns:
+            节点实体迭代器
+        """
+        return iter(self.db.select_nodes(
+            Node.COLUMNS, Node.from_row, where='network_id IS ?', params=(network_id,)
+        ))
+    
+    def iter_by_hub(self, hub_id: int) -> Iterator[Node]:
+        """逐行迭代归属指定远端中心节点的节点
+        
+        Args:
+            hub_id: 中心节点ID
+            
+        Returns:
+            节点实体迭代器
+        """
+        return iter(self.db.select_nodes(
+            Node.COLUMNS, Node.from_row, where='hub_id = ? AND disabled_at IS NULL', params=(hub_id,)
+        ))
+    
+    def iter_mesh_peers(self, node: Node, full: bool,
+                        sources: Sequence[str] = ('manual',)) -> Iterator[Node]:
+        """逐行迭代应与指定节点直连的节点
+        
+        直连至少需要一端有公网地址：有公网地址的节点与候选节点全部直连，
+        否则只与有公网地址的候选节点直连。候选节点限于同一网络。
+        
+        Args:
+            node: 查看方节点
+            full: 是否全网状（否则仅限 mesh_links 中的节点对）
+            sources: 生效的 mesh_links 来源（manual 手工、auto 流量分析）
+            
+        Returns:
+            节点实体迭代器
+        """
+        where = 'id != ? AND network_id IS ? AND disabled_at IS NULL'
+        params: tuple = (node.id, node.network_id)
+        if not full:
+            placeholders = ', '.join('?' * len(sources))
+            where += (
+                f' AND id IN (SELECT node_b FROM mesh_links WHERE node_a = ?'
+                f' AND source IN ({placeholders})'
+                f' UNION ALL SELECT node_a FROM mesh_links WHERE node_b = ?'
+                f' AND source IN ({placeholders}))'
+            )
+            params += (node.id, *sources, node.id, *sources)
+        if not node.endpoint:
+            where += ' AND endpoint IS NOT NULL'
+        return iter(self.db.select_nodes(Node.COLUMNS, Node.from_row, where=where, params=params))
+    
+    def set_endpoint(self, node_id: int, endpoint: Optional[str]) -> bool:
+        """设置节点公网地址
+        
+        Args:
+            node_id: 节点ID
+            endpoint: 公网地址，None 表示清除
+            
+        Returns:
+            是否成功
+        """
+        return self.db.set_node_endpoint(node_id, endpoint)
+    
+    def set_routes(self, node_id: int, routes: List[str]) -> bool:
+        """设置节点路由的子网
+        
+        Args:
+            node_id: 节点ID
+            routes: 子网列表，空列表表示清除
+            
+        Returns:
+            是否成功
+        """
+        return self.db.set_node_routes(node_id, ','.join(routes) if routes else None)
+    
+    def get_routes_by_hub(self) -> Dict[Optional[int], List[str]]:
+        """按归属中心节点分组的节点路由子网（仅默认网络，租户网络的子网不跨中心节点通告）
+        
+        Returns:
+            中心节点 ID（本地为 None）-> 子网列表
+        """
+        routes: Dict[Optional[int], List[str]] = {}
+        for _, hub_id, network_id, routed_subnets in self.db.get_routed_subnets():
+            if network_id is None:
+                routes.setdefault(hub_id, []).extend(routed_subnets.split(','))
+        return routes
+    
+    def set_group(self, node_id: int, group_id: Optional[int]) -> bool:
+        """设置节点所属节点组
+        
+        Args:
+            node_id: 节点ID
+            group_id: 节点组ID，None 表示移出节点组
+            
+        Returns:
+            是否成功
+        """
+        return self.db.set_node_group(node_id, group_id)
+    
+    def set_policy(self, node_id: int, policy_id: Optional[int]) -> bool:
+        """设置节点自身的路由策略
+        
+        Args:
+            node_id: 节点ID
+            policy_id: 策略ID，None 表示使用节点组的策略
+            
+        Returns:
+            是否成功
+        """
+        return self.db.set_node_policy(node_id, policy_id)
+    
+    def set_shaping_profile(self, node_id: int, profile_id: Optional[int]) -> bool:
+        """设置节点自身的限速配置
+        
+        Args:
+            node_id: 节点ID
+            profile_id: 限速配置ID，None 表示使用节点组的配置
+            
+        Returns:
+            是否成功
+        """
+        return self.db.set_node_shaping_profile(node_id, profile_id)
+    
+    def set_expiry(self, node_id: int, expires_at: Optional[str]) -> bool:
+        """设置节点过期时间
+        
+        Args:
+            node_id: 节点ID
+            expires_at: 过期时间（UTC，格式同 CURRENT_TIMESTAMP），None 表示永不过期
+            
+        Returns:
+            是否成功
+        """
+        return self.db.set_node_expiry(node_id, expires_at)
+    
+    def set_interface(self, node_id: int, interface_id: int) -> bool:
+        """设置节点所属接口分片
+        
+        Args:
+            node_id: 节点ID
+            interface_id: 接口ID
+            
+        Returns:
+            是否成功
+        """
+        return self.db.set_node_interface(node_id, interface_id)
+    
+    def count(self) -> int:
+        """统计节点数量
+        
+        Returns:
+            节点数量
+        """
+        return self.db.count_nodes()
     
     def delete(self, node_id: int) -> bool:
         """删除节点
@@ -95,7 +284,9 @@ class NodeRepository:
         Returns:
             是否存在
         """
-        return self.get_by_name(name) is not None
+        return self.db.select_nodes(
+            ('id',), where='node_name = ?', params=(name,)
+        ).fetchone() is not None
     
     def get_max_allocated_ip(self, network_prefix: str) -> Optional[str]:
         """获取已分配的最大IP地址
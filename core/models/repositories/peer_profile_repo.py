@@ -0,0 +1,152 @@
+"""
+对端参数配置仓储
+封装保活间隔/MTU 配置和节点公网地址观测结果的存储操作
+"""
+from typing import Optional, List, Sequence
+from core.domain.peer_profile import PeerProfile
+from core.models.database import Database
+
+
+class PeerProfileRepository:
+    """对端参数配置仓储"""
+
+    def __init__(self, db: Database):
+        """初始化
+
+        Args:
+            db: 数据库实例
+        """
+        self.db = db
+
+    def add(self, profile: PeerProfile) -> int:
+        """添加配置
+
+        Args:
+            profile: 配置实体
+
+        Returns:
+            新配置的ID
+        """
+        profile_id = self.db.add_peer_profile(
+            name=profile.name,
+            persistent_keepalive=profile.persistent_keepalive,
+            mtu=profile.mtu,
+            description=profile.description
+        )
+        profile.id = profile_id
+        return profile_id
+
+    def update(self, profile: PeerProfile) -> bool:
+        """更新配置
+
+        Args:
+            profile: 配置实体
+
+        Returns:
+            是否成功
+        """
+        return self.db.update_peer_profile(
+            profile.id,
+            persistent_keepalive=profile.persistent_keepalive,
+            mtu=profile.mtu,
+            description=profile.description
+        )
+
+    def get_by_id(self, profile_id: int) -> Optional[PeerProfile]:
+        """根据ID获取配置
+
+        Args:
+            profile_id: 配置ID
+
+        Returns:
+            配置实体，不存在返回None
+        """
+        return self.db.select_peer_profiles(
+            PeerProfile.COLUMNS, PeerProfile.from_row, where='id = ?', params=(profile_id,)
+        ).fetchone()
+
+    def get_by_name(self, name: str) -> Optional[PeerProfile]:
+        """根据名称获取配置
+
+        Args:
+            name: 配置名称
+
+        Returns:
+            配置实体，不存在返回None
+        """
+        return self.db.select_peer_profiles(
+            PeerProfile.COLUMNS, PeerProfile.from_row, where='name = ?', params=(name,)
+        ).fetchone()
+
+    def list_all(self) -> List[PeerProfile]:
+        """查询所有配置
+
+        Returns:
+            配置实体列表（按ID排序）
+        """
+        return self.db.select_peer_profiles(PeerProfile.COLUMNS, PeerProfile.from_row).fetchall()
+
+    def delete(self, profile_id: int) -> bool:
+        """删除配置
+
+        Args:
+            profile_id: 配置ID
+
+        Returns:
+            是否成功
+        """
+        return self.db.delete_peer_profile(profile_id)
+
+    def set_platform(self, platform: str, profile_id: Optional[int]) -> bool:
+        """设置平台默认配置
+
+        Args:
+            platform: 平台
+            profile_id: 配置ID，None 表示清除
+
+        Returns:
+            是否成功
+        """
+        return self.db.set_platform_peer_profile(platform, profile_id)
+
+    def set_nodes(self, node_ids: Sequence[int], profile_id: Optional[int]) -> int:
+        """批量设置节点自身的配置
+
+        Args:
+            node_ids: 节点ID列表
+            profile_id: 配置ID，None 表示使用平台默认配置
+
+        Returns:
+            更新的节点数量
+        """
+        return self.db.set_nodes_peer_profile(node_ids, profile_id)
+
+    def record_endpoints(self, observations: Sequence[tuple]) -> int:
+        """记录一次公网地址观测
+
+        Args:
+            observations: (节点ID, 观测地址) 列表
+
+        Returns:
+            记录的节点数量
+        """
+        return self.db.record_endpoints(observations)
+
+    def observations(self) -> List[tuple]:
+        """获取全部观测结果
+
+        Returns:
+            (节点ID, 最近观测地址, 观测次数, 变化次数, 观测时长秒数) 列表
+        """
+        return self.db.get_endpoint_observations()
+
+    def reset_observations(self, node_ids: Sequence[int]) -> int:
+        """清除节点的观测结果
+
+        Args:
+            node_ids: 节点ID列表
+
+        Returns:
+            清除的记录数量
+        """
+        return self.db.reset_endpoint_observations(node_ids)
@@ -0,0 +1,98 @@
+"""
+路由策略仓储
+封装客户端 AllowedIPs 分流策略的存储操作
+"""
+from typing import Optional, List
+from core.domain.policy import RoutingPolicy
+from core.models.database import Database
+
+
+class PolicyRepository:
+    """路由策略仓储"""
+
+    def __init__(self, db: Database):
+        """初始化
+
+        Args:
+            db: 数据库实例
+        """
+        self.db = db
+
+    def add(self, policy: RoutingPolicy) -> int:
+        """添加路由策略
+
+        Args:
+            policy: 策略实体
+
+        Returns:
+            新策略的ID
+        """
+        policy_id = self.db.add_policy(
+            name=policy.name,
+            include_prefixes=policy.include_prefixes,
+            exclude_prefixes=policy.exclude_prefixes,
+            description=policy.description
+        )
+        policy.id = policy_id
+        return policy_id
+
+    def update(self, policy: RoutingPolicy) -> bool:
+        """更新路由策略（版本号递增）
+
+        Args:
+            policy: 策略实体
+
+        Returns:
+            是否成功
+        """
+        return self.db.update_policy(
+            policy.id,
+            include_prefixes=policy.include_prefixes,
+            exclude_prefixes=policy.exclude_prefixes,
+            description=policy.description
+        )
+
+    def get_by_id(self, policy_id: int) -> Optional[RoutingPolicy]:
+        """根据ID获取路由策略
+
+        Args:
+            policy_id: 策略ID
+
+        Returns:
+            策略实体，不存在返回None
+        """
+        return self.db.select_policies(
+            RoutingPolicy.COLUMNS, RoutingPolicy.from_row, where='id = ?', params=(policy_id,)
+        ).fetchone()
+
+    def get_by_name(self, name: str) -> Optional[RoutingPolicy]:
+        """根据名称获取路由策略
+
+        Args:
+            name: 策略名称
+
+        Returns:
+            策略实体，不存在返回None
+        """
+        return self.db.select_policies(
+            RoutingPolicy.COLUMNS, RoutingPolicy.from_row, where='name = ?', params=(name,)
+        ).fetchone()
+
+    def list_all(self) -> List[RoutingPolicy]:
+        """查询所有路由策略
+
+        Returns:
+            策略实体列表（按ID排序）
+        """
+        return self.db.select_policies(RoutingPolicy.COLUMNS, RoutingPolicy.from_row).fetchall()
+
+    def delete(self, policy_id: int) -> bool:
+        """删除路由策略
+
+        Args:
+            policy_id: 策略ID
+
+        Returns:
+            是否成功
+        """
+        return self.db.delete_policy(policy_id)
@@ -2,7 +2,8 @@
 服务端仓储
 封装服务端信息的存储操作
 """
-from typing import Optional
+from typing import Iterable, Optional, Sequence, Tuple
+from core.domain.interface import WgInterface
 from core.domain.server import Server
 from core.models.database import Database
 
@@ -33,19 +34,38 @@ class ServerRepository:
             virtual_ip=server.virtual_ip,
             listen_port=server.listen_port,
             network_cidr=server.network_cidr,
-            public_endpoint=server.public_endpoint
+            public_endpoint=server.public_endpoint,
+            network6_cidr=server.network6_cidr,
+            virtual_ip6=server.virtual_ip6
         )
     
+    def save_ipv6(self, server: Server, interfaces: Iterable[WgInterface],
+                  assignments: Sequence[Tuple[str, int]]) -> int:
+        """在一个事务中保存服务端、接口分片和节点的 IPv6 地址
+        
+        Args:
+            server: 服务端实体
+            interfaces: 接口分片实体（已设置 IPv6 子段）
+            assignments: (IPv6 地址, 节点ID) 列表
+            
+        Returns:
+            更新的节点数量
+        """
+        return self.db.set_server_ipv6(
+            server.network6_cidr,
+            server.virtual_ip6,
+            [(interface.network6_cidr, interface.virtual_ip6, interface.id)
+             for interface in interfaces],
+            assignments
+        )
+        
     def get(self) -> Optional[Server]:
         """获取服务端信息
         
         Returns:
             服务端实体，不存在返回None
         """
-        data = self.db.get_server_info()
-        if data:
-            return Server.from_dict(data)
-        return None
+        return self.db.select_server_info(Server.COLUMNS, Server.from_row)
     
     def exists(self) -> bool:
         """检查是否已初始化
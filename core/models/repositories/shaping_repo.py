@@ -0,0 +1,115 @@
+"""
+限速配置仓储
+封装限速配置的存储操作
+"""
+from typing import Optional, List
+from core.domain.shaping import ShapingProfile
+from core.models.database import Database
+
+
+class ShapingRepository:
+    """限速配置仓储"""
+
+    def __init__(self, db: Database):
+        """初始化
+
+        Args:
+            db: 数据库实例
+        """
+        self.db = db
+
+    def add(self, profile: ShapingProfile) -> int:
+        """添加限速配置
+
+        Args:
+            profile: 限速配置实体
+
+        Returns:
+            新配置的ID
+        """
+        profile_id = self.db.add_shaping_profile(
+            name=profile.name,
+            download_kbit=profile.download_kbit,
+            upload_kbit=profile.upload_kbit,
+            description=profile.description
+        )
+        profile.id = profile_id
+        return profile_id
+
+    def update(self, profile: ShapingProfile) -> bool:
+        """更新限速配置
+
+        Args:
+            profile: 限速配置实体
+
+        Returns:
+            是否成功
+        """
+        return self.db.update_shaping_profile(
+            profile.id,
+            download_kbit=profile.download_kbit,
+            upload_kbit=profile.upload_kbit,
+            description=profile.description
+        )
+
+    def get_by_id(self, profile_id: int) -> Optional[ShapingProfile]:
+        """根据ID获取限速配置
+
+        Args:
+            profile_id: 配置ID
+
+        Returns:
+            限速配置实体，不存在返回None
+        """
+        return self.db.select_shaping_profiles(
+            ShapingProfile.COLUMNS, ShapingProfile.from_row, where='id = ?', params=(profile_id,)
+        ).fetchone()
+
+    def get_by_name(self, name: str) -> Optional[ShapingProfile]:
+        """根据名称获取限速配置
+
+        Args:
+            name: 配置名称
+
+        Returns:
+            限速配置实体，不存在返回None
+        """
+        return self.db.select_shaping_profiles(
+            ShapingProfile.COLUMNS, ShapingProfile.from_row, where='name = ?', params=(name,)
+        ).fetchone()
+
+    def list_all(self) -> List[ShapingProfile]:
+        """查询所有限速配置
+
+        Returns:
+            限速配置实体列表（按ID排序）
+        """
+        return self.db.select_shaping_profiles(
+            ShapingProfile.COLUMNS, ShapingProfile.from_row
+        ).fetchall()
+
+    def exists(self) -> bool:
+        """是否存在任何限速配置"""
+        return self.db.select_shaping_profiles(('id',)).fetchone() is not None
+
+    def delete(self, profile_id: int) -> bool:
+        """删除限速配置
+
+        Args:
+            profile_id: 配置ID
+
+        Returns:
+            是否成功
+        """
+        return self.db.delete_shaping_profile(profile_id)
+
+    def interface_rates(self, interface_id: int) -> List[tuple]:
+        """获取接口分片上受限速节点的生效速率
+
+        Args:
+            interface_id: 接口分片ID
+
+        Returns:
+            (节点ID, 虚拟IP, 虚拟IPv6, 路由子网, 下行 kbit/s, 上行 kbit/s) 列表
+        """
+        return self.db.get_interface_shaping(interface_id)
@@ -0,0 +1,207 @@
+"""
+访问控制服务
+实现节点组之间的放行规则管理，并编译为 nftables 集合/判决映射下发到中心节点
+"""
+import logging
+from typing import Optional, Dict, Any, List
+from core.domain.acl import AclRule
+from core.domain.node import Node
+from core.models.database import Database
+from core.models.repositories.acl_repo import AclRepository
+from core.models.repositories.group_repo import GroupRepository
+from core.utils.deferred_apply import pending_apply
+from core.utils.nft_compiler import node_members, render_ruleset, render_member_delta
+from core.utils.privileged_executor import get_executor
+from config import base as config
+
+logger = logging.getLogger(__name__)
+
+
+# 访问控制模式：off 节点之间全部互通，enforce 仅放行规则允许的节点组之间的流量
+ACL_MODES = ('off', 'enforce')
+
+
+class AclService:
+    """访问控制服务
+
+    节点组即节点标签：每个组编译为一组地址集合（节点虚拟 IP 和路由子网），
+    源地址经判决映射跳转到所属组的链，链内只列出该组允许访问的目的组集合。
+    报文匹配开销与节点数量无关；节点加入/离开节点组时只增删集合元素，
+    节点组或规则变化时原子替换整张表，两者都通过单次 `nft -f -` 事务完成。
+    """
+
+    def __init__(self, db: Database):
+        """初始化
+
+        Args:
+            db: 数据库实例
+        """
+        self.db = db
+        self.acl_repo = AclRepository(db)
+        self.group_repo = GroupRepository(db)
+        self.executor = get_executor()
+
+    def get_mode(self) -> str:
+        """获取访问控制模式
+
+        Returns:
+            模式名称，未配置或无效时使用默认模式
+        """
+        mode = self.db.get_config_param('acl_mode')
+        return mode if mode in ACL_MODES else config.DEFAULT_ACL_MODE
+
+    def set_mode(self, mode: str) -> bool:
+        """设置访问控制模式并立即下发（enforce 加载规则表，off 删除规则表）
+
+        Raises:
+            ValueError: 模式无效
+            RuntimeError: 下发规则失败
+        """
+        if mode not in ACL_MODES:
+            raise ValueError(f"访问控制模式必须为 {', '.join(ACL_MODES)} 之一")
+        result = self.db.set_config_param('acl_mode', mode, '节点组访问控制模式')
+        self.apply()
+        return result
+
+    # ---- 规则 ----
+
+    def add_rule(self, src_group: str, dst_group: str,
+                 description: Optional[str] = None) -> AclRule:
+        """添加放行规则（允许源节点组访问目的节点组）
+
+        Raises:
+            ValueError: 节点组不存在或规则已存在
+        """
+        src, dst = self._get_group(src_group), self._get_group(dst_group)
+        if self.acl_repo.get_by_groups(src.id, dst.id):
+            raise ValueError(f"放行规则 {src_group} -> {dst_group} 已存在")
+
+        rule = AclRule(src_group_id=src.id, dst_group_id=dst.id, description=description)
+        valid, error_msg = rule.validate()
+        if not valid:
+            raise ValueError(error_msg)
+        self.acl_repo.add(rule)
+        self.refresh()
+        return self.acl_repo.get_by_id(rule.id)
+
+    def remove_rule(self, src_group: str, dst_group: str) -> bool:
+        """删除放行规则
+
+        Raises:
+            ValueError: 节点组或规则不存在
+        """
+        src, dst = self._get_group(src_group), self._get_group(dst_group)
+        rule = self.acl_repo.get_by_groups(src.id, dst.id)
+        if not rule:
+            raise ValueError(f"放行规则 {src_group} -> {dst_group} 不存在")
+        result = self.acl_repo.delete(rule.id)
+        self.refresh()
+        return result
+
+    def list_rules(self) -> List[Dict[str, Any]]:
+        """获取所有放行规则（附带节点组名称）"""
+        names = {group.id: group.name for group in self.group_repo.list_all()}
+        result = []
+        for rule in self.acl_repo.list_all():
+            data = rule.to_dict()
+            data['src_group'] = names.get(rule.src_group_id)
+            data['dst_group'] = names.get(rule.dst_group_id)
+            result.append(data)
+        return result
+
+    # ---- 编译与下发 ----
+
+    def compile(self) -> str:
+        """编译完整的 nftables 规则集
+
+        Returns:
+            nft -f 输入文本
+        """
+        members = set()
+        cursor = self.db.select_nodes(
+            ('group_id', 'virtual_ip', 'virtual_ip6', 'routed_subnets'), where='group_id IS NOT NULL'
+        )
+        for row in cursor:
+            members |= node_members(*row)
+        return render_ruleset(
+            (group.id for group in self.group_repo.list_all()),
+            members,
+            ((rule.src_group_id, rule.dst_group_id) for rule in self.acl_repo.list_all()),
+            interface_glob=f"{config.WG_INTERFACE_PREFIX}*"
+        )
+
+    def apply(self):
+        """按当前模式下发规则：enforce 原子替换整张表，off 删除规则表
+
+        批处理（defer_apply）期间只做标记，提交后整表下发一次。
+
+        Raises:
+            RuntimeError: nft 执行失败
+        """
+        pending = pending_apply()
+        if pending is not None:
+            pending.acl = True
+            return
+        if self.get_mode() != 'enforce':
+            self.executor.execute_privileged_command(
+                ['nft', 'delete', 'table', 'inet', config.NFT_TABLE_NAME],
+                capture_output=True
+            )
+            return
+        self._nft([self.compile()])
+
+    def refresh(self):
+        """节点组或规则变化后重新下发（未启用访问控制时不做任何事）"""
+        if self.get_mode() != 'enforce':
+            return
+        try:
+            self.apply()
+        except Exception as e:
+            logger.warning(f"下发访问控制规则失败: {str(e)}")
+
+    def sync_node(self, before: Optional[Node], after: Optional[Node]):
+        """节点加入/离开节点组或地址变化后增量更新集合元素
+
+        增量语句失败（如规则表被外部删除）时退回整表替换。
+
+        Args:
+            before: 变化前的节点，None 表示新注册
+            after: 变化后的节点，None 表示已删除
+        """
+        if self.get_mode() != 'enforce':
+            return
+        pending = pending_apply()
+        if pending is not None:
+            pending.acl = True
+            return
+        old = self._members(before)
+        new = self._members(after)
+        delta = render_member_delta(old - new, new - old)
+        if not delta:
+            return
+        try:
+            self._nft([delta])
+        except Exception:
+            self.refresh()
+
+    @staticmethod
+    def _members(node: Optional[Node]):
+        """节点 -> 组成员前缀集合"""
+        if node is None:
+            return set()
+        return node_members(node.group_id, node.virtual_ip, node.virtual_ip6, node.routed_subnets)
+
+    def _nft(self, chunks: List[str]):
+        """将规则文本作为单个事务交给 nft 执行
+
+        Raises:
+            RuntimeError: nft 执行失败（事务整体回滚，规则保持原状）
+        """
+        self.executor.pipe_privileged_command(['nft', '-f', '-'], chunks)
+
+    def _get_group(self, name: str):
+        """按名称获取节点组，不存在时抛出 ValueError"""
+        group = self.group_repo.get_by_name(name)
+        if not group:
+            raise ValueError(f"节点组 '{name}' 不存在")
+        return group
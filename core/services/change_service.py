@@ -0,0 +1,349 @@
+"""
+变更日志服务
+外部系统（配置下发、监控、IPAM 等）按序号增量同步节点和服务端配置：变更日志由数据库
+触发器在修改的同一事务中写入，每个对象只保留最新一条；节点删除记录按保留时长压缩，
+落后超过保留时长的客户端需重新全量同步
+"""
+import asyncio
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from core.domain.node import Node
+from core.models.database import Database
+from core.models.repositories.server_repo import ServerRepository
+from core.utils.event_bus import get_event_bus, publish_event
+from core.utils.log import operation
+from config import base as config
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeService:
+    """变更日志服务"""
+
+    def __init__(self, db: Database):
+        """初始化服务
+
+        Args:
+            db: 数据库实例
+        """
+        self.db = db
+
+    def changes_since(self, since: int, limit: Optional[int] = None) -> Dict[str, Any]:
+        """获取序号大于 since 的变更
+
+        reset 为 True 时客户端无法增量同步（首次同步、since 之后的删除记录已被压缩、
+        数据库已重建），应先记下 next，再重新拉取完整数据，之后从 next 继续同步。
+
+        Args:
+            since: 客户端已同步到的序号，0 表示首次同步
+            limit: 最多返回的变更数量，默认使用全局配置
+
+        Returns:
+            {'changes': 变更列表, 'next': 下次请求的 since, 'reset': 是否需要全量同步,
+             'more': 是否还有未返回的变更}
+        """
+        limit = limit or config.CHANGES_PAGE_SIZE
+        if since <= 0:
+            return self._feed([], self.db.get_change_seq(), reset=True)
+
+        rows = self.db.select_changes(since, limit + 1)
+        if not rows:
+            return self._feed([], 0, reset=True)
+        if rows[0][0] < since:
+            # since 超过了最新序号：数据库已重建或恢复自旧备份
+            return self._feed([], rows[0][0], reset=True)
+        if since < (rows[0][8] or 0):
+            return self._feed([], self.db.get_change_seq(), reset=True)
+
+        rows = [row for row in rows if row[0] > since]
+        if not rows:
+            return self._feed([], since)
+        more = len(rows) > limit
+        rows = rows[:limit]
+        return self._feed(self._build_changes(rows), rows[-1][0], more=more)
+
+    def _build_changes(self, rows: List[tuple]) -> List[Dict[str, Any]]:
+        """变更记录 -> 变更列表（更新附带对象的当前数据，删除附带节点的标识字段）"""
+        node_ids = [row[2] for row in rows if row[1] == 'node' and row[3] == 'upsert']
+        nodes = {}
+        if node_ids:
+            placeholders = ', '.join('?' * len(node_ids))
+            nodes = {
+                node.id: node for node in self.db.select_nodes(
+                    Node.COLUMNS, Node.from_row, where=f"id IN ({placeholders})", params=tuple(node_ids)
+                )
+            }
+
+        changes = []
+        for seq, entity, entity_id, op, name, virtual_ip, virtual_ip6, public_key, _ in rows:
+            if op == 'delete':
+                data = {'id': entity_id, 'node_name': name, 'virtual_ip': virtual_ip,
+                        'virtual_ip6': virtual_ip6, 'public_key': public_key}
+            elif entity == 'node':
+                node = nodes.get(entity_id)
+                if node is None:
+                    # 读取期间被删除，删除记录会以更大的序号出现在之后的结果中
+                    continue
+                data = node.to_dict()
+            else:
+                server = ServerRepository(self.db).get()
+                if server is None:
+                    continue
+                data = server.to_dict()
+            changes.append({'seq': seq, 'entity': entity, 'id': entity_id, 'op': op, 'data': data})
+        return changes
+
+    @staticmethod
+    def _feed(changes: List[Dict[str, Any]], next_seq: int,
+              reset: bool = False, more: bool = False) -> Dict[str, Any]:
+        return {'changes': changes, 'next': next_seq, 'reset': reset, 'more': more}
+
+    def compact(self, retention: Optional[int] = None) -> int:
+        """删除超过保留时长的节点删除记录
+
+        Args:
+            retention: 保留时长（秒），默认使用全局配置
+
+        Returns:
+            删除的记录数量
+        """
+        retention = config.CHANGES_RETENTION if retention is None else retention
+        before = datetime.now(timezone.utc) - timedelta(seconds=retention)
+        return self.db.compact_changes(before.strftime('%Y-%m-%d %H:%M:%S'))
+
+
+class ChangeWatcher:
+    """长轮询等待新的变更
+
+    变更可能由其他进程（CLI、其他 Web 进程）写入，因此按固定间隔检查最新序号。
+    所有等待中的请求共享一个检查任务和一个 Future，每个间隔只查询一次数据库，
+    与等待的客户端数量无关；没有等待者时检查任务退出。
+    """
+
+    def __init__(self, interval: Optional[float] = None):
+        """初始化
+
+        Args:
+            interval: 检查间隔（秒），默认使用全局配置
+        """
+        self.interval = interval or config.CHANGES_POLL_INTERVAL
+        self._future: Optional[asyncio.Future] = None
+        self._task: Optional[asyncio.Task] = None
+        self._since: Optional[int] = None  # 等待者中最小的 since
+        self._waiters = 0
+
+    async def wait(self, since: int, timeout: float) -> bool:
+        """等待序号大于 since 的变更
+
+        Args:
+            since: 客户端已同步到的序号
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            False 表示超时（被唤醒时也可能没有该客户端需要的变更，调用方应重新查询）
+        """
+        loop = asyncio.get_running_loop()
+        if self._future is None or self._future.done():
+            self._future = loop.create_future()
+        self._since = since if self._since is None else min(self._since, since)
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._poll())
+        future = self._future
+        self._waiters += 1
+        try:
+            # shield：单个请求超时不能取消共享的 Future
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiters -= 1
+
+    async def _poll(self):
+        """检查最新序号，超过等待者的 since 时唤醒所有等待者"""
+        while self._waiters:
+            await asyncio.sleep(self.interval)
+            try:
+                with Database() as db:
+                    seq = db.get_change_seq()
+            except Exception as e:
+                logger.warning(f"检查变更序号失败: {str(e)}")
+                continue
+            if self._since is not None and seq > self._since:
+                self._since = None
+                if not self._future.done():
+                    self._future.set_result(None)
+        self._since = None
+
+
+class ChangeRelay:
+    """把变更日志的推进作为事件发布到事件总线（changes 事件）
+
+    事件总线只在发布事件的进程内有效，CLI、批处理和其他 Web 进程的修改不会出现在
+    本进程的事件流中；变更日志由所有进程写入同一数据库，按固定间隔检查最新序号，
+    推进时发布 {'seq': 最新序号}，订阅者再通过 /api/v1/changes 拉取具体变化。
+    没有事件订阅者时不查询数据库。
+    """
+
+    def __init__(self):
+        """初始化"""
+        self._seq: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def run_once(self, db: Database) -> Optional[int]:
+        """检查一次最新序号
+
+        Args:
+            db: 数据库实例
+
+        Returns:
+            发布的序号，未推进（或首次检查只记录基线）时返回 None
+        """
+        seq = db.get_change_seq()
+        previous, self._seq = self._seq, seq
+        if previous is None or seq == previous:
+            return None
+        publish_event('changes', {'seq': seq})
+        return seq
+
+    def start(self, interval: Optional[float] = None) -> bool:
+        """在后台线程中周期运行
+
+        Args:
+            interval: 检查间隔（秒），默认使用全局配置
+
+        Returns:
+            是否启动（间隔为 0 或已在运行时返回 False）
+        """
+        interval = config.CHANGES_POLL_INTERVAL if interval is None else interval
+        if interval <= 0 or (self._thread and self._thread.is_alive()):
+            return False
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(interval,), name='change-relay', daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """停止后台线程"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _loop(self, interval: float):
+        """后台检查循环"""
+        bus = get_event_bus()
+        while not self._stop.wait(interval):
+            # 没有订阅者时不查询，恢复订阅后重新记录基线
+            if not bus.subscriber_count:
+                self._seq = None
+                continue
+            try:
+                with Database() as db:
+                    self.run_once(db)
+            except Exception as e:
+                logger.warning(f"检查变更序号失败: {str(e)}")
+
+
+class ChangeCompactor:
+    """后台变更日志压缩器：在 Web 服务中按固定间隔删除超过保留时长的节点删除记录"""
+
+    def __init__(self):
+        """初始化压缩器"""
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def run_once(self, db: Database) -> int:
+        """压缩一次
+
+        Args:
+            db: 数据库实例
+
+        Returns:
+            删除的记录数量
+        """
+        return ChangeService(db).compact()
+
+    def start(self, interval: Optional[int] = None) -> bool:
+        """在后台线程中周期运行
+
+        Args:
+            interval: 压缩间隔（秒），默认使用全局配置
+
+        Returns:
+            是否启动（间隔为 0 或已在运行时返回 False）
+        """
+        interval = config.CHANGES_COMPACT_INTERVAL if interval is None else interval
+        if interval <= 0 or (self._thread and self._thread.is_alive()):
+            return False
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(interval,), name='change-compactor', daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """停止后台线程"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _loop(self, interval: int):
+        """后台压缩循环"""
+        while not self._stop.wait(interval):
+            try:
+                with operation('change-compact'), Database() as db:
+                    self.run_once(db)
+            except Exception as e:
+                logger.warning(f"压缩变更日志失败: {str(e)}")
+
+
+# 全局单例
+_watcher = None
+_relay = None
+_compactor = None
+
+
+def get_change_watcher() -> ChangeWatcher:
+    """获取全局长轮询等待器
+
+    Returns:
+        ChangeWatcher 实例
+    """
+    global _watcher
+    if _watcher is None:
+        _watcher = ChangeWatcher()
+    return _watcher
+
+
+def get_change_relay() -> ChangeRelay:
+    """获取全局变更事件转发器
+
+    Returns:
+        ChangeRelay 实例
+    """
+    global _relay
+    if _relay is None:
+        _relay = ChangeRelay()
+    return _relay
+
+
+def get_change_compactor() -> ChangeCompactor:
+    """获取全局压缩器实例
+
+    Returns:
+        ChangeCompactor 实例
+    """
+    global _compactor
+    if _compactor is None:
+        _compactor = ChangeCompactor()
+    return _compactor
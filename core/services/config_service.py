@@ -2,11 +2,23 @@
 配置服务
 实现配置参数管理和配置文件生成的业务逻辑
 """
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List
+from core.domain.hub import Hub
+from core.domain.interface import WgInterface
+from core.domain.node import Node
+from core.domain.peer_profile import PeerSettings
 from core.models.database import Database
+from core.models.repositories.hub_repo import HubRepository
+from core.models.repositories.network_repo import NetworkRepository
 from core.models.repositories.node_repo import NodeRepository
+from core.models.repositories.peer_profile_repo import PeerProfileRepository
 from core.models.repositories.server_repo import ServerRepository
+from core.models.repositories.interface_repo import InterfaceRepository
+from core.services.mesh_service import MeshService, MESH_CACHE_SCOPE
+from core.services.policy_service import PolicyService
 from core.utils.config_generator import ConfigGenerator
+from core.utils.fragment_cache import get_peer_fragment_cache
+from core.utils.metrics import RENDER_SECONDS, timed
 from config import base as config
 
 
@@ -22,6 +34,12 @@ class ConfigService:
         self.db = db
         self.node_repo = NodeRepository(db)
         self.server_repo = ServerRepository(db)
+        self.interface_repo = InterfaceRepository(db)
+        self.hub_repo = HubRepository(db)
+        self.network_repo = NetworkRepository(db)
+        self.peer_profile_repo = PeerProfileRepository(db)
+        self.mesh_service = MeshService(db)
+        self.policy_service = PolicyService(db)
         self.config_generator = ConfigGenerator()
     
     def get_config_param(self, key: str) -> Optional[str]:
@@ -48,6 +66,22 @@ class ConfigService:
         """
         return self.db.set_config_param(key, value, description)
     
+    def get_persistent_keepalive(self) -> int:
+        """获取全局保活间隔
+        
+        Returns:
+            保活间隔（秒），未配置或格式错误时使用默认值
+        """
+        value = self.get_config_param('persistent_keepalive')
+        try:
+            return int(value) if value is not None else config.PERSISTENT_KEEPALIVE
+        except ValueError:
+            return config.PERSISTENT_KEEPALIVE
+    
+    def get_peer_settings(self) -> PeerSettings:
+        """获取按节点解析保活间隔和 MTU 的设置（节点配置 -> 平台默认配置 -> 全局参数）"""
+        return PeerSettings(self.get_persistent_keepalive(), self.peer_profile_repo.list_all())
+    
     def generate_client_config(self, node_id: int) -> str:
         """生成客户端配置文件
         
@@ -66,46 +100,157 @@ class ConfigService:
         if not node:
             raise ValueError(f"节点 ID {node_id} 不存在")
         
+        return self.render_client_config(node)
+    
+    @timed(RENDER_SECONDS, ('client',))
+    def render_client_config(self, node: Node) -> str:
+        """为节点实体生成客户端配置文件
+        
+        归属远端中心节点的节点以该中心节点作为对端，其余节点使用所属接口分片。
+        存在远端中心节点时，默认网络节点的 AllowedIPs 覆盖所有中心节点的网络子段；
+        租户网络节点只路由本网络的网络段。
+        启用网状模式时追加直连节点的 [Peer] 段。
+        
+        Args:
+            node: 节点实体
+            
+        Returns:
+            配置文件内容
+            
+        Raises:
+            RuntimeError: 服务端未初始化
+        """
         # 获取服务端信息
         server = self.server_repo.get()
         if not server:
             raise RuntimeError("服务端未初始化")
         
+        # 获取节点所属接口分片或远端中心节点
+        interface = self.interface_repo.get_by_id(node.interface_id) if node.interface_id else None
+        hub = self.hub_repo.get_by_id(node.hub_id) if node.hub_id else None
+        
+        network = self.network_repo.get_by_id(node.network_id) if node.network_id else None
+        if node.network_id and network is None:
+            raise RuntimeError(f"节点所属租户网络 ID {node.network_id} 不存在")
+        networks = (network or server).networks
+        
         # 获取DNS配置
         dns_server = self.get_config_param('dns_server') or config.DEFAULT_DNS_SERVER
         
+        # 直连节点的子网随直连 [Peer] 段路由，其余节点的子网经中心节点
+        direct_peers = self.mesh_service.get_direct_peers(node)
+        allowed_ips = self.get_client_allowed_ips() if network is None else None
+        routes = self.get_client_routes(node, direct_peers)
+        if routes:
+            allowed_ips = ', '.join([allowed_ips or ', '.join(networks)] + routes)
+        
+        # 分流策略：在必须经中心节点的前缀之外追加策略前缀，并压缩为最少的 CIDR
+        required = allowed_ips.split(', ') if allowed_ips else networks
+        policy_ips = self.policy_service.get_client_allowed_ips(node, required)
+        if policy_ips is not None:
+            allowed_ips = ', '.join(policy_ips)
+        
+        # 保活间隔和 MTU 按节点解析；直连 [Peer] 段缓存按全局保活间隔渲染，
+        # 使用其他保活间隔的节点直接渲染，避免缓存反复整体失效
+        peer_settings = self.get_peer_settings()
+        keepalive = peer_settings.keepalive(node)
+        cache = get_peer_fragment_cache(MESH_CACHE_SCOPE)
+        
         # 生成配置
         return self.config_generator.generate_client_config(
-            node_info=node.to_dict(include_private_key=True),
-            server_info=server.to_dict(include_private_key=True),
-            dns_server=dns_server
+            node=node,
+            server=server,
+            dns_server=dns_server,
+            allowed_ips=allowed_ips,
+            persistent_keepalive=keepalive,
+            interface=interface,
+            hub=hub,
+            direct_peers=direct_peers,
+            cache=cache if keepalive == peer_settings.default_keepalive else None,
+            network=network,
+            mtu=peer_settings.mtu(node)
         )
     
-    def generate_server_config(self) -> str:
+    def get_client_allowed_ips(self) -> Optional[str]:
+        """获取客户端应路由的全部网络段
+        
+        Returns:
+            逗号分隔的网络段，没有远端中心节点时返回 None（使用虚拟网络段）
+        """
+        remote_hubs = self.hub_repo.list_all()
+        if not remote_hubs:
+            return None
+        server = self.server_repo.get()
+        return ', '.join(server.networks + [hub.network_cidr for hub in remote_hubs])
+    
+    def get_client_routes(self, node: Node, direct_peers: Iterable[Node] = ()) -> List[str]:
+        """获取客户端经中心节点访问的其他节点子网
+        
+        节点自身的子网和直连节点的子网（已在直连 [Peer] 段中）不经中心节点，
+        其他网络的子网不可达。
+        
+        Args:
+            node: 节点实体
+            direct_peers: 直连节点
+            
+        Returns:
+            子网列表
+        """
+        skip = {node.id} | {peer.id for peer in direct_peers}
+        return [
+            subnet
+            for node_id, _, network_id, routed_subnets in self.db.get_routed_subnets()
+            if node_id not in skip and network_id == node.network_id
+            for subnet in routed_subnets.split(',')
+        ]
+    
+    @timed(RENDER_SECONDS, ('server',))
+    def generate_server_config(self, interface_id: Optional[int] = None) -> str:
         """生成服务端配置文件
         
+        Args:
+            interface_id: 接口分片ID，默认主接口
+            
         Returns:
             配置文件内容
             
         Raises:
             RuntimeError: 服务端未初始化
         """
-        # 获取服务端信息
-        server = self.server_repo.get()
-        if not server:
+        # 获取接口分片
+        if interface_id is None:
+            interfaces = self.interface_repo.list_by_network(None)
+            interface = interfaces[0] if interfaces else None
+        else:
+            interface = self.interface_repo.get_by_id(interface_id)
+        if not interface:
             raise RuntimeError("服务端未初始化")
         
-        # 获取所有节点
-        all_nodes = self.node_repo.list_all()
+        # 生成配置（复用未变化节点的已渲染片段）
+        return ''.join(self.config_generator.iter_server_config(
+            interface,
+            self.node_repo.iter_by_interface(interface.id),
+            persistent_keepalive=self.get_persistent_keepalive(),
+            cache=get_peer_fragment_cache(interface.id),
+            hubs=self.get_routed_hubs(interface),
+            hub_routes=self.node_repo.get_routes_by_hub(),
+            peer_settings=self.get_peer_settings()
+        ))
+    
+    def get_routed_hubs(self, interface: WgInterface) -> List[Hub]:
+        """获取接口分片需要路由的远端中心节点
         
-        # 转换为字典列表
-        nodes_dict = [node.to_dict(include_private_key=True) for node in all_nodes]
+        远端中心节点之间的路由仅挂在主接口上，避免多个分片声明相同的 AllowedIPs。
         
-        # 生成配置
-        return self.config_generator.generate_server_config(
-            server_info=server.to_dict(include_private_key=True),
-            nodes=nodes_dict
-        )
+        Args:
+            interface: 接口分片实体
+            
+        Returns:
+            远端中心节点列表
+        """
+        if interface.name != config.WG_INTERFACE_NAME:
+            return []
+        return self.hub_repo.list_all()
     
     def generate_install_script(self, node_id: int, server_api: str) -> str:
         """生成安装脚本
@@ -0,0 +1,316 @@
+"""
+中心节点服务
+实现多中心部署的中心节点管理、新节点归属策略和中心节点配置分发
+"""
+import ipaddress
+from typing import Optional, Dict, Any, Iterator, List
+from core.domain.hub import Hub
+from core.domain.peer_profile import PeerSettings
+from core.models.database import Database
+from core.models.repositories.hub_repo import HubRepository
+from core.models.repositories.node_repo import NodeRepository
+from core.models.repositories.server_repo import ServerRepository
+from core.utils.config_generator import ConfigGenerator
+from config import base as config
+
+
+# 支持的新节点归属策略
+PLACEMENT_POLICIES = ('least_peers', 'least_traffic', 'region')
+
+
+class HubService:
+    """中心节点服务
+    
+    多个中心节点共享同一份节点注册表（本数据库）。本地中心节点即 server_info
+    描述的服务端，hubs 表记录远端中心节点，每个中心节点负责一个互不重叠的网络子段。
+    """
+    
+    def __init__(self, db: Database):
+        """初始化
+        
+        Args:
+            db: 数据库实例
+        """
+        self.db = db
+        self.hub_repo = HubRepository(db)
+        self.node_repo = NodeRepository(db)
+        self.server_repo = ServerRepository(db)
+        self.config_generator = ConfigGenerator()
+    
+    def add_hub(self, name: str, public_endpoint: str, public_key: str,
+                network_cidr: str, virtual_ip: Optional[str] = None,
+                capacity_weight: float = 1.0, region: Optional[str] = None) -> Hub:
+        """添加远端中心节点
+        
+        Args:
+            name: 中心节点名称
+            public_endpoint: 公网地址（IP:Port 或域名:Port）
+            public_key: 中心节点公钥（私钥由中心节点本地保管）
+            network_cidr: 中心节点负责分配的网络子段
+            virtual_ip: 中心节点虚拟 IP，默认取子段第一个主机地址
+            capacity_weight: 容量权重
+            region: 区域标签
+            
+        Returns:
+            中心节点实体
+            
+        Raises:
+            ValueError: 参数验证失败
+            RuntimeError: 服务端未初始化
+        """
+        server = self.server_repo.get()
+        if not server:
+            raise RuntimeError("服务端未初始化，请先运行初始化命令")
+            
+        if name == config.WG_HUB_NAME or self.hub_repo.get_by_name(name):
+            raise ValueError(f"中心节点名称 '{name}' 已存在")
+            
+        try:
+            network = ipaddress.ip_network(network_cidr, strict=False)
+        except ValueError:
+            raise ValueError(f"网络段格式错误: {network_cidr}")
+            
+        # 各中心节点的网络子段互不重叠
+        for hub in self.list_hubs():
+            if network.overlaps(ipaddress.ip_network(hub.network_cidr, strict=False)):
+                raise ValueError(f"网络段 {network} 与中心节点 '{hub.name}' 的 {hub.network_cidr} 重叠")
+                
+        if virtual_ip is None:
+            virtual_ip = str(network.network_address + 1)
+        elif ipaddress.ip_address(virtual_ip) not in network:
+            raise ValueError(f"虚拟 IP {virtual_ip} 不在网络段 {network} 内")
+            
+        hub = Hub(
+            name=name,
+            public_endpoint=public_endpoint,
+            public_key=public_key,
+            virtual_ip=virtual_ip,
+            network_cidr=str(network),
+            capacity_weight=capacity_weight,
+            region=region
+        )
+        
+        valid, error_msg = hub.validate()
+        if not valid:
+            raise ValueError(error_msg)
+            
+        try:
+            self.hub_repo.add(hub)
+        except Exception as e:
+            raise RuntimeError(f"保存中心节点失败: {str(e)}")
+            
+        return hub
+    
+    def remove_hub(self, name: str) -> bool:
+        """删除远端中心节点（仍有归属节点时拒绝删除）
+        
+        Args:
+            name: 中心节点名称
+            
+        Returns:
+            是否成功
+            
+        Raises:
+            ValueError: 中心节点不存在或仍有归属节点
+        """
+        hub = self.hub_repo.get_by_name(name)
+        if not hub:
+            raise ValueError(f"中心节点 '{name}' 不存在")
+            
+        count = self.hub_repo.node_counts().get(hub.id, 0)
+        if count:
+            raise ValueError(f"中心节点 '{name}' 上仍有 {count} 个节点，请先删除或迁移")
+            
+        return self.hub_repo.delete(hub.id)
+    
+    def get_local_hub(self) -> Optional[Hub]:
+        """获取本地中心节点（由服务端信息和配置参数构造）
+        
+        Returns:
+            本地中心节点实体（id 为 None），服务端未初始化返回 None
+        """
+        server = self.server_repo.get()
+        if not server:
+            return None
+            
+        return Hub(
+            name=config.WG_HUB_NAME,
+            public_endpoint=server.public_endpoint,
+            public_key=server.public_key,
+            virtual_ip=server.virtual_ip,
+            network_cidr=server.network_cidr,
+            capacity_weight=self._get_float_param('hub_local_weight', 1.0),
+            region=self.db.get_config_param('hub_local_region'),
+            recent_traffic=int(self._get_float_param('hub_local_traffic', 0)),
+            created_at=server.created_at
+        )
+    
+    def get_hub(self, name: str) -> Optional[Hub]:
+        """根据名称获取中心节点（包括本地中心节点）
+        
+        Args:
+            name: 中心节点名称
+            
+        Returns:
+            中心节点实体，不存在返回 None
+        """
+        if name == config.WG_HUB_NAME:
+            return self.get_local_hub()
+        return self.hub_repo.get_by_name(name)
+    
+    def get_remote_hubs(self) -> List[Hub]:
+        """获取所有远端中心节点
+        
+        Returns:
+            中心节点实体列表
+        """
+        return self.hub_repo.list_all()
+    
+    def list_hubs(self) -> List[Hub]:
+        """获取全部中心节点（本地中心节点在前）
+        
+        Returns:
+            中心节点实体列表
+        """
+        local_hub = self.get_local_hub()
+        hubs = [local_hub] if local_hub else []
+        hubs.extend(self.hub_repo.list_all())
+        return hubs
+    
+    def get_hub_stats(self) -> List[Dict[str, Any]]:
+        """获取各中心节点的负载统计
+        
+        Returns:
+            中心节点字典列表（附带 total_nodes）
+        """
+        counts = self.hub_repo.node_counts()
+        result = []
+        for hub in self.list_hubs():
+            data = hub.to_dict()
+            data['total_nodes'] = counts.get(hub.id, 0)
+            data['is_local'] = hub.is_local
+            result.append(data)
+        return result
+    
+    def get_placement_policy(self) -> str:
+        """获取新节点归属策略
+        
+        Returns:
+            策略名称，未配置或无效时使用默认策略
+        """
+        policy = self.db.get_config_param('hub_placement_policy')
+        return policy if policy in PLACEMENT_POLICIES else config.DEFAULT_HUB_PLACEMENT_POLICY
+    
+    def place_node(self, region: Optional[str] = None) -> Hub:
+        """按归属策略为新节点选择中心节点
+        
+        - least_peers: 节点数 / 容量权重 最小
+        - least_traffic: 最近流量 / 容量权重 最小（相同时按节点数）
+        - region: 优先选择区域标签一致的中心节点，再按 least_peers
+        
+        Args:
+            region: 新节点的区域标签
+            
+        Returns:
+            选中的中心节点
+            
+        Raises:
+            RuntimeError: 服务端未初始化
+        """
+        hubs = self.list_hubs()
+        if not hubs:
+            raise RuntimeError("服务端未初始化，请先运行初始化命令")
+        if len(hubs) == 1:
+            return hubs[0]
+            
+        policy = self.get_placement_policy()
+        counts = self.hub_repo.node_counts()
+        
+        if policy == 'region' and region:
+            same_region = [hub for hub in hubs if hub.region == region]
+            hubs = same_region or hubs
+            
+        def peers_load(hub: Hub) -> float:
+            return counts.get(hub.id, 0) / hub.capacity_weight
+            
+        if policy == 'least_traffic':
+            key = lambda hub: (hub.recent_traffic / hub.capacity_weight, peers_load(hub))
+        else:
+            key = peers_load
+            
+        # min 保持列表顺序，负载相同时优先本地中心节点
+        return min(hubs, key=key)
+    
+    def report_traffic(self, name: str, recent_traffic: int) -> bool:
+        """上报中心节点最近流量（供 least_traffic 策略使用）
+        
+        Args:
+            name: 中心节点名称
+            recent_traffic: 最近统计周期内的流量（字节）
+            
+        Returns:
+            是否成功
+            
+        Raises:
+            ValueError: 中心节点不存在或流量无效
+        """
+        if recent_traffic < 0:
+            raise ValueError("流量不能为负数")
+            
+        if name == config.WG_HUB_NAME:
+            return self.db.set_config_param(
+                'hub_local_traffic', str(recent_traffic), '本地中心节点最近流量（字节）'
+            )
+            
+        hub = self.hub_repo.get_by_name(name)
+        if not hub:
+            raise ValueError(f"中心节点 '{name}' 不存在")
+        return self.hub_repo.update_traffic(hub.id, recent_traffic)
+    
+    def iter_hub_peers(self, name: str,
+                       persistent_keepalive: Optional[int] = None,
+                       peer_settings: Optional[PeerSettings] = None) -> Iterator[str]:
+        """流式生成远端中心节点应加载的 [Peer] 段
+        
+        包括归属该中心节点的全部节点，以及指向其他中心节点（含本地）的路由 [Peer] 段。
+        远端中心节点将其合并到自身 [Interface] 段后执行 wg syncconf。
+        
+        Args:
+            name: 远端中心节点名称
+            persistent_keepalive: 保活间隔（秒）
+            peer_settings: 按节点解析的保活间隔
+            
+        Returns:
+            [Peer] 段迭代器
+            
+        Raises:
+            ValueError: 中心节点不存在或为本地中心节点
+        """
+        hub = self.hub_repo.get_by_name(name)
+        if not hub:
+            raise ValueError(f"远端中心节点 '{name}' 不存在")
+            
+        other_hubs = [other for other in self.list_hubs() if other.id != hub.id]
+        return self.config_generator.iter_peer_blocks(
+            self.node_repo.iter_by_hub(hub.id),
+            persistent_keepalive=persistent_keepalive,
+            hubs=other_hubs,
+            hub_routes=self.node_repo.get_routes_by_hub(),
+            peer_settings=peer_settings
+        )
+    
+    def _get_float_param(self, key: str, default: float) -> float:
+        """读取数值型配置参数
+        
+        Args:
+            key: 参数键
+            default: 默认值
+            
+        Returns:
+            参数值，未配置或格式错误时返回默认值
+        """
+        value = self.db.get_config_param(key)
+        try:
+            return float(value) if value is not None else default
+        except ValueError:
+            return default
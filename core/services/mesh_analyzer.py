@@ -0,0 +1,332 @@
+"""
+直连自动提升分析器
+按中心节点转发的流量找出“重”节点对，提升为直连节点对，流量回落后降级
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple, Any
+from core.models.database import Database
+from core.models.repositories.hub_repo import HubRepository
+from core.models.repositories.interface_repo import InterfaceRepository
+from core.models.repositories.network_repo import NetworkRepository
+from core.models.repositories.server_repo import ServerRepository
+from core.services.mesh_service import MeshService, LINK_SOURCE_AUTO
+from core.utils.prefix_index import PrefixIndex, get_prefix_index, KIND_NODE, KIND_ROUTE
+from core.utils.log import operation
+from core.utils.traffic_sampler import TrafficSampler
+from config import base as config
+
+logger = logging.getLogger(__name__)
+
+
+Pair = Tuple[int, int]
+
+
+class MeshAnalyzer:
+    """直连自动提升分析器
+
+    每个采样窗口读取中心节点的 peer 计数器（wg show transfer），可用时再读取
+    conntrack 的节点对流量，计算每个节点对经中心节点转发的平滑速率：
+
+    - 连续 MESH_PROMOTE_AFTER 个窗口高于 MESH_PROMOTE_BPS 时提升为直连；
+    - 连续 MESH_DEMOTE_AFTER 个窗口低于 MESH_DEMOTE_BPS，且超过保持时间后降级。
+
+    提升后节点对流量不再经过中心节点，中心节点观测到的速率会回落，因此降级
+    主要由保持时间决定；降级后若仍是“重”节点对会再次提升，保持时间翻倍，
+    避免反复切换。提升结果写入 mesh_links（source=auto），仅在 auto 模式下生效，
+    客户端通过配置下载（ETag）获取变化。
+
+    没有 conntrack 数据时无法确认两个节点之间确有流量，只报告候选，不自动提升。
+    """
+
+    def __init__(self, sampler: Optional[TrafficSampler] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 wall_clock: Callable[[], float] = time.time):
+        """初始化分析器
+
+        Args:
+            sampler: 流量采样器
+            clock: 单调时钟（计算速率）
+            wall_clock: 墙上时钟（计算保持时间，与数据库 created_at 对齐）
+        """
+        self.sampler = sampler or TrafficSampler()
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._lock = threading.Lock()
+        self._prev_time: Optional[float] = None
+        self._prev_peers: Dict[int, int] = {}
+        self._prev_flows: Dict[Pair, int] = {}
+        self._rates: Dict[Pair, float] = {}
+        self._heavy: Dict[Pair, int] = {}
+        self._light: Dict[Pair, int] = {}
+        self._holds: Dict[Pair, Tuple[float, float]] = {}  # 节点对 -> (提升时间, 保持秒数)
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def run_once(self, db: Database, dry_run: bool = False) -> Dict[str, Any]:
+        """执行一次采样和提升/降级决策
+
+        Args:
+            db: 数据库实例
+            dry_run: 仅计算不写入数据库
+
+        Returns:
+            分析报告（promoted/demoted/candidates 等）
+        """
+        with self._lock:
+            return self._run_once(db, dry_run)
+
+    def _run_once(self, db: Database, dry_run: bool) -> Dict[str, Any]:
+        mesh_service = MeshService(db)
+        mode = mesh_service.get_mode()
+        report: Dict[str, Any] = {
+            'mode': mode,
+            'applied': mode == 'auto' and not dry_run,
+            'warming_up': False,
+            'flow_source': None,
+            'promoted': [],
+            'demoted': [],
+            'candidates': [],
+        }
+
+        nodes = db.select_nodes(
+            ('id', 'node_name', 'virtual_ip', 'public_key', 'endpoint', 'network_id')
+        ).fetchall()
+        names = {row[0]: row[1] for row in nodes}
+        has_endpoint = {row[0] for row in nodes if row[4]}
+        network_of = {row[0]: row[5] for row in nodes}
+        node_by_key = {row[3]: row[0] for row in nodes}
+
+        # 采样：peer 计数器（收发合计）+ 可选的 conntrack 节点对流量
+        interface_names = [interface.name for interface in InterfaceRepository(db).list_all()]
+        peer_totals = {
+            node_by_key[key]: rx + tx
+            for key, (rx, tx) in self.sampler.sample_peer_transfer(interface_names).items()
+            if key in node_by_key
+        }
+        server = ServerRepository(db).get()
+        cidrs = list(server.networks) if server else []
+        cidrs += [hub.network_cidr for hub in HubRepository(db).list_all()]
+        cidrs += [network.network_cidr for network in NetworkRepository(db).list_all()]
+        cidrs += [subnet for *_, subnets in db.get_routed_subnets() for subnet in subnets.split(',')]
+        raw_flows = self.sampler.sample_flows(cidrs) if cidrs else None
+        flow_totals = None
+        if raw_flows is not None:
+            # 按最长前缀匹配归属节点：节点 IP 和节点路由子网内的地址都计入该节点
+            index = get_prefix_index(db)
+            owners: Dict[str, Optional[int]] = {}
+            flow_totals = {}
+            for (ip_a, ip_b), total in raw_flows.items():
+                node_a, node_b = self._owner(index, ip_a, owners), self._owner(index, ip_b, owners)
+                if node_a is not None and node_b is not None and node_a != node_b:
+                    pair = (min(node_a, node_b), max(node_a, node_b))
+                    flow_totals[pair] = flow_totals.get(pair, 0) + total
+        report['flow_source'] = 'conntrack' if flow_totals is not None else 'peer_counters'
+
+        now = self._clock()
+        prev_time, prev_peers, prev_flows = self._prev_time, self._prev_peers, self._prev_flows
+        self._prev_time, self._prev_peers, self._prev_flows = now, peer_totals, flow_totals or {}
+        if prev_time is None or now <= prev_time:
+            report['warming_up'] = True
+            return report
+        elapsed = now - prev_time
+
+        # 每个节点经中心节点的速率，是其参与的任何节点对速率的上界
+        node_rates = {
+            node_id: max(0, total - prev_peers.get(node_id, total)) / elapsed
+            for node_id, total in peer_totals.items()
+        }
+        pair_rates = self._estimate_pair_rates(node_rates, flow_totals, prev_flows, elapsed)
+
+        # 平滑速率并更新滞回计数；已提升节点对缺少观测时按 0 计
+        links = {
+            (link['node_a'], link['node_b']): link
+            for link in mesh_service.list_links()
+        }
+        auto_links = {pair for pair, link in links.items() if link['source'] == LINK_SOURCE_AUTO}
+        alpha = config.MESH_EWMA_ALPHA
+        for pair in set(pair_rates) | set(self._rates) | auto_links:
+            observed = pair_rates.get(pair, 0.0)
+            previous = self._rates.get(pair)
+            rate = observed if previous is None else alpha * observed + (1 - alpha) * previous
+            self._rates[pair] = rate
+            if rate >= config.MESH_PROMOTE_BPS:
+                self._heavy[pair] = self._heavy.get(pair, 0) + 1
+                self._light.pop(pair, None)
+            elif rate < config.MESH_DEMOTE_BPS:
+                self._light[pair] = self._light.get(pair, 0) + 1
+                self._heavy.pop(pair, None)
+            else:
+                # 滞回区间：保持现状，重新计数
+                self._heavy.pop(pair, None)
+                self._light.pop(pair, None)
+
+        wall_now = self._wall_clock()
+
+        # 降级：连续多个窗口为“轻”且超过保持时间
+        for pair in sorted(auto_links):
+            promoted_at, hold = self._holds.get(pair) or (
+                self._parse_time(links[pair]['created_at'], wall_now), config.MESH_MIN_HOLD
+            )
+            self._holds[pair] = (promoted_at, hold)
+            if self._light.get(pair, 0) >= config.MESH_DEMOTE_AFTER and wall_now - promoted_at >= hold:
+                report['demoted'].append(self._describe(pair, names))
+                auto_links.discard(pair)
+                if report['applied']:
+                    db.delete_mesh_link(*pair, source=LINK_SOURCE_AUTO)
+
+        # 提升：连续多个窗口为“重”、至少一端有公网地址、同一网络、尚未直连；
+        # 候选只由 peer 计数器估计时（无 conntrack 数据）仅报告，不提升
+        candidates = sorted(
+            (pair for pair, count in self._heavy.items()
+             if count >= config.MESH_PROMOTE_AFTER and pair not in links
+             and (pair[0] in has_endpoint or pair[1] in has_endpoint)
+             and network_of.get(pair[0]) == network_of.get(pair[1])),
+            key=lambda pair: self._rates[pair],
+            reverse=True
+        )
+        report['candidates'] = [self._describe(pair, names) for pair in candidates]
+        slots = max(0, config.MESH_MAX_AUTO_LINKS - len(auto_links)) if flow_totals is not None else 0
+        for pair in candidates[:slots]:
+            previous = self._holds.get(pair)
+            if previous and wall_now - previous[0] < previous[1] + config.MESH_MAX_HOLD:
+                # 最近降级过又变“重”：保持时间翻倍
+                hold = min(previous[1] * 2, config.MESH_MAX_HOLD)
+            else:
+                hold = config.MESH_MIN_HOLD
+            self._holds[pair] = (wall_now, hold)
+            self._light.pop(pair, None)
+            report['promoted'].append(self._describe(pair, names))
+            if report['applied']:
+                db.add_mesh_link(*pair, source=LINK_SOURCE_AUTO)
+
+        # 清理长期为“轻”且未直连的节点对，状态规模只与活跃节点对相关
+        active_links = set(links) | {tuple(item['pair']) for item in report['promoted']}
+        for pair in [pair for pair, rate in self._rates.items() if rate < 1 and pair not in active_links]:
+            self._rates.pop(pair, None)
+            self._light.pop(pair, None)
+            self._heavy.pop(pair, None)
+            hold = self._holds.get(pair)
+            if hold and wall_now - hold[0] >= hold[1] + config.MESH_MAX_HOLD:
+                self._holds.pop(pair, None)
+
+        return report
+
+    @staticmethod
+    def _owner(index: PrefixIndex, ip: str, owners: Dict[str, Optional[int]]) -> Optional[int]:
+        """地址所属节点 ID（本窗口内缓存查询结果）"""
+        if ip not in owners:
+            try:
+                match = index.lookup(ip)
+            except ValueError:
+                match = None
+            owners[ip] = match[1].id if match and match[1].kind in (KIND_NODE, KIND_ROUTE) else None
+        return owners[ip]
+
+    @staticmethod
+    def _estimate_pair_rates(node_rates: Dict[int, float],
+                             flow_totals: Optional[Dict[Pair, int]],
+                             prev_flows: Dict[Pair, int],
+                             elapsed: float) -> Dict[Pair, float]:
+        """估算节点对经中心节点的速率
+
+        有 conntrack 数据时按节点对流量增量计算，并以两端 peer 速率的较小值为上界。
+        否则只在“重”节点之间取两端速率的较小值：这只是上界，两个节点可能各自只与
+        中心节点通信（如都向中心节点备份），节点对之间并没有流量，因此结果只作为
+        候选报告，不用于提升。仅考虑速率最高的少量节点，避免节点对数量随节点数
+        平方增长。
+        """
+        if flow_totals is not None:
+            rates = {}
+            for pair, total in flow_totals.items():
+                rate = max(0, total - prev_flows.get(pair, total)) / elapsed
+                bound = min(node_rates.get(pair[0], rate), node_rates.get(pair[1], rate))
+                rates[pair] = min(rate, bound)
+            return rates
+
+        heavy = sorted(
+            (node_id for node_id, rate in node_rates.items() if rate >= config.MESH_PROMOTE_BPS),
+            key=node_rates.get,
+            reverse=True
+        )[:config.MESH_MAX_AUTO_LINKS + 1]
+        rates = {}
+        for index, node_a in enumerate(heavy):
+            for node_b in heavy[index + 1:]:
+                pair = (min(node_a, node_b), max(node_a, node_b))
+                rates[pair] = min(node_rates[node_a], node_rates[node_b])
+        return rates
+
+    def _describe(self, pair: Pair, names: Dict[int, str]) -> Dict[str, Any]:
+        """节点对报告项"""
+        return {
+            'pair': list(pair),
+            'nodes': [names.get(pair[0]), names.get(pair[1])],
+            'rate': round(self._rates.get(pair, 0.0), 1),
+        }
+
+    @staticmethod
+    def _parse_time(value: Optional[str], default: float) -> float:
+        """解析数据库时间（UTC）为时间戳"""
+        if not value:
+            return default
+        try:
+            return datetime.fromisoformat(f"{value}+00:00").timestamp()
+        except ValueError:
+            return default
+
+    def start(self, interval: Optional[int] = None) -> bool:
+        """在后台线程中周期运行
+
+        Args:
+            interval: 采样间隔（秒），默认使用全局配置
+
+        Returns:
+            是否启动（间隔为 0 或已在运行时返回 False）
+        """
+        interval = config.MESH_ANALYZER_INTERVAL if interval is None else interval
+        if interval <= 0 or (self._thread and self._thread.is_alive()):
+            return False
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(interval,), name='mesh-analyzer', daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """停止后台线程"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _loop(self, interval: int):
+        """后台采样循环"""
+        while not self._stop.is_set():
+            try:
+                with operation('mesh-analyze'), Database() as db:
+                    # 非 auto 模式下不采样，避免无谓的 wg/conntrack 调用
+                    if MeshService(db).get_mode() == 'auto':
+                        self.run_once(db)
+            except Exception as e:
+                logger.warning(f"直连流量分析失败: {str(e)}")
+            self._stop.wait(interval)
+
+
+# 全局单例
+_analyzer = None
+
+
+def get_mesh_analyzer() -> MeshAnalyzer:
+    """获取全局分析器实例
+
+    Returns:
+        MeshAnalyzer 实例
+    """
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = MeshAnalyzer()
+    return _analyzer
@@ -0,0 +1,164 @@
+"""
+网状拓扑服务
+实现节点间直连（全网状/部分网状）的模式管理、节点公网地址和直连节点对维护
+"""
+from typing import Optional, Dict, Any, List
+from core.domain.node import Node
+from core.models.database import Database
+from core.models.repositories.node_repo import NodeRepository
+from core.utils.fragment_cache import get_peer_fragment_cache
+from config import base as config
+
+
+# 支持的拓扑模式：off 仅经中心节点转发，full 全网状，partial 仅手工添加的节点对，
+# auto 手工添加的节点对 + 流量分析自动提升的节点对
+MESH_MODES = ('off', 'full', 'partial', 'auto')
+
+# 直连节点对来源
+LINK_SOURCE_MANUAL = 'manual'
+LINK_SOURCE_AUTO = 'auto'
+
+# 直连 [Peer] 段缓存作用域（与接口分片 ID 区分）
+MESH_CACHE_SCOPE = 'mesh'
+
+
+class MeshService:
+    """网状拓扑服务
+    
+    直连节点的 [Peer] 段使用 /32 AllowedIPs，按最长前缀匹配优先于中心节点的
+    网络段路由，未直连的节点仍经中心节点转发。
+    """
+    
+    def __init__(self, db: Database):
+        """初始化
+        
+        Args:
+            db: 数据库实例
+        """
+        self.db = db
+        self.node_repo = NodeRepository(db)
+    
+    def get_mode(self) -> str:
+        """获取拓扑模式
+        
+        Returns:
+            模式名称，未配置或无效时使用默认模式
+        """
+        mode = self.db.get_config_param('mesh_mode')
+        return mode if mode in MESH_MODES else config.DEFAULT_MESH_MODE
+    
+    def set_mode(self, mode: str) -> bool:
+        """设置拓扑模式
+        
+        Args:
+            mode: 模式名称
+            
+        Returns:
+            是否成功
+            
+        Raises:
+            ValueError: 模式无效
+        """
+        if mode not in MESH_MODES:
+            raise ValueError(f"拓扑模式必须为 {', '.join(MESH_MODES)} 之一")
+        return self.db.set_config_param('mesh_mode', mode, '节点直连拓扑模式')
+    
+    def set_endpoint(self, node_id: int, endpoint: Optional[str]) -> Node:
+        """设置节点公网地址（有公网地址的节点可被其他节点直连）
+        
+        Args:
+            node_id: 节点 ID
+            endpoint: 公网地址（IP:Port），None 或空字符串表示清除
+            
+        Returns:
+            更新后的节点实体
+            
+        Raises:
+            ValueError: 节点不存在或地址格式错误
+        """
+        node = self.node_repo.get_by_id(node_id)
+        if not node:
+            raise ValueError(f"节点 ID {node_id} 不存在")
+            
+        node.endpoint = endpoint or None
+        valid, error_msg = node.validate()
+        if not valid:
+            raise ValueError(error_msg)
+            
+        self.node_repo.set_endpoint(node_id, node.endpoint)
+        get_peer_fragment_cache(MESH_CACHE_SCOPE).discard(node_id)
+        return self.node_repo.get_by_id(node_id)
+    
+    def link(self, node_a: int, node_b: int) -> bool:
+        """添加直连节点对（partial 模式生效）
+        
+        Args:
+            node_a: 节点 ID
+            node_b: 节点 ID
+            
+        Returns:
+            是否新增
+            
+        Raises:
+            ValueError: 节点不存在或两端相同
+        """
+        self._check_pair(node_a, node_b)
+        # 手工添加的节点对覆盖自动提升的同一节点对
+        return self.db.add_mesh_link(node_a, node_b, LINK_SOURCE_MANUAL)
+    
+    def unlink(self, node_a: int, node_b: int) -> bool:
+        """删除直连节点对
+        
+        Args:
+            node_a: 节点 ID
+            node_b: 节点 ID
+            
+        Returns:
+            是否成功
+        """
+        return self.db.delete_mesh_link(node_a, node_b)
+    
+    def list_links(self, node_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """获取直连节点对
+        
+        Args:
+            node_id: 仅返回包含该节点的节点对
+            
+        Returns:
+            节点对列表
+        """
+        return self.db.get_mesh_links(node_id)
+    
+    def get_direct_peers(self, node: Node) -> List[Node]:
+        """获取节点应直连的其他节点
+        
+        只查询候选节点（带索引），不会为每次配置请求做全量节点对比较。
+        
+        Args:
+            node: 节点实体
+            
+        Returns:
+            直连节点列表，off 模式返回空列表
+        """
+        mode = self.get_mode()
+        if mode == 'off':
+            return []
+        sources = (LINK_SOURCE_MANUAL, LINK_SOURCE_AUTO) if mode == 'auto' else (LINK_SOURCE_MANUAL,)
+        return list(self.node_repo.iter_mesh_peers(node, full=(mode == 'full'), sources=sources))
+    
+    def _check_pair(self, node_a: int, node_b: int):
+        """校验直连节点对
+        
+        Raises:
+            ValueError: 节点不存在、两端相同或不在同一网络
+        """
+        if node_a == node_b:
+            raise ValueError("直连节点对的两端不能相同")
+        nodes = []
+        for node_id in (node_a, node_b):
+            node = self.node_repo.get_by_id(node_id)
+            if not node:
+                raise ValueError(f"节点 ID {node_id} 不存在")
+            nodes.append(node)
+        if nodes[0].network_id != nodes[1].network_id:
+            raise ValueError("直连节点对的两端不在同一网络")
@@ -0,0 +1,41 @@
+"""
+运行指标服务
+注册抓取时采集的节点指标，并输出 Prometheus 文本格式
+"""
+import time
+from core.models.database import Database
+from core.utils.metrics import REGISTRY
+from core.utils.traffic_sampler import TrafficSampler
+from config import base as config
+
+PEERS = REGISTRY.gauge('wg_peers', '接口上的节点数量', ('interface',))
+PEERS_DISABLED = REGISTRY.gauge('wg_peers_disabled', '接口上已停用的节点数量', ('interface',))
+PEERS_ACTIVE = REGISTRY.gauge(
+    'wg_peers_active', f'最近 {config.METRICS_ACTIVE_HANDSHAKE} 秒内有握手的节点数量（仅运行中的接口）',
+    ('interface',)
+)
+
+
+def collect_peer_metrics():
+    """采集节点数量（数据库）和在线节点数量（`wg show <iface> latest-handshakes`）"""
+    with Database() as db:
+        counts = db.get_peer_counts()
+
+    for gauge in (PEERS, PEERS_DISABLED, PEERS_ACTIVE):
+        gauge.clear()
+    for name, (total, disabled) in counts.items():
+        PEERS.set((name,), total)
+        PEERS_DISABLED.set((name,), disabled)
+
+    now = time.time()
+    for name, peers in TrafficSampler().sample_latest_handshakes(counts).items():
+        active = sum(1 for ts in peers.values() if ts and now - ts <= config.METRICS_ACTIVE_HANDSHAKE)
+        PEERS_ACTIVE.set((name,), active)
+
+
+REGISTRY.add_collector(collect_peer_metrics)
+
+
+def render_metrics() -> str:
+    """输出全部指标（Prometheus 文本格式）"""
+    return REGISTRY.render()
@@ -0,0 +1,244 @@
+"""
+租户网络服务
+实现同一服务端上相互隔离的多个虚拟网络（租户）的管理
+"""
+import ipaddress
+import logging
+import os
+from typing import Optional, Dict, Any, List
+from core.domain.interface import WgInterface
+from core.domain.network import Network
+from core.models.database import Database
+from core.models.repositories.interface_repo import InterfaceRepository
+from core.models.repositories.network_repo import NetworkRepository
+from core.models.repositories.server_repo import ServerRepository
+from core.services.server_service import ServerService
+from core.utils.key_manager import KeyManager
+from core.utils.prefix_index import get_prefix_index
+from core.utils.privileged_executor import get_executor
+from config import base as config
+
+logger = logging.getLogger(__name__)
+
+
+class NetworkService:
+    """租户网络服务
+
+    每个租户网络拥有独立的 WireGuard 接口（wgn<ID>）、监听端口和网络段，
+    地址分配和 [Peer] 段渲染缓存都按接口隔离；所有租户共用同一进程、
+    数据库和流量分析器。服务端用 iptables 丢弃不同网络之间的转发流量。
+    租户网络段不得与已有网络段、节点地址或路由子网重叠（节点虚拟 IP
+    全局唯一，且所有接口共用服务端的路由表）。
+    """
+
+    def __init__(self, db: Database):
+        """初始化
+
+        Args:
+            db: 数据库实例
+        """
+        self.db = db
+        self.network_repo = NetworkRepository(db)
+        self.interface_repo = InterfaceRepository(db)
+        self.server_repo = ServerRepository(db)
+        self.key_manager = KeyManager()
+        self.executor = get_executor()
+
+    def create_network(self, name: str, network_cidr: str,
+                       listen_port: Optional[int] = None,
+                       description: Optional[str] = None) -> Dict[str, Any]:
+        """创建租户网络并启动其 WireGuard 接口
+
+        Args:
+            name: 网络名称
+            network_cidr: 网络段（IPv4）
+            listen_port: 监听端口，默认取已用端口的下一个
+            description: 描述
+
+        Returns:
+            网络信息字典
+
+        Raises:
+            ValueError: 参数无效、名称已存在或网络段重叠
+            RuntimeError: 服务端未初始化或创建失败
+        """
+        name = (name or '').strip()
+        if not name:
+            raise ValueError("网络名称不能为空")
+        if name == config.DEFAULT_NETWORK_NAME or self.network_repo.get_by_name(name):
+            raise ValueError(f"网络 '{name}' 已存在")
+
+        try:
+            network = ipaddress.ip_network(network_cidr, strict=False)
+        except ValueError:
+            raise ValueError(f"网络段格式错误: {network_cidr}")
+        if network.version != 4:
+            raise ValueError("租户网络仅支持 IPv4 网络段")
+        if network.prefixlen > 30:
+            raise ValueError(f"网络段 {network} 过小")
+
+        if not self.server_repo.exists():
+            raise RuntimeError("服务端未初始化，请先运行初始化命令")
+
+        conflicts = get_prefix_index(self.db).find_conflicts(str(network))
+        if conflicts:
+            owner = conflicts[0][1]
+            raise ValueError(f"网络段 {network} 与已有前缀 {conflicts[0][0]}（{owner.name}）重叠")
+
+        interfaces = self.interface_repo.list_all()
+        used_ports = {interface.listen_port for interface in interfaces}
+        if listen_port is None:
+            listen_port = max(used_ports, default=config.DEFAULT_LISTEN_PORT - 1) + 1
+        if listen_port in used_ports:
+            raise ValueError(f"监听端口 {listen_port} 已被使用")
+        if not 1 <= listen_port <= 65535:
+            raise ValueError("监听端口超出范围")
+
+        try:
+            private_key, public_key = self.key_manager.generate_keypair()
+        except Exception as e:
+            raise RuntimeError(f"生成密钥失败: {str(e)}")
+
+        tenant = Network(name=name, network_cidr=str(network), description=description)
+        self.network_repo.add(tenant)
+
+        interface_name = f"{config.WG_NETWORK_INTERFACE_PREFIX}{tenant.id}"
+        interface = WgInterface(
+            name=interface_name,
+            listen_port=listen_port,
+            public_key=public_key,
+            private_key=private_key,
+            virtual_ip=str(network.network_address + 1),
+            network_cidr=str(network),
+            config_path=os.path.join(config.WG_CONFIG_DIR, f"{interface_name}.conf"),
+            network_id=tenant.id
+        )
+        try:
+            self.interface_repo.add(interface)
+        except Exception as e:
+            self.network_repo.delete(tenant.id)
+            raise RuntimeError(f"保存网络接口失败: {str(e)}")
+
+        # 写入配置并启动接口；失败时保留网络记录，可稍后通过 reload 重试
+        server_service = ServerService(self.db)
+        try:
+            server_service.update_wireguard_config(interface.id)
+            server_service.reload_wireguard(interface.id)
+        except Exception as e:
+            logger.warning(f"启动网络接口 {interface_name} 失败: {str(e)}")
+        self._set_isolation(interface_name, enable=True)
+
+        return self._describe(self.network_repo.get_by_id(tenant.id), interface, 0)
+
+    def delete_network(self, name: str) -> bool:
+        """删除租户网络（网络内必须已无节点）
+
+        Args:
+            name: 网络名称
+
+        Returns:
+            是否成功
+
+        Raises:
+            ValueError: 网络不存在或仍有节点
+        """
+        network = self.get_network(name)
+        count = self.network_repo.node_counts().get(network.id, 0)
+        if count:
+            raise ValueError(f"网络 '{name}' 中仍有 {count} 个节点，请先删除节点")
+
+        for interface in self.interface_repo.list_by_network(network.id):
+            self.executor.execute_privileged_command(
+                ['wg-quick', 'down', interface.name],
+                capture_output=True
+            )
+            self._set_isolation(interface.name, enable=False)
+            self.executor.execute_privileged_command(
+                ['rm', '-f', interface.config_path],
+                capture_output=True
+            )
+        return self.network_repo.delete(network.id)
+
+    def get_network(self, name: str) -> Network:
+        """按名称获取租户网络
+
+        Raises:
+            ValueError: 网络不存在
+        """
+        network = self.network_repo.get_by_name(name)
+        if not network:
+            raise ValueError(f"网络 '{name}' 不存在")
+        return network
+
+    def resolve_network_id(self, name: Optional[str]) -> Optional[int]:
+        """网络名称 -> 网络 ID（默认网络为 None）
+
+        Raises:
+            ValueError: 网络不存在
+        """
+        if not name or name == config.DEFAULT_NETWORK_NAME:
+            return None
+        return self.get_network(name).id
+
+    def list_networks(self) -> List[Dict[str, Any]]:
+        """获取所有网络（默认网络在前）及其接口和节点数量"""
+        counts = self.network_repo.node_counts()
+        interfaces: Dict[Optional[int], WgInterface] = {}
+        for interface in self.interface_repo.list_all():
+            interfaces.setdefault(interface.network_id, interface)
+
+        result = []
+        server = self.server_repo.get()
+        if server:
+            result.append({
+                'id': None,
+                'name': config.DEFAULT_NETWORK_NAME,
+                'network_cidr': server.network_cidr,
+                'description': None,
+                'created_at': server.created_at.isoformat() if server.created_at else None,
+                'interface': config.WG_INTERFACE_NAME,
+                'listen_port': server.listen_port,
+                'node_count': counts.get(None, 0),
+            })
+        for network in self.network_repo.list_all():
+            result.append(self._describe(network, interfaces.get(network.id), counts.get(network.id, 0)))
+        return result
+
+    @staticmethod
+    def _describe(network: Network, interface: Optional[WgInterface], node_count: int) -> Dict[str, Any]:
+        """网络实体 -> 展示用字典"""
+        data = network.to_dict()
+        data['interface'] = interface.name if interface else None
+        data['listen_port'] = interface.listen_port if interface else None
+        data['node_count'] = node_count
+        return data
+
+    def _set_isolation(self, interface_name: str, enable: bool):
+        """添加或删除租户接口的隔离规则
+
+        网络内互通，与其他 WireGuard 接口（wg+ 通配全部分片和租户接口）之间的
+        转发全部丢弃；访问外网仍走默认的 FORWARD/NAT 规则。
+
+        Args:
+            interface_name: 租户接口名称
+            enable: True 添加，False 删除
+        """
+        wg_iface = f"{config.WG_INTERFACE_PREFIX}+"
+        rules = [
+            ['-i', wg_iface, '-o', interface_name, '-j', 'DROP'],
+            ['-i', interface_name, '-o', wg_iface, '-j', 'DROP'],
+            ['-i', interface_name, '-o', interface_name, '-j', 'ACCEPT'],
+        ]
+        try:
+            for rule in rules:
+                # 先删除已有规则，保证重复执行不叠加
+                self.executor.execute_privileged_command(
+                    ['iptables', '-D', 'FORWARD'] + rule, capture_output=True
+                )
+                if enable:
+                    # 逐条插入到链首，最后插入的网络内放行规则排在丢弃规则之前
+                    self.executor.execute_privileged_command(
+                        ['iptables', '-I', 'FORWARD'] + rule, capture_output=True
+                    )
+        except Exception as e:
+            logger.warning(f"配置网络隔离规则失败: {str(e)}")
@@ -2,18 +2,34 @@
 节点服务
 实现节点相关的业务逻辑
 """
+import logging
 import os
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterator, List
 from core.domain.node import Node
 from core.models.database import Database
 from core.models.repositories.node_repo import NodeRepository
 from core.models.repositories.server_repo import ServerRepository
+from core.models.repositories.interface_repo import InterfaceRepository
+from core.services.acl_service import AclService
+from core.services.config_service import ConfigService
+from core.services.hub_service import HubService
+from core.services.mesh_service import MESH_CACHE_SCOPE
+from core.services.network_service import NetworkService
+from core.services.policy_service import PolicyService
+from core.services.route_service import RouteService
+from core.services.server_service import ServerService
+from core.services.shaping_service import ShapingService
+from core.services.sweep_service import SweepService
 from core.utils.key_manager import KeyManager
 from core.utils.ip_allocator import IPAllocator
 from core.utils.config_generator import ConfigGenerator
+from core.utils.event_bus import publish_event
+from core.utils.fragment_cache import get_peer_fragment_cache
 from core.utils.privileged_executor import get_executor
 from config import base as config
 
+logger = logging.getLogger(__name__)
+
 
 class NodeService:
     """节点服务"""
@@ -27,19 +43,38 @@ class NodeService:
         self.db = db
         self.node_repo = NodeRepository(db)
         self.server_repo = ServerRepository(db)
+        self.interface_repo = InterfaceRepository(db)
+        self.hub_service = HubService(db)
+        self.route_service = RouteService(db)
         self.key_manager = KeyManager()
         self.ip_allocator = IPAllocator(db)
         self.config_generator = ConfigGenerator()
         self.executor = get_executor()
     
     def register_node(self, node_name: str, platform: str, 
-                     description: Optional[str] = None) -> Dict[str, Any]:
+                     description: Optional[str] = None,
+                     region: Optional[str] = None,
+                     endpoint: Optional[str] = None,
+                     routes: Optional[List[str]] = None,
+                     group: Optional[str] = None,
+                     network: Optional[str] = None,
+                     ttl=None) -> Dict[str, Any]:
         """注册新节点
         
+        存在远端中心节点时，先按归属策略选择中心节点：归属本地的节点分配到
+        节点最少的接口分片，归属远端的节点在该中心节点的网络子段内分配 IP。
+        租户网络的节点始终归属本地中心节点，使用该网络自己的接口。
+        
         Args:
             node_name: 节点名称
             platform: 平台类型（linux/windows）
             description: 节点描述
+            region: 区域标签（用于 region 归属策略）
+            endpoint: 节点公网地址（IP:Port），网状模式下可被其他节点直连
+            routes: 节点后方的子网（CIDR），不得与已有地址前缀重叠
+            group: 所属节点组名称
+            network: 所属租户网络名称，默认网络可省略
+            ttl: 有效期（如 12h、7d），到期后由节点清理删除或停用，None 表示永不过期
             
         Returns:
             节点信息字典
@@ -59,16 +94,47 @@ class NodeService:
         if self.node_repo.exists_by_name(node_name):
             raise ValueError(f"节点名称 '{node_name}' 已存在")
             
+        # 校验路由子网
+        routes = self.route_service.normalize(routes or [])
+        self.route_service.check_conflicts(routes)
+        
+        # 过期时间
+        expires_at = SweepService(self.db).expiry_from_ttl(ttl)
+        
+        # 获取节点组和租户网络
+        node_group = PolicyService(self.db).get_group(group) if group else None
+        network_id = NetworkService(self.db).resolve_network_id(network)
+            
         # 获取服务端信息
         server = self.server_repo.get()
         if not server:
             raise RuntimeError("服务端未初始化，请先运行初始化命令")
             
-        # 分配 IP 地址
-        virtual_ip = self.ip_allocator.allocate_ip(
-            server.network_cidr,
-            server.virtual_ip
-        )
+        # 选择归属中心节点（远端中心节点只承载默认网络）
+        if network_id is None:
+            hub = self.hub_service.place_node(region)
+        else:
+            hub = self.hub_service.get_local_hub()
+        
+        if hub.is_local:
+            # 选择网络内节点最少的接口分片
+            interface = self.interface_repo.get_least_loaded(network_id)
+            if not interface:
+                raise RuntimeError(f"网络 '{network}' 没有可用接口" if network_id
+                                   else "服务端未初始化，请先运行初始化命令")
+                
+            # 在分片子段内分配 IP 地址
+            virtual_ip = self.ip_allocator.allocate_interface_ip(interface)
+            
+            # 分片启用双栈时，以节点名称为哈希种子在 IPv6 子段内稀疏分配
+            virtual_ip6 = self.ip_allocator.allocate_interface_ip6(interface, node_name)
+            if interface.network6_cidr and not virtual_ip6:
+                raise RuntimeError("IPv6 地址池已耗尽，无法分配新 IP")
+        else:
+            # 远端中心节点自行拉取 [Peer] 段，本地接口分片无需变更
+            interface = None
+            virtual_ip = self.ip_allocator.allocate_hub_ip(hub)
+            virtual_ip6 = None
         
         if not virtual_ip:
             raise RuntimeError("IP 地址池已耗尽，无法分配新 IP")
@@ -86,7 +152,16 @@ class NodeService:
             public_key=public_key,
             private_key=private_key,
             platform=platform,
-            description=description
+            description=description,
+            interface_id=interface.id if interface else None,
+            hub_id=hub.id,
+            region=region,
+            endpoint=endpoint,
+            routed_subnets=','.join(routes) or None,
+            group_id=node_group.id if node_group else None,
+            virtual_ip6=virtual_ip6,
+            network_id=network_id,
+            expires_at=expires_at
         )
         
         # 验证节点数据
@@ -100,21 +175,25 @@ class NodeService:
         except Exception as e:
             raise RuntimeError(f"保存节点失败: {str(e)}")
             
-        # 更新服务端配置
-        try:
-            self._update_server_config()
-        except Exception as e:
-            # 回滚：删除已添加的节点
-            self.node_repo.delete(node_id)
-            raise RuntimeError(f"更新服务端配置失败: {str(e)}")
+        # 更新服务端配置（仅节点所在分片；远端节点带子网时更新主接口的中心节点路由）
+        if interface is not None or routes:
+            try:
+                if routes:
+                    self.route_service.apply_routes(node, added=routes)
+                else:
+                    self._update_server_config(interface.id)
+            except Exception as e:
+                # 回滚：删除已添加的节点
+                self.node_repo.delete(node_id)
+                raise RuntimeError(f"更新服务端配置失败: {str(e)}")
+        
+        # 节点组成员变化，增量更新访问控制集合和限速类
+        AclService(self.db).sync_node(None, node)
+        ShapingService(self.db).sync_node(None, node)
+        publish_event('node.created', (self.node_repo.get_by_id(node_id) or node).to_dict())
             
         # 生成配置和脚本
-        dns_server = self.db.get_config_param('dns_server') or config.DEFAULT_DNS_SERVER
-        config_content = self.config_generator.generate_client_config(
-            node_info=node.to_dict(include_private_key=True),
-            server_info=server.to_dict(include_private_key=True),
-            dns_server=dns_server
-        )
+        config_content = ConfigService(self.db).render_client_config(node)
         
         # 生成接入脚本
         server_api = f"http://SERVER_IP:8080"
@@ -133,9 +212,15 @@ class NodeService:
             'node_id': node.id,
             'node_name': node.node_name,
             'virtual_ip': node.virtual_ip,
+            'virtual_ip6': node.virtual_ip6,
             'public_key': node.public_key,
             'platform': node.platform,
             'description': node.description,
+            'hub': hub.name,
+            'routed_subnets': node.routes,
+            'group': node_group.name if node_group else None,
+            'network': network if network_id else config.DEFAULT_NETWORK_NAME,
+            'expires_at': node.expires_at,
             'config_content': config_content,
             'script_content': script_content,
             'created_at': node.created_at
@@ -159,13 +244,36 @@ class NodeService:
         else:
             raise ValueError("必须提供 node_id 或 node_name")
     
-    def list_nodes(self) -> List[Node]:
-        """获取所有节点列表
+    def list_nodes(self, network: Optional[str] = None) -> List[Node]:
+        """获取节点列表
         
+        Args:
+            network: 租户网络名称，None 表示全部网络
+            
         Returns:
             节点列表
         """
-        return self.node_repo.list_all()
+        if network is None:
+            return self.node_repo.list_all()
+        network_id = NetworkService(self.db).resolve_network_id(network)
+        return list(self.node_repo.iter_by_network(network_id))
+    
+    def iter_nodes(self, network: Optional[str] = None) -> Iterator[Node]:
+        """逐行迭代节点（直接读取数据库游标，不一次性载入内存）
+        
+        Args:
+            network: 租户网络名称，None 表示全部网络
+            
+        Returns:
+            节点实体迭代器
+            
+        Raises:
+            ValueError: 网络不存在
+        """
+        if network is None:
+            return self.node_repo.iter_all()
+        network_id = NetworkService(self.db).resolve_network_id(network)
+        return self.node_repo.iter_by_network(network_id)
     
     def delete_node(self, node_id: int) -> bool:
         """删除节点
@@ -188,11 +296,25 @@ class NodeService:
         success = self.node_repo.delete(node_id)
         
         if success:
-            # 更新服务端配置
+            get_peer_fragment_cache(MESH_CACHE_SCOPE).discard(node_id)
+            AclService(self.db).sync_node(node, None)
+            ShapingService(self.db).sync_node(node, None)
+            publish_event('node.deleted', {
+                'id': node.id, 'node_name': node.node_name, 'virtual_ip': node.virtual_ip
+            })
+            
+        if success and node.interface_id is not None:
+            get_peer_fragment_cache(node.interface_id).discard(node_id)
+            
+        if success and (node.interface_id is not None or node.routes):
+            # 更新服务端配置（仅节点所在分片），并撤销节点子网的路由
             try:
-                self._update_server_config()
+                if node.routes:
+                    self.route_service.apply_routes(node, removed=node.routes)
+                else:
+                    self._update_server_config(node.interface_id)
             except Exception as e:
-                print(f"警告: 更新服务端配置失败: {str(e)}")
+                logger.warning(f"更新服务端配置失败: {str(e)}")
                 
         return success
     
@@ -227,12 +349,7 @@ class NodeService:
         os.makedirs(node_dir, exist_ok=True)
         
         # 生成配置内容
-        dns_server = self.db.get_config_param('dns_server') or config.DEFAULT_DNS_SERVER
-        config_content = self.config_generator.generate_client_config(
-            node_info=node.to_dict(include_private_key=True),
-            server_info=server.to_dict(include_private_key=True),
-            dns_server=dns_server
-        )
+        config_content = ConfigService(self.db).render_client_config(node)
         
         # 写入配置文件
         config_path = os.path.join(node_dir, 'wg0.conf')
@@ -264,75 +381,17 @@ class NodeService:
             
         return node_dir
     
-    def _update_server_config(self):
-        """更新服务端 WireGuard 配置文件"""
-        # 获取服务端信息和所有节点
-        server = self.server_repo.get()
-        if not server:
-            raise RuntimeError("服务端未初始化")
-            
-        all_nodes = self.node_repo.list_all()
-        
-        # 转换为字典列表
-        nodes_dict = [node.to_dict(include_private_key=True) for node in all_nodes]
-        
-        # 生成配置文件内容
-        config_content = self.config_generator.generate_server_config(
-            server_info=server.to_dict(include_private_key=True),
-            nodes=nodes_dict
-        )
+    def _update_server_config(self, interface_id: Optional[int] = None):
+        """更新服务端 WireGuard 配置文件并重载
         
-        # 备份现有配置（如果存在）
-        config_path = config.WG_CONFIG_PATH
-        if os.path.exists(config_path):
-            backup_path = f"{config_path}.backup"
-            try:
-                with open(config_path, 'r') as f_src:
-                    with open(backup_path, 'w') as f_dst:
-                        f_dst.write(f_src.read())
-            except Exception as e:
-                print(f"警告: 备份配置文件失败: {str(e)}")
-        
-        # 使用特权执行器写入新配置
-        self.executor.write_privileged_file(
-            content=config_content,
-            target_path=config_path,
-            mode=0o600
-        )
+        Args:
+            interface_id: 仅更新指定接口分片，默认更新全部分片
+        """
+        server_service = ServerService(self.db)
+        server_service.update_wireguard_config(interface_id)
         
         # 重载 WireGuard 配置
         try:
-            self._reload_wireguard()
+            server_service.reload_wireguard(interface_id)
         except Exception as e:
-            print(f"警告: 重载 WireGuard 配置失败: {str(e)}")
-    
-    def _reload_wireguard(self):
-        """重载 WireGuard 配置"""
-        import subprocess
-        
-        interface_name = config.WG_INTERFACE_NAME
-        
-        # 检查接口是否存在
-        try:
-            result = self.executor.execute_privileged_command(
-                ['wg', 'show', interface_name],
-                capture_output=True,
-                text=True
-            )
-            
-            if result.returncode == 0:
-                # 接口存在，使用 syncconf 重载
-                self.executor.execute_privileged_command(
-                    ['wg', 'syncconf', interface_name, config.WG_CONFIG_PATH],
-                    check=True,
-                    capture_output=True
-                )
-            else:
-                # 接口不存在，使用 wg-quick 启动
-                self.executor.execute_privileged_command(
-                    ['wg-quick', 'up', interface_name],
-                    check=True,
-                    capture_output=True
-                )
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"重载 WireGuard 失败: {e.stderr if e.stderr else str(e)}")
+            logger.warning(f"重载 WireGuard 配置失败: {str(e)}")
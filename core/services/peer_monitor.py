@@ -0,0 +1,174 @@
+"""
+peer 状态采集器
+按固定间隔读取中心节点各接口的 peer 握手时间和收发计数，把变化作为事件发布到事件总线
+（peer.handshake / peer.traffic）；没有事件订阅者时不采样
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from core.models.database import Database
+from core.models.repositories.interface_repo import InterfaceRepository
+from core.utils.event_bus import get_event_bus, publish_event
+from core.utils.log import operation
+from core.utils.traffic_sampler import TrafficSampler
+from config import base as config
+
+logger = logging.getLogger(__name__)
+
+
+class PeerMonitor:
+    """peer 状态采集器
+
+    每个采样窗口最多发布两个事件，事件数量与节点数量无关：
+
+    - peer.handshake：最近握手时间有变化的 peer（节点重新握手、新节点首次上线）；
+    - peer.traffic：窗口内有收发的 peer 及其收发字节增量（接口重启、计数器归零后
+      以新的计数作为增量）。
+
+    第一个窗口只记录基线，不发布事件。
+    """
+
+    def __init__(self, sampler: Optional[TrafficSampler] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """初始化采集器
+
+        Args:
+            sampler: 流量采样器
+            clock: 单调时钟（计算窗口长度）
+        """
+        self.sampler = sampler or TrafficSampler()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._prev_time: Optional[float] = None
+        self._prev_transfer: Dict[str, Tuple[int, int]] = {}
+        self._prev_handshakes: Dict[str, int] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def reset(self):
+        """丢弃基线（停止采样一段时间后，下一个窗口重新记录基线）"""
+        with self._lock:
+            self._prev_time = None
+            self._prev_transfer = {}
+            self._prev_handshakes = {}
+
+    def run_once(self, db: Database) -> Dict[str, int]:
+        """采样一次并发布变化
+
+        Args:
+            db: 数据库实例
+
+        Returns:
+            本次发布的 peer 数量（handshakes/traffic）
+        """
+        with self._lock:
+            return self._run_once(db)
+
+    def _run_once(self, db: Database) -> Dict[str, int]:
+        interface_by_key: Dict[str, str] = {}
+        handshakes: Dict[str, int] = {}
+        interface_names = [interface.name for interface in InterfaceRepository(db).list_all()]
+        for name, peers in self.sampler.sample_latest_handshakes(interface_names).items():
+            for key, timestamp in peers.items():
+                handshakes[key] = timestamp
+                interface_by_key[key] = name
+        transfer = self.sampler.sample_peer_transfer(interface_names)
+
+        now = self._clock()
+        prev_time, prev_transfer, prev_handshakes = self._prev_time, self._prev_transfer, self._prev_handshakes
+        self._prev_time, self._prev_transfer, self._prev_handshakes = now, transfer, handshakes
+        if prev_time is None:
+            return {'handshakes': 0, 'traffic': 0}
+
+        handshake_keys = [
+            key for key, timestamp in handshakes.items()
+            if timestamp and timestamp != prev_handshakes.get(key, 0)
+        ]
+        deltas: Dict[str, Tuple[int, int]] = {}
+        for key, (rx, tx) in transfer.items():
+            prev_rx, prev_tx = prev_transfer.get(key, (0, 0))
+            # 计数器小于上次（接口重启）时，当前计数即为窗口内的增量
+            delta = (rx - prev_rx if rx >= prev_rx else rx, tx - prev_tx if tx >= prev_tx else tx)
+            if delta != (0, 0):
+                deltas[key] = delta
+        if not handshake_keys and not deltas:
+            return {'handshakes': 0, 'traffic': 0}
+
+        # 只有存在变化时才查询节点（远端中心节点等非节点 peer 不发布）
+        nodes = {
+            row[2]: (row[0], row[1])
+            for row in db.select_nodes(('id', 'node_name', 'public_key'))
+        }
+        handshake_peers: List[Dict[str, Any]] = [
+            {'node_id': nodes[key][0], 'node_name': nodes[key][1],
+             'interface': interface_by_key[key], 'latest_handshake': handshakes[key]}
+            for key in handshake_keys if key in nodes
+        ]
+        traffic_peers: List[Dict[str, Any]] = [
+            {'node_id': nodes[key][0], 'node_name': nodes[key][1], 'rx_bytes': rx, 'tx_bytes': tx}
+            for key, (rx, tx) in deltas.items() if key in nodes
+        ]
+        if handshake_peers:
+            publish_event('peer.handshake', {'peers': handshake_peers})
+        if traffic_peers:
+            publish_event('peer.traffic', {'interval': round(now - prev_time, 3), 'peers': traffic_peers})
+        return {'handshakes': len(handshake_peers), 'traffic': len(traffic_peers)}
+
+    def start(self, interval: Optional[int] = None) -> bool:
+        """在后台线程中周期运行
+
+        Args:
+            interval: 采样间隔（秒），默认使用全局配置
+
+        Returns:
+            是否启动（间隔为 0 或已在运行时返回 False）
+        """
+        interval = config.EVENTS_PEER_INTERVAL if interval is None else interval
+        if interval <= 0 or (self._thread and self._thread.is_alive()):
+            return False
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(interval,), name='peer-monitor', daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """停止后台线程"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _loop(self, interval: int):
+        """后台采样循环"""
+        bus = get_event_bus()
+        while not self._stop.wait(interval):
+            # 没有订阅者时不调用 wg，恢复订阅后重新记录基线
+            if not bus.subscriber_count:
+                if self._prev_time is not None:
+                    self.reset()
+                continue
+            try:
+                with operation('peer-monitor'), Database() as db:
+                    self.run_once(db)
+            except Exception as e:
+                logger.warning(f"采集 peer 状态失败: {str(e)}")
+
+
+# 全局单例
+_monitor = None
+
+
+def get_peer_monitor() -> PeerMonitor:
+    """获取全局采集器实例
+
+    Returns:
+        PeerMonitor 实例
+    """
+    global _monitor
+    if _monitor is None:
+        _monitor = PeerMonitor()
+    return _monitor
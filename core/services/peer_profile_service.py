@@ -0,0 +1,329 @@
+"""
+对端参数服务
+实现节点/平台的保活间隔和 MTU 配置管理，以及按公网地址观测结果给出保活建议
+"""
+import logging
+from typing import Optional, Dict, Any, List, Iterable, Set
+from core.domain.node import Node
+from core.domain.peer_profile import PeerProfile
+from core.models.database import Database
+from core.models.repositories.interface_repo import InterfaceRepository
+from core.models.repositories.node_repo import NodeRepository
+from core.models.repositories.peer_profile_repo import PeerProfileRepository
+from core.services.config_service import ConfigService
+from core.services.server_service import ServerService
+from core.utils.privileged_executor import get_executor
+from config import base as config
+
+logger = logging.getLogger(__name__)
+
+
+# 保活建议模式：manual 仅给出建议，auto 每次观测后自动应用
+KEEPALIVE_MODES = ('manual', 'auto')
+
+# 支持平台默认配置的平台
+PLATFORMS = ('linux', 'windows')
+
+
+class PeerProfileService:
+    """对端参数服务
+
+    保活间隔只对位于 NAT 之后的节点有意义：中心节点每隔几十秒向每个节点发一个
+    保活包，节点数量多时是一笔固定开销。配置可挂在节点或平台上，节点自身的配置
+    优先；未设置的字段继承全局参数。
+
+    保活建议依据中心节点观测到的节点公网地址（`wg show <iface> endpoints`）：
+    观测期内地址从未变化的节点建议关闭保活（改用内置的 static-endpoint 配置），
+    已关闭的节点一旦观测到地址变化即恢复继承。只处理未显式指定配置的节点。
+    """
+
+    def __init__(self, db: Database):
+        """初始化
+
+        Args:
+            db: 数据库实例
+        """
+        self.db = db
+        self.profile_repo = PeerProfileRepository(db)
+        self.node_repo = NodeRepository(db)
+        self.interface_repo = InterfaceRepository(db)
+        self.executor = get_executor()
+
+    # ---- 配置 ----
+
+    def create_profile(self, name: str, keepalive=None, mtu: Optional[int] = None,
+                       description: Optional[str] = None) -> PeerProfile:
+        """创建配置
+
+        Args:
+            name: 配置名称
+            keepalive: 保活间隔（秒，off/0 表示关闭），None 表示继承
+            mtu: 客户端接口 MTU，None 表示继承
+            description: 描述
+
+        Returns:
+            配置实体
+
+        Raises:
+            ValueError: 参数无效或名称已存在
+        """
+        if self.profile_repo.get_by_name(name):
+            raise ValueError(f"对端参数配置 '{name}' 已存在")
+
+        profile = PeerProfile(
+            name=name,
+            persistent_keepalive=self._parse_keepalive(keepalive),
+            mtu=mtu,
+            description=description
+        )
+        valid, error_msg = profile.validate()
+        if not valid:
+            raise ValueError(error_msg)
+
+        self.profile_repo.add(profile)
+        return self.profile_repo.get_by_id(profile.id)
+
+    def update_profile(self, name: str, keepalive=None, mtu=None,
+                       description: Optional[str] = None) -> PeerProfile:
+        """修改配置（未提供的字段保持不变，'none' 表示改为继承）并重载受影响的接口
+
+        Raises:
+            ValueError: 配置不存在或参数无效
+        """
+        profile = self.get_profile(name)
+        if keepalive is not None:
+            profile.persistent_keepalive = (
+                None if str(keepalive).lower() == 'none' else self._parse_keepalive(keepalive)
+            )
+        if mtu is not None:
+            profile.mtu = None if str(mtu).lower() == 'none' else self._parse_int(mtu, 'MTU')
+        if description is not None:
+            profile.description = description
+
+        valid, error_msg = profile.validate()
+        if not valid:
+            raise ValueError(error_msg)
+
+        self.profile_repo.update(profile)
+        self._reload()
+        return self.profile_repo.get_by_id(profile.id)
+
+    def delete_profile(self, name: str) -> bool:
+        """删除配置（引用它的节点和平台恢复继承）并重载接口
+
+        Raises:
+            ValueError: 配置不存在
+        """
+        result = self.profile_repo.delete(self.get_profile(name).id)
+        self._reload()
+        return result
+
+    def get_profile(self, name: str) -> PeerProfile:
+        """按名称获取配置
+
+        Raises:
+            ValueError: 配置不存在
+        """
+        profile = self.profile_repo.get_by_name(name)
+        if not profile:
+            raise ValueError(f"对端参数配置 '{name}' 不存在")
+        return profile
+
+    def list_profiles(self) -> List[PeerProfile]:
+        """获取所有配置"""
+        return self.profile_repo.list_all()
+
+    def set_node_profile(self, node_id: int, profile_name: Optional[str]) -> Node:
+        """设置节点自身的配置，并重载节点所在接口
+
+        Args:
+            node_id: 节点 ID
+            profile_name: 配置名称，None 表示使用平台默认配置
+
+        Raises:
+            ValueError: 节点或配置不存在
+        """
+        node = self.node_repo.get_by_id(node_id)
+        if not node:
+            raise ValueError(f"节点 ID {node_id} 不存在")
+        profile_id = self.get_profile(profile_name).id if profile_name else None
+        self.profile_repo.set_nodes([node.id], profile_id)
+        self._reload({node.interface_id})
+        return self.node_repo.get_by_id(node.id)
+
+    def set_platform_profile(self, platform: str, profile_name: Optional[str]) -> bool:
+        """设置平台默认配置，并重载全部接口
+
+        Args:
+            platform: 平台
+            profile_name: 配置名称，None 表示清除
+
+        Raises:
+            ValueError: 平台无效或配置不存在
+        """
+        if platform not in PLATFORMS:
+            raise ValueError(f"平台必须为 {', '.join(PLATFORMS)} 之一")
+        profile_id = self.get_profile(profile_name).id if profile_name else None
+        result = self.profile_repo.set_platform(platform, profile_id)
+        self._reload()
+        return result
+
+    # ---- 保活建议 ----
+
+    def get_mode(self) -> str:
+        """获取保活建议模式"""
+        mode = self.db.get_config_param('keepalive_mode')
+        return mode if mode in KEEPALIVE_MODES else config.DEFAULT_KEEPALIVE_MODE
+
+    def set_mode(self, mode: str) -> bool:
+        """设置保活建议模式
+
+        Raises:
+            ValueError: 模式无效
+        """
+        if mode not in KEEPALIVE_MODES:
+            raise ValueError(f"保活建议模式必须为 {', '.join(KEEPALIVE_MODES)} 之一")
+        return self.db.set_config_param('keepalive_mode', mode, '保活建议模式')
+
+    def observe(self) -> Dict[str, Any]:
+        """采样一次各本地接口上节点的公网地址，auto 模式下随即应用建议
+
+        适合由 cron 定期执行；采样间隔决定识别地址变化的灵敏度。
+
+        Returns:
+            {'observed': 记录的节点数, 'applied': 已应用的建议列表}
+        """
+        node_ids = {public_key: node_id for node_id, public_key in self.db.select_nodes(('id', 'public_key'))}
+        observations = []
+        for interface in self.interface_repo.list_all():
+            result = self.executor.execute_privileged_command(
+                ['wg', 'show', interface.name, 'endpoints'],
+                capture_output=True,
+                text=True
+            )
+            if result.returncode != 0:
+                continue
+            for line in result.stdout.splitlines():
+                parts = line.split('\t')
+                if len(parts) != 2 or parts[0] not in node_ids:
+                    continue
+                endpoint = parts[1].strip()
+                observations.append((node_ids[parts[0]], None if endpoint == '(none)' else endpoint))
+
+        self.profile_repo.record_endpoints(observations)
+        applied = []
+        if self.get_mode() == 'auto':
+            applied = self.apply_recommendations()
+        return {'observed': len(observations), 'applied': applied}
+
+    def recommend(self) -> List[Dict[str, Any]]:
+        """根据观测结果生成保活建议
+
+        Returns:
+            建议列表，action 为 disable（关闭保活）或 restore（恢复继承）
+        """
+        settings = ConfigService(self.db).get_peer_settings()
+        static = self.profile_repo.get_by_name(config.KEEPALIVE_STATIC_PROFILE)
+        static_id = static.id if static else None
+
+        recommendations = []
+        for node_id, endpoint, samples, changes, span in self.profile_repo.observations():
+            node = self.node_repo.get_by_id(node_id)
+            if node is None:
+                continue
+            action = None
+            if node.peer_profile_id is None:
+                stable = (endpoint is not None and changes == 0
+                          and samples >= config.KEEPALIVE_MIN_SAMPLES
+                          and span >= config.KEEPALIVE_MIN_OBSERVATION)
+                if stable and settings.keepalive(node) > 0:
+                    action = 'disable'
+            elif node.peer_profile_id == static_id and changes > 0:
+                action = 'restore'
+            if action:
+                recommendations.append({
+                    'node_id': node.id,
+                    'node_name': node.node_name,
+                    'endpoint': endpoint,
+                    'samples': samples,
+                    'changes': changes,
+                    'observed_seconds': span,
+                    'keepalive': settings.keepalive(node),
+                    'action': action,
+                })
+        return recommendations
+
+    def apply_recommendations(self) -> List[Dict[str, Any]]:
+        """应用保活建议并重载受影响的接口（两类节点各一次批量更新）
+
+        Returns:
+            已应用的建议列表
+        """
+        recommendations = self.recommend()
+        if not recommendations:
+            return []
+
+        disable = [item['node_id'] for item in recommendations if item['action'] == 'disable']
+        restore = [item['node_id'] for item in recommendations if item['action'] == 'restore']
+        if disable:
+            self.profile_repo.set_nodes(disable, self._static_profile().id)
+        if restore:
+            # 恢复保活后重新开始观测，地址再次稳定时可以重新关闭
+            self.profile_repo.set_nodes(restore, None)
+            self.profile_repo.reset_observations(restore)
+
+        interface_ids = {self.node_repo.get_by_id(node_id).interface_id for node_id in disable + restore}
+        self._reload(interface_ids)
+        return recommendations
+
+    def _static_profile(self) -> PeerProfile:
+        """获取（不存在时创建）关闭保活的内置配置"""
+        profile = self.profile_repo.get_by_name(config.KEEPALIVE_STATIC_PROFILE)
+        if profile is None:
+            profile = PeerProfile(
+                name=config.KEEPALIVE_STATIC_PROFILE,
+                persistent_keepalive=0,
+                description='公网地址固定的节点（保活建议自动应用）'
+            )
+            self.profile_repo.add(profile)
+        return profile
+
+    # ---- 内部 ----
+
+    def _reload(self, interface_ids: Optional[Iterable[Optional[int]]] = None):
+        """重写并重载接口配置，使中心节点侧的保活间隔生效
+
+        Args:
+            interface_ids: 受影响的接口 ID，None 表示全部接口
+        """
+        if not self.interface_repo.list_all():
+            return
+        server_service = ServerService(self.db)
+        if interface_ids is None:
+            targets: Set[Optional[int]] = {None}
+        else:
+            # 远端中心节点上的节点（无接口 ID）由远端拉取 [Peer] 段时生效
+            targets = {interface_id for interface_id in interface_ids if interface_id is not None}
+        try:
+            for interface_id in targets:
+                server_service.update_wireguard_config(interface_id)
+                server_service.reload_wireguard(interface_id)
+        except Exception as e:
+            logger.warning(f"重载 WireGuard 配置失败: {str(e)}")
+
+    @staticmethod
+    def _parse_keepalive(value) -> Optional[int]:
+        """解析保活间隔（off 表示关闭，即 0）"""
+        if value is None or value == '':
+            return None
+        if str(value).lower() == 'off':
+            return 0
+        return PeerProfileService._parse_int(value, '保活间隔')
+
+    @staticmethod
+    def _parse_int(value, label: str) -> int:
+        """解析整数参数"""
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{label}必须为整数: {value}")
@@ -0,0 +1,341 @@
+"""
+路由策略服务
+实现分流策略、节点组的管理，以及客户端 AllowedIPs 的编译和按版本缓存
+"""
+import threading
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+from core.domain.group import NodeGroup
+from core.domain.node import Node
+from core.domain.policy import RoutingPolicy
+from core.models.database import Database
+from core.models.repositories.group_repo import GroupRepository
+from core.models.repositories.node_repo import NodeRepository
+from core.models.repositories.policy_repo import PolicyRepository
+from core.services.acl_service import AclService
+from core.services.shaping_service import ShapingService
+from core.utils.cidr_compactor import compact_prefixes
+
+
+# 策略 ID -> (版本号, 编译结果)；策略修改后版本号递增，旧结果自然失效
+_compiled_policies: Dict[int, Tuple[int, List[str]]] = {}
+_compiled_lock = threading.Lock()
+
+
+def _clear_compiled_policies():
+    """丢弃全部编译结果（回滚后策略版本号回退，可能与之后的新版本重合）"""
+    with _compiled_lock:
+        _compiled_policies.clear()
+
+
+Database.on_rollback(_clear_compiled_policies)
+
+
+class PolicyService:
+    """路由策略服务
+
+    策略以包含/排除前缀集合描述客户端经隧道转发的流量（如“除 RFC1918 和办公网段
+    外的全部流量”），编译为最少的等价 CIDR 列表作为中心节点 [Peer] 的 AllowedIPs。
+    节点自身的策略优先于节点组的策略；虚拟网络段和其他节点的路由子网始终保留，
+    不受排除前缀影响。
+    """
+
+    def __init__(self, db: Database):
+        """初始化
+
+        Args:
+            db: 数据库实例
+        """
+        self.db = db
+        self.policy_repo = PolicyRepository(db)
+        self.group_repo = GroupRepository(db)
+        self.node_repo = NodeRepository(db)
+
+    # ---- 策略 ----
+
+    def create_policy(self, name: str, include: Iterable[str],
+                      exclude: Iterable[str] = (),
+                      description: Optional[str] = None) -> RoutingPolicy:
+        """创建路由策略
+
+        Args:
+            name: 策略名称
+            include: 包含的前缀（可用别名，如 any、rfc1918）
+            exclude: 排除的前缀
+            description: 描述
+
+        Returns:
+            策略实体
+
+        Raises:
+            ValueError: 参数无效或名称已存在
+        """
+        if self.policy_repo.get_by_name(name):
+            raise ValueError(f"路由策略 '{name}' 已存在")
+
+        policy = RoutingPolicy(
+            name=name,
+            include_prefixes=self._join(include),
+            exclude_prefixes=self._join(exclude) or None,
+            description=description
+        )
+        valid, error_msg = policy.validate()
+        if not valid:
+            raise ValueError(error_msg)
+
+        self.policy_repo.add(policy)
+        return self.policy_repo.get_by_id(policy.id)
+
+    def update_policy(self, name: str, include: Optional[Iterable[str]] = None,
+                      exclude: Optional[Iterable[str]] = None,
+                      description: Optional[str] = None) -> RoutingPolicy:
+        """更新路由策略（未提供的字段保持不变，版本号递增）
+
+        Args:
+            name: 策略名称
+            include: 新的包含前缀
+            exclude: 新的排除前缀
+            description: 新的描述
+
+        Returns:
+            更新后的策略实体
+
+        Raises:
+            ValueError: 策略不存在或参数无效
+        """
+        policy = self.get_policy(name)
+        if include is not None:
+            policy.include_prefixes = self._join(include)
+        if exclude is not None:
+            policy.exclude_prefixes = self._join(exclude) or None
+        if description is not None:
+            policy.description = description
+
+        valid, error_msg = policy.validate()
+        if not valid:
+            raise ValueError(error_msg)
+
+        self.policy_repo.update(policy)
+        return self.policy_repo.get_by_id(policy.id)
+
+    def delete_policy(self, name: str) -> bool:
+        """删除路由策略（引用它的节点和节点组恢复默认路由）
+
+        Args:
+            name: 策略名称
+
+        Returns:
+            是否成功
+
+        Raises:
+            ValueError: 策略不存在
+        """
+        policy = self.get_policy(name)
+        with _compiled_lock:
+            _compiled_policies.pop(policy.id, None)
+        return self.policy_repo.delete(policy.id)
+
+    def get_policy(self, name: str) -> RoutingPolicy:
+        """按名称获取路由策略
+
+        Raises:
+            ValueError: 策略不存在
+        """
+        policy = self.policy_repo.get_by_name(name)
+        if not policy:
+            raise ValueError(f"路由策略 '{name}' 不存在")
+        return policy
+
+    def list_policies(self) -> List[RoutingPolicy]:
+        """获取所有路由策略"""
+        return self.policy_repo.list_all()
+
+    def compile_policy(self, policy: RoutingPolicy) -> List[str]:
+        """编译策略为最少的等价 CIDR 列表（按策略版本缓存）
+
+        Args:
+            policy: 策略实体
+
+        Returns:
+            CIDR 列表
+        """
+        cached = _compiled_policies.get(policy.id)
+        if cached is not None and cached[0] == policy.version:
+            return cached[1]
+
+        compiled = compact_prefixes(policy.includes, policy.excludes)
+        with _compiled_lock:
+            _compiled_policies[policy.id] = (policy.version, compiled)
+        return compiled
+
+    @staticmethod
+    def preview(include: Iterable[str], exclude: Iterable[str] = ()) -> List[str]:
+        """不保存策略，直接计算包含/排除前缀的压缩结果
+
+        Raises:
+            ValueError: 前缀格式错误
+        """
+        return compact_prefixes(include, exclude)
+
+    # ---- 节点组 ----
+
+    def create_group(self, name: str, policy: Optional[str] = None,
+                     description: Optional[str] = None) -> NodeGroup:
+        """创建节点组
+
+        Args:
+            name: 节点组名称
+            policy: 组内节点默认使用的路由策略名称
+            description: 描述
+
+        Returns:
+            节点组实体
+
+        Raises:
+            ValueError: 参数无效、名称已存在或策略不存在
+        """
+        if self.group_repo.get_by_name(name):
+            raise ValueError(f"节点组 '{name}' 已存在")
+
+        group = NodeGroup(
+            name=name,
+            policy_id=self.get_policy(policy).id if policy else None,
+            description=description
+        )
+        valid, error_msg = group.validate()
+        if not valid:
+            raise ValueError(error_msg)
+
+        self.group_repo.add(group)
+        AclService(self.db).refresh()
+        return self.group_repo.get_by_id(group.id)
+
+    def delete_group(self, name: str) -> bool:
+        """删除节点组（组内节点变为未分组，引用该组的放行规则一并删除）
+
+        Raises:
+            ValueError: 节点组不存在
+        """
+        group = self.get_group(name)
+        shaping_service = ShapingService(self.db)
+        shaping = shaping_service.snapshot()
+        result = self.group_repo.delete(group.id)
+        AclService(self.db).refresh()
+        shaping_service.sync(shaping)
+        return result
+
+    def get_group(self, name: str) -> NodeGroup:
+        """按名称获取节点组
+
+        Raises:
+            ValueError: 节点组不存在
+        """
+        group = self.group_repo.get_by_name(name)
+        if not group:
+            raise ValueError(f"节点组 '{name}' 不存在")
+        return group
+
+    def list_groups(self) -> List[Dict[str, Any]]:
+        """获取所有节点组及其节点数量和策略名称"""
+        counts = self.group_repo.node_counts()
+        policy_names = {policy.id: policy.name for policy in self.policy_repo.list_all()}
+        result = []
+        for group in self.group_repo.list_all():
+            data = group.to_dict()
+            data['policy'] = policy_names.get(group.policy_id)
+            data['node_count'] = counts.get(group.id, 0)
+            result.append(data)
+        return result
+
+    def set_group_policy(self, group_name: str, policy_name: Optional[str]) -> NodeGroup:
+        """设置节点组的路由策略
+
+        Args:
+            group_name: 节点组名称
+            policy_name: 策略名称，None 表示清除
+
+        Raises:
+            ValueError: 节点组或策略不存在
+        """
+        group = self.get_group(group_name)
+        policy_id = self.get_policy(policy_name).id if policy_name else None
+        self.group_repo.set_policy(group.id, policy_id)
+        return self.group_repo.get_by_id(group.id)
+
+    def assign_group(self, node_id: int, group_name: Optional[str]) -> Node:
+        """将节点加入节点组
+
+        Args:
+            node_id: 节点 ID
+            group_name: 节点组名称，None 表示移出节点组
+
+        Raises:
+            ValueError: 节点或节点组不存在
+        """
+        node = self._get_node(node_id)
+        group_id = self.get_group(group_name).id if group_name else None
+        self.node_repo.set_group(node.id, group_id)
+        updated = self.node_repo.get_by_id(node.id)
+        AclService(self.db).sync_node(node, updated)
+        ShapingService(self.db).sync_node(node, updated)
+        return updated
+
+    def set_node_policy(self, node_id: int, policy_name: Optional[str]) -> Node:
+        """设置节点自身的路由策略
+
+        Args:
+            node_id: 节点 ID
+            policy_name: 策略名称，None 表示使用节点组的策略
+
+        Raises:
+            ValueError: 节点或策略不存在
+        """
+        node = self._get_node(node_id)
+        policy_id = self.get_policy(policy_name).id if policy_name else None
+        self.node_repo.set_policy(node.id, policy_id)
+        return self.node_repo.get_by_id(node.id)
+
+    # ---- 客户端 AllowedIPs ----
+
+    def resolve_policy(self, node: Node) -> Optional[RoutingPolicy]:
+        """获取节点生效的路由策略（节点自身优先，其次节点组）
+
+        Returns:
+            策略实体，未设置时返回 None
+        """
+        policy_id = node.policy_id
+        if policy_id is None and node.group_id is not None:
+            group = self.group_repo.get_by_id(node.group_id)
+            policy_id = group.policy_id if group else None
+        return self.policy_repo.get_by_id(policy_id) if policy_id is not None else None
+
+    def get_client_allowed_ips(self, node: Node, required: List[str]) -> Optional[List[str]]:
+        """计算节点中心节点 [Peer] 的 AllowedIPs
+
+        Args:
+            node: 节点实体
+            required: 必须经中心节点路由的前缀（虚拟网络段、其他节点的路由子网）
+
+        必须的前缀按原顺序排在最前（接入脚本取第一项推算服务端地址），其后是策略前缀
+        减去这些前缀后压缩的 CIDR，两部分不重叠。
+
+        Returns:
+            CIDR 列表，节点未使用策略时返回 None
+        """
+        policy = self.resolve_policy(node)
+        if policy is None:
+            return None
+        required = list(dict.fromkeys(required))
+        return required + compact_prefixes(self.compile_policy(policy), required)
+
+    def _get_node(self, node_id: int) -> Node:
+        """获取节点，不存在时抛出 ValueError"""
+        node = self.node_repo.get_by_id(node_id)
+        if not node:
+            raise ValueError(f"节点 ID {node_id} 不存在")
+        return node
+
+    @staticmethod
+    def _join(prefixes: Iterable[str]) -> str:
+        """前缀列表 -> 存储格式（逗号分隔，允许输入中含逗号）"""
+        items = [item.strip() for prefix in prefixes for item in prefix.split(',')]
+        return ','.join(item for item in items if item)
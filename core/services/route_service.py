@@ -0,0 +1,256 @@
+"""
+路由子网服务
+实现节点后方子网（站点互联）的登记、重叠校验和地址归属查询
+"""
+import ipaddress
+import logging
+from typing import Optional, Dict, Any, List, Iterable
+from core.domain.node import Node
+from core.models.database import Database
+from core.models.repositories.node_repo import NodeRepository
+from core.models.repositories.interface_repo import InterfaceRepository
+from core.services.acl_service import AclService
+from core.services.server_service import ServerService
+from core.services.shaping_service import ShapingService
+from core.utils.prefix_index import get_prefix_index, owner_to_dict
+from core.utils.prefix_trie import PrefixTrie
+from core.utils.privileged_executor import get_executor
+
+logger = logging.getLogger(__name__)
+
+
+class RouteService:
+    """路由子网服务
+
+    节点可声明其后方的子网（如办公室局域网），中心节点和其他节点经该节点访问这些子网。
+    子网不得与虚拟网络段、任何节点 IP 或其他节点的子网重叠，重叠检测和地址归属查询
+    都通过前缀索引完成，耗时与节点数量无关。
+    """
+
+    def __init__(self, db: Database):
+        """初始化
+
+        Args:
+            db: 数据库实例
+        """
+        self.db = db
+        self.node_repo = NodeRepository(db)
+        self.interface_repo = InterfaceRepository(db)
+        self.executor = get_executor()
+
+    @staticmethod
+    def normalize(routes: Iterable[str]) -> List[str]:
+        """规整并校验子网列表
+
+        Args:
+            routes: 子网（CIDR）列表
+
+        Returns:
+            规整后的子网列表（去重，保持顺序）
+
+        Raises:
+            ValueError: 格式错误或列表内互相重叠
+        """
+        result = []
+        trie = PrefixTrie()
+        for route in routes:
+            route = route.strip()
+            if not route:
+                continue
+            try:
+                network = ipaddress.ip_network(route, strict=True)
+            except ValueError:
+                raise ValueError(f"子网格式错误: {route}（应为 CIDR 格式，如 192.168.10.0/24）")
+            if network.prefixlen == 0:
+                raise ValueError(f"不能路由默认路由: {route}")
+
+            overlaps = trie.overlaps(network, limit=1)
+            if overlaps:
+                if overlaps[0][0] == network:
+                    continue
+                raise ValueError(f"子网 {network} 与 {overlaps[0][0]} 重叠")
+            trie.insert(network)
+            result.append(str(network))
+        return result
+
+    def check_conflicts(self, routes: Iterable[str], node_id: Optional[int] = None):
+        """检查子网是否与已有地址前缀重叠
+
+        Args:
+            routes: 已规整的子网列表
+            node_id: 子网所属节点（其原有子网不计为冲突）
+
+        Raises:
+            ValueError: 存在重叠
+        """
+        index = get_prefix_index(self.db)
+        for route in routes:
+            conflicts = index.find_conflicts(route, ignore_node_id=node_id)
+            if conflicts:
+                network, owner = conflicts[0]
+                kinds = {'node': '节点', 'route': '节点', 'network': '网络段'}
+                raise ValueError(
+                    f"子网 {route} 与{kinds.get(owner.kind, '')} {owner.name} 的 {network} 重叠"
+                )
+
+    def set_routes(self, node_id: int, routes: Iterable[str]) -> Node:
+        """替换节点路由的全部子网
+
+        Args:
+            node_id: 节点 ID
+            routes: 子网列表，空列表表示清除
+
+        Returns:
+            更新后的节点实体
+
+        Raises:
+            ValueError: 节点不存在、格式错误或子网重叠
+        """
+        node = self.node_repo.get_by_id(node_id)
+        if not node:
+            raise ValueError(f"节点 ID {node_id} 不存在")
+
+        routes = self.normalize(routes)
+        self.check_conflicts(routes, node_id)
+
+        previous = node.routes
+        if routes == previous:
+            return node
+
+        self.node_repo.set_routes(node_id, routes)
+        try:
+            self.apply_routes(node, added=[r for r in routes if r not in previous],
+                              removed=[r for r in previous if r not in routes])
+        except RuntimeError as e:
+            logger.warning(str(e))
+        updated = self.node_repo.get_by_id(node_id)
+        AclService(self.db).sync_node(node, updated)
+        ShapingService(self.db).sync_node(node, updated)
+        return updated
+
+    def add_route(self, node_id: int, route: str) -> Node:
+        """为节点添加一个路由子网
+
+        Args:
+            node_id: 节点 ID
+            route: 子网（CIDR）
+
+        Returns:
+            更新后的节点实体
+
+        Raises:
+            ValueError: 节点不存在、格式错误或子网重叠
+        """
+        node = self.node_repo.get_by_id(node_id)
+        if not node:
+            raise ValueError(f"节点 ID {node_id} 不存在")
+        return self.set_routes(node_id, node.routes + [route])
+
+    def remove_route(self, node_id: int, route: str) -> Node:
+        """删除节点的一个路由子网
+
+        Args:
+            node_id: 节点 ID
+            route: 子网（CIDR）
+
+        Returns:
+            更新后的节点实体
+
+        Raises:
+            ValueError: 节点不存在或未路由该子网
+        """
+        node = self.node_repo.get_by_id(node_id)
+        if not node:
+            raise ValueError(f"节点 ID {node_id} 不存在")
+        try:
+            route = str(ipaddress.ip_network(route.strip(), strict=False))
+        except ValueError:
+            raise ValueError(f"子网格式错误: {route}")
+        if route not in node.routes:
+            raise ValueError(f"节点 '{node.node_name}' 未路由子网 {route}")
+        return self.set_routes(node_id, [r for r in node.routes if r != route])
+
+    def list_routes(self) -> List[Dict[str, Any]]:
+        """获取全部路由子网
+
+        Returns:
+            路由列表（subnet、node_id、node_name、hub_id）
+        """
+        names = {
+            node_id: name
+            for node_id, name in self.db.select_nodes(
+                ('id', 'node_name'), where='routed_subnets IS NOT NULL'
+            )
+        }
+        return [
+            {'subnet': subnet, 'node_id': node_id, 'node_name': names.get(node_id), 'hub_id': hub_id}
+            for node_id, hub_id, _, routed_subnets in self.db.get_routed_subnets()
+            for subnet in routed_subnets.split(',')
+        ]
+
+    def whois(self, address: str) -> Dict[str, Any]:
+        """查询地址归属
+
+        Args:
+            address: IP 地址
+
+        Returns:
+            归属信息（kind 为 node/route/network，未知地址为 None）
+
+        Raises:
+            ValueError: 地址格式错误
+        """
+        try:
+            ip = ipaddress.ip_address(address.strip())
+        except ValueError:
+            raise ValueError(f"IP 地址格式错误: {address}")
+
+        result: Dict[str, Any] = {'address': str(ip), 'prefix': None, 'kind': None, 'id': None, 'name': None}
+        match = get_prefix_index(self.db).lookup(ip)
+        if match:
+            result.update(owner_to_dict(*match))
+        return result
+
+    def apply_routes(self, node: Node, added: Iterable[str] = (), removed: Iterable[str] = ()):
+        """将节点及其子网变化应用到本地中心节点
+
+        归属本地的节点更新其所在分片；归属远端中心节点的节点由主接口上指向
+        该中心节点的 [Peer] 段路由。远端中心节点和客户端通过拉取配置获得变化。
+
+        Args:
+            node: 节点实体
+            added: 新增子网
+            removed: 删除子网
+
+        Raises:
+            RuntimeError: 更新服务端配置失败
+        """
+        if node.interface_id is not None:
+            interface = self.interface_repo.get_by_id(node.interface_id)
+        else:
+            interfaces = self.interface_repo.list_by_network(node.network_id)
+            interface = interfaces[0] if interfaces else None
+        if interface is None:
+            return
+
+        server_service = ServerService(self.db)
+        try:
+            server_service.update_wireguard_config(interface.id)
+        except Exception as e:
+            raise RuntimeError(f"更新服务端配置失败: {str(e)}")
+        try:
+            server_service.reload_wireguard(interface.id)
+        except Exception as e:
+            logger.warning(f"重载 WireGuard 配置失败: {str(e)}")
+            return
+
+        # wg syncconf 不维护内核路由，按子网变化增删
+        for action, routes in (('del', removed), ('replace', added)):
+            for route in routes:
+                result = self.executor.execute_privileged_command(
+                    ['ip', 'route', action, route, 'dev', interface.name],
+                    capture_output=True,
+                    text=True
+                )
+                if result.returncode != 0 and action == 'replace':
+                    logger.warning(f"添加路由 {route} 失败: {result.stderr.strip()}")
@@ -2,18 +2,33 @@
 服务端服务
 实现服务端相关的业务逻辑
 """
+import ipaddress
+import logging
 import os
+import shutil
 import subprocess
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+from core.domain.interface import WgInterface
 from core.domain.server import Server
 from core.models.database import Database
 from core.models.repositories.server_repo import ServerRepository
 from core.models.repositories.node_repo import NodeRepository
+from core.models.repositories.interface_repo import InterfaceRepository
+from core.services.acl_service import AclService
+from core.services.config_service import ConfigService
+from core.services.shaping_service import ShapingService
+from core.utils.ip_allocator import IPAllocator
 from core.utils.key_manager import KeyManager
 from core.utils.config_generator import ConfigGenerator
+from core.utils.deferred_apply import PendingApply, pending_apply
+from core.utils.event_bus import publish_event
+from core.utils.fragment_cache import get_peer_fragment_cache
+from core.utils.metrics import RELOADS, RELOAD_REQUESTS, RENDER_SECONDS
 from core.utils.privileged_executor import get_executor
 from config import base as config
 
+logger = logging.getLogger(__name__)
+
 
 class ServerService:
     """服务端服务"""
@@ -27,7 +42,9 @@ class ServerService:
         self.db = db
         self.server_repo = ServerRepository(db)
         self.node_repo = NodeRepository(db)
+        self.interface_repo = InterfaceRepository(db)
         self.key_manager = KeyManager()
+        self.config_service = ConfigService(db)
         self.config_generator = ConfigGenerator()
         self.executor = get_executor()
     
@@ -54,15 +71,19 @@ class ServerService:
                          network_cidr: Optional[str] = None,
                          server_ip: Optional[str] = None,
                          public_endpoint: Optional[str] = None,
-                         force: bool = False) -> Server:
+                         force: bool = False,
+                         shards: Optional[int] = None,
+                         ipv6: Optional[str] = None) -> Server:
         """初始化服务端
         
         Args:
-            listen_port: WireGuard 监听端口
+            listen_port: WireGuard 监听端口（第 0 个分片，其余分片依次递增）
             network_cidr: 虚拟网络段
             server_ip: 服务端虚拟 IP
             public_endpoint: 公网地址（IP:Port 或域名:Port）
             force: 是否强制重新初始化
+            shards: 接口分片数量（wg0..wgN-1），网络段按分片数等分
+            ipv6: 启用双栈：IPv6 网络段，或 'auto' 表示生成随机 ULA 网络段
             
         Returns:
             服务端实体
@@ -74,6 +95,7 @@ class ServerService:
         listen_port = listen_port or config.DEFAULT_LISTEN_PORT
         network_cidr = network_cidr or config.DEFAULT_NETWORK_CIDR
         server_ip = server_ip or config.DEFAULT_SERVER_IP
+        shards = shards or config.DEFAULT_SHARD_COUNT
         
         # 检查系统要求
         ok, errors = self.check_system_requirements()
@@ -95,6 +117,9 @@ class ServerService:
         # 初始化数据库
         self.db.init_database()
         
+        # 解析 IPv6 网络段，服务端取其第一个主机地址
+        network6 = self.resolve_network6(ipv6) if ipv6 else None
+        
         # 创建服务端实体
         server = Server(
             public_key=public_key,
@@ -102,7 +127,9 @@ class ServerService:
             virtual_ip=server_ip,
             listen_port=listen_port,
             network_cidr=network_cidr,
-            public_endpoint=public_endpoint
+            public_endpoint=public_endpoint,
+            network6_cidr=str(network6) if network6 else None,
+            virtual_ip6=str(network6.network_address + 1) if network6 else None
         )
         
         # 验证服务端数据
@@ -110,152 +137,524 @@ class ServerService:
         if not valid:
             raise ValueError(error_msg)
         
+        # 规划接口分片
+        interfaces = self._plan_interfaces(server, shards)
+        
         # 保存服务端信息
         try:
             self.server_repo.save(server)
         except Exception as e:
             raise RuntimeError(f"保存服务端信息失败: {str(e)}")
         
+        # 保存接口分片，并将已有节点归入所在子段的分片
+        try:
+            self._replace_interfaces(interfaces)
+        except Exception as e:
+            raise RuntimeError(f"保存接口分片失败: {str(e)}")
+        
+        # 重新初始化时按新的 IPv6 子段调整已有节点的地址
+        assignments = self._plan_node_ip6(interfaces)
+        if assignments:
+            self.server_repo.save_ipv6(server, interfaces, assignments)
+        
         # 生成服务端配置文件
         try:
-            config_content = self.config_generator.generate_server_config(
-                server_info=server.to_dict(include_private_key=True),
-                nodes=[]  # 初始时没有节点
-            )
-            
-            # 使用特权执行器写入配置文件
-            self.executor.write_privileged_file(
-                content=config_content,
-                target_path=config.WG_CONFIG_PATH,
-                mode=0o600
-            )
+            self.update_wireguard_config()
         except Exception as e:
             raise RuntimeError(f"生成配置文件失败: {str(e)}")
         
         # 启动 WireGuard 接口
-        try:
-            self._start_wireguard()
-        except Exception as e:
-            # 仅警告，不抛出异常
-            print(f"警告: WireGuard 接口启动失败: {str(e)}")
+        for interface in interfaces:
+            try:
+                self._start_wireguard(interface.name)
+            except Exception as e:
+                # 仅警告，不抛出异常
+                logger.warning(f"WireGuard 接口 {interface.name} 启动失败: {str(e)}")
+        
+        # 接口已重新创建，整体下发限速规则
+        ShapingService(self.db).refresh()
         
         # 配置 IP 转发和 NAT
         try:
             self._configure_networking()
         except Exception as e:
             # 仅警告，不抛出异常
-            print(f"警告: 网络配置失败: {str(e)}")
+            logger.warning(f"网络配置失败: {str(e)}")
         
         return server
     
-    def get_server_info(self) -> Optional[Server]:
-        """获取服务端信息
+    def enable_ipv6(self, prefix: str = 'auto') -> Dict[str, Any]:
+        """为已初始化的服务端启用 IPv6 双栈
+        
+        IPv6 网络段按接口分片数等分，已有节点在一次遍历中批量分配地址，
+        全部结果在同一个事务中写入；之后每个分片的配置只重写和重载一次。
         
+        Args:
+            prefix: IPv6 网络段，'auto' 表示生成随机 ULA 网络段
+            
         Returns:
-            服务端实体，不存在返回None
+            {'network6_cidr', 'virtual_ip6', 'assigned'}
+            
+        Raises:
+            ValueError: 网络段无效或已启用 IPv6
+            RuntimeError: 服务端未初始化或地址分配失败
         """
-        return self.server_repo.get()
-    
-    def update_wireguard_config(self):
-        """更新服务端 WireGuard 配置文件"""
-        # 获取服务端信息和所有节点
         server = self.server_repo.get()
         if not server:
             raise RuntimeError("服务端未初始化")
+        if server.network6_cidr:
+            raise ValueError(f"IPv6 已启用: {server.network6_cidr}")
             
-        all_nodes = self.node_repo.list_all()
+        network6 = self.resolve_network6(prefix)
+        server.network6_cidr = str(network6)
+        server.virtual_ip6 = str(network6.network_address + 1)
         
-        # 转换为字典列表
-        nodes_dict = [node.to_dict(include_private_key=True) for node in all_nodes]
+        interfaces = self.interface_repo.list_by_network(None)
+        subnets = self._split_network6(server, len(interfaces))
+        for interface, (subnet, virtual_ip6) in zip(interfaces, subnets):
+            interface.network6_cidr = subnet
+            interface.virtual_ip6 = virtual_ip6
+            
+        assignments = self._plan_node_ip6(interfaces)
+        shaping_service = ShapingService(self.db)
+        shaping = shaping_service.snapshot([interface.id for interface in interfaces])
+        self.server_repo.save_ipv6(server, interfaces, assignments)
+        AclService(self.db).refresh()
+        shaping_service.sync(shaping)
         
-        # 生成配置文件内容
-        config_content = self.config_generator.generate_server_config(
-            server_info=server.to_dict(include_private_key=True),
-            nodes=nodes_dict
-        )
+        # 重写配置；运行中的接口用 syncconf 不会添加地址，需单独添加
+        self.update_wireguard_config()
+        for interface in interfaces:
+            self.executor.execute_privileged_command(
+                ['ip', '-6', 'address', 'replace',
+                 f"{interface.virtual_ip6}/{interface.prefix6_length}", 'dev', interface.name],
+                capture_output=True
+            )
+        try:
+            self._configure_ipv6_forwarding()
+        except Exception as e:
+            logger.warning(f"IPv6 转发配置失败: {str(e)}")
+        try:
+            self.reload_wireguard()
+        except RuntimeError as e:
+            logger.warning(str(e))
+            
+        return {
+            'network6_cidr': server.network6_cidr,
+            'virtual_ip6': server.virtual_ip6,
+            'assigned': len(assignments),
+        }
+    
+    def _plan_node_ip6(self, interfaces: List[WgInterface]) -> List[tuple]:
+        """为接口分片上的节点批量规划 IPv6 地址（只读，不写入数据库）
         
-        # 备份现有配置（如果存在）
-        config_path = config.WG_CONFIG_PATH
-        if os.path.exists(config_path):
-            backup_path = f"{config_path}.backup"
-            try:
-                with open(config_path, 'r') as f_src:
-                    with open(backup_path, 'w') as f_dst:
-                        f_dst.write(f_src.read())
-            except Exception as e:
-                print(f"警告: 备份配置文件失败: {str(e)}")
+        地址已在所属分片子段内的节点保持不变；分片未启用 IPv6 时清除节点地址。
+        同一批次内已分配的地址通过 taken 传给分配器，避免批内冲突。
         
-        # 使用特权执行器写入新配置
-        self.executor.write_privileged_file(
-            content=config_content,
-            target_path=config_path,
-            mode=0o600
-        )
+        Args:
+            interfaces: 接口分片实体（已设置 IPv6 子段）
+            
+        Returns:
+            (IPv6 地址或 None, 节点ID) 列表
+            
+        Raises:
+            RuntimeError: 地址池已耗尽
+        """
+        allocator = IPAllocator(self.db)
+        taken = set()
+        assignments = []
+        for interface in interfaces:
+            subnet = (
+                ipaddress.IPv6Network(interface.network6_cidr)
+                if interface.network6_cidr else None
+            )
+            for node in self.node_repo.iter_by_interface(interface.id, include_disabled=True):
+                current = node.virtual_ip6
+                if subnet is None:
+                    if current:
+                        assignments.append((None, node.id))
+                    continue
+                if current and ipaddress.IPv6Address(current) in subnet:
+                    continue
+                address = allocator.allocate_interface_ip6(interface, node.node_name, taken)
+                if not address:
+                    raise RuntimeError(f"IPv6 地址池已耗尽: {subnet}")
+                taken.add(int(ipaddress.IPv6Address(address)))
+                assignments.append((address, node.id))
+        return assignments
     
-    def reload_wireguard(self):
-        """重载 WireGuard 配置"""
-        interface_name = config.WG_INTERFACE_NAME
+    @staticmethod
+    def resolve_network6(prefix: str) -> ipaddress.IPv6Network:
+        """解析 IPv6 网络段
         
-        # 检查接口是否存在
+        Args:
+            prefix: IPv6 网络段，'auto' 表示生成随机 ULA 网络段
+            
+        Returns:
+            IPv6 网络对象
+            
+        Raises:
+            ValueError: 格式错误或网络段过小
+        """
+        if prefix == 'auto':
+            prefix = IPAllocator.generate_ula_network(config.DEFAULT_NETWORK6_PREFIXLEN)
         try:
-            result = self.executor.execute_privileged_command(
-                ['wg', 'show', interface_name],
-                capture_output=True,
-                text=True
-            )
+            network = ipaddress.ip_network(prefix, strict=False)
+        except ValueError:
+            raise ValueError(f"IPv6 网络段格式错误: {prefix}")
+        if network.version != 6:
+            raise ValueError(f"不是 IPv6 网络段: {prefix}")
+        if network.prefixlen > 120:
+            raise ValueError(f"IPv6 网络段 {prefix} 过小，前缀长度不能超过 /120")
+        return network
+    
+    def get_server_info(self) -> Optional[Server]:
+        """获取服务端信息
+        
+        Returns:
+            服务端实体，不存在返回None
+        """
+        return self.server_repo.get()
+    
+    def list_interfaces(self) -> List[WgInterface]:
+        """获取默认网络的接口分片
+        
+        Returns:
+            接口分片列表（第一个为主接口）
+        """
+        return self.interface_repo.list_by_network(None)
+    
+    def update_wireguard_config(self, interface_id: Optional[int] = None):
+        """更新服务端 WireGuard 配置文件
+        
+        节点从数据库游标逐行读取并流式写入临时文件后原子替换，
+        峰值内存与节点数量无关。
+        
+        批处理（defer_apply）期间只记录接口，提交后由 apply_deferred() 统一重写。
+        
+        Args:
+            interface_id: 仅更新指定接口分片，默认更新全部分片
+        """
+        pending = pending_apply()
+        if pending is not None:
+            pending.configs.add(interface_id)
+            return
+        for interface in self._target_interfaces(interface_id):
+            # 备份现有配置（如果存在）
+            config_path = interface.config_path
+            if os.path.exists(config_path):
+                backup_path = f"{config_path}.backup"
+                try:
+                    shutil.copyfile(config_path, backup_path)
+                except Exception as e:
+                    logger.warning(f"备份配置文件失败: {str(e)}")
             
-            if result.returncode == 0:
-                # 接口存在，使用 syncconf 重载
-                self.executor.execute_privileged_command(
-                    ['wg', 'syncconf', interface_name, config.WG_CONFIG_PATH],
-                    check=True,
-                    capture_output=True
+            # 使用特权执行器流式写入新配置
+            with RENDER_SECONDS.time(('server_file',)):
+                self.executor.write_privileged_stream(
+                    self._iter_interface_config(interface),
+                    target_path=config_path,
+                    mode=0o600
                 )
-            else:
-                # 接口不存在，使用 wg-quick 启动
-                self.executor.execute_privileged_command(
-                    ['wg-quick', 'up', interface_name],
-                    check=True,
-                    capture_output=True
+    
+    def reload_wireguard(self, interface_id: Optional[int] = None):
+        """重载 WireGuard 配置
+        
+        接口已存在时，将去除 wg-quick 专用字段的配置直接从数据库游标流式
+        写入 `wg syncconf <iface> /dev/stdin`，不经过中间文件和完整字符串。
+        新建（wg-quick up）的接口随即整体下发限速规则；已存在接口上的限速规则由各变更
+        操作增量更新，重载时不动。批处理（defer_apply）期间只记录接口，提交后由
+        apply_deferred() 统一重载。
+        
+        Args:
+            interface_id: 仅重载指定接口分片，默认重载全部分片
+        """
+        pending = pending_apply()
+        if pending is not None:
+            pending.reloads.add(interface_id)
+            return
+        RELOAD_REQUESTS.inc()
+        interfaces = self._target_interfaces(interface_id)
+        applied = []
+        created = []
+        for interface in interfaces:
+            interface_name = interface.name
+            
+            # 检查接口是否存在
+            try:
+                result = self.executor.execute_privileged_command(
+                    ['wg', 'show', interface_name],
+                    capture_output=True,
+                    text=True
                 )
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"重载 WireGuard 失败: {e.stderr if e.stderr else str(e)}")
+                
+                if result.returncode == 0:
+                    # 接口存在，使用 syncconf 重载
+                    self.executor.pipe_privileged_command(
+                        ['wg', 'syncconf', interface_name, '/dev/stdin'],
+                        self._iter_interface_config(interface, strip=True)
+                    )
+                    RELOADS.inc((interface_name, 'syncconf'))
+                    applied.append({'interface': interface_name, 'method': 'syncconf'})
+                else:
+                    # 接口不存在，使用 wg-quick 启动
+                    self.executor.execute_privileged_command(
+                        ['wg-quick', 'up', interface_name],
+                        check=True,
+                        capture_output=True
+                    )
+                    RELOADS.inc((interface_name, 'up'))
+                    applied.append({'interface': interface_name, 'method': 'up'})
+                    created.append(interface.id)
+            except subprocess.CalledProcessError as e:
+                raise RuntimeError(f"重载 WireGuard 失败: {e.stderr if e.stderr else str(e)}")
+        
+        if created:
+            ShapingService(self.db).refresh(created)
+        if applied:
+            publish_event('config.applied', {'interfaces': applied})
+    
+    def apply_deferred(self, pending: PendingApply) -> int:
+        """执行批处理期间推迟的下发：每个受影响的接口只重写、重载一次
+        
+        须在 defer_apply() 上下文之外、批处理事务提交之后调用。
+        
+        Args:
+            pending: defer_apply() 记录的下发操作
+            
+        Returns:
+            重载的接口数量
+            
+        Raises:
+            RuntimeError: 写入配置文件或下发访问控制规则失败
+        """
+        for interface_id in pending.targets(pending.configs):
+            self.update_wireguard_config(interface_id)
+        
+        reloaded = 0
+        for interface_id in pending.targets(pending.reloads):
+            try:
+                self.reload_wireguard(interface_id)
+                reloaded += len(self._target_interfaces(interface_id))
+            except Exception as e:
+                logger.warning(f"重载 WireGuard 配置失败: {str(e)}")
+        
+        if pending.acl:
+            AclService(self.db).apply()
+        if pending.shaping:
+            ShapingService(self.db).sync(pending.shaping)
+        return reloaded
     
     def get_status(self) -> Dict[str, Any]:
         """获取服务端运行状态
         
         Returns:
-            状态信息字典
+            状态信息字典（interfaces 为各分片状态）
         """
-        interface_name = config.WG_INTERFACE_NAME
-        
-        # 检查 WireGuard 是否运行
-        wireguard_running = False
-        try:
-            result = self.executor.execute_privileged_command(
-                ['wg', 'show', interface_name],
-                capture_output=True,
-                text=True
-            )
-            wireguard_running = result.returncode == 0
-        except:
-            pass
+        interfaces = self.interface_repo.list_all()
+        node_counts = {}
+        for network_id in {interface.network_id for interface in interfaces}:
+            node_counts.update(self.interface_repo.node_counts(network_id))
         
-        # 获取节点统计
-        all_nodes = self.node_repo.list_all()
-        total_nodes = len(all_nodes)
+        interface_status = []
+        for interface in interfaces:
+            # 检查 WireGuard 是否运行
+            running = False
+            try:
+                result = self.executor.execute_privileged_command(
+                    ['wg', 'show', interface.name],
+                    capture_output=True,
+                    text=True
+                )
+                running = result.returncode == 0
+            except:
+                pass
+                
+            interface_status.append({
+                'name': interface.name,
+                'listen_port': interface.listen_port,
+                'network_cidr': interface.network_cidr,
+                'running': running,
+                'total_nodes': node_counts.get(interface.id, 0),
+            })
         
         return {
-            'wireguard_running': wireguard_running,
-            'interface_name': interface_name,
-            'total_nodes': total_nodes,
-            'connected_peers': 0  # TODO: 解析 wg show 输出获取实际连接数
+            'wireguard_running': bool(interface_status) and all(
+                item['running'] for item in interface_status
+            ),
+            'interface_name': interfaces[0].name if interfaces else config.WG_INTERFACE_NAME,
+            'total_nodes': self.node_repo.count(),
+            'connected_peers': 0,  # TODO: 解析 wg show 输出获取实际连接数
+            'interfaces': interface_status,
         }
     
-    def _start_wireguard(self):
-        """启动 WireGuard 接口"""
-        interface_name = config.WG_INTERFACE_NAME
+    def _target_interfaces(self, interface_id: Optional[int] = None) -> List[WgInterface]:
+        """获取要操作的接口分片
+        
+        Args:
+            interface_id: 指定接口 ID，None 表示全部
+            
+        Returns:
+            接口分片列表
+            
+        Raises:
+            RuntimeError: 服务端未初始化或接口不存在
+        """
+        if interface_id is None:
+            interfaces = self.interface_repo.list_all()
+            if not interfaces:
+                raise RuntimeError("服务端未初始化")
+            return interfaces
+            
+        interface = self.interface_repo.get_by_id(interface_id)
+        if not interface:
+            raise RuntimeError(f"接口分片 ID {interface_id} 不存在")
+        return [interface]
+    
+    def _iter_interface_config(self, interface: WgInterface, strip: bool = False):
+        """流式生成单个接口分片的服务端配置
+        
+        Args:
+            interface: 接口分片实体
+            strip: 是否省略 wg-quick 专用字段
+            
+        Returns:
+            配置片段迭代器
+        """
+        peer_settings = self.config_service.get_peer_settings()
+        return self.config_generator.iter_server_config(
+            interface,
+            self.node_repo.iter_by_interface(interface.id),
+            strip=strip,
+            persistent_keepalive=peer_settings.default_keepalive,
+            cache=get_peer_fragment_cache(interface.id),
+            hubs=self.config_service.get_routed_hubs(interface),
+            hub_routes=self.node_repo.get_routes_by_hub(),
+            peer_settings=peer_settings
+        )
+    
+    def _plan_interfaces(self, server: Server, shards: int) -> List[WgInterface]:
+        """按分片数量等分网络段并生成接口分片
         
+        第 0 个分片沿用服务端密钥、端口和虚拟 IP，其余分片生成独立密钥，
+        端口依次递增，虚拟 IP 取各自子段的第一个主机地址。
+        
+        Args:
+            server: 服务端实体
+            shards: 分片数量
+            
+        Returns:
+            接口分片列表（尚未保存）
+            
+        Raises:
+            ValueError: 分片参数无效
+            RuntimeError: 生成密钥失败
+        """
+        if shards < 1:
+            raise ValueError("接口分片数量必须大于 0")
+            
+        network = ipaddress.ip_network(server.network_cidr, strict=False)
+        prefixlen_diff = (shards - 1).bit_length()
+        if network.prefixlen + prefixlen_diff > network.max_prefixlen - 2:
+            raise ValueError(f"网络段 {server.network_cidr} 过小，无法划分 {shards} 个分片")
+        if server.listen_port + shards - 1 > 65535:
+            raise ValueError("分片监听端口超出范围")
+        tenant_ports = {
+            interface.listen_port for interface in self.interface_repo.list_all()
+            if interface.network_id is not None
+        }
+        if tenant_ports & set(range(server.listen_port, server.listen_port + shards)):
+            raise ValueError("分片监听端口与租户网络接口冲突")
+            
+        server_ip = ipaddress.ip_address(server.virtual_ip)
+        subnets = list(network.subnets(prefixlen_diff=prefixlen_diff))[:shards]
+        subnets6 = self._split_network6(server, shards)
+        
+        interfaces = []
+        for index, subnet in enumerate(subnets):
+            if index == 0:
+                private_key, public_key = server.private_key, server.public_key
+            else:
+                try:
+                    private_key, public_key = self.key_manager.generate_keypair()
+                except Exception as e:
+                    raise RuntimeError(f"生成密钥失败: {str(e)}")
+                    
+            virtual_ip = server_ip if server_ip in subnet else subnet.network_address + 1
+            name = f"{config.WG_INTERFACE_PREFIX}{index}"
+            interfaces.append(WgInterface(
+                name=name,
+                listen_port=server.listen_port + index,
+                public_key=public_key,
+                private_key=private_key,
+                virtual_ip=str(virtual_ip),
+                network_cidr=str(subnet),
+                config_path=os.path.join(config.WG_CONFIG_DIR, f"{name}.conf"),
+                network6_cidr=subnets6[index][0] if subnets6 else None,
+                virtual_ip6=subnets6[index][1] if subnets6 else None
+            ))
+            
+        return interfaces
+    
+    @staticmethod
+    def _split_network6(server: Server, shards: int) -> List[tuple]:
+        """按分片数量等分 IPv6 网络段
+        
+        Args:
+            server: 服务端实体
+            shards: 分片数量
+            
+        Returns:
+            [(子段, 分片虚拟 IPv6 地址)]，服务端未启用 IPv6 时为空列表
+            
+        Raises:
+            ValueError: 网络段过小
+        """
+        if not server.network6_cidr:
+            return []
+            
+        network6 = ipaddress.IPv6Network(server.network6_cidr, strict=False)
+        prefixlen_diff = (shards - 1).bit_length()
+        if network6.prefixlen + prefixlen_diff > 124:
+            raise ValueError(f"IPv6 网络段 {server.network6_cidr} 过小，无法划分 {shards} 个分片")
+            
+        server_ip6 = ipaddress.IPv6Address(server.virtual_ip6)
+        result = []
+        for subnet in list(network6.subnets(prefixlen_diff=prefixlen_diff))[:shards]:
+            virtual_ip6 = server_ip6 if server_ip6 in subnet else subnet.network_address + 1
+            result.append((str(subnet), str(virtual_ip6)))
+        return result
+    
+    def _replace_interfaces(self, interfaces: List[WgInterface]):
+        """替换全部接口分片，并将已有节点归入所在子段的分片
+        
+        Args:
+            interfaces: 新的接口分片列表
+        """
+        self.interface_repo.delete_all()
+        for interface in interfaces:
+            self.interface_repo.add(interface)
+            
+        subnets = [
+            (ipaddress.ip_network(interface.network_cidr), interface.id)
+            for interface in interfaces
+        ]
+        for node in list(self.node_repo.iter_by_network(None)):
+            if node.hub_id is not None:
+                continue  # 归属远端中心节点，不占用本地分片
+            ip = ipaddress.ip_address(node.virtual_ip)
+            interface_id = next(
+                (iface_id for subnet, iface_id in subnets if ip in subnet),
+                subnets[0][1]
+            )
+            self.node_repo.set_interface(node.id, interface_id)
+    
+    def _start_wireguard(self, interface_name: str):
+        """启动 WireGuard 接口
+        
+        Args:
+            interface_name: 接口名称
+        """
         # 先尝试停止现有接口
         self.executor.execute_privileged_command(
             ['wg-quick', 'down', interface_name],
@@ -272,10 +671,29 @@ class ServerService:
         if result.returncode != 0:
             raise RuntimeError(f"启动失败: {result.stderr}")
     
+    def _configure_ipv6_forwarding(self):
+        """启用 IPv6 转发并放行接口分片之间的 IPv6 流量（ULA 不做 NAT）"""
+        self.executor.write_system_file('1\n', '/proc/sys/net/ipv6/conf/all/forwarding')
+        
+        wg_iface = f"{config.WG_INTERFACE_PREFIX}+"
+        for direction in ('-i', '-o'):
+            self.executor.execute_privileged_command(
+                ['ip6tables', '-D', 'FORWARD', direction, wg_iface, '-j', 'ACCEPT'],
+                capture_output=True
+            )
+            self.executor.execute_privileged_command(
+                ['ip6tables', '-A', 'FORWARD', direction, wg_iface, '-j', 'ACCEPT'],
+                check=True
+            )
+    
     def _configure_networking(self):
         """配置 IP 转发和 NAT"""
         # 启用 IP 转发
         self.executor.write_system_file('1\n', '/proc/sys/net/ipv4/ip_forward')
+        
+        server = self.server_repo.get()
+        if server and server.network6_cidr:
+            self._configure_ipv6_forwarding()
             
         # 持久化 IP 转发配置
         sysctl_conf = '/etc/sysctl.conf'
@@ -304,8 +722,8 @@ class ServerService:
         except:
             default_iface = 'eth0'
             
-        # 配置 NAT（使用 iptables）
-        wg_iface = config.WG_INTERFACE_NAME
+        # 配置 NAT（使用 iptables），通配所有接口分片（wg+）
+        wg_iface = f"{config.WG_INTERFACE_PREFIX}+"
         
         # 清除现有规则（忽略错误）
         self.executor.execute_privileged_command(
@@ -335,6 +753,10 @@ class ServerService:
             check=True
         )
         
+        # 上面的放行规则只保证转发可达；启用访问控制时节点之间的流量由 nftables
+        # 规则表按节点组收紧（任一表中的 drop 都是最终判决）
+        AclService(self.db).refresh()
+        
         # 尝试保存 iptables 规则
         for cmd in [
             ['iptables-save'],
@@ -0,0 +1,356 @@
+"""
+限速服务
+实现节点/节点组限速配置的管理，并编译为 tc 规则下发到中心节点的 WireGuard 接口
+"""
+import logging
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+from core.domain.group import NodeGroup
+from core.domain.interface import WgInterface
+from core.domain.node import Node
+from core.domain.shaping import ShapingProfile
+from core.models.database import Database
+from core.models.repositories.group_repo import GroupRepository
+from core.models.repositories.interface_repo import InterfaceRepository
+from core.models.repositories.node_repo import NodeRepository
+from core.models.repositories.shaping_repo import ShapingRepository
+from core.utils.deferred_apply import pending_apply
+from core.utils.privileged_executor import get_executor
+from core.utils.tc_compiler import parse_rate, render_interface, render_interface_delta, ifb_name
+
+logger = logging.getLogger(__name__)
+
+
+class ShapingService:
+    """限速服务
+
+    每个本地接口分片（含租户网络接口）上，每个受限速节点对应一个 HTB 类和
+    fq_codel 叶子队列，按虚拟 IP、虚拟 IPv6 和路由子网经 u32 过滤器分类。
+    节点或配置变化时只增删、修改受影响节点的类和过滤器（snapshot() 记录变更前的
+    状态，sync() 生成增量语句），其他节点的队列状态不受影响；只有 `shaping apply`
+    和新建接口时整体重建。每次下发的语句拼成一次 `tc -batch -` 调用。
+    远端中心节点上的节点不经过本机，不做限速。
+    """
+
+    def __init__(self, db: Database):
+        """初始化
+
+        Args:
+            db: 数据库实例
+        """
+        self.db = db
+        self.shaping_repo = ShapingRepository(db)
+        self.interface_repo = InterfaceRepository(db)
+        self.group_repo = GroupRepository(db)
+        self.node_repo = NodeRepository(db)
+        self.executor = get_executor()
+
+    # ---- 限速配置 ----
+
+    def create_profile(self, name: str, download=None, upload=None,
+                       description: Optional[str] = None) -> ShapingProfile:
+        """创建限速配置
+
+        Args:
+            name: 配置名称
+            download: 下行速率（如 50mbit），None 表示不限速
+            upload: 上行速率，None 表示不限速
+            description: 描述
+
+        Returns:
+            限速配置实体
+
+        Raises:
+            ValueError: 参数无效或名称已存在
+        """
+        if self.shaping_repo.get_by_name(name):
+            raise ValueError(f"限速配置 '{name}' 已存在")
+
+        profile = ShapingProfile(
+            name=name,
+            download_kbit=parse_rate(download),
+            upload_kbit=parse_rate(upload),
+            description=description
+        )
+        valid, error_msg = profile.validate()
+        if not valid:
+            raise ValueError(error_msg)
+
+        self.shaping_repo.add(profile)
+        return self.shaping_repo.get_by_id(profile.id)
+
+    def update_profile(self, name: str, download=None, upload=None,
+                       description: Optional[str] = None) -> ShapingProfile:
+        """修改限速配置（未提供的字段保持不变，'none' 表示该方向不限速）并更新引用它的节点的类
+
+        Raises:
+            ValueError: 配置不存在或参数无效
+        """
+        profile = self.get_profile(name)
+        if download is not None:
+            profile.download_kbit = None if str(download).lower() == 'none' else parse_rate(download)
+        if upload is not None:
+            profile.upload_kbit = None if str(upload).lower() == 'none' else parse_rate(upload)
+        if description is not None:
+            profile.description = description
+
+        valid, error_msg = profile.validate()
+        if not valid:
+            raise ValueError(error_msg)
+
+        before = self.snapshot()
+        self.shaping_repo.update(profile)
+        self.sync(before)
+        return self.shaping_repo.get_by_id(profile.id)
+
+    def delete_profile(self, name: str) -> bool:
+        """删除限速配置（引用它的节点和节点组恢复不限速）并删除对应的类
+
+        Raises:
+            ValueError: 配置不存在
+        """
+        profile = self.get_profile(name)
+        before = self.snapshot()
+        result = self.shaping_repo.delete(profile.id)
+        self.sync(before)
+        return result
+
+    def get_profile(self, name: str) -> ShapingProfile:
+        """按名称获取限速配置
+
+        Raises:
+            ValueError: 配置不存在
+        """
+        profile = self.shaping_repo.get_by_name(name)
+        if not profile:
+            raise ValueError(f"限速配置 '{name}' 不存在")
+        return profile
+
+    def list_profiles(self) -> List[ShapingProfile]:
+        """获取所有限速配置"""
+        return self.shaping_repo.list_all()
+
+    def describe_profiles(self) -> List[Dict[str, Any]]:
+        """获取所有限速配置及引用它的节点组名称"""
+        groups: Dict[int, List[str]] = {}
+        for group in self.group_repo.list_all():
+            if group.shaping_profile_id is not None:
+                groups.setdefault(group.shaping_profile_id, []).append(group.name)
+        result = []
+        for profile in self.shaping_repo.list_all():
+            data = profile.to_dict()
+            data['groups'] = groups.get(profile.id, [])
+            result.append(data)
+        return result
+
+    # ---- 挂载 ----
+
+    def set_node_profile(self, node_id: int, profile_name: Optional[str]) -> Node:
+        """设置节点自身的限速配置，并增量更新节点的类
+
+        Args:
+            node_id: 节点 ID
+            profile_name: 配置名称，None 表示使用节点组的配置
+
+        Raises:
+            ValueError: 节点或配置不存在
+        """
+        node = self.node_repo.get_by_id(node_id)
+        if not node:
+            raise ValueError(f"节点 ID {node_id} 不存在")
+        profile_id = self.get_profile(profile_name).id if profile_name else None
+        self.node_repo.set_shaping_profile(node.id, profile_id)
+        updated = self.node_repo.get_by_id(node.id)
+        self.sync_node(node, updated)
+        return updated
+
+    def set_group_profile(self, group_name: str, profile_name: Optional[str]) -> NodeGroup:
+        """设置节点组的限速配置（组内节点可能分布在多个接口上，按全部接口的前后状态增量更新）
+
+        Args:
+            group_name: 节点组名称
+            profile_name: 配置名称，None 表示清除
+
+        Raises:
+            ValueError: 节点组或配置不存在
+        """
+        group = self.group_repo.get_by_name(group_name)
+        if not group:
+            raise ValueError(f"节点组 '{group_name}' 不存在")
+        profile_id = self.get_profile(profile_name).id if profile_name else None
+        before = self.snapshot()
+        self.group_repo.set_shaping_profile(group.id, profile_id)
+        self.sync(before)
+        return self.group_repo.get_by_id(group.id)
+
+    # ---- 编译与下发 ----
+
+    def compile(self, interface_ids: Optional[Iterable[int]] = None) -> List[Tuple[WgInterface, List[str], bool]]:
+        """编译接口的限速规则
+
+        Args:
+            interface_ids: 指定接口 ID，None 表示全部本地接口
+
+        Returns:
+            (接口, tc 批处理语句, 是否需要 IFB 设备) 列表
+        """
+        result = []
+        for interface in self._interfaces(interface_ids):
+            lines, needs_ifb = render_interface(
+                interface.name, interface.network_cidr,
+                self.shaping_repo.interface_rates(interface.id)
+            )
+            result.append((interface, lines, needs_ifb))
+        return result
+
+    def render(self, interface_ids: Optional[Iterable[int]] = None) -> str:
+        """生成 `tc -batch` 输入文本（不下发）"""
+        lines = [line for _, batch, _ in self.compile(interface_ids) for line in batch]
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def apply(self, interface_ids: Optional[Iterable[int]] = None) -> int:
+        """整体重建接口的限速规则：所有语句通过一次 `tc -batch -` 调用下发
+
+        会清空各类的队列状态，用于 `shaping apply`（如服务端重启后）和新建的接口。
+        上行限速需要的 IFB 设备在批处理前创建；不再需要的 IFB 设备保留
+        （空闲设备不影响转发，下次启用上行限速时直接复用）。
+
+        Args:
+            interface_ids: 指定接口 ID，None 表示全部本地接口
+
+        Returns:
+            处理的接口数量
+
+        Raises:
+            RuntimeError: tc 执行失败
+        """
+        compiled = self.compile(interface_ids)
+        if compiled:
+            self._batch(compiled)
+        return len(compiled)
+
+    def refresh(self, interface_ids: Optional[Iterable[int]] = None):
+        """接口新建（wg-quick up）后整体下发限速规则（从未创建过限速配置时不做任何事）"""
+        if not self.shaping_repo.exists():
+            return
+        self._apply_quietly(interface_ids)
+
+    def snapshot(self, interface_ids: Optional[Iterable[int]] = None) -> Dict[int, List[tuple]]:
+        """记录接口上受限速节点的当前状态，变更后交给 sync() 生成增量语句
+
+        Args:
+            interface_ids: 指定接口 ID，None 表示全部本地接口
+
+        Returns:
+            {接口 ID: 受限速节点列表}，从未创建过限速配置时为空
+        """
+        if not self.shaping_repo.exists():
+            return {}
+        return {
+            interface.id: self.shaping_repo.interface_rates(interface.id)
+            for interface in self._interfaces(interface_ids)
+        }
+
+    def sync(self, before: Dict[int, List[tuple]]):
+        """按变更前后的差异增量更新限速规则：只增删、修改受影响节点的类和过滤器
+
+        批处理（defer_apply）期间只记录每个接口最早的状态，提交后合并下发一次。
+        增量语句失败（如规则被外部清除、服务端重启后尚未 apply）时退回整体重建
+        相关接口，失败只打印警告。
+
+        Args:
+            before: snapshot() 在变更前记录的状态
+        """
+        if not before:
+            return
+        pending = pending_apply()
+        if pending is not None:
+            for interface_id, nodes in before.items():
+                pending.shaping.setdefault(interface_id, nodes)
+            return
+
+        compiled = []
+        try:
+            for interface in self._interfaces(before):
+                lines, needs_ifb = render_interface_delta(
+                    interface.name, interface.network_cidr, before[interface.id],
+                    self.shaping_repo.interface_rates(interface.id)
+                )
+                if lines:
+                    compiled.append((interface, lines, needs_ifb))
+            if compiled:
+                self._batch(compiled)
+        except Exception as e:
+            logger.warning(f"增量下发限速规则失败，整体重建: {str(e)}")
+            self._apply_quietly(list(before))
+
+    def sync_node(self, before: Optional[Node], after: Optional[Node]):
+        """节点注册/删除、换组、换配置或地址、子网变化后增量更新该节点的类和过滤器
+
+        节点前后都不受限速（或生效速率和地址都未变）时不调用 tc。
+
+        Args:
+            before: 变化前的节点，None 表示新注册
+            after: 变化后的节点，None 表示已删除
+        """
+        node = after or before
+        if node is None or node.interface_id is None or not self.shaping_repo.exists():
+            return
+        old, new = self._shaped(before), self._shaped(after)
+        if old == new:
+            return
+        # 变更前的状态 = 当前状态中替换回该节点变更前的限速项
+        nodes = [tuple(row) for row in self.shaping_repo.interface_rates(node.interface_id) if row[0] != node.id]
+        if old is not None:
+            nodes = sorted(nodes + [old])
+        self.sync({node.interface_id: nodes})
+
+    def _shaped(self, node: Optional[Node]) -> Optional[tuple]:
+        """节点实体 -> 受限速节点（与 interface_rates 的行格式相同），不受限速时为 None"""
+        if node is None or node.interface_id is None:
+            return None
+        profile_id = node.shaping_profile_id
+        if profile_id is None and node.group_id is not None:
+            group = self.group_repo.get_by_id(node.group_id)
+            profile_id = group.shaping_profile_id if group else None
+        profile = self.shaping_repo.get_by_id(profile_id) if profile_id is not None else None
+        if profile is None:
+            return None
+        return (node.id, node.virtual_ip, node.virtual_ip6, node.routed_subnets,
+                profile.download_kbit, profile.upload_kbit)
+
+    def _interfaces(self, interface_ids: Optional[Iterable[int]] = None) -> List[WgInterface]:
+        """接口 ID -> 接口实体（None 表示全部本地接口，不存在的 ID 忽略）"""
+        if interface_ids is None:
+            return self.interface_repo.list_all()
+        interfaces = [self.interface_repo.get_by_id(interface_id) for interface_id in interface_ids]
+        return [interface for interface in interfaces if interface is not None]
+
+    def _batch(self, compiled: List[Tuple[WgInterface, List[str], bool]]):
+        """创建需要的 IFB 设备，再将全部语句通过一次 `tc -batch -` 调用下发
+
+        Raises:
+            RuntimeError: tc 执行失败
+        """
+        for interface, _, needs_ifb in compiled:
+            if needs_ifb:
+                self._ensure_ifb(ifb_name(interface.name))
+        chunks = ('\n'.join(lines) + '\n' for _, lines, _ in compiled)
+        self.executor.pipe_privileged_command(['tc', '-batch', '-'], chunks)
+
+    def _apply_quietly(self, interface_ids: Optional[Iterable[int]] = None):
+        """下发限速规则，失败时只打印警告（数据库中的配置已保存，可稍后 apply 重试）"""
+        try:
+            self.apply(interface_ids)
+        except Exception as e:
+            logger.warning(f"下发限速规则失败: {str(e)}")
+
+    def _ensure_ifb(self, name: str):
+        """创建并启用 IFB 设备（已存在时 add 失败，忽略）"""
+        self.executor.execute_privileged_command(
+            ['ip', 'link', 'add', 'name', name, 'type', 'ifb'],
+            capture_output=True
+        )
+        self.executor.execute_privileged_command(
+            ['ip', 'link', 'set', 'dev', name, 'up'],
+            capture_output=True
+        )
@@ -0,0 +1,430 @@
+"""
+节点清理服务
+按过期时间和最近握手时间找出需要清理的节点，分批删除或停用，每轮清理只重载一次接口
+"""
+import logging
+import re
+import threading
+import time
+from datetime import timezone
+from typing import Callable, Dict, Any, List, Optional, Set, Tuple
+from core.domain.node import Node
+from core.models.database import Database
+from core.models.repositories.interface_repo import InterfaceRepository
+from core.models.repositories.node_repo import NodeRepository
+from core.services.acl_service import AclService
+from core.services.mesh_service import MESH_CACHE_SCOPE
+from core.services.server_service import ServerService
+from core.services.shaping_service import ShapingService
+from core.utils.event_bus import publish_event
+from core.utils.fragment_cache import get_peer_fragment_cache
+from core.utils.log import operation
+from core.utils.privileged_executor import get_executor
+from core.utils.traffic_sampler import TrafficSampler
+from config import base as config
+
+logger = logging.getLogger(__name__)
+
+
+# 过期/闲置节点的处理方式：delete 删除，disable 停用（保留地址和密钥，可恢复）
+SWEEP_ACTIONS = ('delete', 'disable')
+
+# 时长单位 -> 秒（不带单位按秒计）
+_DURATION_UNITS = {'': 1, 's': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 7 * 86400}
+_DURATION_PATTERN = re.compile(r'^\s*(\d+)\s*([smhdw]?)\s*$', re.IGNORECASE)
+
+# (节点, 原因, 详情)
+Candidate = Tuple[Node, str, str]
+
+
+def parse_duration(value) -> int:
+    """解析时长（如 90m、12h、7d、1w，纯数字按秒）
+
+    Args:
+        value: 时长字符串或整数
+
+    Returns:
+        秒数
+
+    Raises:
+        ValueError: 格式错误
+    """
+    if isinstance(value, int):
+        seconds = value
+    else:
+        match = _DURATION_PATTERN.match(str(value))
+        if not match:
+            raise ValueError(f"时长格式错误: {value}（示例: 90m、12h、7d）")
+        number, unit = match.groups()
+        seconds = int(number) * _DURATION_UNITS[unit.lower()]
+    if seconds < 0:
+        raise ValueError(f"时长不能为负数: {value}")
+    return seconds
+
+
+def format_duration(seconds: int) -> str:
+    """秒数 -> 便于阅读的时长字符串"""
+    for unit in ('w', 'd', 'h', 'm'):
+        factor = _DURATION_UNITS[unit]
+        if seconds >= factor and seconds % factor == 0:
+            return f"{seconds // factor}{unit}"
+    return f"{seconds}s"
+
+
+def _format_age(seconds: float) -> str:
+    """秒数 -> 粗略的时长描述（用于清理报告）"""
+    for unit, factor in (('天', 86400), ('小时', 3600), ('分钟', 60)):
+        if seconds >= factor:
+            return f"{int(seconds // factor)} {unit}"
+    return f"{int(seconds)} 秒"
+
+
+def _timestamp(epoch: float) -> str:
+    """时间戳 -> 数据库时间字符串（UTC，与 CURRENT_TIMESTAMP 格式一致，可直接比较）"""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(epoch))
+
+
+class SweepService:
+    """节点清理服务
+
+    两类节点会被清理：
+
+    - 过期：注册时或之后设置了过期时间（TTL）且已到期；
+    - 闲置：启用闲置策略后，最近一次握手（`wg show <iface> latest-handshakes`）
+      距今超过阈值，从未握手的节点从注册或最近修改（如恢复）时间起算。只判断
+      本地接口上的节点，读取握手时间失败的接口整体跳过，避免接口未运行时误判
+      全部节点闲置。
+
+    候选节点按 NODE_SWEEP_BATCH_SIZE 分批在数据库事务中删除或停用，清理记录与
+    变更写在同一事务；全部批次完成后每个受影响的接口只重写并重载一次。
+    """
+
+    def __init__(self, db: Database, sampler: Optional[TrafficSampler] = None,
+                 clock: Callable[[], float] = time.time):
+        """初始化
+
+        Args:
+            db: 数据库实例
+            sampler: 握手时间采样器
+            clock: 墙上时钟（与数据库时间、握手时间戳对齐）
+        """
+        self.db = db
+        self.node_repo = NodeRepository(db)
+        self.interface_repo = InterfaceRepository(db)
+        self.sampler = sampler or TrafficSampler()
+        self.executor = get_executor()
+        self._clock = clock
+
+    # ---- 策略 ----
+
+    def get_policy(self) -> Dict[str, Any]:
+        """获取清理策略
+
+        Returns:
+            {'action': 处理方式, 'idle_after': 闲置阈值秒数（0 表示不按闲置清理）}
+        """
+        action = self.db.get_config_param('sweep_action')
+        idle_after = self.db.get_config_param('sweep_idle_after')
+        try:
+            idle_after = int(idle_after) if idle_after is not None else config.DEFAULT_SWEEP_IDLE_AFTER
+        except ValueError:
+            idle_after = config.DEFAULT_SWEEP_IDLE_AFTER
+        return {
+            'action': action if action in SWEEP_ACTIONS else config.DEFAULT_SWEEP_ACTION,
+            'idle_after': idle_after,
+        }
+
+    def set_policy(self, action: Optional[str] = None, idle_after=None) -> Dict[str, Any]:
+        """设置清理策略（未提供的字段保持不变）
+
+        Args:
+            action: 处理方式（delete/disable）
+            idle_after: 闲置阈值（如 7d，off/0 表示不按闲置清理）
+
+        Raises:
+            ValueError: 参数无效
+        """
+        if action is not None:
+            if action not in SWEEP_ACTIONS:
+                raise ValueError(f"处理方式必须为 {', '.join(SWEEP_ACTIONS)} 之一")
+            self.db.set_config_param('sweep_action', action, '过期/闲置节点的处理方式')
+        if idle_after is not None:
+            seconds = 0 if str(idle_after).lower() == 'off' else parse_duration(idle_after)
+            self.db.set_config_param('sweep_idle_after', str(seconds), '节点闲置阈值（秒）')
+        return self.get_policy()
+
+    def set_ttl(self, node_id: int, ttl) -> Node:
+        """设置节点的剩余有效期
+
+        Args:
+            node_id: 节点 ID
+            ttl: 有效期（如 12h，从当前时间起算），None 或 never 表示永不过期
+
+        Raises:
+            ValueError: 节点不存在或格式错误
+        """
+        node = self.node_repo.get_by_id(node_id)
+        if not node:
+            raise ValueError(f"节点 ID {node_id} 不存在")
+        self.node_repo.set_expiry(node.id, self.expiry_from_ttl(ttl))
+        return self.node_repo.get_by_id(node.id)
+
+    def expiry_from_ttl(self, ttl) -> Optional[str]:
+        """有效期 -> 过期时间（UTC），None 或 never 返回 None
+
+        Raises:
+            ValueError: 格式错误
+        """
+        if ttl is None or str(ttl).lower() == 'never':
+            return None
+        seconds = parse_duration(ttl)
+        if seconds == 0:
+            raise ValueError("有效期必须大于 0")
+        return _timestamp(self._clock() + seconds)
+
+    # ---- 清理 ----
+
+    def find_candidates(self) -> List[Candidate]:
+        """找出需要清理的节点（过期节点在前）"""
+        now = self._clock()
+        policy = self.get_policy()
+
+        where = 'expires_at IS NOT NULL AND expires_at <= ?'
+        if policy['action'] == 'disable':
+            where += ' AND disabled_at IS NULL'
+        candidates: List[Candidate] = [
+            (node, 'expired', f"已于 {node.expires_at.isoformat(sep=' ')} 过期")
+            for node in self.db.select_nodes(
+                Node.COLUMNS, Node.from_row, where=where, params=(_timestamp(now),)
+            )
+        ]
+
+        idle_after = policy['idle_after']
+        if idle_after <= 0:
+            return candidates
+
+        seen = {node.id for node, _, _ in candidates}
+        interfaces = self.interface_repo.list_all()
+        handshakes = self.sampler.sample_latest_handshakes(interface.name for interface in interfaces)
+        for interface in interfaces:
+            peers = handshakes.get(interface.name)
+            if peers is None:
+                continue
+            for node in self.node_repo.iter_by_interface(interface.id):
+                if node.id in seen:
+                    continue
+                latest = peers.get(node.public_key, 0)
+                changed = node.updated_at or node.created_at
+                changed = changed.replace(tzinfo=timezone.utc).timestamp() if changed else 0
+                if now - max(latest, changed) < idle_after:
+                    continue
+                if latest:
+                    detail = f"最近握手于 {_format_age(now - latest)}前"
+                else:
+                    detail = f"注册/修改后 {_format_age(now - changed)}内从未握手"
+                candidates.append((node, 'idle', detail))
+        return candidates
+
+    def sweep(self, dry_run: bool = False) -> Dict[str, Any]:
+        """执行一轮清理
+
+        Args:
+            dry_run: 仅报告候选节点，不做任何变更
+
+        Returns:
+            清理报告
+        """
+        policy = self.get_policy()
+        candidates = self.find_candidates()
+        report: Dict[str, Any] = {
+            'dry_run': dry_run,
+            'action': policy['action'],
+            'idle_after': policy['idle_after'],
+            'nodes': [self._describe(node, reason, detail) for node, reason, detail in candidates],
+            'swept': 0,
+            'batches': 0,
+        }
+        if dry_run or not candidates:
+            return report
+
+        shaping_service = ShapingService(self.db)
+        shaping = shaping_service.snapshot()
+        batch_size = max(1, config.NODE_SWEEP_BATCH_SIZE)
+        for start in range(0, len(candidates), batch_size):
+            batch = candidates[start:start + batch_size]
+            report['swept'] += self.db.sweep_nodes(policy['action'], [
+                (node.id, node.node_name, node.virtual_ip, node.public_key, reason, detail)
+                for node, reason, detail in batch
+            ])
+            report['batches'] += 1
+
+        event_type = 'node.deleted' if policy['action'] == 'delete' else 'node.disabled'
+        for node, reason, _ in candidates:
+            publish_event(event_type, {
+                'id': node.id, 'node_name': node.node_name, 'virtual_ip': node.virtual_ip, 'reason': reason
+            })
+
+        nodes = [node for node, _, _ in candidates]
+        self._apply(nodes, removed=True)
+        if policy['action'] == 'delete' and any(node.group_id is not None for node in nodes):
+            AclService(self.db).refresh()
+        shaping_service.sync(shaping)
+        return report
+
+    def restore(self, node_id: int) -> Node:
+        """恢复已停用的节点（同时清除过期时间）
+
+        Raises:
+            ValueError: 节点不存在或未停用
+        """
+        node = self.node_repo.get_by_id(node_id)
+        if not node:
+            raise ValueError(f"节点 ID {node_id} 不存在")
+        if node.disabled_at is None:
+            raise ValueError(f"节点 '{node.node_name}' 未停用")
+        self.db.sweep_nodes('enable', [
+            (node.id, node.node_name, node.virtual_ip, node.public_key, 'manual', None)
+        ])
+        self._apply([node], removed=False)
+        publish_event('node.enabled', {
+            'id': node.id, 'node_name': node.node_name, 'virtual_ip': node.virtual_ip
+        })
+        return self.node_repo.get_by_id(node.id)
+
+    def history(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """获取最近的清理记录（最新的在前）"""
+        keys = ('id', 'node_id', 'node_name', 'virtual_ip', 'public_key',
+                'action', 'reason', 'detail', 'created_at')
+        return [dict(zip(keys, row)) for row in self.db.select_sweep_audit(limit)]
+
+    # ---- 内部 ----
+
+    @staticmethod
+    def _describe(node: Node, reason: str, detail: str) -> Dict[str, Any]:
+        """候选节点报告项"""
+        return {
+            'node_id': node.id,
+            'node_name': node.node_name,
+            'virtual_ip': node.virtual_ip,
+            'reason': reason,
+            'detail': detail,
+        }
+
+    def _apply(self, nodes: List[Node], removed: bool):
+        """将节点变化应用到本地中心节点：每个受影响的接口只重写并重载一次
+
+        Args:
+            nodes: 被清理或恢复的节点
+            removed: True 表示节点已删除/停用，False 表示已恢复
+        """
+        mesh_cache = get_peer_fragment_cache(MESH_CACHE_SCOPE)
+        targets: Set[int] = set()
+        routes: Dict[int, List[str]] = {}
+        for node in nodes:
+            mesh_cache.discard(node.id)
+            if node.interface_id is not None:
+                get_peer_fragment_cache(node.interface_id).discard(node.id)
+                interface_id = node.interface_id
+            elif node.routes:
+                # 远端中心节点的节点子网由主接口上指向该中心节点的 [Peer] 段路由
+                interfaces = self.interface_repo.list_by_network(node.network_id)
+                if not interfaces:
+                    continue
+                interface_id = interfaces[0].id
+            else:
+                continue
+            targets.add(interface_id)
+            routes.setdefault(interface_id, []).extend(node.routes)
+
+        server_service = ServerService(self.db)
+        for interface_id in sorted(targets):
+            try:
+                server_service.update_wireguard_config(interface_id)
+                server_service.reload_wireguard(interface_id)
+            except Exception as e:
+                logger.warning(f"重载 WireGuard 配置失败: {str(e)}")
+                continue
+
+            # wg syncconf 不维护内核路由，按子网变化增删
+            interface = self.interface_repo.get_by_id(interface_id)
+            for route in routes.get(interface_id, []):
+                self.executor.execute_privileged_command(
+                    ['ip', 'route', 'del' if removed else 'replace', route, 'dev', interface.name],
+                    capture_output=True,
+                    text=True
+                )
+
+
+class NodeSweeper:
+    """后台节点清理器：在 Web 服务中按固定间隔执行清理"""
+
+    def __init__(self):
+        """初始化清理器"""
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def run_once(self, db: Database, dry_run: bool = False) -> Dict[str, Any]:
+        """执行一轮清理（同一进程内的清理串行执行）
+
+        Args:
+            db: 数据库实例
+            dry_run: 仅报告不变更
+
+        Returns:
+            清理报告
+        """
+        with self._lock:
+            return SweepService(db).sweep(dry_run)
+
+    def start(self, interval: Optional[int] = None) -> bool:
+        """在后台线程中周期运行
+
+        Args:
+            interval: 清理间隔（秒），默认使用全局配置
+
+        Returns:
+            是否启动（间隔为 0 或已在运行时返回 False）
+        """
+        interval = config.NODE_SWEEP_INTERVAL if interval is None else interval
+        if interval <= 0 or (self._thread and self._thread.is_alive()):
+            return False
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(interval,), name='node-sweeper', daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """停止后台线程"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _loop(self, interval: int):
+        """后台清理循环"""
+        while not self._stop.wait(interval):
+            try:
+                with operation('node-sweep'), Database() as db:
+                    self.run_once(db)
+            except Exception as e:
+                logger.warning(f"节点清理失败: {str(e)}")
+
+
+# 全局单例
+_sweeper = None
+
+
+def get_node_sweeper() -> NodeSweeper:
+    """获取全局清理器实例
+
+    Returns:
+        NodeSweeper 实例
+    """
+    global _sweeper
+    if _sweeper is None:
+        _sweeper = NodeSweeper()
+    return _sweeper
@@ -0,0 +1,138 @@
+"""
+AllowedIPs 压缩模块
+将包含/排除前缀集合计算为最少的等价 CIDR 列表（合并相邻前缀、减去排除前缀）
+"""
+import ipaddress
+from typing import Dict, Iterable, List, Tuple
+
+# 常用前缀集合别名，可直接写在策略的包含/排除列表中
+PREFIX_ALIASES: Dict[str, Tuple[str, ...]] = {
+    'any': ('0.0.0.0/0', '::/0'),
+    'any4': ('0.0.0.0/0',),
+    'any6': ('::/0',),
+    'rfc1918': ('10.0.0.0/8', '172.16.0.0/12', '192.168.0.0/16'),
+    'cgnat': ('100.64.0.0/10',),
+    'loopback': ('127.0.0.0/8', '::1/128'),
+    'link-local': ('169.254.0.0/16', 'fe80::/10'),
+    'multicast': ('224.0.0.0/4', 'ff00::/8'),
+    'ula': ('fc00::/7',),
+}
+
+# 地址族 -> 地址位数
+_FAMILY_BITS = {4: 32, 6: 128}
+
+Interval = Tuple[int, int]  # [起始, 结束)，整数地址
+
+
+def expand_prefixes(prefixes: Iterable[str]) -> List[str]:
+    """展开别名并校验前缀
+
+    Args:
+        prefixes: 前缀或别名列表
+
+    Returns:
+        规整后的 CIDR 列表
+
+    Raises:
+        ValueError: 前缀格式错误
+    """
+    result = []
+    for prefix in prefixes:
+        prefix = prefix.strip()
+        if not prefix:
+            continue
+        if prefix.lower() in PREFIX_ALIASES:
+            result.extend(PREFIX_ALIASES[prefix.lower()])
+            continue
+        try:
+            result.append(str(ipaddress.ip_network(prefix, strict=False)))
+        except ValueError:
+            raise ValueError(f"前缀格式错误: {prefix}")
+    return result
+
+
+def _to_intervals(prefixes: Iterable[str]) -> Dict[int, List[Interval]]:
+    """前缀 -> 按地址族分组的整数区间"""
+    intervals: Dict[int, List[Interval]] = {4: [], 6: []}
+    for prefix in expand_prefixes(prefixes):
+        network = ipaddress.ip_network(prefix)
+        start = int(network.network_address)
+        intervals[network.version].append((start, start + network.num_addresses))
+    return intervals
+
+
+def _merge(intervals: List[Interval]) -> List[Interval]:
+    """合并重叠或相邻的区间（结果有序）"""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _subtract(include: List[Interval], exclude: List[Interval]) -> List[Interval]:
+    """有序区间相减（双指针，线性时间）"""
+    result: List[Interval] = []
+    index = 0
+    for start, end in include:
+        # 跳过完全位于当前区间之前的排除区间
+        while index < len(exclude) and exclude[index][1] <= start:
+            index += 1
+        cursor = start
+        probe = index
+        while probe < len(exclude) and exclude[probe][0] < end:
+            ex_start, ex_end = exclude[probe]
+            if ex_start > cursor:
+                result.append((cursor, ex_start))
+            cursor = max(cursor, ex_end)
+            if cursor >= end:
+                break
+            probe += 1
+        if cursor < end:
+            result.append((cursor, end))
+    return result
+
+
+def _to_cidrs(intervals: List[Interval], bits: int) -> List[Tuple[int, int]]:
+    """区间 -> 最少的对齐 CIDR 块 (起始地址, 前缀长度)"""
+    blocks = []
+    for start, end in intervals:
+        while start < end:
+            # 起始地址对齐允许的最大块，再缩小到不超过剩余长度
+            size = start & -start if start else 1 << bits
+            while size > end - start:
+                size >>= 1
+            blocks.append((start, bits - size.bit_length() + 1))
+            start += size
+    return blocks
+
+
+def compact_prefixes(include: Iterable[str], exclude: Iterable[str] = ()) -> List[str]:
+    """计算包含集合减去排除集合后的最少等价 CIDR 列表
+
+    全部运算在整数区间上完成：先分别合并包含和排除区间，再做有序相减，
+    最后把每个区间拆成最少的对齐块。耗时 O(n log n)，n 为前缀数量。
+
+    Args:
+        include: 包含的前缀（可用别名，如 any、rfc1918）
+        exclude: 排除的前缀
+
+    Returns:
+        CIDR 列表（IPv4 在前，按地址排序）
+
+    Raises:
+        ValueError: 前缀格式错误
+    """
+    included = _to_intervals(include)
+    excluded = _to_intervals(exclude)
+
+    result = []
+    for version, bits in _FAMILY_BITS.items():
+        intervals = _subtract(_merge(included[version]), _merge(excluded[version]))
+        network_class = ipaddress.IPv4Network if version == 4 else ipaddress.IPv6Network
+        for start, prefixlen in _to_cidrs(intervals, bits):
+            result.append(str(network_class((start, prefixlen))))
+    return result
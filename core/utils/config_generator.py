@@ -2,68 +2,257 @@
 配置文件生成模块
 负责生成 WireGuard 服务端和客户端配置文件
 """
-from typing import List, Dict, Any, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 from config import base as config
+from core.domain.hub import Hub
+from core.domain.interface import WgInterface
+from core.domain.network import Network
+from core.domain.node import Node
+from core.domain.peer_profile import PeerSettings
+from core.domain.server import Server
+from core.utils.fragment_cache import PeerFragmentCache
 
 
 class ConfigGenerator:
     """WireGuard 配置文件生成器"""
     
     @staticmethod
-    def generate_server_config(server_info: Dict[str, Any], 
-                               nodes: List[Dict[str, Any]]) -> str:
+    def generate_server_config(server: Server, nodes: Iterable[Node],
+                               persistent_keepalive: Optional[int] = None) -> str:
         """生成服务端配置文件
         
         Args:
-            server_info: 服务端信息字典
-            nodes: 节点信息列表
+            server: 服务端实体
+            nodes: 节点实体序列
+            persistent_keepalive: 保活间隔（秒），默认使用全局配置
             
         Returns:
             配置文件内容字符串
         """
-        lines = []
+        return ''.join(ConfigGenerator.iter_server_config(
+            server, nodes, persistent_keepalive=persistent_keepalive
+        ))
+        
+    @staticmethod
+    def iter_server_config(server: Server, nodes: Iterable[Node],
+                           strip: bool = False,
+                           persistent_keepalive: Optional[int] = None,
+                           cache: Optional[PeerFragmentCache] = None,
+                           hubs: Iterable[Hub] = (),
+                           hub_routes: Optional[Dict[Optional[int], List[str]]] = None,
+                           peer_settings: Optional[PeerSettings] = None) -> Iterator[str]:
+        """流式生成服务端配置文件
         
+        依次产出 [Interface] 段和每个节点的 [Peer] 段，配合数据库游标使用时
+        内存占用与节点数量无关。
+        
+        Args:
+            server: 服务端实体
+            nodes: 节点实体可迭代对象（可为数据库游标）
+            strip: 是否省略 wg-quick 专用字段（Address/SaveConfig），
+                   用于直接传给 wg setconf/syncconf
+            persistent_keepalive: 保活间隔（秒），默认使用全局配置
+            cache: [Peer] 段缓存，提供时未变化的节点直接复用已渲染片段
+            hubs: 其他中心节点，追加为路由其网络子段的 [Peer] 段
+            hub_routes: 中心节点 ID -> 归属该中心节点的节点路由子网
+            peer_settings: 按节点解析的保活间隔，未提供时所有节点使用 persistent_keepalive
+            
+        Yields:
+            配置文件片段
+        """
         # [Interface] 部分
-        lines.append('[Interface]')
-        lines.append(f"PrivateKey = {server_info['private_key']}")
-        lines.append(f"Address = {server_info['virtual_ip']}/{server_info['network_cidr'].split('/')[-1]}")
-        lines.append(f"ListenPort = {server_info['listen_port']}")
-        lines.append('SaveConfig = false')
-        lines.append('')
+        if strip:
+            yield (
+                '[Interface]\n'
+                f"PrivateKey = {server.private_key}\n"
+                f"ListenPort = {server.listen_port}\n"
+                '\n'
+            )
+        else:
+            yield (
+                '[Interface]\n'
+                f"PrivateKey = {server.private_key}\n"
+                f"Address = {server.addresses}\n"
+                f"ListenPort = {server.listen_port}\n"
+                'SaveConfig = false\n'
+                '\n'
+            )
+        
+        yield from ConfigGenerator.iter_peer_blocks(
+            nodes, persistent_keepalive=persistent_keepalive, cache=cache, hubs=hubs,
+            hub_routes=hub_routes, peer_settings=peer_settings
+        )
+        
+    @staticmethod
+    def iter_peer_blocks(nodes: Iterable[Node],
+                         persistent_keepalive: Optional[int] = None,
+                         cache: Optional[PeerFragmentCache] = None,
+                         hubs: Iterable[Hub] = (),
+                         hub_routes: Optional[Dict[Optional[int], List[str]]] = None,
+                         peer_settings: Optional[PeerSettings] = None) -> Iterator[str]:
+        """流式生成中心节点的全部 [Peer] 段（不含 [Interface] 段）
+        
+        远端中心节点自行保管私钥，只从注册表拉取此部分并合并到本地配置。
+        
+        Args:
+            nodes: 归属该中心节点的节点实体可迭代对象
+            persistent_keepalive: 保活间隔（秒），默认使用全局配置
+            cache: [Peer] 段缓存
+            hubs: 其他中心节点
+            hub_routes: 中心节点 ID -> 归属该中心节点的节点路由子网
+            peer_settings: 按节点解析的保活间隔
+            
+        Yields:
+            [Peer] 段文本
+        """
+        if persistent_keepalive is None:
+            persistent_keepalive = config.PERSISTENT_KEEPALIVE
+            
+        if peer_settings is None:
+            def render_peer(node: Node) -> str:
+                return ConfigGenerator.render_server_peer(node, persistent_keepalive)
+            params = (persistent_keepalive,)
+        else:
+            def render_peer(node: Node) -> str:
+                return ConfigGenerator.render_server_peer(node, peer_settings.keepalive(node))
+            params = (persistent_keepalive, peer_settings.signature)
         
         # 为每个客户端添加 [Peer] 部分
-        for node in nodes:
-            lines.append('[Peer]')
-            lines.append(f"# {node['node_name']} - {node['platform']}")
-            lines.append(f"PublicKey = {node['public_key']}")
-            lines.append(f"AllowedIPs = {node['virtual_ip']}/32")
-            lines.append(f"PersistentKeepalive = {config.PERSISTENT_KEEPALIVE}")
-            lines.append('')
+        if cache is None:
+            for node in nodes:
+                yield render_peer(node)
+        else:
+            cache.use_params(params)
+            yield from cache.render_all(nodes, render_peer)
             
-        return '\n'.join(lines)
+        # 中心节点之间互相路由对方负责的网络子段
+        hub_routes = hub_routes or {}
+        for hub in hubs:
+            yield ConfigGenerator.render_hub_peer(
+                hub, persistent_keepalive, hub_routes.get(hub.id, ())
+            )
+            
+    @staticmethod
+    def render_hub_peer(hub: Hub, persistent_keepalive: Optional[int] = None,
+                        routes: Iterable[str] = ()) -> str:
+        """生成指向其他中心节点的 [Peer] 段
         
+        Args:
+            hub: 中心节点实体
+            persistent_keepalive: 保活间隔（秒），默认使用全局配置
+            routes: 归属该中心节点的节点路由子网
+            
+        Returns:
+            [Peer] 段文本（以空行结尾）
+        """
+        if persistent_keepalive is None:
+            persistent_keepalive = config.PERSISTENT_KEEPALIVE
+            
+        endpoint = f"Endpoint = {hub.public_endpoint}\n" if hub.public_endpoint else ''
+        return (
+            '[Peer]\n'
+            f"# hub {hub.name}\n"
+            f"PublicKey = {hub.public_key}\n"
+            f"{endpoint}"
+            f"AllowedIPs = {', '.join([hub.network_cidr, *routes])}\n"
+            f"{ConfigGenerator.keepalive_line(persistent_keepalive)}"
+            '\n'
+        )
+            
     @staticmethod
-    def generate_client_config(node_info: Dict[str, Any], 
-                               server_info: Dict[str, Any],
+    def render_server_peer(node: Node, persistent_keepalive: Optional[int] = None) -> str:
+        """生成服务端配置中单个节点的 [Peer] 段
+        
+        Args:
+            node: 节点实体
+            persistent_keepalive: 保活间隔（秒，0 表示关闭），默认使用全局配置
+            
+        Returns:
+            [Peer] 段文本（以空行结尾）
+        """
+        if persistent_keepalive is None:
+            persistent_keepalive = config.PERSISTENT_KEEPALIVE
+            
+        return (
+            '[Peer]\n'
+            f"# {node.node_name} - {node.platform}\n"
+            f"PublicKey = {node.public_key}\n"
+            f"AllowedIPs = {node.allowed_ips}\n"
+            f"{ConfigGenerator.keepalive_line(persistent_keepalive)}"
+            '\n'
+        )
+        
+    @staticmethod
+    def keepalive_line(persistent_keepalive: int) -> str:
+        """生成 PersistentKeepalive 行（0 表示关闭，省略该行）"""
+        if not persistent_keepalive:
+            return ''
+        return f"PersistentKeepalive = {persistent_keepalive}\n"
+        
+    @staticmethod
+    def generate_client_config(node: Node, 
+                               server: Server,
                                dns_server: Optional[str] = None,
-                               allowed_ips: Optional[str] = None) -> str:
+                               allowed_ips: Optional[str] = None,
+                               persistent_keepalive: Optional[int] = None,
+                               interface: Optional[WgInterface] = None,
+                               hub: Optional[Hub] = None,
+                               direct_peers: Iterable[Node] = (),
+                               cache: Optional[PeerFragmentCache] = None,
+                               network: Optional[Network] = None,
+                               mtu: Optional[int] = None) -> str:
         """生成客户端配置文件
         
         Args:
-            node_info: 节点信息字典
-            server_info: 服务端信息字典
+            node: 节点实体
+            server: 服务端实体
             dns_server: DNS 服务器（可选）
-            allowed_ips: 允许的 IP 范围（默认为虚拟网络段）
+            allowed_ips: 允许的 IP 范围（默认为虚拟网络段，双栈时包含 IPv6 网络段）
+            persistent_keepalive: 保活间隔（秒，0 表示关闭），默认使用全局配置
+            interface: 节点所属接口分片，提供时使用该分片的公钥和监听端口
+            hub: 节点归属的远端中心节点，提供时以该中心节点作为对端
+            direct_peers: 网状模式下直连的其他节点（/32 优先于中心节点的网络段路由）
+            cache: 直连 [Peer] 段缓存（同一节点对所有查看方渲染结果相同）
+            network: 节点所属租户网络，提供时使用该网络的网络段
+            mtu: 客户端接口 MTU，None 表示使用 wg-quick 默认值
             
         Returns:
             配置文件内容字符串
         """
+        if network is None:
+            network = server
+        prefix_length = network.prefix_length
+        prefix6_length = network.prefix6_length
+        if hub is not None and not hub.is_local:
+            peer_public_key = hub.public_key
+            endpoint = hub.public_endpoint
+            listen_port = endpoint.rsplit(':', 1)[-1] if endpoint else server.listen_port
+            prefix_length = hub.prefix_length
+        elif interface is not None:
+            peer_public_key = interface.public_key
+            listen_port = interface.listen_port
+            endpoint = ConfigGenerator.endpoint_with_port(server.public_endpoint, listen_port)
+        else:
+            peer_public_key = server.public_key
+            listen_port = server.listen_port
+            endpoint = server.public_endpoint
+            
         lines = []
         
         # [Interface] 部分
         lines.append('[Interface]')
-        lines.append(f"PrivateKey = {node_info['private_key']}")
-        lines.append(f"Address = {node_info['virtual_ip']}/{server_info['network_cidr'].split('/')[-1]}")
+        lines.append(f"PrivateKey = {node.private_key}")
+        address = f"{node.virtual_ip}/{prefix_length}"
+        if node.virtual_ip6 and prefix6_length:
+            address += f", {node.virtual_ip6}/{prefix6_length}"
+        lines.append(f"Address = {address}")
+        
+        # 有公网地址的节点需要固定监听端口，供其他节点直连
+        if node.listen_port:
+            lines.append(f"ListenPort = {node.listen_port}")
+        
+        if mtu:
+            lines.append(f"MTU = {mtu}")
         
         if dns_server:
             lines.append(f"DNS = {dns_server}")
@@ -72,26 +261,95 @@ class ConfigGenerator:
         
         # [Peer] 部分（服务端）
         lines.append('[Peer]')
-        lines.append(f"# Server")
-        lines.append(f"PublicKey = {server_info['public_key']}")
+        lines.append(f"# {hub.name}" if hub is not None else "# Server")
+        lines.append(f"PublicKey = {peer_public_key}")
         
         # 如果有公网地址，使用公网地址，否则需要用户手动填写
-        if server_info.get('public_endpoint'):
-            lines.append(f"Endpoint = {server_info['public_endpoint']}")
+        if endpoint:
+            lines.append(f"Endpoint = {endpoint}")
         else:
-            lines.append(f"# Endpoint = YOUR_SERVER_IP:{server_info['listen_port']}")
+            lines.append(f"# Endpoint = YOUR_SERVER_IP:{listen_port}")
             lines.append(f"# 请将 YOUR_SERVER_IP 替换为服务端的公网 IP 地址")
             
         # 默认仅路由虚拟网络段流量
         if allowed_ips:
             lines.append(f"AllowedIPs = {allowed_ips}")
         else:
-            lines.append(f"AllowedIPs = {server_info['network_cidr']}")
+            lines.append(f"AllowedIPs = {', '.join(network.networks)}")
             
-        lines.append(f"PersistentKeepalive = {config.PERSISTENT_KEEPALIVE}")
+        if persistent_keepalive is None:
+            persistent_keepalive = config.PERSISTENT_KEEPALIVE
+        if persistent_keepalive:
+            lines.append(f"PersistentKeepalive = {persistent_keepalive}")
         lines.append('')
         
-        return '\n'.join(lines)
+        content = '\n'.join(lines)
+        
+        # [Peer] 部分（直连节点），其余节点仍经中心节点转发
+        def render_peer(peer: Node) -> str:
+            return ConfigGenerator.render_mesh_peer(peer, persistent_keepalive)
+            
+        if cache is None:
+            fragments = [render_peer(peer) for peer in direct_peers]
+        else:
+            cache.use_params((persistent_keepalive,))
+            fragments = [cache.render(peer, render_peer) for peer in direct_peers]
+            
+        if fragments:
+            content += '\n' + ''.join(fragments)
+            
+        return content
+        
+    @staticmethod
+    def render_mesh_peer(node: Node, persistent_keepalive: Optional[int] = None) -> str:
+        """生成客户端配置中直连节点的 [Peer] 段
+        
+        Args:
+            node: 直连节点实体
+            persistent_keepalive: 保活间隔（秒），默认使用全局配置
+            
+        Returns:
+            [Peer] 段文本（以空行结尾）
+        """
+        if persistent_keepalive is None:
+            persistent_keepalive = config.PERSISTENT_KEEPALIVE
+            
+        endpoint = f"Endpoint = {node.endpoint}\n" if node.endpoint else ''
+        return (
+            '[Peer]\n'
+            f"# {node.node_name} (direct)\n"
+            f"PublicKey = {node.public_key}\n"
+            f"{endpoint}"
+            f"AllowedIPs = {node.allowed_ips}\n"
+            f"{ConfigGenerator.keepalive_line(persistent_keepalive)}"
+            '\n'
+        )
+        
+    @staticmethod
+    def endpoint_with_port(endpoint: Optional[str], port: int) -> Optional[str]:
+        """将公网地址中的端口替换为指定端口
+        
+        Args:
+            endpoint: 公网地址（IP:Port、域名:Port、[IPv6]:Port 或不带端口）
+            port: 目标端口
+            
+        Returns:
+            替换端口后的地址，endpoint 为空时返回 None
+        """
+        if not endpoint:
+            return None
+            
+        host = endpoint
+        if endpoint.startswith('['):
+            # [IPv6]:Port
+            host = endpoint[:endpoint.index(']') + 1]
+        elif endpoint.count(':') == 1:
+            host = endpoint.rsplit(':', 1)[0]
+        elif ':' in endpoint:
+            # 不带端口的裸 IPv6 地址
+            host = f"[{endpoint}]"
+            
+        return f"{host}:{port}"
         
     @staticmethod
     def generate_linux_install_script(node_name: str, server_api: str) -> str:
@@ -0,0 +1,49 @@
+"""
+延迟下发
+批处理（CLI run / shell 事务）期间，服务层不立即重写、重载 WireGuard 配置和下发访问控制
+规则、限速规则，只记录受影响的接口；批处理提交后由 ServerService.apply_deferred() 统一执行一次
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Set
+
+
+class PendingApply:
+    """批处理期间推迟的下发操作"""
+
+    def __init__(self):
+        self.configs: Set[Optional[int]] = set()  # 需重写配置的接口 ID，None 表示全部接口
+        self.reloads: Set[Optional[int]] = set()  # 需重载的接口 ID，None 表示全部接口
+        self.acl = False  # 是否需要整表重新下发访问控制规则
+        self.shaping: Dict[int, list] = {}  # 批处理前受影响接口的限速状态（接口 ID -> 受限速节点）
+
+    def __bool__(self) -> bool:
+        return bool(self.configs or self.reloads or self.acl or self.shaping)
+
+    @staticmethod
+    def targets(interface_ids: Set[Optional[int]]) -> List[Optional[int]]:
+        """接口 ID 集合 -> 依次处理的目标（包含 None 时只处理一次全部接口）"""
+        return [None] if None in interface_ids else sorted(interface_ids)
+
+
+_pending: ContextVar[Optional[PendingApply]] = ContextVar('wg_pending_apply', default=None)
+
+
+def pending_apply() -> Optional[PendingApply]:
+    """当前上下文推迟的下发操作，不在批处理中时为 None"""
+    return _pending.get()
+
+
+@contextmanager
+def defer_apply():
+    """在上下文中推迟下发
+
+    Yields:
+        PendingApply 对象，上下文结束后交给 ServerService.apply_deferred() 执行
+    """
+    pending = PendingApply()
+    token = _pending.set(pending)
+    try:
+        yield pending
+    finally:
+        _pending.reset(token)
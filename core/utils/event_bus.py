@@ -0,0 +1,198 @@
+"""
+进程内事件总线
+服务层和 peer 采集器发布节点、配置下发和 peer 状态变化事件，/api/v1/events 以
+Server-Sent Events 推送给订阅者。
+
+事件在发布时只编码一次（完整的 SSE 帧），追加到环形缓冲区后唤醒等待中的订阅者：
+同一事件循环上的订阅者共同等待一个 Future，发布的开销与订阅者数量无关，各订阅者
+按自己的游标从缓冲区读取并直接写出编码好的帧。缓冲区保留最近的事件，断线重连时
+按 Last-Event-ID 补发；补发不了（缓冲区已覆盖、服务重启过）时发送 resync 事件，
+客户端应重新拉取完整数据。
+
+事件只在发布它的进程内有效：CLI、批处理和其他 Web worker 的修改不会直接出现在事件流
+中，由 ChangeRelay 根据数据库变更日志发布 changes 事件补充。
+"""
+import asyncio
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Deque, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from config import base as config
+
+
+class Event(NamedTuple):
+    """已发布的事件"""
+    seq: int
+    type: str
+    frame: bytes  # 编码好的 SSE 帧
+
+
+def _resolve(future: asyncio.Future):
+    """在事件循环线程中唤醒等待者"""
+    if not future.done():
+        future.set_result(None)
+
+
+class EventBus:
+    """事件总线：可在任意线程发布，在 asyncio 事件循环中订阅
+
+    尚无订阅者连接过时（如 CLI 进程）发布直接返回，不做编码和缓存。
+    """
+
+    def __init__(self, capacity: Optional[int] = None):
+        """初始化事件总线
+
+        Args:
+            capacity: 缓冲区保留的事件数量，默认使用全局配置
+        """
+        self._lock = threading.Lock()
+        self._events: Deque[Event] = deque(maxlen=capacity or config.EVENTS_BUFFER_SIZE)
+        self._seq = 0
+        # 事件 ID 为 <纪元>:<序号>，纪元区分进程，重启后旧的 Last-Event-ID 不会被误认
+        self.epoch = os.urandom(4).hex()
+        self._waiters: Dict[asyncio.AbstractEventLoop, asyncio.Future] = {}
+        self._subscribers = 0
+        self._active = False
+
+    @property
+    def subscriber_count(self) -> int:
+        """当前订阅者数量"""
+        return self._subscribers
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> Optional[int]:
+        """发布事件
+
+        Args:
+            event_type: 事件类型（如 node.created）
+            data: 事件数据（可 JSON 序列化）
+
+        Returns:
+            事件序号，尚无订阅者连接过时不记录，返回 None
+        """
+        if not self._active:
+            return None
+        payload = json.dumps(
+            {'time': datetime.now(timezone.utc).isoformat(timespec='seconds'), **data},
+            ensure_ascii=False, default=str
+        )
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            self._events.append(Event(
+                seq, event_type, f"id: {self.epoch}:{seq}\nevent: {event_type}\ndata: {payload}\n\n".encode()
+            ))
+            waiters = list(self._waiters.items())
+            self._waiters.clear()
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve, future)
+            except RuntimeError:
+                # 事件循环已关闭
+                pass
+        return seq
+
+    def _parse_last_id(self, last_event_id: Optional[str]) -> Tuple[int, bool]:
+        """Last-Event-ID -> (起始游标, 是否需要 resync)"""
+        if not last_event_id:
+            return self._seq, False
+        epoch, _, seq = last_event_id.partition(':')
+        if epoch != self.epoch or not seq.isdigit() or int(seq) > self._seq:
+            return self._seq, True
+        return int(seq), False
+
+    def _read(self, cursor: int) -> Tuple[List[Event], bool]:
+        """读取序号大于 cursor 的事件 -> (事件列表, 是否有事件已被缓冲区覆盖)"""
+        with self._lock:
+            if cursor >= self._seq:
+                return [], False
+            count = min(self._seq - cursor, len(self._events))
+            size = len(self._events)
+            events = [self._events[i] for i in range(size - count, size)]
+            return events, events[0].seq > cursor + 1
+
+    async def _wait(self, cursor: int, timeout: float) -> bool:
+        """等待序号大于 cursor 的事件
+
+        Returns:
+            False 表示超时
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._seq > cursor:
+                return True
+            future = self._waiters.get(loop)
+            if future is None:
+                future = self._waiters[loop] = loop.create_future()
+        try:
+            # shield：单个订阅者超时不能取消共享的 Future
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _resync_frame(self, seq: int) -> bytes:
+        """resync 事件：序号 seq 之前的事件已无法补发"""
+        return f"id: {self.epoch}:{seq}\nevent: resync\ndata: {{}}\n\n".encode()
+
+    async def stream(self, last_event_id: Optional[str] = None,
+                     types: Optional[Sequence[str]] = None,
+                     heartbeat: Optional[float] = None) -> AsyncIterator[bytes]:
+        """订阅事件，逐个产出 SSE 帧
+
+        Args:
+            last_event_id: 断线重连时客户端带回的 Last-Event-ID，从其后补发
+            types: 只接收这些类型的事件（前缀匹配，如 node. 或 peer.traffic），None 表示全部
+            heartbeat: 无事件时发送心跳注释的间隔（秒），默认使用全局配置
+
+        Yields:
+            SSE 帧（字节）
+        """
+        heartbeat = heartbeat or config.EVENTS_HEARTBEAT
+        prefixes = tuple(types) if types else None
+        with self._lock:
+            self._subscribers += 1
+            self._active = True
+            cursor, resync = self._parse_last_id(last_event_id)
+        try:
+            yield f"retry: 3000\n: wg-toolkit events {self.epoch}\n\n".encode()
+            if resync:
+                yield self._resync_frame(cursor)
+            while True:
+                events, missed = self._read(cursor)
+                if missed:
+                    yield self._resync_frame(events[0].seq - 1)
+                for event in events:
+                    cursor = event.seq
+                    if prefixes is None or event.type.startswith(prefixes):
+                        yield event.frame
+                if not events and not await self._wait(cursor, heartbeat):
+                    yield b": ping\n\n"
+        finally:
+            with self._lock:
+                self._subscribers -= 1
+
+
+# 全局单例
+_bus: Optional[EventBus] = None
+_bus_lock = threading.Lock()
+
+
+def get_event_bus() -> EventBus:
+    """获取全局事件总线
+
+    Returns:
+        EventBus 实例
+    """
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                _bus = EventBus()
+    return _bus
+
+
+def publish_event(event_type: str, data: Dict[str, Any]) -> Optional[int]:
+    """向全局事件总线发布事件（见 EventBus.publish）"""
+    return get_event_bus().publish(event_type, data)
@@ -0,0 +1,141 @@
+"""
+配置片段缓存模块
+缓存服务端配置中每个节点已渲染的 [Peer] 段，增量重建服务端配置
+"""
+import threading
+from typing import Callable, Dict, Hashable, Iterable, Iterator, Optional, Tuple
+from core.domain.node import Node
+from core.models.database import Database
+from core.utils.metrics import FRAGMENT_CACHE_HITS, FRAGMENT_CACHE_MISSES
+
+
+class PeerFragmentCache:
+    """节点 [Peer] 段渲染缓存
+
+    以节点 ID 为键，以节点修订号（每次修改节点记录时由数据库触发器加一）校验是否过期；
+    全局渲染参数（如 persistent_keepalive）变化时整体失效。
+    """
+
+    def __init__(self, scope: Hashable = None):
+        """初始化缓存
+
+        Args:
+            scope: 缓存作用域（用于指标标签）
+        """
+        self.scope = str(scope)
+        self._fragments: Dict[int, Tuple[Hashable, str]] = {}
+        self._params: Optional[Hashable] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def use_params(self, params: Hashable) -> None:
+        """声明本次渲染使用的全局参数，参数变化时清空缓存
+
+        Args:
+            params: 影响 [Peer] 段内容的全局参数（需可比较）
+        """
+        with self._lock:
+            if params != self._params:
+                self._fragments.clear()
+                self._params = params
+
+    def render(self, node: Node, renderer: Callable[[Node], str]) -> str:
+        """获取节点的 [Peer] 段，未命中或已过期时重新渲染
+
+        Args:
+            node: 节点实体
+            renderer: 渲染函数
+
+        Returns:
+            [Peer] 段文本
+        """
+        revision = node.revision
+        entry = self._fragments.get(node.id)
+        if entry is not None and entry[0] == revision:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        fragment = renderer(node)
+        self._fragments[node.id] = (revision, fragment)
+        return fragment
+
+    def render_all(self, nodes: Iterable[Node],
+                   renderer: Callable[[Node], str]) -> Iterator[str]:
+        """依次产出所有节点的 [Peer] 段
+
+        完整遍历后会清理已不存在的节点对应的缓存项。
+
+        Args:
+            nodes: 节点实体可迭代对象（可为数据库游标）
+            renderer: 渲染函数
+
+        Yields:
+            [Peer] 段文本
+        """
+        seen = set()
+        render = self.render
+        hits, misses = self.hits, self.misses
+        for node in nodes:
+            seen.add(node.id)
+            yield render(node, renderer)
+
+        with self._lock:
+            for node_id in self._fragments.keys() - seen:
+                del self._fragments[node_id]
+        # 每次完整遍历汇总一次命中数，不在逐个节点的热路径上更新指标
+        FRAGMENT_CACHE_HITS.inc((self.scope,), self.hits - hits)
+        FRAGMENT_CACHE_MISSES.inc((self.scope,), self.misses - misses)
+
+    def discard(self, node_id: int) -> None:
+        """移除单个节点的缓存
+
+        Args:
+            node_id: 节点 ID
+        """
+        self._fragments.pop(node_id, None)
+
+    def clear(self) -> None:
+        """清空全部缓存"""
+        with self._lock:
+            self._fragments.clear()
+            self._params = None
+
+    def __len__(self) -> int:
+        return len(self._fragments)
+
+
+# 全局缓存表：作用域（接口分片 ID）-> 缓存实例
+_peer_fragment_caches: Dict[Hashable, PeerFragmentCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_peer_fragment_cache(scope: Hashable = None) -> PeerFragmentCache:
+    """获取指定作用域的 [Peer] 段缓存实例
+
+    每个接口分片使用独立缓存，避免渲染一个分片时清理掉其他分片的缓存项。
+
+    Args:
+        scope: 缓存作用域（接口分片 ID）
+
+    Returns:
+        PeerFragmentCache 实例
+    """
+    cache = _peer_fragment_caches.get(scope)
+    if cache is None:
+        with _caches_lock:
+            cache = _peer_fragment_caches.setdefault(scope, PeerFragmentCache(scope))
+    return cache
+
+
+def clear_peer_fragment_caches() -> None:
+    """清空全部作用域的 [Peer] 段缓存"""
+    with _caches_lock:
+        caches = list(_peer_fragment_caches.values())
+    for cache in caches:
+        cache.clear()
+
+
+# 事务回滚后节点修订号回退，可能与之后写入的修订号重合，丢弃全部缓存
+Database.on_rollback(clear_peer_fragment_caches)
@@ -2,9 +2,19 @@
 IP 地址分配模块
 负责虚拟网络中的 IP 地址分配和管理
 """
+import hashlib
 import ipaddress
-from typing import Optional
+import secrets
+from typing import Collection, Iterable, List, Optional
+from core.domain.hub import Hub
+from core.domain.interface import WgInterface
 from core.models.database import Database
+from core.utils.prefix_index import get_prefix_index, KIND_NETWORK, KIND_NODE
+
+
+# IPv6 哈希探测次数：稀疏网络段中首次探测几乎总能命中空闲地址，
+# 连续失败说明网络段已较稠密，改为按区间查找空隙
+IP6_HASH_PROBES = 16
 
 
 class IPAllocator:
@@ -30,6 +40,8 @@ class IPAllocator:
         """
         # 解析网络段
         network = ipaddress.ip_network(network_cidr, strict=False)
+        if network.version == 6:
+            return self.allocate_ip6(network_cidr, server_ip, seed=secrets.token_hex(8))
         
         # 获取网络前缀（如 10.0.0）
         network_parts = str(network.network_address).rsplit('.', 1)
@@ -59,6 +71,169 @@ class IPAllocator:
             
         return next_ip
         
+    def allocate_interface_ip(self, interface: WgInterface) -> Optional[str]:
+        """在接口分片的网络子段内分配新的 IP 地址
+        
+        优先使用分片内已分配最大 IP 的下一个地址，到达子段末尾后回收空闲地址。
+        
+        Args:
+            interface: 接口分片实体
+            
+        Returns:
+            分配的 IP 地址字符串，如果子段已耗尽返回 None
+        """
+        return self.allocate_in_range(
+            interface.network_cidr,
+            interface.virtual_ip,
+            self.db.get_interface_ips(interface.id)
+        )
+        
+    def allocate_hub_ip(self, hub: Hub) -> Optional[str]:
+        """在远端中心节点负责的网络子段内分配新的 IP 地址
+        
+        Args:
+            hub: 远端中心节点实体
+            
+        Returns:
+            分配的 IP 地址字符串，如果子段已耗尽返回 None
+        """
+        return self.allocate_in_range(
+            hub.network_cidr,
+            hub.virtual_ip,
+            self.db.get_hub_ips(hub.id)
+        )
+        
+    @staticmethod
+    def allocate_in_range(network_cidr: str, reserved_ip: str,
+                          allocated_ips: Iterable[str]) -> Optional[str]:
+        """在网络子段内分配新的 IP 地址
+        
+        优先使用已分配最大 IP 的下一个地址，到达子段末尾后回收空闲地址。
+        
+        Args:
+            network_cidr: 网络子段
+            reserved_ip: 保留地址（子段所属接口或中心节点自身的 IP）
+            allocated_ips: 子段内已分配的 IP
+            
+        Returns:
+            分配的 IP 地址字符串，如果子段已耗尽返回 None
+        """
+        network = ipaddress.ip_network(network_cidr, strict=False)
+        first = int(network.network_address) + 1
+        last = int(network.broadcast_address) - 1
+        
+        used = {int(ipaddress.ip_address(ip)) for ip in allocated_ips}
+        used.add(int(ipaddress.ip_address(reserved_ip)))
+        
+        # 顺序分配：已分配最大 IP 的下一个
+        candidate = max(used) + 1
+        if first <= candidate <= last and candidate not in used:
+            return str(ipaddress.ip_address(candidate))
+            
+        # 回收：从子段起始位置查找第一个空闲地址
+        for candidate in range(first, last + 1):
+            if candidate not in used:
+                return str(ipaddress.ip_address(candidate))
+                
+        return None  # IP 池已耗尽
+        
+    def allocate_interface_ip6(self, interface: WgInterface, seed: str,
+                               taken: Collection[int] = ()) -> Optional[str]:
+        """在接口分片的 IPv6 网络子段内分配地址
+        
+        Args:
+            interface: 接口分片实体（需已启用 IPv6）
+            seed: 哈希种子（通常为节点名称），同一种子优先得到同一地址
+            taken: 额外视为已占用的地址（整数），用于批量分配
+            
+        Returns:
+            分配的 IPv6 地址字符串，接口未启用 IPv6 或子段已耗尽时返回 None
+        """
+        if not interface.network6_cidr:
+            return None
+        return self.allocate_ip6(interface.network6_cidr, interface.virtual_ip6, seed, taken)
+        
+    def allocate_ip6(self, network6_cidr: str, reserved_ip6: Optional[str], seed: str,
+                     taken: Collection[int] = ()) -> Optional[str]:
+        """在 IPv6 网络段内稀疏分配地址
+        
+        /64 有 2^64 个地址，不能像 IPv4 那样顺序扫描或用位图记录。先以
+        hash(种子, 探测序号) 在整个主机空间内取候选地址，经前缀索引确认空闲，
+        期望一次命中；连续探测失败（网络段很小或已稠密）时，再把已分配地址
+        排序为区间，取第一个空隙。
+        
+        Args:
+            network6_cidr: IPv6 网络段
+            reserved_ip6: 保留地址（网络段所属接口自身的地址）
+            seed: 哈希种子
+            taken: 额外视为已占用的地址（整数）
+            
+        Returns:
+            分配的 IPv6 地址字符串，网络段已耗尽时返回 None
+        """
+        network = ipaddress.IPv6Network(network6_cidr, strict=False)
+        base = int(network.network_address)
+        # 主机号 0 为子网路由器任播地址，不分配
+        host_count = network.num_addresses - 1
+        if host_count < 1:
+            return None
+            
+        reserved = {int(ipaddress.IPv6Address(reserved_ip6))} if reserved_ip6 else set()
+        
+        for attempt in range(IP6_HASH_PROBES):
+            digest = hashlib.blake2b(f"{seed}/{attempt}".encode(), digest_size=16).digest()
+            candidate = base + 1 + int.from_bytes(digest, 'big') % host_count
+            if candidate in reserved or candidate in taken:
+                continue
+            address = str(ipaddress.IPv6Address(candidate))
+            if self.is_ip_available(address):
+                return address
+                
+        used = [
+            value for value in
+            (int(ipaddress.IPv6Address(ip)) for ip in self.db.get_allocated_ip6())
+            if value in range(base, base + network.num_addresses)
+        ]
+        return self.first_free_ip6(network, sorted({*used, *reserved, *taken}))
+        
+    @staticmethod
+    def first_free_ip6(network: ipaddress.IPv6Network, used: List[int]) -> Optional[str]:
+        """在已占用地址的有序区间之间查找第一个空闲地址
+        
+        Args:
+            network: IPv6 网络段
+            used: 网络段内已占用的地址（整数，升序且不重复）
+            
+        Returns:
+            空闲地址字符串，网络段已耗尽时返回 None
+        """
+        candidate = int(network.network_address) + 1
+        last = int(network.broadcast_address)
+        for value in used:
+            if value > candidate:
+                break
+            if value == candidate:
+                candidate += 1
+        if candidate > last:
+            return None
+        return str(ipaddress.IPv6Address(candidate))
+        
+    @staticmethod
+    def generate_ula_network(prefixlen: int = 64) -> str:
+        """生成随机的 ULA 网络段（RFC 4193）
+        
+        fd00::/8 后接 40 位随机全局 ID 得到站点 /48，取其中第一个子网。
+        
+        Args:
+            prefixlen: 网络段前缀长度（48-64）
+            
+        Returns:
+            IPv6 网络段（如 fd3c:9a1e:72b0::/64）
+        """
+        global_id = secrets.randbits(40)
+        site = (0xfd << 120) | (global_id << 80)
+        return str(ipaddress.IPv6Network((site, prefixlen)))
+        
     def validate_ip(self, ip: str, network_cidr: str) -> bool:
         """验证 IP 地址是否在指定网络段内
         
@@ -79,6 +254,9 @@ class IPAllocator:
     def is_ip_available(self, ip: str, exclude_node_id: Optional[int] = None) -> bool:
         """检查 IP 地址是否可用
         
+        通过前缀索引做最长前缀匹配，耗时与节点数量无关。地址已被节点占用，
+        或落在某个节点路由的子网内时不可用。
+        
         Args:
             ip: IP 地址
             exclude_node_id: 排除的节点 ID（用于更新节点时）
@@ -86,16 +264,15 @@ class IPAllocator:
         Returns:
             是否可用
         """
-        all_nodes = self.db.get_all_nodes()
-        
-        for node in all_nodes:
-            if node['virtual_ip'] == ip:
-                # 如果是被排除的节点，则认为可用
-                if exclude_node_id and node['id'] == exclude_node_id:
-                    continue
-                return False
-                
-        return True
+        match = get_prefix_index(self.db).lookup(ip)
+        if match is None:
+            return True
+            
+        _, owner = match
+        if owner.kind == KIND_NETWORK:
+            return True
+        # 如果是被排除节点自身的地址，则认为可用
+        return owner.kind == KIND_NODE and exclude_node_id is not None and owner.id == exclude_node_id
         
     def get_network_info(self, network_cidr: str) -> dict:
         """获取网络段信息
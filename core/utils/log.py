@@ -0,0 +1,210 @@
+"""
+日志模块
+结构化日志：各模块使用 logging.getLogger(__name__)，记录经 QueueHandler 放入队列，
+由 QueueListener 的后台线程格式化并写出，请求线程不会阻塞在 I/O 上。每条日志附带
+当前请求 ID 和操作 ID（由上下文变量传递），日志级别可在运行时调整。
+"""
+import atexit
+import json
+import logging
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from config import base as config
+
+# 项目代码的顶层包，日志处理器挂在这些 logger 上
+LOGGER_NAMESPACES = ('core', 'web', 'cli', 'wg_toolkit_cli')
+
+LOG_FORMATS = ('json', 'text', 'console')
+LOG_LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+_request_id: ContextVar[Optional[str]] = ContextVar('wg_request_id', default=None)
+_operation: ContextVar[Optional[Tuple[str, str]]] = ContextVar('wg_operation', default=None)
+
+
+def new_id() -> str:
+    """生成 12 位十六进制 ID"""
+    return os.urandom(6).hex()
+
+
+@contextmanager
+def request_context(request_id: str):
+    """在上下文中设置请求 ID"""
+    token = _request_id.set(request_id)
+    try:
+        yield request_id
+    finally:
+        _request_id.reset(token)
+
+
+@contextmanager
+def operation(name: str, op_id: Optional[str] = None):
+    """在上下文中设置操作（如一条 CLI 命令、一轮后台清理）
+
+    Args:
+        name: 操作名称
+        op_id: 操作 ID，默认新生成
+
+    Yields:
+        操作 ID
+    """
+    op_id = op_id or new_id()
+    token = _operation.set((op_id, name))
+    try:
+        yield op_id
+    finally:
+        _operation.reset(token)
+
+
+def current_ids() -> Tuple[Optional[str], Optional[str]]:
+    """(当前请求 ID, 当前操作 ID)"""
+    op = _operation.get()
+    return _request_id.get(), op[0] if op else None
+
+
+class ContextFilter(logging.Filter):
+    """在记录日志的线程中附加请求 ID、操作 ID 和操作名称（进入队列之前）"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        op = _operation.get()
+        record.op_id, record.op = op if op else (None, None)
+        return True
+
+
+# LogRecord 自带的属性，其余属性视为 extra 字段
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {
+    'message', 'asctime', 'request_id', 'op_id', 'op', 'taskName'
+}
+
+
+class JsonFormatter(logging.Formatter):
+    """每条日志一行 JSON：时间、级别、logger、消息、请求/操作 ID 和 extra 字段"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key in ('request_id', 'op_id', 'op'):
+            value = getattr(record, key, None)
+            if value:
+                entry[key] = value
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """控制台格式，沿用 CLI 的输出风格（警告: ... / 错误: ...）"""
+
+    PREFIXES = {
+        logging.DEBUG: '调试: ',
+        logging.INFO: '',
+        logging.WARNING: '警告: ',
+        logging.ERROR: '错误: ',
+        logging.CRITICAL: '错误: ',
+    }
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = f"{self.PREFIXES.get(record.levelno, '')}{record.getMessage()}"
+        if record.exc_info:
+            message += '\n' + self.formatException(record.exc_info)
+        return message
+
+
+_listener = None  # logging.handlers.QueueListener
+_configured = False
+_lock = threading.Lock()
+
+
+def setup_logging(default_format: str = 'json', queued: bool = True, stream=None) -> None:
+    """配置项目日志（每个进程只生效一次）
+
+    Args:
+        default_format: 未设置 LOG_FORMAT 时使用的格式（json/text/console）
+        queued: 是否经队列由后台线程写出（CLI 使用同步输出，保证与命令输出的先后顺序）
+        stream: 输出流，默认 stderr
+    """
+    global _listener, _configured
+    with _lock:
+        if _configured:
+            return
+        log_format = (config.LOG_FORMAT or default_format).lower()
+        if log_format not in LOG_FORMATS:
+            log_format = default_format
+
+        handler = logging.StreamHandler(stream or sys.stderr)
+        if log_format == 'json':
+            handler.setFormatter(JsonFormatter())
+        elif log_format == 'console':
+            handler.setFormatter(ConsoleFormatter())
+        else:
+            handler.setFormatter(logging.Formatter(config.LOG_TEXT_FORMAT))
+
+        if queued:
+            # 按需导入：logging.handlers 会连带导入 socket、pickle 等，CLI 不需要
+            from logging.handlers import QueueHandler, QueueListener
+            from queue import SimpleQueue
+
+            log_queue = SimpleQueue()
+            _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+            _listener.start()
+            handler = QueueHandler(log_queue)
+            atexit.register(shutdown_logging)
+        handler.addFilter(ContextFilter())
+
+        for name in LOGGER_NAMESPACES:
+            logger = logging.getLogger(name)
+            logger.handlers = [handler]
+            logger.propagate = False
+        _configured = True
+
+    try:
+        set_log_level(config.LOG_LEVEL)
+    except ValueError:
+        set_log_level('INFO')
+
+
+def shutdown_logging() -> None:
+    """停止后台写出线程（写完队列中剩余的日志）"""
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener:
+        listener.stop()
+
+
+def set_log_level(level: str) -> str:
+    """调整项目日志级别（立即生效，无需重启）
+
+    Args:
+        level: DEBUG/INFO/WARNING/ERROR/CRITICAL
+
+    Returns:
+        规范化后的级别名称
+
+    Raises:
+        ValueError: 级别无效
+    """
+    level = str(level).upper()
+    if level not in LOG_LEVELS:
+        raise ValueError(f"日志级别必须为 {', '.join(LOG_LEVELS)} 之一")
+    for name in LOGGER_NAMESPACES:
+        logging.getLogger(name).setLevel(level)
+    return level
+
+
+def get_log_level() -> str:
+    """当前项目日志级别"""
+    return logging.getLevelName(logging.getLogger(LOGGER_NAMESPACES[0]).getEffectiveLevel())
@@ -0,0 +1,450 @@
+"""
+指标模块
+进程内的 Prometheus 指标注册表（计数器、仪表、直方图）和文本格式输出
+
+热路径上每次记录只做一次字典查找和一次加法，每个指标一把锁，临界区只覆盖
+这两步。多 worker 部署时设置 WG_METRICS_DIR：各进程定期把自己的快照写入
+该目录，抓取时合并所有进程的快照。
+"""
+import atexit
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config import base as config
+
+logger = logging.getLogger(__name__)
+
+# 默认直方图分桶（秒）：覆盖从亚毫秒的数据库查询到数秒的配置重载
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    """转义标签值"""
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    """标签 -> {a="1",b="2"}"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    """数值 -> 文本（整数不带小数点）"""
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """指标基类：名称、说明、标签名和按标签值分组的数据"""
+
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def snapshot_items(self) -> List[Tuple[tuple, object]]:
+        """[(标签值, 数据), ...]（数据为副本）"""
+        with self._lock:
+            return [(labels, self._copy(value)) for labels, value in self._values.items()]
+
+    def snapshot(self) -> List[list]:
+        """[[标签值列表, 数据], ...]（可 JSON 序列化）"""
+        return [[list(labels), value] for labels, value in self.snapshot_items()]
+
+    @staticmethod
+    def _copy(value):
+        return value
+
+    def clear(self) -> None:
+        """清空数据（仪表在每次抓取前由采集函数重新填充）"""
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    """计数器：只增不减"""
+
+    kind = 'counter'
+
+    def inc(self, labels: tuple = (), amount: float = 1.0) -> None:
+        """增加计数
+
+        Args:
+            labels: 标签值（与 labelnames 顺序一致）
+            amount: 增量
+        """
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self, values: Iterable[Tuple[tuple, float]]) -> Iterable[str]:
+        for labels, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """仪表：可任意设置的当前值"""
+
+    kind = 'gauge'
+
+    def set(self, labels: tuple, value: float) -> None:
+        """设置当前值
+
+        Args:
+            labels: 标签值
+            value: 当前值
+        """
+        with self._lock:
+            self._values[labels] = float(value)
+
+
+class Histogram(_Metric):
+    """直方图：按分桶统计观测值的分布（各桶内部存非累计计数，输出时累计）"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, labels: tuple, value: float) -> None:
+        """记录一次观测值
+
+        Args:
+            labels: 标签值
+            value: 观测值（秒）
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            data = self._values.get(labels)
+            if data is None:
+                # [各桶计数..., +Inf 桶计数, 总和]
+                data = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            data[index] += 1
+            data[-1] += value
+
+    def time(self, labels: tuple = ()) -> '_Timer':
+        """计时上下文管理器：退出时记录耗时"""
+        return _Timer(self, labels)
+
+    @staticmethod
+    def _copy(value):
+        return list(value)
+
+    def render(self, values: Iterable[Tuple[tuple, list]]) -> Iterable[str]:
+        for labels, data in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), data):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{bound!r}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(data[-1])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}"
+
+
+class _Timer:
+    """Histogram.time() 返回的计时器"""
+
+    __slots__ = ('histogram', 'labels', 'start')
+
+    def __init__(self, histogram: Histogram, labels: tuple):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.histogram.observe(self.labels, time.perf_counter() - self.start)
+
+
+class MetricsRegistry:
+    """指标注册表
+
+    采集函数（collector）在每次抓取时调用，用于填充按需计算的仪表（如节点数量），
+    只在处理抓取请求的进程中运行，不写入多进程快照。
+    """
+
+    def __init__(self, multiprocess_dir: Optional[str] = None):
+        """初始化
+
+        Args:
+            multiprocess_dir: 多进程快照目录，None 表示单进程模式
+        """
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self.multiprocess_dir = multiprocess_dir
+
+    def register(self, metric: _Metric) -> _Metric:
+        """注册指标（同名时返回已注册的实例）"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """注册抓取时调用的采集函数"""
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    # ---- 多进程快照 ----
+
+    def _snapshot_path(self, pid: int) -> str:
+        return os.path.join(self.multiprocess_dir, f"metrics-{pid}.json")
+
+    def write_snapshot(self) -> None:
+        """将本进程的计数器和直方图写入快照文件（原子替换）"""
+        if not self.multiprocess_dir:
+            return
+        data = {
+            name: metric.snapshot()
+            for name, metric in list(self._metrics.items())
+            if metric.kind != 'gauge'
+        }
+        path = self._snapshot_path(os.getpid())
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+
+    def _merged_values(self) -> Dict[str, Dict[tuple, object]]:
+        """合并所有进程的快照（计数器和直方图按标签求和）
+
+        已退出的 worker 的快照保留，计数器不会因为 worker 重启而回退。
+        """
+        merged: Dict[str, Dict[tuple, object]] = {}
+        self.write_snapshot()
+        for entry in os.scandir(self.multiprocess_dir):
+            if not (entry.name.startswith('metrics-') and entry.name.endswith('.json')):
+                continue
+            try:
+                with open(entry.path, encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, items in data.items():
+                target = merged.setdefault(name, {})
+                for labels, value in items:
+                    labels = tuple(labels)
+                    current = target.get(labels)
+                    if current is None:
+                        target[labels] = value
+                    elif isinstance(value, list):
+                        target[labels] = [a + b for a, b in zip(current, value)]
+                    else:
+                        target[labels] = current + value
+        return merged
+
+    # ---- 输出 ----
+
+    def render(self) -> str:
+        """运行采集函数并输出 Prometheus 文本格式"""
+        for collector in list(self._collectors):
+            try:
+                collector()
+            except Exception as e:
+                logger.warning(f"指标采集失败: {str(e)}")
+
+        merged = self._merged_values() if self.multiprocess_dir else None
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            if merged is not None and metric.kind != 'gauge':
+                values = sorted(merged.get(name, {}).items())
+            else:
+                values = sorted(metric.snapshot_items())
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render(values))
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsFlusher:
+    """多进程模式下定期写入本进程的快照（仿照直连分析器的后台线程）"""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self, interval: Optional[int] = None) -> bool:
+        """启动后台写入线程
+
+        Args:
+            interval: 写入间隔（秒），默认使用配置
+
+        Returns:
+            是否启动（单进程模式或已在运行时不启动）
+        """
+        interval = config.METRICS_FLUSH_INTERVAL if interval is None else interval
+        if not self.registry.multiprocess_dir or interval <= 0:
+            return False
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return False
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run, args=(interval,), name='metrics-flusher', daemon=True
+            )
+            self._thread.start()
+            return True
+
+    def stop(self):
+        """停止后台线程并写入最后一次快照"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread:
+            self._stop_event.set()
+            thread.join(timeout=5)
+        self._flush()
+
+    def _run(self, interval: int):
+        while not self._stop_event.wait(interval):
+            self._flush()
+
+    def _flush(self):
+        try:
+            self.registry.write_snapshot()
+        except OSError as e:
+            logger.warning(f"写入指标快照失败: {str(e)}")
+
+
+def _create_registry() -> MetricsRegistry:
+    """创建全局注册表（设置 WG_METRICS_DIR 时启用多进程模式）"""
+    multiprocess_dir = config.METRICS_MULTIPROC_DIR
+    if multiprocess_dir:
+        os.makedirs(multiprocess_dir, exist_ok=True)
+    return MetricsRegistry(multiprocess_dir)
+
+
+# 全局注册表
+REGISTRY = _create_registry()
+
+# 热路径指标
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    'wg_http_request_duration_seconds', 'HTTP 请求处理耗时', ('method', 'route', 'status')
+)
+DB_QUERY_SECONDS = REGISTRY.histogram(
+    'wg_db_query_duration_seconds', 'Database 方法耗时', ('method',)
+)
+COMMAND_SECONDS = REGISTRY.histogram(
+    'wg_command_duration_seconds', '外部命令（wg/ip/nft/tc 等）执行耗时', ('command',)
+)
+COMMAND_FAILURES = REGISTRY.counter(
+    'wg_command_failures_total', '外部命令执行失败次数', ('command',)
+)
+RENDER_SECONDS = REGISTRY.histogram(
+    'wg_config_render_duration_seconds',
+    '配置渲染耗时（server: 生成服务端配置文本，server_file: 流式写入服务端配置文件，client: 客户端配置）',
+    ('kind',)
+)
+RELOADS = REGISTRY.counter(
+    'wg_reloads_total', 'WireGuard 接口重载次数（syncconf 同步或 wg-quick 启动）', ('interface', 'mode')
+)
+RELOAD_REQUESTS = REGISTRY.counter(
+    'wg_reload_requests_total', 'reload_wireguard 调用次数（一次调用可重载多个接口）'
+)
+FRAGMENT_CACHE_HITS = REGISTRY.counter(
+    'wg_peer_fragment_cache_hits_total', '[Peer] 段渲染复用缓存的次数', ('scope',)
+)
+FRAGMENT_CACHE_MISSES = REGISTRY.counter(
+    'wg_peer_fragment_cache_misses_total', '[Peer] 段重新渲染的次数', ('scope',)
+)
+
+_flusher: Optional[MetricsFlusher] = None
+_flusher_lock = threading.Lock()
+
+
+def get_metrics_flusher() -> MetricsFlusher:
+    """获取全局快照写入器单例"""
+    global _flusher
+    if _flusher is None:
+        with _flusher_lock:
+            if _flusher is None:
+                _flusher = MetricsFlusher(REGISTRY)
+    return _flusher
+
+
+def command_label(cmd: Sequence[str]) -> str:
+    """命令列表 -> 指标标签（程序名加子命令，如 "wg syncconf"、"ip route"）
+
+    去掉 sudo 前缀；参数中的接口名、路径等不进入标签，避免标签数量无界增长。
+    """
+    parts = list(cmd[1:] if cmd and cmd[0] == 'sudo' else cmd)
+    if not parts:
+        return ''
+    program = os.path.basename(parts[0])
+    if len(parts) > 1 and program in ('wg', 'wg-quick', 'ip') and not parts[1].startswith('-'):
+        return f"{program} {parts[1]}"
+    return program
+
+
+def timed(histogram: Histogram, labels: tuple = ()):
+    """装饰器：记录函数每次调用的耗时"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with histogram.time(labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrument_methods(cls, histogram: Histogram, exclude: Iterable[str] = ()) -> None:
+    """为类的全部公开方法记录耗时（标签为方法名）
+
+    Args:
+        cls: 目标类
+        histogram: 记录耗时的直方图（单个标签：方法名）
+        exclude: 不记录的方法名
+    """
+    perf_counter = time.perf_counter
+    observe = histogram.observe
+
+    def wrap(name, func):
+        labels = (name,)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(labels, perf_counter() - start)
+        return wrapper
+
+    excluded = set(exclude)
+    for name, func in list(vars(cls).items()):
+        if name.startswith('_') or name in excluded or not inspect.isfunction(func):
+            continue
+        setattr(cls, name, wrap(name, func))
+
+
+atexit.register(lambda: REGISTRY.write_snapshot() if REGISTRY.multiprocess_dir else None)
@@ -0,0 +1,162 @@
+"""
+nftables 规则编译模块
+将节点组成员和组间放行规则编译为 nftables 集合和判决映射（verdict map）
+"""
+import ipaddress
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from config import base as config
+
+# (节点组 ID, 前缀)：组成员的一个地址前缀（节点虚拟 IP 或路由子网）
+Member = Tuple[int, str]
+
+# 地址族 -> (集合后缀, nft 地址类型, 匹配关键字)
+_FAMILIES = {
+    4: ('v4', 'ipv4_addr', 'ip'),
+    6: ('v6', 'ipv6_addr', 'ip6'),
+}
+
+
+def node_members(group_id: Optional[int], virtual_ip: Optional[str],
+                 virtual_ip6: Optional[str], routed_subnets: Optional[str]) -> Set[Member]:
+    """节点 -> 组成员前缀集合（未分组的节点没有成员前缀）
+
+    Args:
+        group_id: 节点组 ID
+        virtual_ip: 虚拟 IP
+        virtual_ip6: 虚拟 IPv6 地址
+        routed_subnets: 逗号分隔的路由子网
+
+    Returns:
+        (节点组 ID, 前缀) 集合
+    """
+    if group_id is None:
+        return set()
+    prefixes = [virtual_ip, virtual_ip6] + (routed_subnets.split(',') if routed_subnets else [])
+    return {(group_id, _normalize(prefix)) for prefix in prefixes if prefix}
+
+
+def _normalize(prefix: str) -> str:
+    """规整前缀（主机地址不带前缀长度，与 nft 的元素写法一致）"""
+    network = ipaddress.ip_network(prefix, strict=False)
+    if network.prefixlen == network.max_prefixlen:
+        return str(network.network_address)
+    return str(network)
+
+
+def _family(prefix: str) -> int:
+    """前缀的地址族"""
+    return 6 if ':' in prefix else 4
+
+
+def _set_name(group_id: int, family: int) -> str:
+    return f"g{group_id}_{_FAMILIES[family][0]}"
+
+
+def _map_name(family: int) -> str:
+    return f"src_{_FAMILIES[family][0]}"
+
+
+def _chain_name(group_id: int) -> str:
+    return f"from_g{group_id}"
+
+
+def _elements(items: Iterable[str]) -> str:
+    return ', '.join(items)
+
+
+def render_ruleset(group_ids: Iterable[int], members: Iterable[Member],
+                   rules: Iterable[Tuple[int, int]],
+                   interface_glob: str = 'wg*') -> str:
+    """生成完整的 nftables 规则集（nft -f 输入，原子替换整张表）
+
+    转发链只处理 WireGuard 接口之间（节点到节点）的流量：按源地址在判决映射中
+    查到所属节点组的链，再按目的地址匹配该组允许访问的各组集合，未命中则丢弃。
+    每个报文只做一次映射查找和若干次集合查找，耗时与节点数量无关。
+
+    Args:
+        group_ids: 全部节点组 ID
+        members: (节点组 ID, 前缀) 成员
+        rules: (源节点组 ID, 目的节点组 ID) 放行规则
+        interface_glob: WireGuard 接口通配名
+
+    Returns:
+        规则集文本
+    """
+    table = f"inet {config.NFT_TABLE_NAME}"
+    group_ids = sorted(set(group_ids))
+    by_set: Dict[Tuple[int, int], List[str]] = {}
+    for group_id, prefix in sorted(members):
+        by_set.setdefault((group_id, _family(prefix)), []).append(prefix)
+    allowed: Dict[int, List[int]] = {}
+    for src, dst in sorted(set(rules)):
+        allowed.setdefault(src, []).append(dst)
+
+    # 先声明再删除，表不存在时也不会报错；整个文件在同一事务中生效
+    lines = [f"table {table} {{}}", f"delete table {table}", f"table {table} {{"]
+    for group_id in group_ids:
+        for family, (_, addr_type, _) in _FAMILIES.items():
+            lines.append(f"  set {_set_name(group_id, family)} {{")
+            lines.append(f"    type {addr_type}; flags interval;")
+            elements = by_set.get((group_id, family))
+            if elements:
+                lines.append(f"    elements = {{ {_elements(elements)} }}")
+            lines.append("  }")
+    for family, (_, addr_type, _) in _FAMILIES.items():
+        lines.append(f"  map {_map_name(family)} {{")
+        lines.append(f"    type {addr_type} : verdict; flags interval;")
+        elements = [
+            f"{prefix} : jump {_chain_name(group_id)}"
+            for (group_id, prefix_family), prefixes in sorted(by_set.items())
+            if prefix_family == family
+            for prefix in prefixes
+        ]
+        if elements:
+            lines.append(f"    elements = {{ {_elements(elements)} }}")
+        lines.append("  }")
+    for group_id in group_ids:
+        lines.append(f"  chain {_chain_name(group_id)} {{")
+        for dst in allowed.get(group_id, []):
+            for family, (_, _, keyword) in _FAMILIES.items():
+                lines.append(f"    {keyword} daddr @{_set_name(dst, family)} accept")
+        lines.append("  }")
+    lines += [
+        "  chain forward {",
+        "    type filter hook forward priority filter; policy accept;",
+        f'    iifname != "{interface_glob}" return',
+        f'    oifname != "{interface_glob}" return',
+        "    ct state established,related accept",
+        f"    ip saddr vmap @{_map_name(4)}",
+        f"    ip6 saddr vmap @{_map_name(6)}",
+        "    drop",
+        "  }",
+        "}",
+    ]
+    return '\n'.join(lines) + '\n'
+
+
+def render_member_delta(removed: Iterable[Member], added: Iterable[Member]) -> str:
+    """生成成员变化的增量语句（nft -f 输入，同一事务内先删后增）
+
+    Args:
+        removed: 移除的成员
+        added: 新增的成员
+
+    Returns:
+        增量语句文本，无变化时为空字符串
+    """
+    table = f"inet {config.NFT_TABLE_NAME}"
+    lines = []
+    for verb, items in (('delete', removed), ('add', added)):
+        by_set: Dict[Tuple[int, int], List[str]] = {}
+        for group_id, prefix in sorted(items):
+            by_set.setdefault((group_id, _family(prefix)), []).append(prefix)
+        for (group_id, family), prefixes in sorted(by_set.items()):
+            lines.append(
+                f"{verb} element {table} {_set_name(group_id, family)} {{ {_elements(prefixes)} }}"
+            )
+            if verb == 'delete':
+                entries = prefixes
+            else:
+                entries = [f"{prefix} : jump {_chain_name(group_id)}" for prefix in prefixes]
+            lines.append(f"{verb} element {table} {_map_name(family)} {{ {_elements(entries)} }}")
+    return '\n'.join(lines) + '\n' if lines else ''
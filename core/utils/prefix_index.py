@@ -0,0 +1,203 @@
+"""
+地址前缀索引模块
+将节点 IP、节点路由子网和中心节点网络段放入前缀树，提供地址归属查询和重叠检测
+"""
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from core.models.database import Database, PREFIXES_COUNTER
+from core.utils.prefix_trie import PrefixTrie, IPNetwork
+from config import base as config
+
+
+# 前缀类型
+KIND_NODE = 'node'  # 节点虚拟 IP（/32 或 /128）
+KIND_ROUTE = 'route'  # 节点路由的子网
+KIND_NETWORK = 'network'  # 中心节点负责的网络段
+
+
+class PrefixOwner(NamedTuple):
+    """前缀归属"""
+
+    kind: str
+    id: Optional[int]  # 节点 ID；网络段为中心节点 ID（本地中心节点为 None）
+    name: str
+
+
+class PrefixIndex:
+    """地址前缀索引
+
+    从数据库一次性构建，之后的归属查询和重叠检测都只沿前缀树走一条路径，
+    与节点数量无关。本进程的写入通过 Database.on_prefixes_changed 在写入路径上
+    增删对应前缀；其他进程改变了版本计数时由 get_prefix_index 重建。
+    """
+
+    def __init__(self, version: int = 0):
+        """初始化空索引
+
+        Args:
+            version: 构建时的数据版本计数
+        """
+        self.version = version
+        self.trie = PrefixTrie()
+
+    @classmethod
+    def build(cls, db: Database) -> 'PrefixIndex':
+        """从数据库构建索引
+
+        Args:
+            db: 数据库实例
+
+        Returns:
+            PrefixIndex 实例
+        """
+        index = cls(db.get_counter(PREFIXES_COUNTER))
+        trie = index.trie
+
+        server = db.get_server_info()
+        rows = [('server', (server['network_cidr'], server['network6_cidr']))] if server else []
+        rows += [('hub', row) for row in db.select_hubs(('id', 'name', 'network_cidr')).fetchall()]
+        rows += [('network', row) for row in db.select_networks(('name', 'network_cidr')).fetchall()]
+        rows += [('node', row) for row in db.select_nodes(
+            ('id', 'node_name', 'virtual_ip', 'virtual_ip6', 'routed_subnets'))]
+        for entity, row in rows:
+            for prefix, owner in _row_prefixes(entity, row):
+                trie.insert(prefix, owner)
+        return index
+
+    def apply_change(self, entity: str, before: Sequence[tuple], after: Sequence[tuple]) -> bool:
+        """按一次写入增删前缀
+
+        Args:
+            entity: 对象类型（node/hub/network/server）
+            before: 变化前的行
+            after: 变化后的行
+
+        Returns:
+            是否与重建的结果一致（同一前缀有多个归属时无法增量维护，返回 False）
+        """
+        consistent = True
+        for row in before:
+            for prefix, owner in _row_prefixes(entity, row):
+                if self.trie.get(prefix) != owner:
+                    consistent = False
+                self.trie.remove(prefix)
+        for row in after:
+            for prefix, owner in _row_prefixes(entity, row):
+                if not self.trie.insert(prefix, owner):
+                    consistent = False
+        return consistent
+
+    def lookup(self, address: str) -> Optional[Tuple[IPNetwork, PrefixOwner]]:
+        """查询地址归属（最长前缀匹配）
+
+        Args:
+            address: IP 地址
+
+        Returns:
+            (匹配到的前缀, 归属)，不属于任何已知前缀时返回 None
+        """
+        return self.trie.longest_match(address)
+
+    def find_conflicts(self, prefix: str,
+                       ignore_node_id: Optional[int] = None) -> List[Tuple[IPNetwork, PrefixOwner]]:
+        """查找与前缀重叠的已有前缀
+
+        Args:
+            prefix: 网络前缀
+            ignore_node_id: 忽略该节点自身的路由子网（替换节点路由时使用）
+
+        Returns:
+            (已有前缀, 归属) 列表
+        """
+        return [
+            (network, owner) for network, owner in self.trie.overlaps(prefix)
+            if not (owner.kind == KIND_ROUTE and owner.id == ignore_node_id)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.trie)
+
+
+def _row_prefixes(entity: str, row: Sequence[Any]) -> List[Tuple[str, PrefixOwner]]:
+    """数据库行包含的前缀（行格式见 Database.on_prefixes_changed）"""
+    if entity == 'server':
+        owner = PrefixOwner(KIND_NETWORK, None, config.WG_HUB_NAME)
+        return [(prefix, owner) for prefix in row if prefix]
+    if entity == 'hub':
+        hub_id, name, network_cidr = row
+        return [(network_cidr, PrefixOwner(KIND_NETWORK, hub_id, name))]
+    if entity == 'network':
+        # 租户网络挂在本地中心节点上
+        name, network_cidr = row
+        return [(network_cidr, PrefixOwner(KIND_NETWORK, None, name))]
+
+    node_id, name, virtual_ip, virtual_ip6, routed_subnets = row
+    owner = PrefixOwner(KIND_NODE, node_id, name)
+    prefixes = [(address, owner) for address in (virtual_ip, virtual_ip6) if address]
+    if routed_subnets:
+        route = PrefixOwner(KIND_ROUTE, node_id, name)
+        prefixes += [(subnet, route) for subnet in routed_subnets.split(',')]
+    return prefixes
+
+
+# 按数据库路径缓存的索引
+_prefix_indexes: Dict[str, PrefixIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_prefix_index(db: Database) -> PrefixIndex:
+    """获取数据库对应的前缀索引
+
+    每次调用只读取一次版本计数。本进程的写入已在写入路径上增量应用，
+    只有其他进程改变了数据（或回滚丢弃了索引）时才整体重建。
+
+    Args:
+        db: 数据库实例
+
+    Returns:
+        PrefixIndex 实例
+    """
+    version = db.get_counter(PREFIXES_COUNTER)
+    index = _prefix_indexes.get(db.db_path)
+    if index is None or index.version != version:
+        with _indexes_lock:
+            index = _prefix_indexes.get(db.db_path)
+            if index is None or index.version != version:
+                index = _prefix_indexes[db.db_path] = PrefixIndex.build(db)
+    return index
+
+
+def clear_prefix_indexes():
+    """丢弃全部前缀索引（回滚后版本计数回退，之后的新版本可能与已缓存的索引重合）"""
+    with _indexes_lock:
+        _prefix_indexes.clear()
+
+
+def _apply_prefix_change(db: Database, version: int, entity: str,
+                         before: Sequence[tuple], after: Sequence[tuple]):
+    """写入路径上的前缀变化：已缓存的索引恰好落后一个版本时就地增删前缀
+
+    落后更多（其他进程也写入了）时保持不动，由下一次 get_prefix_index 重建。
+    """
+    with _indexes_lock:
+        index = _prefix_indexes.get(db.db_path)
+        if index is None or index.version != version - 1:
+            return
+        if index.apply_change(entity, before, after):
+            index.version = version
+        else:
+            del _prefix_indexes[db.db_path]
+
+
+Database.on_rollback(clear_prefix_indexes)
+Database.on_prefixes_changed(_apply_prefix_change)
+
+
+def owner_to_dict(network: IPNetwork, owner: PrefixOwner) -> Dict[str, Any]:
+    """前缀归属的字典表示"""
+    return {
+        'prefix': str(network),
+        'kind': owner.kind,
+        'id': owner.id,
+        'name': owner.name,
+    }
@@ -0,0 +1,213 @@
+"""
+前缀树模块
+按位展开的 IP 前缀树，支持最长前缀匹配和重叠检测，单次操作耗时与前缀长度成正比
+"""
+import ipaddress
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+IPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+IPAddress = Union[ipaddress.IPv4Address, ipaddress.IPv6Address]
+
+
+class _TrieNode:
+    """前缀树节点"""
+
+    __slots__ = ('children', 'value', 'has_value', 'count')
+
+    def __init__(self):
+        self.children: List[Optional['_TrieNode']] = [None, None]
+        self.value: Any = None
+        self.has_value = False
+        self.count = 0  # 子树（含自身）中的前缀数量，用于 O(1) 判断是否有更具体的前缀
+
+
+class PrefixTrie:
+    """IP 前缀树
+
+    IPv4 和 IPv6 各有一棵二叉树，从最高位开始每一位走一层。
+    插入、删除、精确查找、最长前缀匹配和重叠检测都只沿一条路径走，
+    耗时 O(前缀长度)，与已有前缀数量无关。
+    """
+
+    def __init__(self):
+        """初始化空树"""
+        self._roots: Dict[int, _TrieNode] = {4: _TrieNode(), 6: _TrieNode()}
+
+    @staticmethod
+    def _network(prefix: Union[str, IPNetwork]) -> IPNetwork:
+        if isinstance(prefix, str):
+            return ipaddress.ip_network(prefix, strict=False)
+        return prefix
+
+    @staticmethod
+    def _bits(network: IPNetwork) -> Iterator[int]:
+        """依次产出网络前缀的每一位（高位在前）"""
+        address = int(network.network_address)
+        top = network.max_prefixlen - 1
+        for index in range(network.prefixlen):
+            yield (address >> (top - index)) & 1
+
+    def insert(self, prefix: Union[str, IPNetwork], value: Any = None) -> bool:
+        """插入前缀（已存在时覆盖其值）
+
+        Args:
+            prefix: 网络前缀（CIDR 字符串或网络对象）
+            value: 关联值
+
+        Returns:
+            是否为新插入的前缀
+        """
+        network = self._network(prefix)
+        node = self._roots[network.version]
+        path = [node]
+        for bit in self._bits(network):
+            child = node.children[bit]
+            if child is None:
+                child = node.children[bit] = _TrieNode()
+            node = child
+            path.append(node)
+
+        node.value = value
+        if node.has_value:
+            return False
+        node.has_value = True
+        for item in path:
+            item.count += 1
+        return True
+
+    def remove(self, prefix: Union[str, IPNetwork]) -> bool:
+        """删除前缀
+
+        Args:
+            prefix: 网络前缀
+
+        Returns:
+            是否删除成功（前缀不存在返回 False）
+        """
+        network = self._network(prefix)
+        node = self._roots[network.version]
+        path = [(node, None)]
+        for bit in self._bits(network):
+            node = node.children[bit]
+            if node is None:
+                return False
+            path.append((node, bit))
+
+        if not node.has_value:
+            return False
+        node.has_value = False
+        node.value = None
+
+        # 沿路径递减计数，并剪掉不再包含前缀的分支
+        for index in range(len(path) - 1, -1, -1):
+            item, bit = path[index]
+            item.count -= 1
+            if item.count == 0 and index > 0:
+                path[index - 1][0].children[bit] = None
+        return True
+
+    def get(self, prefix: Union[str, IPNetwork]) -> Optional[Any]:
+        """精确查找前缀的关联值
+
+        Args:
+            prefix: 网络前缀
+
+        Returns:
+            关联值，前缀不存在返回 None
+        """
+        network = self._network(prefix)
+        node = self._roots[network.version]
+        for bit in self._bits(network):
+            node = node.children[bit]
+            if node is None:
+                return None
+        return node.value if node.has_value else None
+
+    def longest_match(self, address: Union[str, IPAddress]) -> Optional[Tuple[IPNetwork, Any]]:
+        """最长前缀匹配
+
+        Args:
+            address: IP 地址
+
+        Returns:
+            (匹配到的最具体前缀, 关联值)，没有任何前缀包含该地址时返回 None
+        """
+        if isinstance(address, str):
+            address = ipaddress.ip_address(address)
+        network = ipaddress.ip_network(address)
+        node = self._roots[network.version]
+
+        best: Optional[Tuple[int, Any]] = (0, node.value) if node.has_value else None
+        depth = 0
+        for bit in self._bits(network):
+            node = node.children[bit]
+            if node is None:
+                break
+            depth += 1
+            if node.has_value:
+                best = (depth, node.value)
+
+        if best is None:
+            return None
+        return network.supernet(new_prefix=best[0]), best[1]
+
+    def overlaps(self, prefix: Union[str, IPNetwork],
+                 limit: int = 8) -> List[Tuple[IPNetwork, Any]]:
+        """查找与指定前缀重叠的已有前缀
+
+        重叠包括：包含该前缀的更短前缀、相同前缀、被该前缀包含的更长前缀。
+
+        Args:
+            prefix: 网络前缀
+            limit: 最多返回的更长前缀数量
+
+        Returns:
+            (已有前缀, 关联值) 列表，无重叠时为空列表
+        """
+        network = self._network(prefix)
+        node = self._roots[network.version]
+        result = []
+        if node.has_value:
+            result.append((network.supernet(new_prefix=0), node.value))
+
+        depth = 0
+        for bit in self._bits(network):
+            node = node.children[bit]
+            if node is None:
+                return result
+            depth += 1
+            if node.has_value:
+                result.append((network.supernet(new_prefix=depth), node.value))
+
+        # 该前缀及其子树中的前缀（更长或相同）
+        if node.count:
+            if node.has_value:
+                # 相同前缀已在上面的路径中计入
+                descendants = node.count - 1
+            else:
+                descendants = node.count
+            if descendants:
+                result.extend(self._collect(node, network, limit))
+        return result
+
+    def _collect(self, root: _TrieNode, network: IPNetwork,
+                 limit: int) -> List[Tuple[IPNetwork, Any]]:
+        """收集子树中（不含根）的前缀，最多 limit 个"""
+        result = []
+        network_class = type(network)
+        max_prefixlen = network.max_prefixlen
+        stack = [(root, network.prefixlen, int(network.network_address))]
+        while stack and len(result) < limit:
+            node, depth, address = stack.pop()
+            if node is not root and node.has_value:
+                result.append((network_class((address, depth)), node.value))
+            if depth < max_prefixlen:
+                shift = max_prefixlen - depth - 1
+                for bit in (1, 0):
+                    child = node.children[bit]
+                    if child is not None:
+                        stack.append((child, depth + 1, address | (bit << shift)))
+        return result
+
+    def __len__(self) -> int:
+        return sum(root.count for root in self._roots.values())
@@ -2,12 +2,17 @@
 特权命令执行器模块
 负责统一管理需要提升权限的系统命令执行
 """
+import logging
 import os
 import sys
 import shutil
 import subprocess
 import tempfile
-from typing import List, Optional, Union
+import time
+from typing import Iterable, List, Optional, Union
+from core.utils.metrics import COMMAND_SECONDS, COMMAND_FAILURES, command_label
+
+logger = logging.getLogger(__name__)
 
 
 class PrivilegedCommandExecutor:
@@ -16,6 +21,9 @@ class PrivilegedCommandExecutor:
     负责检测权限状态，并在需要时自动为命令添加 sudo 前缀
     """
     
+    # 写入配置文件时的缓冲区大小（字节）
+    WRITE_BUFFER_SIZE = 64 * 1024
+    
     def __init__(self):
         """初始化执行器"""
         self._is_root = None
@@ -103,15 +111,8 @@ class PrivilegedCommandExecutor:
         Raises:
             RuntimeError: 权限不足或命令执行失败
         """
-        # 如果不是 root 用户，且 sudo 可用，添加 sudo 前缀
-        if not self.is_root() and self.is_sudo_available():
-            cmd = ['sudo'] + cmd
-        elif not self.is_root():
-            # 既不是 root 也没有 sudo，抛出错误
-            raise RuntimeError(
-                f"执行命令 '{' '.join(cmd)}' 需要 root 或 sudo 权限\n"
-                "提示: 请使用 sudo 运行程序或切换到 root 用户"
-            )
+        cmd = self._with_privilege(cmd)
+        start = time.perf_counter()
             
         try:
             result = subprocess.run(
@@ -121,8 +122,10 @@ class PrivilegedCommandExecutor:
                 text=text,
                 **kwargs
             )
+            self._record(cmd, start, result.returncode)
             return result
         except subprocess.CalledProcessError as e:
+            self._record(cmd, start, e.returncode)
             # 增强错误提示
             error_msg = f"命令执行失败: {' '.join(cmd)}"
             if e.stderr:
@@ -136,11 +139,73 @@ class PrivilegedCommandExecutor:
                     
             raise RuntimeError(error_msg) from e
         except FileNotFoundError as e:
+            self._record(cmd, start, None)
             raise RuntimeError(
                 f"命令未找到: {cmd[0]}\n"
                 f"提示: 请检查是否已安装相关工具"
             ) from e
             
+    def pipe_privileged_command(
+        self,
+        cmd: List[str],
+        chunks: Iterable[str],
+        encoding: str = 'utf-8'
+    ) -> None:
+        """执行需要特权的命令，并将内容分块写入其标准输入
+        
+        用于 `wg syncconf <iface> /dev/stdin` 等场景，内容无需先拼接成整串。
+        
+        Args:
+            cmd: 命令列表
+            chunks: 写入标准输入的文本片段
+            encoding: 文本编码
+            
+        Raises:
+            RuntimeError: 权限不足或命令执行失败
+        """
+        cmd = self._with_privilege(cmd)
+        start = time.perf_counter()
+        
+        # stderr 写入临时文件而不是管道：命令在读完标准输入前输出大量错误信息（如
+        # tc -batch 逐行报错）时，管道写满会使双方互相等待
+        with tempfile.TemporaryFile() as stderr_file:
+            try:
+                process = subprocess.Popen(
+                    cmd,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.DEVNULL,
+                    stderr=stderr_file
+                )
+            except FileNotFoundError as e:
+                self._record(cmd, start, None)
+                raise RuntimeError(
+                    f"命令未找到: {cmd[0]}\n"
+                    f"提示: 请检查是否已安装相关工具"
+                ) from e
+                
+            try:
+                for chunk in chunks:
+                    process.stdin.write(chunk.encode(encoding))
+                process.stdin.close()
+            except BrokenPipeError:
+                # 进程提前退出，错误信息从 stderr 获取
+                pass
+            except BaseException:
+                process.kill()
+                process.wait()
+                self._record(cmd, start, None)
+                raise
+                
+            returncode = process.wait()
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode(encoding, errors='replace')
+        self._record(cmd, start, returncode)
+        if returncode != 0:
+            error_msg = f"命令执行失败: {' '.join(cmd)}"
+            if stderr:
+                error_msg += f"\n错误信息: {stderr}"
+            raise RuntimeError(error_msg)
+            
     def execute_command(
         self,
         cmd: List[str],
@@ -161,13 +226,20 @@ class PrivilegedCommandExecutor:
         Returns:
             subprocess.CompletedProcess 对象
         """
-        return subprocess.run(
-            cmd,
-            check=check,
-            capture_output=capture_output,
-            text=text,
-            **kwargs
-        )
+        start = time.perf_counter()
+        try:
+            result = subprocess.run(
+                cmd,
+                check=check,
+                capture_output=capture_output,
+                text=text,
+                **kwargs
+            )
+        except (subprocess.CalledProcessError, OSError) as e:
+            self._record(cmd, start, getattr(e, 'returncode', None))
+            raise
+        self._record(cmd, start, result.returncode)
+        return result
         
     def write_privileged_file(
         self,
@@ -184,6 +256,27 @@ class PrivilegedCommandExecutor:
             target_path: 目标文件路径
             mode: 文件权限（八进制）
             
+        Raises:
+            RuntimeError: 写入失败
+        """
+        self.write_privileged_stream((content,), target_path, mode)
+        
+    def write_privileged_stream(
+        self,
+        chunks: Iterable[str],
+        target_path: str,
+        mode: int = 0o600
+    ) -> None:
+        """分块写入需要特权的文件
+        
+        内容逐块写入临时文件后原子替换目标文件，整个过程不在内存中拼接完整内容。
+        如果目标路径需要特权且非 root，则临时文件写在系统临时目录并通过 sudo mv 替换。
+        
+        Args:
+            chunks: 文件内容片段
+            target_path: 目标文件路径
+            mode: 文件权限（八进制）
+            
         Raises:
             RuntimeError: 写入失败
         """
@@ -192,11 +285,16 @@ class PrivilegedCommandExecutor:
         needs_privilege = self._path_needs_privilege(target_path)
         
         if not needs_privilege or self.is_root():
-            # 不需要特权或已是 root 用户，直接写入
+            # 不需要特权或已是 root 用户，在目标目录内写临时文件后原子替换
             os.makedirs(target_dir, exist_ok=True)
-            with open(target_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            os.chmod(target_path, mode)
+            temp_path = self._write_temp_file(chunks, target_dir)
+            try:
+                os.chmod(temp_path, mode)
+                os.replace(temp_path, target_path)
+            except Exception:
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+                raise
         else:
             # 需要特权且非 root，使用临时文件方式
             if not self.is_sudo_available():
@@ -205,14 +303,7 @@ class PrivilegedCommandExecutor:
                 )
                 
             # 创建临时文件
-            with tempfile.NamedTemporaryFile(
-                mode='w',
-                encoding='utf-8',
-                delete=False,
-                suffix='.conf'
-            ) as temp_file:
-                temp_file.write(content)
-                temp_path = temp_file.name
+            temp_path = self._write_temp_file(chunks)
                 
             try:
                 # 确保目标目录存在
@@ -238,6 +329,35 @@ class PrivilegedCommandExecutor:
                     os.unlink(temp_path)
                 raise RuntimeError(f"写入特权文件失败: {str(e)}") from e
                 
+    def _write_temp_file(self, chunks: Iterable[str], directory: Optional[str] = None) -> str:
+        """将内容片段写入临时文件
+        
+        Args:
+            chunks: 文件内容片段
+            directory: 临时文件所在目录，默认系统临时目录
+            
+        Returns:
+            临时文件路径
+        """
+        with tempfile.NamedTemporaryFile(
+            mode='w',
+            encoding='utf-8',
+            delete=False,
+            dir=directory,
+            prefix='.wg-toolkit-',
+            suffix='.conf',
+            buffering=self.WRITE_BUFFER_SIZE
+        ) as temp_file:
+            temp_path = temp_file.name
+            try:
+                for chunk in chunks:
+                    temp_file.write(chunk)
+            except BaseException:
+                temp_file.close()
+                os.unlink(temp_path)
+                raise
+        return temp_path
+        
     def write_system_file(
         self,
         content: str,
@@ -281,6 +401,43 @@ class PrivilegedCommandExecutor:
                     f"错误: {str(e)}"
                 ) from e
                 
+    @staticmethod
+    def _record(cmd: List[str], start: float, returncode: Optional[int]):
+        """记录命令耗时；返回码非 0 或未能执行（None）时计为失败"""
+        label = (command_label(cmd),)
+        elapsed = time.perf_counter() - start
+        COMMAND_SECONDS.observe(label, elapsed)
+        if returncode != 0:
+            COMMAND_FAILURES.inc(label)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"执行命令: {' '.join(cmd)}",
+                extra={'command': label[0], 'returncode': returncode, 'duration_ms': round(elapsed * 1000, 2)}
+            )
+        
+    def _with_privilege(self, cmd: List[str]) -> List[str]:
+        """按需为命令添加 sudo 前缀
+        
+        Args:
+            cmd: 命令列表
+            
+        Returns:
+            实际执行的命令列表
+            
+        Raises:
+            RuntimeError: 既不是 root 也没有 sudo
+        """
+        # 如果不是 root 用户，且 sudo 可用，添加 sudo 前缀
+        if not self.is_root() and self.is_sudo_available():
+            return ['sudo'] + cmd
+        elif not self.is_root():
+            # 既不是 root 也没有 sudo，抛出错误
+            raise RuntimeError(
+                f"执行命令 '{' '.join(cmd)}' 需要 root 或 sudo 权限\n"
+                "提示: 请使用 sudo 运行程序或切换到 root 用户"
+            )
+        return cmd
+        
     def _path_needs_privilege(self, path: str) -> bool:
         """检查路径是否需要特权
         
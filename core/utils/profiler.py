@@ -0,0 +1,339 @@
+"""
+请求剖析模块
+记录一次请求/命令的调用跨度树（服务 → 仓储 → 数据库查询 / 外部命令）和耗时，
+超过阈值时连同 cProfile 结果保存到轮转目录，并保留最近的慢操作供查询
+
+默认关闭。开启（WG_PROFILE=1、CLI --profile 或 PUT /api/v1/debug/profiler）时才为
+服务、仓储、Database 和特权执行器的方法安装计时包装；包装安装后不再移除，关闭时
+每次调用只多一次上下文变量读取。
+"""
+import cProfile
+import importlib
+import inspect
+import json
+import logging
+import os
+import pkgutil
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from config import base as config
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    """调用跨度：名称、类别、附加信息、耗时和子跨度"""
+
+    __slots__ = ('name', 'kind', 'detail', 'start', 'duration', 'children')
+
+    def __init__(self, name: str, kind: str, detail: Optional[str] = None):
+        self.name = name
+        self.kind = kind
+        self.detail = detail
+        self.start = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.children: List['Span'] = []
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.start
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        """转换为字典（offset_ms 为相对请求开始的时刻）"""
+        return {
+            'name': self.name,
+            'kind': self.kind,
+            'detail': self.detail,
+            'offset_ms': (self.start - origin) * 1000,
+            'duration_ms': (self.duration or 0.0) * 1000,
+            'children': [child.to_dict(origin) for child in self.children],
+        }
+
+
+class Trace:
+    """一次请求或命令的跨度树"""
+
+    def __init__(self, name: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.root = Span(name, 'request')
+        self.started_at = datetime.now(timezone.utc)
+        self.spans = 1
+        self.dropped = 0
+        self.profile_path: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return self.root.name
+
+    @name.setter
+    def name(self, value: str):
+        self.root.name = value
+
+    @property
+    def duration(self) -> float:
+        return self.root.duration or 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """概要（不含跨度树）"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'started_at': self.started_at,
+            'duration_ms': self.duration * 1000,
+            'spans': self.spans,
+            'dropped_spans': self.dropped,
+            'profile_path': self.profile_path,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """概要加跨度树"""
+        return {**self.summary(), 'root': self.root.to_dict(self.root.start)}
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar('wg_current_trace', default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar('wg_current_span', default=None)
+
+
+@contextmanager
+def span(name: str, kind: str, detail: Optional[str] = None):
+    """在当前跨度下记录一个子跨度（没有进行中的剖析时不做任何事）
+
+    单次请求的跨度数量超过 PROFILE_MAX_SPANS 后只计数不记录，避免批量操作撑大内存。
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    if trace.spans >= config.PROFILE_MAX_SPANS:
+        trace.dropped += 1
+        yield None
+        return
+
+    current = Span(name, kind, detail)
+    trace.spans += 1
+    _current_span.get().children.append(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    finally:
+        current.finish()
+        _current_span.reset(token)
+
+
+def _wrap(func: Callable, name: str, kind: str,
+          describe: Optional[Callable[[tuple, dict], Optional[str]]] = None) -> Callable:
+    """包装方法：有进行中的剖析时记录跨度"""
+    def wrapper(*args, **kwargs):
+        if _current_trace.get() is None:
+            return func(*args, **kwargs)
+        with span(name, kind, describe(args, kwargs) if describe else None):
+            return func(*args, **kwargs)
+    wrapper.__name__ = func.__name__
+    wrapper.__qualname__ = func.__qualname__
+    wrapper.__doc__ = func.__doc__
+    wrapper.__wrapped__ = func
+    return wrapper
+
+
+def _wrap_class(cls, kind: str, include: Optional[Iterable[str]] = None,
+                exclude: Iterable[str] = (), describe=None):
+    """为类的公开方法安装跨度包装"""
+    names = set(include) if include is not None else None
+    for name, func in list(vars(cls).items()):
+        if name.startswith('_') or name in exclude or not inspect.isfunction(func):
+            continue
+        if names is not None and name not in names:
+            continue
+        setattr(cls, name, _wrap(func, f"{cls.__name__}.{name}", kind, describe))
+
+
+def _describe_command(args: tuple, kwargs: dict) -> Optional[str]:
+    """特权执行器调用 -> 命令行或目标路径"""
+    value = args[1] if len(args) > 1 else kwargs.get('cmd')
+    if isinstance(value, (list, tuple)):
+        return ' '.join(str(part) for part in value)[:200]
+    target = kwargs.get('target_path') or (args[2] if len(args) > 2 else None)
+    return str(target) if target else None
+
+
+_installed = False
+_install_lock = threading.Lock()
+
+
+def install_tracing():
+    """为服务、仓储、Database 和特权执行器安装跨度包装（只执行一次）"""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        import core.services
+        import core.models.repositories
+        from core.models.database import Database
+        from core.utils.privileged_executor import PrivilegedCommandExecutor
+
+        for package, kind in ((core.services, 'service'), (core.models.repositories, 'repo')):
+            for info in pkgutil.iter_modules(package.__path__):
+                module = importlib.import_module(f"{package.__name__}.{info.name}")
+                for cls in list(vars(module).values()):
+                    if inspect.isclass(cls) and cls.__module__ == module.__name__:
+                        _wrap_class(cls, kind)
+        _wrap_class(Database, 'db', exclude=('connect', 'close', 'shared', 'transaction'))
+        _wrap_class(
+            PrivilegedCommandExecutor, 'command',
+            include=('execute_privileged_command', 'pipe_privileged_command', 'execute_command',
+                     'write_privileged_file', 'write_privileged_stream', 'write_system_file'),
+            describe=_describe_command
+        )
+        _installed = True
+
+
+class Profiler:
+    """慢操作剖析器
+
+    开启后每个请求都记录跨度树，并尽量同时运行 cProfile（同一时刻只能有一个
+    cProfile 运行，并发的请求只记录跨度树）。耗时超过阈值的请求保存到目录中
+    （<时间>-<ID>.json 跨度树，<时间>-<ID>.prof cProfile 结果，可用 pstats 或
+    snakeviz 查看），目录只保留最近 PROFILE_KEEP 个请求的文件。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.threshold = config.PROFILE_THRESHOLD_MS / 1000
+        self.directory = config.PROFILE_DIR
+        self._recent: deque = deque(maxlen=config.PROFILE_RECENT)
+        self._lock = threading.Lock()
+        self._profile_lock = threading.Lock()
+
+    def enable(self, threshold_ms: Optional[int] = None):
+        """开启剖析（首次开启时安装跨度包装）
+
+        Args:
+            threshold_ms: 慢操作阈值（毫秒），None 表示保持不变
+        """
+        if threshold_ms is not None:
+            if threshold_ms < 0:
+                raise ValueError("慢操作阈值不能为负数")
+            self.threshold = threshold_ms / 1000
+        install_tracing()
+        self.enabled = True
+
+    def disable(self):
+        """关闭剖析"""
+        self.enabled = False
+
+    @contextmanager
+    def trace(self, name: str, force: bool = False):
+        """剖析一次请求或命令
+
+        Args:
+            name: 操作名称
+            force: 无论是否开启、是否超过阈值都保存结果（CLI --profile）
+
+        Yields:
+            Trace 对象，未开启时为 None
+        """
+        if not (self.enabled or force):
+            yield None
+            return
+
+        trace = Trace(name)
+        trace_token = _current_trace.set(trace)
+        span_token = _current_span.set(trace.root)
+        profile = None
+        if self._profile_lock.acquire(blocking=False):
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # 其他剖析工具（调试器、覆盖率等）已在运行
+                profile = None
+                self._profile_lock.release()
+        try:
+            yield trace
+        finally:
+            if profile is not None:
+                profile.disable()
+                self._profile_lock.release()
+            trace.root.finish()
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+            if force or trace.duration >= self.threshold:
+                self._save(trace, profile)
+
+    def _save(self, trace: Trace, profile: Optional[cProfile.Profile]):
+        """保存慢操作：加入最近列表并写入轮转目录"""
+        with self._lock:
+            self._recent.append(trace)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            stem = os.path.join(
+                self.directory, f"{trace.started_at.strftime('%Y%m%d-%H%M%S')}-{trace.id}"
+            )
+            if profile is not None:
+                profile.dump_stats(f"{stem}.prof")
+                trace.profile_path = f"{stem}.prof"
+            with open(f"{stem}.json", 'w', encoding='utf-8') as f:
+                json.dump(trace.to_dict(), f, ensure_ascii=False, indent=2, default=str)
+            self._rotate()
+        except OSError as e:
+            logger.warning(f"保存剖析结果失败: {str(e)}")
+
+    def _rotate(self):
+        """只保留最近 PROFILE_KEEP 个请求的文件"""
+        stems = sorted({
+            entry.name.rsplit('.', 1)[0]
+            for entry in os.scandir(self.directory)
+            if entry.name.endswith(('.json', '.prof'))
+        })
+        for stem in stems[:-config.PROFILE_KEEP] if config.PROFILE_KEEP > 0 else stems:
+            for suffix in ('.json', '.prof'):
+                path = os.path.join(self.directory, stem + suffix)
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def slowest(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """最近保存的慢操作，按耗时从高到低"""
+        with self._lock:
+            traces = list(self._recent)
+        traces.sort(key=lambda trace: trace.duration, reverse=True)
+        return [trace.summary() for trace in traces[:limit]]
+
+    def get(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        """按 ID 获取慢操作的跨度树"""
+        with self._lock:
+            for trace in self._recent:
+                if trace.id == trace_id:
+                    return trace.to_dict()
+        return None
+
+
+def format_span_tree(node: Dict[str, Any], min_ms: float = 0.0, depth: int = 0) -> List[str]:
+    """跨度树 -> 缩进文本行（跳过耗时低于 min_ms 的子跨度）"""
+    detail = f"  {node['detail']}" if node.get('detail') else ''
+    lines = [f"{'  ' * depth}{node['duration_ms']:>9.2f}ms  {node['name']}{detail}"]
+    for child in node['children']:
+        if child['duration_ms'] >= min_ms:
+            lines.extend(format_span_tree(child, min_ms, depth + 1))
+    return lines
+
+
+_profiler: Optional[Profiler] = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler() -> Profiler:
+    """获取全局剖析器单例（WG_PROFILE=1 时默认开启）"""
+    global _profiler
+    if _profiler is None:
+        with _profiler_lock:
+            if _profiler is None:
+                _profiler = Profiler()
+                if config.PROFILE_ENABLED:
+                    _profiler.enable()
+    return _profiler
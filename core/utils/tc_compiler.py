@@ -0,0 +1,330 @@
+"""
+tc 限速规则编译模块
+将节点的限速配置编译为 `tc -batch` 输入（HTB 类 + fq_codel 叶子队列 + u32 哈希过滤器），
+可整体重建接口的规则，也可只生成受影响节点的增量语句
+"""
+import ipaddress
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# (节点 ID, 虚拟 IP, 虚拟 IPv6, 路由子网（逗号分隔）, 下行 kbit/s, 上行 kbit/s)
+ShapedNode = Tuple[int, str, Optional[str], Optional[str], Optional[int], Optional[int]]
+
+# 单方向的限速项：类次编号 -> (kbit/s, 虚拟 IP, 虚拟 IPv6, 路由子网列表)
+_Entries = Dict[int, Tuple[int, str, Optional[str], Tuple[str, ...]]]
+
+# 速率单位 -> kbit/s 倍数（不带单位按 kbit 计）
+_RATE_UNITS = {'': 1, 'kbit': 1, 'mbit': 1000, 'gbit': 1000 * 1000}
+_RATE_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([kmg]bit)?\s*$', re.IGNORECASE)
+
+# 过滤器表：名称 -> (优先级, 协议, u32 哈希表句柄, 桶数)
+# 节点地址以最后一个字节为键哈希到桶，每个报文一次哈希即定位到桶再精确匹配；
+# 路由子网前缀长度不一，无法按字节哈希，放在单桶表中顺序匹配
+_TABLES = {
+    'ip': (10, 'ip', 0x2, 256),
+    'ip6': (11, 'ipv6', 0x3, 256),
+    'route': (20, 'ip', 0x4, 1),
+    'route6': (21, 'ipv6', 0x5, 1),
+}
+
+# 哈希键（地址最后 4 字节）在 IP 头中的偏移（WireGuard 为三层接口，报文从 IP 头开始）
+_HASH_OFFSET = {
+    'ip': {'src': 12, 'dst': 16},
+    'ip6': {'src': 20, 'dst': 36},
+}
+
+# u32 过滤器句柄中表项编号为 12 位（0 保留）
+_MAX_ITEMS = 0xfff
+
+# HTB 类次编号的取值范围（16 位，0 为根句柄）
+_MAX_CLASS = 0xfffe
+
+
+def parse_rate(value) -> Optional[int]:
+    """解析速率（如 50mbit、800kbit、1gbit，纯数字按 kbit/s）
+
+    Args:
+        value: 速率字符串或整数，None/空字符串表示不限速
+
+    Returns:
+        kbit/s，不限速时返回 None
+
+    Raises:
+        ValueError: 格式错误
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, int):
+        return value
+    match = _RATE_PATTERN.match(str(value))
+    if not match:
+        raise ValueError(f"速率格式错误: {value}（示例: 50mbit、800kbit）")
+    number, unit = match.groups()
+    return int(float(number) * _RATE_UNITS[(unit or '').lower()])
+
+
+def format_rate(kbit: Optional[int]) -> str:
+    """kbit/s -> 便于阅读的速率字符串"""
+    if kbit is None:
+        return '-'
+    for unit in ('gbit', 'mbit'):
+        factor = _RATE_UNITS[unit]
+        if kbit >= factor and kbit % factor == 0:
+            return f"{kbit // factor}{unit}"
+    return f"{kbit}kbit"
+
+
+def ifb_name(interface_name: str) -> str:
+    """接口对应的 IFB 设备名（承接入方向流量做上行限速）"""
+    return f"ifb-{interface_name}"
+
+
+def _entries(nodes: Iterable[ShapedNode], direction: int) -> _Entries:
+    """受限速节点 -> 单方向的限速项
+
+    类次编号取虚拟 IP 的低 16 位：节点地址不变，编号就不变，增量更新时只需增删
+    该节点的类；/16 及更小的网络段内不会重复，也不会是 0 或 0xffff（网络/广播地址）。
+
+    Args:
+        nodes: 受限速节点
+        direction: 4 取下行速率，5 取上行速率
+
+    Raises:
+        ValueError: 类次编号超出范围或重复（接口网络段大于 /16）
+    """
+    entries: _Entries = {}
+    for node in nodes:
+        rate = node[direction]
+        if not rate:
+            continue
+        minor = int(ipaddress.IPv4Address(node[1])) & 0xffff
+        if not 0 < minor <= _MAX_CLASS or minor in entries:
+            raise ValueError(f"节点 {node[1]} 无法映射为唯一的 tc 类编号（接口网络段不能大于 /16）")
+        routes = tuple(node[3].split(',')) if node[3] else ()
+        entries[minor] = (rate, node[1], node[2], routes)
+    return entries
+
+
+def _filters(dev: str, key: str, entries: _Entries) -> Dict[Tuple[int, str], str]:
+    """限速项 -> 过滤器表项
+
+    IPv4 地址按最后一个字节分桶、倒数第二个字节编号，句柄只取决于地址本身；
+    IPv6 地址和路由子网在桶内按类次编号排序编号，增删节点时只有同一桶内排在其后的
+    表项需要重建。
+
+    Returns:
+        {(优先级, 句柄): 过滤器参数（不含动词）}
+
+    Raises:
+        ValueError: 同一桶内的表项超出 u32 编号范围
+    """
+    items: Dict[Tuple[str, int], List[Tuple[int, str]]] = {}
+    result = {}
+    for minor, (_, virtual_ip, virtual_ip6, routes) in sorted(entries.items()):
+        address = int(ipaddress.IPv4Address(virtual_ip))
+        prio, protocol, table, _ = _TABLES['ip']
+        handle = f"{table:x}:{address & 0xff:x}:{((address >> 8) & 0xff) + 1:x}"
+        result[(prio, handle)] = (
+            f"dev {dev} parent 1: prio {prio} handle {handle} protocol {protocol} u32 "
+            f"match ip {key} {virtual_ip}/32 flowid 1:{minor:x}"
+        )
+        if virtual_ip6:
+            bucket = int(ipaddress.IPv6Address(virtual_ip6)) & 0xff
+            items.setdefault(('ip6', bucket), []).append((minor, f"match ip6 {key} {virtual_ip6}/128"))
+        for route in routes:
+            name = 'route6' if ':' in route else 'route'
+            items.setdefault((name, 0), []).append((minor, f"match {'ip6' if ':' in route else 'ip'} {key} {route}"))
+
+    for (name, bucket), matches in items.items():
+        if len(matches) > _MAX_ITEMS:
+            raise ValueError(f"设备 {dev} 上的 {name} 过滤器数量 {len(matches)} 超出上限 {_MAX_ITEMS}")
+        prio, protocol, table, _ = _TABLES[name]
+        for item, (minor, match) in enumerate(sorted(matches), 1):
+            handle = f"{table:x}:{bucket:x}:{item:x}"
+            result[(prio, handle)] = (
+                f"dev {dev} parent 1: prio {prio} handle {handle} protocol {protocol} u32 "
+                f"{match} flowid 1:{minor:x}"
+            )
+    return result
+
+
+def _filter_del(dev: str, prio: int, handle: str) -> str:
+    """删除单个过滤器表项的语句"""
+    protocol = next(protocol for p, protocol, _, _ in _TABLES.values() if p == prio)
+    return f"filter del dev {dev} parent 1: prio {prio} handle {handle} protocol {protocol} u32"
+
+
+def _class_lines(dev: str, minor: int, rate: int, verb: str = 'add') -> List[str]:
+    """添加/修改一个 HTB 类（添加时附带 fq_codel 叶子队列）"""
+    lines = [f"class {verb} dev {dev} parent 1: classid 1:{minor:x} htb rate {rate}kbit ceil {rate}kbit"]
+    if verb == 'add':
+        lines.append(f"qdisc add dev {dev} parent 1:{minor:x} fq_codel")
+    return lines
+
+
+def _reset_root(dev: str) -> List[str]:
+    """清除设备上已有的根队列
+
+    先替换为不同类型的队列再删除：无论原来是否存在根队列，两条语句都不会失败，
+    批处理因此无需 -force。
+    """
+    return [f"qdisc replace dev {dev} root pfifo", f"qdisc del dev {dev} root"]
+
+
+def _htb_tree(dev: str, network_cidr: str, key: str, entries: _Entries) -> List[str]:
+    """生成一棵完整的 HTB 树：每个节点一个类（fq_codel 叶子队列），u32 哈希过滤器按地址分类
+
+    四张过滤器表（IPv4/IPv6 节点地址、IPv4/IPv6 路由子网）总是全部创建，之后的增量
+    更新只需增删表项。未命中任何过滤器的流量不进入任何类，直接发送，不受限速影响。
+
+    Args:
+        dev: 设备名
+        network_cidr: 接口网络段（IPv4 哈希入口只匹配此网络段）
+        key: 'dst' 按目的地址分类，'src' 按源地址分类
+        entries: 限速项
+    """
+    lines = [
+        f"qdisc replace dev {dev} root pfifo",
+        f"qdisc replace dev {dev} root handle 1: htb",
+    ]
+    for minor, (rate, _, _, _) in sorted(entries.items()):
+        lines += _class_lines(dev, minor, rate)
+
+    for name, (prio, protocol, table, buckets) in _TABLES.items():
+        prefix = f"filter add dev {dev} parent 1: prio {prio}"
+        lines.append(f"{prefix} handle {table:x}: protocol {protocol} u32 divisor {buckets}")
+        if name == 'ip':
+            match = f"match ip {key} {network_cidr}"
+        else:
+            match = 'match u32 0 0'
+        if buckets > 1:
+            match += f" hashkey mask 0x000000ff at {_HASH_OFFSET[name][key]}"
+        lines.append(f"{prefix} protocol {protocol} u32 {match} link {table:x}:")
+
+    filters = _filters(dev, key, entries)
+    lines += [f"filter add {filters[handle]}" for handle in sorted(filters)]
+    return lines
+
+
+def _htb_delta(dev: str, key: str, before: _Entries, after: _Entries) -> List[str]:
+    """生成 HTB 树的增量语句：只增删、修改变化节点的类和过滤器表项
+
+    u32 表项的匹配条件不能原地修改，内容变化的表项先删后增；类在其过滤器之前
+    添加、之后删除，避免过滤器引用不存在的类。其他节点的类和队列状态不受影响。
+    """
+    lines = []
+    for minor, (rate, _, _, _) in sorted(after.items()):
+        if minor not in before:
+            lines += _class_lines(dev, minor, rate)
+        elif before[minor][0] != rate:
+            lines += _class_lines(dev, minor, rate, verb='change')
+
+    old, new = _filters(dev, key, before), _filters(dev, key, after)
+    lines += [_filter_del(dev, *handle) for handle in sorted(old) if new.get(handle) != old[handle]]
+    lines += [f"filter add {new[handle]}" for handle in sorted(new) if old.get(handle) != new[handle]]
+
+    lines += [f"class del dev {dev} classid 1:{minor:x}" for minor in sorted(before) if minor not in after]
+    return lines
+
+
+def _ingress_redirect(interface_name: str) -> List[str]:
+    """重建入方向队列，将全部入方向流量（IPv4 和 IPv6）重定向到 IFB 设备"""
+    return [
+        f"qdisc replace dev {interface_name} handle ffff: ingress",
+        f"qdisc del dev {interface_name} ingress",
+        f"qdisc add dev {interface_name} handle ffff: ingress",
+        f"filter add dev {interface_name} parent ffff: prio 10 protocol all u32 "
+        f"match u32 0 0 action mirred egress redirect dev {ifb_name(interface_name)}",
+    ]
+
+
+def _remove_ingress(interface_name: str) -> List[str]:
+    """删除入方向队列（其上的重定向过滤器一并移除）：同理先确保存在再删除"""
+    return [
+        f"qdisc replace dev {interface_name} handle ffff: ingress",
+        f"qdisc del dev {interface_name} ingress",
+    ]
+
+
+def render_interface(interface_name: str, network_cidr: str,
+                     nodes: Iterable[ShapedNode]) -> Tuple[List[str], bool]:
+    """生成单个接口的 tc 批处理语句（整体重建，可重复执行）
+
+    下行（中心节点 -> 节点）在 WireGuard 接口出方向按目的地址限速；上行
+    （节点 -> 中心节点）在入方向把流量重定向到 IFB 设备，再按源地址限速。
+    节点的虚拟 IP、虚拟 IPv6 和路由子网都归入节点的类，共享同一限速。
+    过滤器先按地址最后一个字节哈希到桶，桶内再精确匹配，分类开销与节点数量无关
+    （网络段大于 /24 时同一桶内最多 2^(24-前缀长度) 个节点）；路由子网按顺序匹配。
+
+    整体重建会清空各类的队列状态，只用于 `shaping apply` 和新建接口；日常变更使用
+    render_interface_delta()。
+
+    Args:
+        interface_name: WireGuard 接口名
+        network_cidr: 接口网络段
+        nodes: 接口上受限速的节点
+
+    Returns:
+        (批处理语句列表, 是否需要 IFB 设备)
+
+    Raises:
+        ValueError: 节点地址无法映射为 tc 类编号或过滤器数量超出上限
+    """
+    nodes = list(nodes)
+    download, upload = _entries(nodes, 4), _entries(nodes, 5)
+
+    lines = []
+    if download:
+        lines += _htb_tree(interface_name, network_cidr, 'dst', download)
+    else:
+        lines += _reset_root(interface_name)
+
+    if upload:
+        lines += _ingress_redirect(interface_name)
+        lines += _htb_tree(ifb_name(interface_name), network_cidr, 'src', upload)
+    else:
+        lines += _remove_ingress(interface_name)
+    return lines, bool(upload)
+
+
+def render_interface_delta(interface_name: str, network_cidr: str,
+                           before: Iterable[ShapedNode],
+                           after: Iterable[ShapedNode]) -> Tuple[List[str], bool]:
+    """生成单个接口从 before 到 after 的增量语句（与 nftables 集合元素的增量更新相同）
+
+    只有受影响节点的类和过滤器表项被增删、修改；某个方向第一次出现或不再有受限速
+    节点时，该方向的树整体创建或删除（此时没有其他节点的队列状态需要保留）。
+
+    Args:
+        interface_name: WireGuard 接口名
+        network_cidr: 接口网络段
+        before: 变更前接口上受限速的节点（须与当前已下发的规则一致）
+        after: 变更后接口上受限速的节点
+
+    Returns:
+        (批处理语句列表，无变化时为空, 是否需要新建 IFB 设备)
+
+    Raises:
+        ValueError: 节点地址无法映射为 tc 类编号或过滤器数量超出上限
+    """
+    before, after = list(before), list(after)
+    lines = []
+    ifb = ifb_name(interface_name)
+
+    old, new = _entries(before, 4), _entries(after, 4)
+    if old and new:
+        lines += _htb_delta(interface_name, 'dst', old, new)
+    elif new:
+        lines += _htb_tree(interface_name, network_cidr, 'dst', new)
+    elif old:
+        lines += _reset_root(interface_name)
+
+    old, new = _entries(before, 5), _entries(after, 5)
+    if old and new:
+        lines += _htb_delta(ifb, 'src', old, new)
+    elif new:
+        lines += _ingress_redirect(interface_name)
+        lines += _htb_tree(ifb, network_cidr, 'src', new)
+    elif old:
+        lines += _remove_ingress(interface_name) + _reset_root(ifb)
+    return lines, bool(new) and not old
@@ -0,0 +1,143 @@
+"""
+流量采样模块
+采集中心节点上每个 peer 的累计收发字节，以及（可用时）按源/目的地址的连接跟踪流量
+"""
+import re
+import shutil
+from typing import Dict, Iterable, Optional, Tuple
+from core.utils.prefix_trie import PrefixTrie
+from core.utils.privileged_executor import get_executor
+
+
+# conntrack -L 输出中的地址和字节计数字段
+_CONNTRACK_FIELD = re.compile(r'\b(src|dst|bytes)=(\S+)')
+
+
+class TrafficSampler:
+    """流量采样器
+
+    peer 计数器来自 `wg show <iface> transfer`，所有 WireGuard 部署都可用；
+    节点对流量来自 `conntrack -L`（需要安装 conntrack 且开启 nf_conntrack_acct），
+    不可用时返回 None，由调用方降级处理。
+    """
+
+    def __init__(self):
+        """初始化采样器"""
+        self.executor = get_executor()
+
+    def sample_peer_transfer(self, interface_names: Iterable[str]) -> Dict[str, Tuple[int, int]]:
+        """采集各 peer 的累计收发字节
+
+        Args:
+            interface_names: WireGuard 接口名称
+
+        Returns:
+            公钥 -> (接收字节, 发送字节)
+        """
+        counters = {}
+        for name in interface_names:
+            try:
+                result = self.executor.execute_privileged_command(
+                    ['wg', 'show', name, 'transfer'],
+                    capture_output=True,
+                    text=True
+                )
+            except RuntimeError:
+                continue
+            if result.returncode != 0:
+                continue
+
+            for line in result.stdout.splitlines():
+                parts = line.split()
+                if len(parts) == 3 and parts[1].isdigit() and parts[2].isdigit():
+                    counters[parts[0]] = (int(parts[1]), int(parts[2]))
+        return counters
+
+    def sample_latest_handshakes(self, interface_names: Iterable[str]) -> Dict[str, Dict[str, int]]:
+        """采集各 peer 最近一次握手时间
+
+        Args:
+            interface_names: WireGuard 接口名称
+
+        Returns:
+            接口名 -> {公钥: 握手时间戳（0 表示从未握手）}；
+            接口未运行或读取失败时不包含该接口，调用方据此跳过判断
+        """
+        handshakes = {}
+        for name in interface_names:
+            try:
+                result = self.executor.execute_privileged_command(
+                    ['wg', 'show', name, 'latest-handshakes'],
+                    capture_output=True,
+                    text=True
+                )
+            except RuntimeError:
+                continue
+            if result.returncode != 0:
+                continue
+
+            peers = handshakes[name] = {}
+            for line in result.stdout.splitlines():
+                parts = line.split()
+                if len(parts) == 2 and parts[1].isdigit():
+                    peers[parts[0]] = int(parts[1])
+        return handshakes
+
+    def sample_flows(self, network_cidrs: Iterable[str]) -> Optional[Dict[Tuple[str, str], int]]:
+        """采集虚拟网络内节点之间的连接跟踪流量
+
+        Args:
+            network_cidrs: 虚拟网络段和节点路由子网（源和目的都在其中的流才计入）
+
+        Returns:
+            (较小 IP, 较大 IP) -> 当前跟踪连接的累计字节（双向合计），
+            conntrack 不可用或未开启字节统计时返回 None
+        """
+        if shutil.which('conntrack') is None:
+            return None
+
+        try:
+            result = self.executor.execute_privileged_command(
+                ['conntrack', '-L', '-o', 'extended'],
+                capture_output=True,
+                text=True
+            )
+        except RuntimeError:
+            return None
+        if result.returncode != 0:
+            return None
+
+        # 网络段和节点路由子网可能很多，用前缀树判断归属
+        networks = PrefixTrie()
+        for cidr in network_cidrs:
+            networks.insert(cidr)
+
+        def in_network(ip: str) -> bool:
+            try:
+                return networks.longest_match(ip) is not None
+            except ValueError:
+                return False
+
+        flows: Dict[Tuple[str, str], int] = {}
+        accounted = False
+        for line in result.stdout.splitlines():
+            src = dst = None
+            total = 0
+            for key, value in _CONNTRACK_FIELD.findall(line):
+                # 每行先是原方向、后是应答方向，地址取原方向
+                if key == 'src' and src is None:
+                    src = value
+                elif key == 'dst' and dst is None:
+                    dst = value
+                elif key == 'bytes' and value.isdigit():
+                    total += int(value)
+                    accounted = True
+            if src is None or dst is None or src == dst:
+                continue
+            if not (in_network(src) and in_network(dst)):
+                continue
+            pair = (src, dst) if src < dst else (dst, src)
+            flows[pair] = flows.get(pair, 0) + total
+
+        # 未开启 nf_conntrack_acct 时没有 bytes 字段，视为不可用
+        return flows if accounted or not result.stdout.strip() else None
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+多中心部署本地替身
+在单机上用多个进程模拟共享同一节点注册表的中心节点，验证新节点归属策略和配置分发
+
+每个子进程代表一个中心节点，并发地向共享数据库注册节点，随后各自拉取自身的
+[Peer] 段；主进程检查每个节点恰好出现在其归属中心节点的配置中、各中心节点互相
+路由对方网络段、客户端配置以归属中心节点为对端。不依赖 WireGuard（使用随机密钥）。
+
+用法:
+    python scripts/hub_standin.py [--hubs 3] [--nodes 60] [--policy least_peers]
+"""
+import argparse
+import base64
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import base as config
+from core.domain.interface import WgInterface
+from core.domain.node import Node
+from core.domain.server import Server
+from core.models.database import Database
+from core.models.repositories.interface_repo import InterfaceRepository
+from core.models.repositories.node_repo import NodeRepository
+from core.models.repositories.server_repo import ServerRepository
+from core.services.config_service import ConfigService
+from core.services.hub_service import HubService, PLACEMENT_POLICIES
+from core.utils.ip_allocator import IPAllocator
+
+REGIONS = ('cn', 'eu', 'us')
+
+
+def random_key() -> str:
+    """生成格式合法的随机密钥（仅用于替身测试）"""
+    return base64.b64encode(os.urandom(32)).decode()
+
+
+def setup_registry(db_path: str, hub_count: int, policy: str):
+    """创建共享注册表：本地中心节点 + 远端中心节点"""
+    with Database(db_path) as db:
+        server = Server(public_key=random_key(), private_key=random_key(),
+                        virtual_ip='10.0.0.1', listen_port=51820,
+                        network_cidr='10.0.0.0/24', public_endpoint='198.51.100.1:51820')
+        ServerRepository(db).save(server)
+        InterfaceRepository(db).add(WgInterface(
+            name=config.WG_INTERFACE_NAME, listen_port=server.listen_port,
+            public_key=server.public_key, private_key=server.private_key,
+            virtual_ip=server.virtual_ip, network_cidr=server.network_cidr,
+            config_path=os.path.join(os.path.dirname(db_path), 'wg0.conf')
+        ))
+        db.set_config_param('hub_placement_policy', policy)
+        db.set_config_param('hub_local_region', REGIONS[0])
+
+        hub_service = HubService(db)
+        for index in range(1, hub_count):
+            hub_service.add_hub(
+                name=f'hub-{index}',
+                public_endpoint=f'198.51.100.{index + 1}:51820',
+                public_key=random_key(),
+                network_cidr=f'10.0.{index}.0/24',
+                capacity_weight=float(index + 1),
+                region=REGIONS[index % len(REGIONS)]
+            )
+            hub_service.report_traffic(f'hub-{index}', index * 1000)
+
+
+def register_worker(db_path: str, worker: int, count: int) -> list:
+    """子进程：并发注册节点，返回 (节点名, 中心节点名) 列表"""
+    placed = []
+    with Database(db_path) as db:
+        db.conn.execute('PRAGMA busy_timeout = 5000')
+        hub_service = HubService(db)
+        allocator = IPAllocator(db)
+        interfaces = InterfaceRepository(db)
+        nodes = NodeRepository(db)
+        for index in range(count):
+            name = f'w{worker}-node-{index}'
+            region = REGIONS[index % len(REGIONS)]
+            # 归属选择与 IP 分配放在同一写事务中，避免多个进程分配到同一地址
+            db.conn.execute('BEGIN IMMEDIATE')
+            try:
+                hub = hub_service.place_node(region)
+                if hub.is_local:
+                    interface = interfaces.get_least_loaded()
+                    virtual_ip = allocator.allocate_interface_ip(interface)
+                else:
+                    interface = None
+                    virtual_ip = allocator.allocate_hub_ip(hub)
+                nodes.add(Node(
+                    node_name=name, virtual_ip=virtual_ip, public_key=random_key(),
+                    private_key=random_key(), platform='linux',
+                    interface_id=interface.id if interface else None,
+                    hub_id=hub.id, region=region
+                ))
+            except sqlite3.Error:
+                db.conn.rollback()
+                raise
+            placed.append((name, hub.name))
+    return placed
+
+
+def render_worker(db_path: str, hub_name: str) -> str:
+    """子进程：以指定中心节点身份拉取自身配置"""
+    with Database(db_path) as db:
+        if hub_name == config.WG_HUB_NAME:
+            return ConfigService(db).generate_server_config()
+        keepalive = ConfigService(db).get_persistent_keepalive()
+        return ''.join(HubService(db).iter_hub_peers(hub_name, keepalive))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='多中心部署本地替身')
+    parser.add_argument('--hubs', type=int, default=3, help='中心节点数量（含本地）')
+    parser.add_argument('--nodes', type=int, default=60, help='注册节点总数')
+    parser.add_argument('--workers', type=int, default=3, help='并发注册进程数')
+    parser.add_argument('--policy', default='least_peers', choices=PLACEMENT_POLICIES, help='归属策略')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'registry.db')
+        setup_registry(db_path, args.hubs, args.policy)
+
+        per_worker = args.nodes // args.workers
+        with multiprocessing.Pool(args.workers) as pool:
+            placed = [
+                item for batch in pool.starmap(
+                    register_worker, [(db_path, i, per_worker) for i in range(args.workers)]
+                ) for item in batch
+            ]
+            with Database(db_path) as db:
+                hubs = HubService(db).list_hubs()
+            configs = dict(zip(
+                (hub.name for hub in hubs),
+                pool.starmap(render_worker, [(db_path, hub.name) for hub in hubs])
+            ))
+
+        errors = []
+        homes = dict(placed)
+        distribution = Counter(homes.values())
+
+        with Database(db_path) as db:
+            config_service = ConfigService(db)
+            for node in NodeRepository(db).iter_all():
+                home = homes[node.node_name]
+                # 节点恰好出现在归属中心节点的配置中
+                holders = [name for name, text in configs.items() if node.public_key in text]
+                if holders != [home]:
+                    errors.append(f"{node.node_name}: 出现在 {holders}，应为 [{home}]")
+                # 客户端配置以归属中心节点为对端
+                client = config_service.render_client_config(node)
+                hub = next(hub for hub in hubs if hub.name == home)
+                if f"PublicKey = {hub.public_key}" not in client:
+                    errors.append(f"{node.node_name}: 客户端配置未指向 {home}")
+
+        # 各中心节点互相路由对方网络段
+        for hub in hubs:
+            for other in hubs:
+                if other is not hub and f"AllowedIPs = {other.network_cidr}" not in configs[hub.name]:
+                    errors.append(f"{hub.name}: 缺少到 {other.name} 的路由")
+
+        print(f"归属策略: {args.policy}")
+        for hub in hubs:
+            print(f"  {hub.name:<10} 权重 {hub.capacity_weight:<4g} 区域 {hub.region or '-':<4} "
+                  f"节点 {distribution.get(hub.name, 0)}")
+        if errors:
+            print(f"✗ 发现 {len(errors)} 个问题:")
+            for error in errors[:20]:
+                print(f"  - {error}")
+            return 1
+        print(f"✓ {len(placed)} 个节点的归属与配置分发均正确")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
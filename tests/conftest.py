@@ -0,0 +1,43 @@
+"""
+测试公共夹具
+使用 benchmarks/fake_backend 的替身脚本和合成节点，测试不依赖真实的 WireGuard 和 root 权限
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks import fake_backend
+from config import base as config
+from core.utils.fragment_cache import clear_peer_fragment_caches
+
+
+@pytest.fixture
+def fake_env(tmp_path, monkeypatch):
+    """安装替身脚本，数据库和配置目录指向临时目录（测试结束后恢复）
+
+    Returns:
+        临时目录
+    """
+    monkeypatch.setenv('PATH', os.environ.get('PATH', ''))
+    monkeypatch.setattr(config, 'WG_CONFIG_DIR', config.WG_CONFIG_DIR)
+    monkeypatch.setattr(config, 'DATABASE_PATH', str(tmp_path / 'wg.db'))
+    fake_backend.install(str(tmp_path))
+    clear_peer_fragment_caches()
+    yield tmp_path
+    clear_peer_fragment_caches()
+
+
+@pytest.fixture
+def fleet(fake_env):
+    """已初始化服务端和 3 个合成节点的数据库
+
+    Returns:
+        数据库文件路径
+    """
+    fake_backend.build_fleet(config.DATABASE_PATH, 3)
+    return config.DATABASE_PATH
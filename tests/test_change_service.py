@@ -0,0 +1,90 @@
+"""
+变更日志测试
+"""
+import sqlite3
+
+from core.models.database import Database
+from core.services.change_service import ChangeRelay, ChangeService
+
+
+def test_changes_since_returns_latest_state(fleet):
+    with Database() as db:
+        service = ChangeService(db)
+        start = service.changes_since(0)
+        assert start['reset'] and start['changes'] == []
+
+        db.conn.execute("UPDATE nodes SET description = 'edited' WHERE id = 1")
+        db.conn.execute('DELETE FROM nodes WHERE id = 2')
+        db.conn.commit()
+        feed = service.changes_since(start['next'])
+
+    assert not feed['reset'] and not feed['more']
+    assert [(c['id'], c['op']) for c in feed['changes']] == [(1, 'upsert'), (2, 'delete')]
+    assert feed['changes'][0]['data']['description'] == 'edited'
+    assert feed['changes'][1]['data']['node_name'] == 'node-1'
+
+
+def test_relay_sees_writes_from_other_connections(fleet):
+    """其他进程（此处以独立连接模拟）的修改同样推进变更日志并发布 changes 事件"""
+    relay = ChangeRelay()
+    with Database() as db:
+        assert relay.run_once(db) is None  # 首次检查只记录基线
+
+    other = sqlite3.connect(fleet)
+    other.execute("UPDATE nodes SET description = 'cli' WHERE id = 3")
+    other.commit()
+    other.close()
+
+    with Database() as db:
+        seq = relay.run_once(db)
+        assert seq == db.get_change_seq()
+        assert relay.run_once(db) is None
+
+
+def _journal(db):
+    return db.conn.execute("SELECT seq, entity_id FROM changes WHERE entity = 'node' ORDER BY seq").fetchall()
+
+
+def _revision(db, node_id):
+    return db.conn.execute('SELECT revision FROM nodes WHERE id = ?', (node_id,)).fetchone()[0]
+
+
+def test_only_config_columns_journaled(fleet):
+    """只改时间戳或写入相同值不记录变更；配置列变化只记录一次，修订号只加一"""
+    with Database() as db:
+        before, revision = _journal(db), _revision(db, 1)
+        db.conn.execute('UPDATE nodes SET updated_at = CURRENT_TIMESTAMP WHERE id = 1')
+        db.conn.execute("UPDATE nodes SET platform = platform WHERE id = 1")
+        db.conn.commit()
+        assert _journal(db) == before and _revision(db, 1) == revision
+
+        changes = db.conn.total_changes
+        db.conn.execute("UPDATE nodes SET endpoint = '203.0.113.7:51820' WHERE id = 1")
+        db.conn.commit()
+        # 原语句、递增修订号、写入变更日志各一次
+        assert db.conn.total_changes - changes == 3
+        assert _revision(db, 1) == revision + 1
+        assert [entity_id for _, entity_id in _journal(db)].count(1) == 1
+        assert _journal(db)[-1][0] == db.get_change_seq()
+
+
+def test_legacy_revision_trigger_replaced(fleet):
+    """升级时删除旧的 nodes_revision 触发器，并按新的条件重建变更日志触发器"""
+    conn = sqlite3.connect(fleet)
+    conn.executescript('''
+        DROP TRIGGER changes_node_update;
+        CREATE TRIGGER changes_node_update AFTER UPDATE ON nodes BEGIN
+            INSERT OR REPLACE INTO changes (entity, entity_id, op) VALUES ('node', NEW.id, 'upsert');
+        END;
+        CREATE TRIGGER nodes_revision AFTER UPDATE ON nodes WHEN NEW.revision = OLD.revision BEGIN
+            UPDATE nodes SET revision = OLD.revision + 1 WHERE id = NEW.id;
+        END;
+    ''')
+    conn.close()
+
+    Database._schema_checked.discard(fleet)
+    with Database() as db:
+        triggers = {row[0]: row[1] for row in db.conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger'")}
+        assert 'nodes_revision' not in triggers
+        assert 'WHEN' in triggers['changes_node_update']
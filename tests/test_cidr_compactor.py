@@ -0,0 +1,88 @@
+"""
+AllowedIPs 压缩测试
+"""
+import ipaddress
+import random
+
+import pytest
+
+from core.models.database import Database
+from core.services.config_service import ConfigService
+from core.services.policy_service import PolicyService
+from core.utils.cidr_compactor import PREFIX_ALIASES, compact_prefixes
+
+
+def _collapse(networks):
+    """按地址族分别合并（collapse_addresses 不接受混合地址族）"""
+    networks = list(networks)
+    return [network for version in (4, 6) for network in ipaddress.collapse_addresses(
+        [network for network in networks if network.version == version])]
+
+
+def _reference(include, exclude):
+    """用 ipaddress 逐个前缀相减、合并得到的结果"""
+    networks = _collapse(map(ipaddress.ip_network, include))
+    for removed in map(ipaddress.ip_network, exclude):
+        remaining = []
+        for network in networks:
+            if network.version != removed.version or not network.overlaps(removed):
+                remaining.append(network)
+            elif not network.subnet_of(removed):
+                remaining.extend(network.address_exclude(removed))
+        networks = _collapse(remaining)
+    return sorted(str(network) for network in networks)
+
+
+def _random_prefixes(rng, count, base='10.0.0.0/8'):
+    base = ipaddress.ip_network(base)
+    prefixes = []
+    for _ in range(count):
+        length = rng.randint(base.prefixlen + 2, 30)
+        address = int(base.network_address) + rng.randrange(base.num_addresses)
+        prefixes.append(str(ipaddress.ip_network(f'{ipaddress.ip_address(address)}/{length}', strict=False)))
+    return prefixes
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_ipaddress_reference(seed):
+    rng = random.Random(seed)
+    include = _random_prefixes(rng, 120)
+    exclude = _random_prefixes(rng, 40)
+    assert sorted(compact_prefixes(include, exclude)) == _reference(include, exclude)
+
+
+def test_aliases_and_families():
+    result = compact_prefixes(['any4', 'ula'], ['rfc1918'])
+    assert sorted(result) == _reference(list(PREFIX_ALIASES['any4']) + ['fc00::/7'], list(PREFIX_ALIASES['rfc1918']))
+    # IPv4 在前
+    assert result[-1] == 'fc00::/7'
+    assert compact_prefixes(['10.0.0.0/25', '10.0.0.128/25']) == ['10.0.0.0/24']
+    assert compact_prefixes(['10.0.0.0/24'], ['10.0.0.0/16']) == []
+
+
+def test_invalid_prefix_rejected():
+    with pytest.raises(ValueError):
+        compact_prefixes(['10.0.0.300/24'])
+
+
+def test_split_policy_keeps_overlay_network_first(fleet):
+    """分流策略下虚拟网络段仍是 AllowedIPs 第一项，接入脚本据此推算服务端地址"""
+    with Database() as db:
+        policy_service = PolicyService(db)
+        policy_service.create_policy('split', ['any4'], ['rfc1918'])
+        node_id = db.conn.execute('SELECT MIN(id) FROM nodes').fetchone()[0]
+        policy_service.set_node_policy(node_id, 'split')
+        node = policy_service.node_repo.get_by_id(node_id)
+        network = db.get_server_info()['network_cidr']
+
+        allowed = policy_service.get_client_allowed_ips(node, [network])
+        assert allowed[0] == network
+        # 与整体压缩覆盖相同的地址，且各项互不重叠
+        assert compact_prefixes(allowed) == compact_prefixes(compact_prefixes(['any4'], ['rfc1918']) + [network])
+        networks = [ipaddress.ip_network(prefix) for prefix in allowed]
+        assert sum(item.num_addresses for item in networks) == sum(
+            item.num_addresses for item in map(ipaddress.ip_network, compact_prefixes(allowed)))
+
+        config_text = ConfigService(db).generate_client_config(node_id)
+        allowed_line = next(line for line in config_text.splitlines() if line.startswith('AllowedIPs'))
+        assert allowed_line.split('=', 1)[1].split(',')[0].strip() == network
@@ -0,0 +1,37 @@
+"""
+[Peer] 段缓存测试
+"""
+import os
+
+from config import base as config
+from core.models.database import Database
+from core.services.route_service import RouteService
+
+
+def _server_config() -> str:
+    with open(os.path.join(config.WG_CONFIG_DIR, 'wg0.conf')) as f:
+        return f.read()
+
+
+def test_edits_within_same_second_invalidate_cached_peer(fleet):
+    """同一秒内两次修改同一节点，服务端配置应包含第二次修改（updated_at 只精确到秒）"""
+    with Database() as db:
+        service = RouteService(db)
+        service.add_route(1, '192.168.70.0/24')
+        service.add_route(1, '192.168.80.0/24')
+
+    content = _server_config()
+    assert '192.168.70.0/24' in content
+    assert '192.168.80.0/24' in content
+
+
+def test_revision_increments_on_every_update(fleet):
+    """任何修改节点记录的语句（包括批量更新）都会增加修订号"""
+    with Database() as db:
+        before = dict(db.conn.execute('SELECT id, revision FROM nodes'))
+        db.conn.execute("UPDATE nodes SET description = 'a'")
+        db.conn.execute("UPDATE nodes SET description = 'b' WHERE id = 1")
+        after = dict(db.conn.execute('SELECT id, revision FROM nodes'))
+
+    assert after[1] == before[1] + 2
+    assert after[2] == before[2] + 1
@@ -0,0 +1,21 @@
+"""
+CLI 冷启动导入预算测试
+在临时合成数据库上运行 benchmarks/import_budget.py 的全部场景（含真实的 list / server-info）
+"""
+import os
+
+from benchmarks import import_budget
+
+# 测试机器负载不稳定，预算默认放宽一倍；不应导入的模块仍严格检查
+SCALE = float(os.environ.get('WG_IMPORT_BUDGET_SCALE', '2.0'))
+
+
+def test_scenarios_cover_monitoring_commands():
+    commands = [argv for argv, _, _ in import_budget.SCENARIOS]
+    assert ['list'] in commands
+    assert ['server-info'] in commands
+
+
+def test_import_budget():
+    failures = import_budget.run_checks(repeat=3, scale=SCALE, verbose=False)
+    assert failures == []
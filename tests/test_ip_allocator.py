@@ -0,0 +1,75 @@
+"""
+IPv6 稀疏地址分配测试
+"""
+import ipaddress
+
+from core.models.database import Database
+from core.services.server_service import ServerService
+from core.utils.ip_allocator import IP6_HASH_PROBES, IPAllocator
+
+NETWORK6 = 'fd00:1:2:3::/64'
+
+
+def test_hash_probe_deterministic_and_in_range(fleet):
+    with Database() as db:
+        allocator = IPAllocator(db)
+        address = allocator.allocate_ip6(NETWORK6, 'fd00:1:2:3::1', 'laptop1')
+        assert allocator.allocate_ip6(NETWORK6, 'fd00:1:2:3::1', 'laptop1') == address
+        assert allocator.allocate_ip6(NETWORK6, 'fd00:1:2:3::1', 'laptop2') != address
+        network = ipaddress.IPv6Network(NETWORK6)
+        assert ipaddress.IPv6Address(address) in network
+        assert ipaddress.IPv6Address(address) != network.network_address
+
+
+def test_occupied_candidate_probes_next(fleet):
+    """首个候选已被节点占用时取下一次探测的地址"""
+    with Database() as db:
+        allocator = IPAllocator(db)
+        first = allocator.allocate_ip6(NETWORK6, None, 'laptop1')
+        node_id = db.conn.execute('SELECT MIN(id) FROM nodes').fetchone()[0]
+        db.set_server_ipv6(NETWORK6, 'fd00:1:2:3::1', node_addresses=[(first, node_id)])
+        second = allocator.allocate_ip6(NETWORK6, None, 'laptop1')
+        assert second != first
+        # 批内已分配的地址同样跳过
+        third = allocator.allocate_ip6(NETWORK6, None, 'laptop1',
+                                       taken={int(ipaddress.IPv6Address(second))})
+        assert third not in (first, second)
+
+
+def test_small_network_falls_back_to_gaps(fleet):
+    """探测全部失败时按区间取第一个空隙，耗尽时返回 None"""
+    with Database() as db:
+        allocator = IPAllocator(db)
+        network = ipaddress.IPv6Network('fd00::/126')  # 主机号 1-3，1 为保留地址
+        taken = set()
+        for index in range(2):
+            address = allocator.allocate_ip6(str(network), 'fd00::1', f'node{index}', taken)
+            assert address is not None
+            taken.add(int(ipaddress.IPv6Address(address)))
+        assert {str(ipaddress.IPv6Address(value)) for value in taken} == {'fd00::2', 'fd00::3'}
+        assert allocator.allocate_ip6(str(network), 'fd00::1', 'node2', taken) is None
+
+
+def test_first_free_ip6():
+    network = ipaddress.IPv6Network('fd00::/120')
+    base = int(network.network_address)
+    assert IPAllocator.first_free_ip6(network, []) == 'fd00::1'
+    assert IPAllocator.first_free_ip6(network, [base + 1, base + 2, base + 4]) == 'fd00::3'
+    assert IPAllocator.first_free_ip6(network, list(range(base + 1, base + 256))) is None
+
+
+def test_enable_ipv6_assigns_unique_addresses(fake_env):
+    from benchmarks import fake_backend
+    from config import base as config
+
+    fake_backend.build_fleet(config.DATABASE_PATH, 50)
+    with Database() as db:
+        result = ServerService(db).enable_ipv6('fd00:aa::/64')
+        assert result['assigned'] == 50
+        rows = db.conn.execute('SELECT virtual_ip6 FROM nodes').fetchall()
+        addresses = [ipaddress.IPv6Address(row[0]) for row in rows]
+        assert len(set(addresses)) == 50
+        network = ipaddress.IPv6Network('fd00:aa::/64')
+        assert all(address in network for address in addresses)
+        # 稀疏分配：地址散布在整个子段，而不是从 ::2 起连续排列
+        assert int(max(addresses)) - int(min(addresses)) > 50 * IP6_HASH_PROBES
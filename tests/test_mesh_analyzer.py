@@ -0,0 +1,54 @@
+"""
+直连自动提升分析器测试
+"""
+from config import base as config
+from core.models.database import Database
+from core.services.mesh_analyzer import MeshAnalyzer
+from core.services.mesh_service import MeshService
+
+
+class FakeSampler:
+    """每个窗口每个节点增加固定字节数的采样器"""
+
+    def __init__(self, public_keys, flows: bool):
+        self.public_keys = public_keys
+        self.flows = flows
+        self.total = 0
+
+    def sample_peer_transfer(self, interface_names):
+        self.total += 10 * config.MESH_PROMOTE_BPS
+        return {key: (self.total, 0) for key in self.public_keys}
+
+    def sample_flows(self, network_cidrs):
+        if not self.flows:
+            return None
+        return {('10.0.0.2', '10.0.0.3'): self.total}
+
+
+def _analyze(db, flows: bool):
+    MeshService(db).set_mode('auto')
+    db.conn.execute("UPDATE nodes SET endpoint = '203.0.113.1:51820'")
+    keys = [row[0] for row in db.select_nodes(('public_key',), where='id IN (1, 2)')]
+    ticks = iter(range(100))
+    analyzer = MeshAnalyzer(FakeSampler(keys, flows), clock=lambda: float(next(ticks)))
+    for _ in range(config.MESH_PROMOTE_AFTER + 1):
+        report = analyzer.run_once(db)
+    return report
+
+
+def test_peer_counters_only_report_candidates(fleet):
+    """没有 conntrack 数据时两个“重”节点只作为候选，不创建直连"""
+    with Database() as db:
+        report = _analyze(db, flows=False)
+        assert report['flow_source'] == 'peer_counters'
+        assert [item['pair'] for item in report['candidates']] == [[1, 2]]
+        assert report['promoted'] == []
+        assert MeshService(db).list_links() == []
+
+
+def test_conntrack_flows_promote(fleet):
+    with Database() as db:
+        report = _analyze(db, flows=True)
+        assert report['flow_source'] == 'conntrack'
+        assert [item['pair'] for item in report['promoted']] == [[1, 2]]
+        assert len(MeshService(db).list_links()) == 1
@@ -0,0 +1,87 @@
+"""
+nftables 规则编译测试
+"""
+import re
+
+import pytest
+
+from config import base as config
+from core.utils.nft_compiler import node_members, render_member_delta, render_ruleset
+
+
+def _ruleset_elements(text):
+    """完整规则集中各集合/映射的元素"""
+    state, name = {}, None
+    for line in text.splitlines():
+        match = re.match(r'\s+(?:set|map) (\S+) \{', line)
+        if match:
+            name = match.group(1)
+            state[name] = set()
+        match = re.match(r'\s+elements = \{ (.*) \}', line)
+        if match:
+            state[name].update(match.group(1).split(', '))
+    return state
+
+
+def _apply_delta(state, text):
+    """像 nft 一样应用增量语句：删除不存在的元素或重复添加都会出错"""
+    table = f"inet {config.NFT_TABLE_NAME}"
+    for line in text.splitlines():
+        match = re.fullmatch(rf'(add|delete) element {table} (\S+) \{{ (.*) \}}', line)
+        assert match, line
+        verb, name, items = match.groups()
+        elements = state[name]
+        for item in items.split(', '):
+            if verb == 'add':
+                assert item not in elements
+                elements.add(item)
+            else:
+                key = next((element for element in elements if element.split(' : ')[0] == item), None)
+                assert key is not None, item
+                elements.remove(key)
+    return state
+
+
+GROUPS = [1, 2, 3]
+RULES = [(1, 2), (2, 3)]
+
+
+def _members(nodes):
+    members = set()
+    for node in nodes:
+        members |= node_members(*node)
+    return members
+
+
+def test_node_members_normalized():
+    members = node_members(2, '10.0.0.5', 'fd00::5', '192.168.1.0/24,10.9.0.1/32')
+    assert members == {(2, '10.0.0.5'), (2, 'fd00::5'), (2, '192.168.1.0/24'), (2, '10.9.0.1')}
+    assert node_members(None, '10.0.0.5', None, None) == set()
+
+
+@pytest.mark.parametrize('before, after', [
+    ([(1, '10.0.0.2', None, None)], [(1, '10.0.0.2', None, None), (2, '10.0.0.3', 'fd00::3', None)]),
+    ([(1, '10.0.0.2', 'fd00::2', '192.168.1.0/24')], [(3, '10.0.0.2', 'fd00::2', '192.168.1.0/24')]),
+    ([(1, '10.0.0.2', None, '192.168.1.0/24'), (2, '10.0.0.3', None, None)],
+     [(1, '10.0.0.2', None, '192.168.2.0/24')]),
+])
+def test_delta_matches_full_ruleset(before, after):
+    """在旧规则集上应用增量语句，集合和映射与新成员的完整规则集相同"""
+    old, new = _members(before), _members(after)
+    state = _ruleset_elements(render_ruleset(GROUPS, old, RULES))
+    delta = render_member_delta(old - new, new - old)
+    assert _apply_delta(state, delta) == _ruleset_elements(render_ruleset(GROUPS, new, RULES))
+
+
+def test_delta_format():
+    table = f"inet {config.NFT_TABLE_NAME}"
+    delta = render_member_delta({(1, '10.0.0.2')}, {(2, '10.0.0.2'), (2, 'fd00::2')})
+    assert delta.splitlines() == [
+        f"delete element {table} g1_v4 {{ 10.0.0.2 }}",
+        f"delete element {table} src_v4 {{ 10.0.0.2 }}",
+        f"add element {table} g2_v4 {{ 10.0.0.2 }}",
+        f"add element {table} src_v4 {{ 10.0.0.2 : jump from_g2 }}",
+        f"add element {table} g2_v6 {{ fd00::2 }}",
+        f"add element {table} src_v6 {{ fd00::2 : jump from_g2 }}",
+    ]
+    assert render_member_delta(set(), set()) == ''
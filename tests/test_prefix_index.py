@@ -0,0 +1,110 @@
+"""
+前缀树与前缀索引测试
+"""
+import ipaddress
+import random
+
+import pytest
+
+from core.models.database import Database, PREFIXES_COUNTER
+from core.utils.prefix_index import (
+    KIND_NODE, KIND_ROUTE, PrefixIndex, clear_prefix_indexes, get_prefix_index
+)
+from core.utils.prefix_trie import PrefixTrie
+
+
+def _random_prefixes(rng, count):
+    prefixes = set()
+    while len(prefixes) < count:
+        length = rng.randint(8, 32)
+        address = ipaddress.ip_address(rng.getrandbits(32) & 0x0affffff | 0x0a000000)
+        prefixes.add(ipaddress.ip_network(f'{address}/{length}', strict=False))
+    return sorted(prefixes)
+
+
+def test_trie_matches_ipaddress_reference():
+    """最长前缀匹配和重叠检测与逐个比较 ipaddress 对象的结果相同"""
+    rng = random.Random(7)
+    prefixes = _random_prefixes(rng, 200)
+    trie = PrefixTrie()
+    for network in prefixes:
+        assert trie.insert(str(network), str(network))
+    removed = prefixes[::3]
+    for network in removed:
+        assert trie.remove(network)
+    assert not trie.remove(removed[0])
+    present = [network for network in prefixes if network not in removed]
+    assert len(trie) == len(present)
+
+    for _ in range(300):
+        address = ipaddress.ip_address(rng.getrandbits(32) & 0x0affffff | 0x0a000000)
+        matches = [network for network in present if address in network]
+        expected = max(matches, key=lambda network: network.prefixlen, default=None)
+        result = trie.longest_match(str(address))
+        assert (result and result[0]) == expected
+
+    for query in _random_prefixes(rng, 100):
+        expected = {network for network in present if network.overlaps(query)}
+        assert {network for network, _ in trie.overlaps(query, limit=len(present))} == expected
+
+
+def test_trie_ipv6_separate_from_ipv4():
+    trie = PrefixTrie()
+    trie.insert('0.0.0.0/0', 'v4')
+    trie.insert('fd00::/8', 'v6')
+    assert trie.longest_match('fd00::1')[1] == 'v6'
+    assert trie.longest_match('2001:db8::1') is None
+    assert [value for _, value in trie.overlaps('fd00:1::/32')] == ['v6']
+
+
+def _node(db, name, ip, routes=None):
+    return db.add_node(name, ip, f'pub-{name}', f'priv-{name}', 'linux', routed_subnets=routes)
+
+
+def test_writes_update_cached_index(fleet):
+    """本进程的写入就地更新已缓存的索引，不整体重建"""
+    clear_prefix_indexes()
+    with Database() as db:
+        index = get_prefix_index(db)
+        node_id = _node(db, 'branch', '10.0.0.50', '192.168.7.0/24')
+        assert get_prefix_index(db) is index
+        assert index.version == db.get_counter(PREFIXES_COUNTER)
+        assert index.lookup('10.0.0.50')[1].kind == KIND_NODE
+        assert index.lookup('192.168.7.9')[1] == (KIND_ROUTE, node_id, 'branch')
+
+        db.set_node_routes(node_id, '192.168.8.0/24')
+        assert index.lookup('192.168.7.9') is None
+        assert index.lookup('192.168.8.9')[1].id == node_id
+
+        db.delete_node(node_id)
+        assert get_prefix_index(db) is index
+        assert index.lookup('192.168.8.9') is None
+        assert len(index) == len(PrefixIndex.build(db))
+
+
+def test_other_process_change_rebuilds(fleet):
+    """其他连接（进程）递增了版本计数时重建索引"""
+    clear_prefix_indexes()
+    with Database() as db:
+        index = get_prefix_index(db)
+        with Database() as other:
+            other._bump_counter(PREFIXES_COUNTER)
+            other.conn.commit()
+        # 落后超过一个版本，写入路径不再就地更新
+        _node(db, 'late', '10.0.0.60')
+        assert index.version != db.get_counter(PREFIXES_COUNTER)
+        rebuilt = get_prefix_index(db)
+        assert rebuilt is not index
+        assert rebuilt.lookup('10.0.0.60')[1].name == 'late'
+
+
+def test_rollback_discards_index(fleet):
+    """回滚的写入不留在索引中（回滚丢弃索引，之后整体重建）"""
+    clear_prefix_indexes()
+    with Database() as db, db.transaction(), db.shared():
+        with pytest.raises(RuntimeError):
+            with Database() as inner:
+                _node(inner, 'ghost', '10.0.0.70')
+                assert get_prefix_index(inner).lookup('10.0.0.70')[1].name == 'ghost'
+                raise RuntimeError('abort')
+        assert get_prefix_index(db).lookup('10.0.0.70')[1].kind != KIND_NODE
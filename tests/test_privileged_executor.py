@@ -0,0 +1,46 @@
+"""
+特权命令执行器测试
+"""
+import sys
+import threading
+
+import pytest
+
+from core.utils.privileged_executor import PrivilegedCommandExecutor
+
+# 读标准输入之前先写出超过管道缓冲区的错误信息，然后读完输入并以失败退出
+NOISY = '''
+import sys
+sys.stderr.write('e' * 1024 * 1024)
+sys.stderr.flush()
+data = sys.stdin.read()
+sys.stderr.write(f' read {len(data)}')
+sys.exit(1)
+'''
+
+
+def test_pipe_does_not_deadlock_on_large_stderr():
+    executor = PrivilegedCommandExecutor()
+    executor._is_root = True
+    chunks = ['x' * 4096] * 256
+    result = {}
+
+    def run():
+        try:
+            executor.pipe_privileged_command([sys.executable, '-c', NOISY], chunks)
+        except RuntimeError as e:
+            result['error'] = str(e)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout=30)
+    assert not thread.is_alive(), '写标准输入与读 stderr 互相等待'
+    assert result['error'].endswith(f' read {4096 * 256}')
+
+
+def test_pipe_success_and_missing_command():
+    executor = PrivilegedCommandExecutor()
+    executor._is_root = True
+    executor.pipe_privileged_command([sys.executable, '-c', 'import sys; sys.stdin.read()'], ['a', 'b'])
+    with pytest.raises(RuntimeError, match='命令未找到'):
+        executor.pipe_privileged_command(['wg-toolkit-missing-command'], ['a'])
@@ -0,0 +1,79 @@
+"""
+shell / run 批处理测试
+"""
+import argparse
+import builtins
+
+from cli.commands import shell
+from core.models.database import Database
+from core.utils.prefix_index import get_prefix_index
+
+
+def _run(tmp_path, lines, keep_going=False):
+    script = tmp_path / 'batch.txt'
+    script.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return shell.cmd_run(argparse.Namespace(script=str(script), keep_going=keep_going, echo=False))
+
+
+def _names(table):
+    with Database() as db:
+        column = 'node_name' if table == 'nodes' else 'name'
+        return {row[0] for row in db.conn.execute(f'SELECT {column} FROM {table}')}
+
+
+SCRIPT = [
+    '# 注释和空行不计入命令',
+    '',
+    'policy add p1 --include 10.50.0.0/16',
+    'register laptop1 linux --route 192.168.50.0/24',
+    'policy remove missing',
+    'group add g1 --policy p1',
+]
+
+
+def test_run_rolls_back_whole_batch(fleet, tmp_path):
+    """默认第一条失败的命令撤销整个批次，已缓存的前缀索引不保留撤销的节点"""
+    nodes = _names('nodes')
+    with Database() as db:
+        get_prefix_index(db)
+
+    assert _run(tmp_path, SCRIPT) == 1
+    assert _names('nodes') == nodes
+    assert _names('routing_policies') == set()
+    with Database() as db:
+        assert get_prefix_index(db).lookup('192.168.50.1') is None
+
+
+def test_run_keep_going_undoes_only_failed_command(fleet, tmp_path, capsys):
+    assert _run(tmp_path, SCRIPT, keep_going=True) == 1
+    assert 'laptop1' in _names('nodes')
+    assert _names('routing_policies') == {'p1'}
+    assert _names('node_groups') == {'g1'}
+    assert '已执行 4 条命令（1 条失败，已撤销）' in capsys.readouterr().out
+    with Database() as db:
+        assert get_prefix_index(db).lookup('192.168.50.1')[1].name == 'laptop1'
+
+
+def test_run_rejects_unbatchable_command(fleet, tmp_path, capsys):
+    assert _run(tmp_path, ['policy add p1 --include 10.50.0.0/16', 'init']) == 1
+    assert "命令 'init' 不能在 shell 或批处理中执行" in capsys.readouterr().out
+    assert _names('routing_policies') == set()
+
+
+def test_shell_begin_rollback_and_autocommit(fleet, monkeypatch):
+    """begin ... rollback 撤销事务内的全部命令，事务外的命令各自立即提交"""
+    lines = iter([
+        'begin',
+        'policy add p2 --include 10.52.0.0/16',
+        'register laptop2 linux',
+        'rollback',
+        'policy add p3 --include 10.53.0.0/16',
+        'policy remove missing',
+        'exit',
+    ])
+    monkeypatch.setattr(builtins, 'input', lambda prompt='': next(lines))
+    monkeypatch.setattr(shell, '_install_completer', lambda runner: None)
+
+    assert shell.cmd_shell(argparse.Namespace()) == 0
+    assert _names('routing_policies') == {'p3'}
+    assert 'laptop2' not in _names('nodes')
@@ -0,0 +1,85 @@
+"""
+节点清理测试
+"""
+import time
+
+from config import base as config
+from core.models.database import Database
+from core.services.sweep_service import SweepService
+
+
+class FakeSampler:
+    """按接口名返回固定握手时间的采样器（不在字典中的接口视为读取失败）"""
+
+    def __init__(self, handshakes):
+        self.handshakes = handshakes
+
+    def sample_latest_handshakes(self, interface_names):
+        return {name: self.handshakes[name] for name in interface_names if name in self.handshakes}
+
+
+def _nodes(db):
+    return {row[0]: row[1:] for row in db.conn.execute('SELECT node_name, id, disabled_at FROM nodes')}
+
+
+def test_dry_run_reports_without_changes(fleet):
+    now = time.time()
+    with Database() as db:
+        service = SweepService(db, sampler=FakeSampler({}), clock=lambda: now)
+        service.set_ttl(_nodes(db)['node-0'][0], '1h')
+        later = SweepService(db, sampler=FakeSampler({}), clock=lambda: now + 7200)
+        before = _nodes(db)
+
+        report = later.sweep(dry_run=True)
+        assert report['dry_run'] and report['swept'] == 0 and report['batches'] == 0
+        assert [(item['node_name'], item['reason']) for item in report['nodes']] == [('node-0', 'expired')]
+        assert _nodes(db) == before
+        assert later.history() == []
+
+
+def test_disable_writes_audit_rows(fleet):
+    now = time.time()
+    with Database() as db:
+        service = SweepService(db, sampler=FakeSampler({}), clock=lambda: now)
+        service.set_policy(action='disable')
+        node_id = _nodes(db)['node-0'][0]
+        service.set_ttl(node_id, '1h')
+
+        later = SweepService(db, sampler=FakeSampler({}), clock=lambda: now + 7200)
+        report = later.sweep()
+        assert report['swept'] == 1 and report['action'] == 'disable'
+        assert _nodes(db)['node-0'][1] is not None
+        # 已停用的节点不再作为候选
+        assert later.sweep()['nodes'] == []
+
+        history = later.history()
+        assert len(history) == 1
+        assert (history[0]['node_id'], history[0]['action'], history[0]['reason']) == (node_id, 'disable', 'expired')
+
+        later.restore(node_id)
+        assert _nodes(db)['node-0'][1] is None
+        assert [item['action'] for item in later.history()] == ['enable', 'disable']
+
+
+def test_idle_delete_in_batches(fleet, monkeypatch):
+    """闲置节点按批删除，每个节点一条清理记录；读取握手失败的接口整体跳过"""
+    monkeypatch.setattr(config, 'NODE_SWEEP_BATCH_SIZE', 1)
+    now = time.time() + 3 * 86400
+    with Database() as db:
+        interface = db.conn.execute('SELECT name FROM wg_interfaces').fetchone()[0]
+        keys = {row[0]: row[1] for row in db.conn.execute('SELECT node_name, public_key FROM nodes')}
+        handshakes = {interface: {keys['node-0']: now - 2 * 86400, keys['node-1']: now - 60}}
+
+        service = SweepService(db, sampler=FakeSampler({}), clock=lambda: now)
+        service.set_policy(action='delete', idle_after='1d')
+        assert service.sweep(dry_run=True)['nodes'] == []
+
+        service = SweepService(db, sampler=FakeSampler(handshakes), clock=lambda: now)
+        report = service.sweep()
+        assert sorted(item['node_name'] for item in report['nodes']) == ['node-0', 'node-2']
+        assert report['swept'] == 2 and report['batches'] == 2
+        assert set(_nodes(db)) == {'node-1'}
+        history = service.history()
+        assert sorted((item['node_name'], item['action'], item['reason']) for item in history) == [
+            ('node-0', 'delete', 'idle'), ('node-2', 'delete', 'idle')
+        ]
@@ -0,0 +1,231 @@
+"""
+tc 限速规则编译测试
+"""
+import json
+import stat
+import sys
+
+import pytest
+
+from core.models.database import Database
+from core.models.repositories.node_repo import NodeRepository
+from core.services.policy_service import PolicyService
+from core.services.shaping_service import ShapingService
+from core.utils.privileged_executor import get_executor
+from core.utils.tc_compiler import render_interface, render_interface_delta
+
+# 替身 tc：记录批处理输入，并像内核一样维护各设备的类和过滤器（状态保存在 JSON 文件中），
+# 拒绝超出 16 位的类次编号、重复添加或删除不存在的类/过滤器表项、引用未定义类的过滤器
+# 以及删除仍被过滤器引用的类；出错时与 iproute2 一样停止执行后续语句
+FAKE_TC = '''#!{python}
+import json, os, re, sys
+batch = sys.stdin.read()
+with open({log!r}, 'a') as f:
+    f.write(batch)
+state = json.load(open({state!r})) if os.path.exists({state!r}) else {{}}
+
+def fail(number, message):
+    json.dump(state, open({state!r}, 'w'))
+    sys.exit(f"Command failed -:{{number}}: {{message}}")
+
+for number, line in enumerate(batch.splitlines(), 1):
+    words = line.split()
+    obj, verb, dev = words[0], words[1], words[3]
+    tree = state.setdefault(dev, {{'classes': {{}}, 'filters': {{}}, 'ingress': False}})
+    for major, minor in re.findall(r'(?:classid|flowid) ([0-9a-f]+):([0-9a-f]+)', line):
+        if not 0 < int(minor, 16) <= 0xffff:
+            fail(number, f"invalid class ID {{major}}:{{minor}}")
+    if obj == 'qdisc':
+        if 'ingress' in words:
+            tree['ingress'] = verb != 'del'
+            if verb == 'del':
+                tree['filters'] = {{k: v for k, v in tree['filters'].items() if not k.startswith('ffff:')}}
+        elif 'root' in words:
+            tree['classes'] = {{}}
+            tree['filters'] = {{k: v for k, v in tree['filters'].items() if k.startswith('ffff:')}}
+        elif words[5] not in tree['classes']:
+            fail(number, f"unknown class {{words[5]}}")
+    elif obj == 'class':
+        class_id = words[words.index('classid') + 1]
+        if verb == 'add' and class_id in tree['classes']:
+            fail(number, f"class {{class_id}} exists")
+        if verb in ('change', 'del') and class_id not in tree['classes']:
+            fail(number, f"unknown class {{class_id}}")
+        if verb == 'del':
+            if class_id in tree['filters'].values():
+                fail(number, f"class {{class_id}} in use")
+            del tree['classes'][class_id]
+        else:
+            tree['classes'][class_id] = words[words.index('rate') + 1]
+    elif obj == 'filter':
+        parent, prio = words[5], words[7]
+        handle = words[words.index('handle') + 1] if 'handle' in words else None
+        key = f"{{parent}}{{prio}} {{handle}}"
+        if verb == 'del':
+            if key not in tree['filters']:
+                fail(number, f"unknown filter {{key}}")
+            del tree['filters'][key]
+        elif 'flowid' in words:
+            flowid = words[words.index('flowid') + 1]
+            if flowid not in tree['classes']:
+                fail(number, f"unknown class {{flowid}}")
+            if key in tree['filters']:
+                fail(number, f"filter {{key}} exists")
+            tree['filters'][key] = flowid
+        elif handle is None:
+            tree['filters'][key] = ' '.join(words[8:])
+json.dump(state, open({state!r}, 'w'))
+'''
+
+
+def _shaped(node_id, ip, ip6=None, routes=None, down=1000, up=500):
+    return (node_id, ip, ip6, routes, down, up)
+
+
+@pytest.fixture
+def fake_tc(fake_env):
+    """替换 fake_backend 的 tc 替身
+
+    Returns:
+        (记录批处理输入的文件路径, 设备状态文件路径)
+    """
+    log, state = str(fake_env / 'tc.log'), str(fake_env / 'tc.json')
+    path = fake_env / 'bin' / 'tc'
+    path.write_text(FAKE_TC.format(python=sys.executable, log=log, state=state))
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return log, state
+
+
+def _read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def _devices(state):
+    """替身 tc 的设备状态（忽略没有任何规则的设备）"""
+    with open(state) as f:
+        devices = json.load(f)
+    return {dev: tree for dev, tree in devices.items() if tree['classes'] or tree['filters'] or tree['ingress']}
+
+
+def test_class_ids_independent_of_node_ids():
+    """类次编号取自虚拟 IP，节点 ID 超过 0xffff 时仍在范围内，且每个节点一个类"""
+    nodes = [_shaped(0x10000 + i, f'10.0.0.{i + 2}') for i in range(3)]
+    lines, needs_ifb = render_interface('wg0', '10.0.0.0/24', nodes)
+
+    assert needs_ifb
+    class_lines = [line for line in lines if line.startswith('class add')]
+    assert [line.split(' classid ')[1].split()[0] for line in class_lines[:3]] == ['1:2', '1:3', '1:4']
+    assert len(class_lines) == 6
+
+
+def test_colliding_class_ids_rejected():
+    """网络段大于 /16 时低 16 位相同的两个受限速节点无法区分"""
+    nodes = [_shaped(1, '10.0.0.2'), _shaped(2, '10.1.0.2')]
+    with pytest.raises(ValueError):
+        render_interface('wg0', '10.0.0.0/8', nodes)
+
+
+def test_ipv6_and_routed_subnets_classified():
+    """节点的 IPv6 地址和路由子网归入节点的类，上下行都受限速"""
+    nodes = [_shaped(1, '10.0.0.2', 'fd00::1:2', '192.168.5.0/24,fd10::/48')]
+    lines, _ = render_interface('wg0', '10.0.0.0/24', nodes)
+    batch = '\n'.join(lines)
+
+    for dev, key in (('wg0', 'dst'), ('ifb-wg0', 'src')):
+        assert f"dev {dev} parent 1: prio 10 handle 2:2:1 protocol ip u32 match ip {key} 10.0.0.2/32 flowid 1:2" in batch
+        assert f"dev {dev} parent 1: prio 11 handle 3:2:1 protocol ipv6 u32 match ip6 {key} fd00::1:2/128 flowid 1:2" in batch
+        assert f"dev {dev} parent 1: prio 20 handle 4:0:1 protocol ip u32 match ip {key} 192.168.5.0/24 flowid 1:2" in batch
+        assert f"dev {dev} parent 1: prio 21 handle 5:0:1 protocol ipv6 u32 match ip6 {key} fd10::/48 flowid 1:2" in batch
+    # 入方向的重定向覆盖全部协议，IPv6 上行流量同样进入 IFB 设备
+    assert 'parent ffff: prio 10 protocol all u32 match u32 0 0 action mirred egress redirect dev ifb-wg0' in batch
+    assert 'protocol ip u32 match u32 0 0 action mirred' not in batch
+
+
+def test_delta_touches_only_changed_nodes():
+    before = [_shaped(1, '10.0.0.2'), _shaped(2, '10.0.0.3')]
+    after = [_shaped(1, '10.0.0.2'), _shaped(2, '10.0.0.3', down=2000), _shaped(3, '10.0.0.4')]
+    lines, needs_ifb = render_interface_delta('wg0', '10.0.0.0/24', before, after)
+
+    assert not needs_ifb
+    assert not any('root' in line or 'ingress' in line for line in lines)
+    assert not any(line.endswith('flowid 1:2') or 'classid 1:2 ' in line for line in lines)
+    assert 'class change dev wg0 parent 1: classid 1:3 htb rate 2000kbit ceil 2000kbit' in lines
+    assert 'class add dev wg0 parent 1: classid 1:4 htb rate 1000kbit ceil 1000kbit' in lines
+    assert render_interface_delta('wg0', '10.0.0.0/24', after, after) == ([], False)
+
+
+def test_delta_matches_full_rebuild(fake_env, fake_tc):
+    """依次增量下发的结果与从头整体重建的结果相同（替身 tc 校验每条语句）"""
+    _, state = fake_tc
+    steps = [
+        [],
+        [_shaped(1, '10.0.0.2', 'fd00::102', down=1000, up=None)],
+        [_shaped(1, '10.0.0.2', 'fd00::102'), _shaped(2, '10.0.1.2', 'fd00::202', '192.168.1.0/24')],
+        [_shaped(2, '10.0.1.2', 'fd00::202', '192.168.1.0/24,192.168.2.0/24'),
+         _shaped(3, '10.0.0.3', 'fd00::302', '10.9.0.0/16')],
+        [_shaped(3, '10.0.0.3', 'fd00::302', None, down=None)],
+        [],
+    ]
+    executor = get_executor()
+
+    def run(lines, initial):
+        with open(state, 'w') as f:
+            json.dump(initial, f)
+        if lines:
+            executor.pipe_privileged_command(['tc', '-batch', '-'], ['\n'.join(lines) + '\n'])
+        return _devices(state)
+
+    current, previous = {}, []
+    for nodes in steps:
+        current = run(render_interface_delta('wg0', '10.0.0.0/16', previous, nodes)[0], current)
+        assert current == run(render_interface('wg0', '10.0.0.0/16', nodes)[0], {})
+        previous = nodes
+
+
+def test_apply_with_large_node_ids(fleet, fake_tc):
+    """长期运行后节点 ID 超过 0xffff，限速规则仍能通过 tc 下发"""
+    log, _ = fake_tc
+    with Database() as db:
+        db.conn.execute('UPDATE nodes SET id = id + 0x10000')
+        db.conn.commit()
+        service = ShapingService(db)
+        service.create_profile('slow', download='10mbit', upload='2mbit')
+        node_ids = [row[0] for row in db.conn.execute('SELECT id FROM nodes')]
+        for node_id in node_ids:
+            NodeRepository(db).set_shaping_profile(node_id, service.get_profile('slow').id)
+        assert service.apply() == 1
+
+    batch = _read(log)
+    assert batch.count('htb rate 10000kbit') == len(node_ids)
+    assert batch.count('htb rate 2000kbit') == len(node_ids)
+
+
+def test_group_assign_updates_only_that_node(fleet, fake_tc):
+    """加入/移出受限速节点组只增删该节点的类和过滤器，不重建整棵树"""
+    log, state = fake_tc
+    with Database() as db:
+        shaping_service, policy_service = ShapingService(db), PolicyService(db)
+        shaping_service.create_profile('slow', download='10mbit', upload='2mbit')
+        policy_service.create_group('backups')
+        shaping_service.set_group_profile('backups', 'slow')
+        node_ids = [row[0] for row in db.conn.execute('SELECT id FROM nodes ORDER BY id')]
+        policy_service.assign_group(node_ids[0], 'backups')
+        policy_service.assign_group(node_ids[1], 'backups')
+
+        open(log, 'w').close()
+        policy_service.assign_group(node_ids[2], 'backups')
+        policy_service.assign_group(node_ids[0], None)
+        batch = _read(log)
+        assert 'root' not in batch and 'ingress' not in batch
+        assert batch.count('class add') == 2 and batch.count('class del') == 2
+
+        # 不受限速的节点变化不调用 tc
+        open(log, 'w').close()
+        policy_service.create_group('others')
+        policy_service.assign_group(node_ids[0], 'others')
+        assert _read(log) == ''
+
+        incremental = _devices(state)
+        shaping_service.apply()
+        assert _devices(state) == incremental
@@ -0,0 +1,83 @@
+"""
+访问控制API
+"""
+from typing import List
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from core.models.database import Database
+from core.services.acl_service import AclService
+from web.backend.schemas.acl import AclModeRequest, AclModeResponse, AclRuleRequest, AclRuleResponse
+from web.backend.schemas.common import MessageResponse
+
+router = APIRouter()
+
+
+@router.get("/acl/mode", response_model=AclModeResponse)
+async def get_acl_mode():
+    """获取访问控制模式"""
+    try:
+        with Database() as db:
+            return AclModeResponse(mode=AclService(db).get_mode())
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.put("/acl/mode", response_model=AclModeResponse)
+async def set_acl_mode(request: AclModeRequest):
+    """设置访问控制模式并下发规则"""
+    try:
+        with Database() as db:
+            AclService(db).set_mode(request.mode)
+            return AclModeResponse(mode=request.mode)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/acl/rules", response_model=List[AclRuleResponse])
+async def list_acl_rules():
+    """获取所有放行规则"""
+    try:
+        with Database() as db:
+            return [AclRuleResponse(**rule) for rule in AclService(db).list_rules()]
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post("/acl/rules", response_model=AclRuleResponse, status_code=status.HTTP_201_CREATED)
+async def add_acl_rule(request: AclRuleRequest):
+    """添加放行规则"""
+    try:
+        with Database() as db:
+            rule = AclService(db).add_rule(request.src_group, request.dst_group, request.description)
+            return AclRuleResponse(
+                **rule.to_dict(), src_group=request.src_group, dst_group=request.dst_group
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.delete("/acl/rules", response_model=MessageResponse)
+async def delete_acl_rule(src_group: str, dst_group: str):
+    """删除放行规则"""
+    try:
+        with Database() as db:
+            AclService(db).remove_rule(src_group, dst_group)
+            return MessageResponse(message=f"已删除放行规则 {src_group} -> {dst_group}")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/acl/ruleset", response_class=PlainTextResponse)
+async def get_acl_ruleset():
+    """获取编译后的 nftables 规则集（不下发）"""
+    try:
+        with Database() as db:
+            return AclService(db).compile()
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -0,0 +1,40 @@
+"""
+变更日志API（增量同步）
+"""
+import time
+from fastapi import APIRouter, HTTPException, Query, status
+from core.models.database import Database
+from core.services.change_service import ChangeService, get_change_watcher
+from web.backend.schemas.changes import ChangeFeed
+from config import base as config
+
+router = APIRouter()
+
+
+def _read_changes(since: int, limit: int) -> dict:
+    with Database() as db:
+        return ChangeService(db).changes_since(since, limit)
+
+
+@router.get("/changes", response_model=ChangeFeed)
+async def get_changes(
+    since: int = Query(0, ge=0, description="已同步到的序号（上次响应的 next），0 表示首次同步"),
+    limit: int = Query(config.CHANGES_PAGE_SIZE, ge=1, le=config.CHANGES_PAGE_SIZE, description="最多返回的变更数量"),
+    wait: int = Query(0, ge=0, le=config.CHANGES_MAX_WAIT, description="没有新变更时最长等待时间（秒），0 表示立即返回")
+):
+    """获取序号 since 之后的节点和服务端变更
+
+    每个对象只返回最新状态；reset 为 true 时应记下 next，重新拉取完整数据后从 next 继续。
+    """
+    try:
+        feed = _read_changes(since, limit)
+        deadline = time.monotonic() + wait
+        watcher = get_change_watcher()
+        # 等待期间不占用数据库连接
+        while not feed['changes'] and not feed['reset'] and time.monotonic() < deadline:
+            if not await watcher.wait(since, deadline - time.monotonic()):
+                break
+            feed = _read_changes(since, limit)
+        return ChangeFeed(**feed)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -0,0 +1,72 @@
+"""
+调试API（慢请求剖析、日志级别）
+"""
+from typing import List
+from fastapi import APIRouter, HTTPException, status
+from core.utils.log import get_log_level, set_log_level
+from core.utils.profiler import get_profiler
+from web.backend.schemas.debug import (
+    LogLevelSettings, ProfilerSettings, ProfilerUpdateRequest, SlowOperation, SlowOperationDetail
+)
+
+router = APIRouter()
+
+
+def _settings() -> ProfilerSettings:
+    profiler = get_profiler()
+    return ProfilerSettings(
+        enabled=profiler.enabled,
+        threshold_ms=int(profiler.threshold * 1000),
+        directory=profiler.directory
+    )
+
+
+@router.get("/debug/profiler", response_model=ProfilerSettings)
+async def get_profiler_settings():
+    """获取剖析器状态"""
+    return _settings()
+
+
+@router.put("/debug/profiler", response_model=ProfilerSettings)
+async def update_profiler_settings(request: ProfilerUpdateRequest):
+    """开启或关闭剖析器（无需重启服务）"""
+    try:
+        if request.enabled:
+            get_profiler().enable(request.threshold_ms)
+        else:
+            get_profiler().disable()
+        return _settings()
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/debug/slow", response_model=List[SlowOperation])
+async def list_slow_operations(limit: int = 20):
+    """最近的慢操作（按耗时从高到低）"""
+    return [SlowOperation(**item) for item in get_profiler().slowest(limit)]
+
+
+@router.get("/debug/slow/{trace_id}", response_model=SlowOperationDetail)
+async def get_slow_operation(trace_id: str):
+    """慢操作的跨度树"""
+    detail = get_profiler().get(trace_id)
+    if detail is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"慢操作 '{trace_id}' 不存在")
+    return SlowOperationDetail(**detail)
+
+
+@router.get("/debug/log-level", response_model=LogLevelSettings)
+async def get_logging_level():
+    """获取当前日志级别"""
+    return LogLevelSettings(level=get_log_level())
+
+
+@router.put("/debug/log-level", response_model=LogLevelSettings)
+async def update_logging_level(request: LogLevelSettings):
+    """调整日志级别（立即生效，无需重启服务）"""
+    try:
+        return LogLevelSettings(level=set_log_level(request.level))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -1,7 +1,8 @@
 """
 下载相关API
 """
-from fastapi import APIRouter, HTTPException, status
+import hashlib
+from fastapi import APIRouter, HTTPException, Request, status
 from fastapi.responses import Response
 from core.models.database import Database
 from core.services.node_service import NodeService
@@ -11,8 +12,12 @@ router = APIRouter()
 
 
 @router.get("/nodes/{node_id}/config")
-async def download_config(node_id: int):
-    """下载节点配置文件"""
+async def download_config(node_id: int, request: Request):
+    """下载节点配置文件
+    
+    响应带 ETag（配置内容摘要），客户端携带 If-None-Match 轮询时，
+    配置未变化（包括直连对端未变化）返回 304。
+    """
     try:
         with Database() as db:
             config_service = ConfigService(db)
@@ -28,12 +33,17 @@ async def download_config(node_id: int):
             
             # 生成配置
             config_content = config_service.generate_client_config(node_id)
+            etag = f'"{hashlib.sha256(config_content.encode()).hexdigest()[:32]}"'
+            
+            if etag in request.headers.get("if-none-match", ""):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
             
             return Response(
                 content=config_content,
                 media_type="text/plain",
                 headers={
-                    "Content-Disposition": f'attachment; filename="{node.node_name}.conf"'
+                    "Content-Disposition": f'attachment; filename="{node.node_name}.conf"',
+                    "ETag": etag
                 }
             )
     except ValueError as e:
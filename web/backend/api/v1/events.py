@@ -0,0 +1,33 @@
+"""
+事件流API（Server-Sent Events）
+"""
+from typing import Optional
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import StreamingResponse
+from core.utils.event_bus import get_event_bus
+
+router = APIRouter()
+
+
+@router.get("/events")
+async def stream_events(
+    types: Optional[str] = Query(None, description="只接收这些类型的事件，逗号分隔，前缀匹配（如 node.,config.applied）"),
+    last_event_id: Optional[str] = Header(None, description="断线重连时从此事件之后补发（浏览器 EventSource 自动携带）")
+):
+    """订阅节点、配置下发和 peer 状态变化事件（text/event-stream）
+
+    事件类型：node.created、node.deleted、node.disabled、node.enabled、config.applied、
+    peer.handshake、peer.traffic 只包含本进程内的修改；changes 表示变更日志推进
+    （包括 CLI 和其他进程的修改），客户端据此从 /changes 拉取；无法补发时发送 resync，
+    客户端应重新拉取完整数据。
+    """
+    prefixes = [item.strip() for item in types.split(',') if item.strip()] if types else None
+    return StreamingResponse(
+        get_event_bus().stream(last_event_id, prefixes),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # 关闭 nginx 的响应缓冲，事件立即送达
+            "X-Accel-Buffering": "no",
+        }
+    )
@@ -0,0 +1,101 @@
+"""
+中心节点管理API
+"""
+from typing import List
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
+from core.models.database import Database
+from core.services.config_service import ConfigService
+from core.services.hub_service import HubService
+from web.backend.schemas.hub import HubCreateRequest, HubTrafficRequest, HubResponse
+from web.backend.schemas.common import MessageResponse
+
+router = APIRouter()
+
+
+@router.get("/hubs", response_model=List[HubResponse])
+async def list_hubs():
+    """获取所有中心节点及负载"""
+    try:
+        with Database() as db:
+            return [HubResponse(**hub) for hub in HubService(db).get_hub_stats()]
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post("/hubs", response_model=HubResponse, status_code=status.HTTP_201_CREATED)
+async def create_hub(request: HubCreateRequest):
+    """添加远端中心节点"""
+    try:
+        with Database() as db:
+            hub = HubService(db).add_hub(
+                name=request.name,
+                public_endpoint=request.public_endpoint,
+                public_key=request.public_key,
+                network_cidr=request.network_cidr,
+                virtual_ip=request.virtual_ip,
+                capacity_weight=request.capacity_weight,
+                region=request.region
+            )
+            return HubResponse(**hub.to_dict())
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.delete("/hubs/{name}", response_model=MessageResponse)
+async def delete_hub(name: str):
+    """删除远端中心节点"""
+    try:
+        with Database() as db:
+            HubService(db).remove_hub(name)
+            return MessageResponse(message=f"中心节点 {name} 删除成功")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.put("/hubs/{name}/traffic", response_model=MessageResponse)
+async def report_hub_traffic(name: str, request: HubTrafficRequest):
+    """上报中心节点最近流量（least_traffic 归属策略使用）"""
+    try:
+        with Database() as db:
+            HubService(db).report_traffic(name, request.recent_traffic)
+            return MessageResponse(message=f"中心节点 {name} 流量已更新")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/hubs/{name}/peers")
+async def download_hub_peers(name: str):
+    """下载远端中心节点应加载的 [Peer] 段
+    
+    远端中心节点定期拉取并与本地 [Interface] 段合并后执行 wg syncconf。
+    """
+    db = Database()
+    try:
+        db.connect()
+        peer_settings = ConfigService(db).get_peer_settings()
+        blocks = HubService(db).iter_hub_peers(name, peer_settings.default_keepalive, peer_settings)
+    except ValueError as e:
+        db.close()
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        db.close()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+    
+    def stream():
+        try:
+            yield from blocks
+        finally:
+            db.close()
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/plain",
+        headers={"Content-Disposition": f'attachment; filename="{name}-peers.conf"'}
+    )
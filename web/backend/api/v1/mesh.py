@@ -0,0 +1,90 @@
+"""
+网状拓扑API
+"""
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, status
+from core.models.database import Database
+from core.services.mesh_service import MeshService
+from web.backend.schemas.mesh import (
+    MeshModeRequest, MeshModeResponse, NodeEndpointRequest, MeshLinkRequest, MeshLinkResponse
+)
+from web.backend.schemas.node import NodeResponse
+from web.backend.schemas.common import MessageResponse
+
+router = APIRouter()
+
+
+@router.get("/mesh/mode", response_model=MeshModeResponse)
+async def get_mesh_mode():
+    """获取拓扑模式"""
+    try:
+        with Database() as db:
+            return MeshModeResponse(mode=MeshService(db).get_mode())
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.put("/mesh/mode", response_model=MeshModeResponse)
+async def set_mesh_mode(request: MeshModeRequest):
+    """设置拓扑模式"""
+    try:
+        with Database() as db:
+            MeshService(db).set_mode(request.mode)
+            return MeshModeResponse(mode=request.mode)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.put("/nodes/{node_id}/endpoint", response_model=NodeResponse)
+async def set_node_endpoint(node_id: int, request: NodeEndpointRequest):
+    """设置节点公网地址"""
+    try:
+        with Database() as db:
+            node = MeshService(db).set_endpoint(node_id, request.endpoint)
+            return NodeResponse(**node.to_dict())
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/mesh/links", response_model=List[MeshLinkResponse])
+async def list_mesh_links(node_id: Optional[int] = None):
+    """获取直连节点对"""
+    try:
+        with Database() as db:
+            return [MeshLinkResponse(**link) for link in MeshService(db).list_links(node_id)]
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post("/mesh/links", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
+async def create_mesh_link(request: MeshLinkRequest):
+    """添加直连节点对（partial 模式生效）"""
+    try:
+        with Database() as db:
+            MeshService(db).link(request.node_a, request.node_b)
+            return MessageResponse(message=f"已添加直连: {request.node_a} <-> {request.node_b}")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.delete("/mesh/links/{node_a}/{node_b}", response_model=MessageResponse)
+async def delete_mesh_link(node_a: int, node_b: int):
+    """删除直连节点对"""
+    try:
+        with Database() as db:
+            if not MeshService(db).unlink(node_a, node_b):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"直连不存在: {node_a} <-> {node_b}"
+                )
+            return MessageResponse(message=f"已删除直连: {node_a} <-> {node_b}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -0,0 +1,50 @@
+"""
+租户网络API
+"""
+from typing import List
+from fastapi import APIRouter, HTTPException, status
+from core.models.database import Database
+from core.services.network_service import NetworkService
+from web.backend.schemas.network import NetworkCreateRequest, NetworkResponse
+from web.backend.schemas.common import MessageResponse
+
+router = APIRouter()
+
+
+@router.get("/networks", response_model=List[NetworkResponse])
+async def list_networks():
+    """获取所有网络（默认网络在前）"""
+    try:
+        with Database() as db:
+            return [NetworkResponse(**network) for network in NetworkService(db).list_networks()]
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post("/networks", response_model=NetworkResponse, status_code=status.HTTP_201_CREATED)
+async def create_network(request: NetworkCreateRequest):
+    """创建租户网络"""
+    try:
+        with Database() as db:
+            network = NetworkService(db).create_network(
+                request.name, request.network_cidr,
+                listen_port=request.listen_port, description=request.description
+            )
+            return NetworkResponse(**network)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.delete("/networks/{name}", response_model=MessageResponse)
+async def delete_network(name: str):
+    """删除租户网络（网络内须已无节点）"""
+    try:
+        with Database() as db:
+            NetworkService(db).delete_network(name)
+            return MessageResponse(message=f"网络 '{name}' 删除成功")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
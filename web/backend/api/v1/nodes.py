@@ -1,7 +1,7 @@
 """
 节点管理API
 """
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException, status
 from core.models.database import Database
 from core.services.node_service import NodeService
@@ -20,7 +20,13 @@ async def create_node(request: NodeCreateRequest):
             result = node_service.register_node(
                 node_name=request.node_name,
                 platform=request.platform,
-                description=request.description
+                description=request.description,
+                region=request.region,
+                endpoint=request.endpoint,
+                routes=request.routed_subnets,
+                group=request.group,
+                network=request.network,
+                ttl=request.ttl
             )
             
             # 获取节点信息
@@ -35,9 +41,19 @@ async def create_node(request: NodeCreateRequest):
                 id=node.id,
                 node_name=node.node_name,
                 virtual_ip=node.virtual_ip,
+                virtual_ip6=node.virtual_ip6,
                 public_key=node.public_key,
                 platform=node.platform,
                 description=node.description,
+                hub_id=node.hub_id,
+                region=node.region,
+                endpoint=node.endpoint,
+                routed_subnets=node.routes,
+                group_id=node.group_id,
+                policy_id=node.policy_id,
+                network_id=node.network_id,
+                expires_at=node.expires_at,
+                disabled_at=node.disabled_at,
                 created_at=node.created_at,
                 updated_at=node.updated_at
             )
@@ -48,26 +64,38 @@ async def create_node(request: NodeCreateRequest):
 
 
 @router.get("/nodes", response_model=List[NodeResponse])
-async def list_nodes():
-    """获取所有节点列表"""
+async def list_nodes(network: Optional[str] = None):
+    """获取节点列表（可按租户网络过滤）"""
     try:
         with Database() as db:
             node_service = NodeService(db)
-            nodes = node_service.list_nodes()
+            nodes = node_service.list_nodes(network=network)
             
             return [
                 NodeResponse(
                     id=node.id,
                     node_name=node.node_name,
                     virtual_ip=node.virtual_ip,
+                    virtual_ip6=node.virtual_ip6,
                     public_key=node.public_key,
                     platform=node.platform,
                     description=node.description,
+                    hub_id=node.hub_id,
+                    region=node.region,
+                    endpoint=node.endpoint,
+                    routed_subnets=node.routes,
+                    group_id=node.group_id,
+                    policy_id=node.policy_id,
+                    network_id=node.network_id,
+                    expires_at=node.expires_at,
+                    disabled_at=node.disabled_at,
                     created_at=node.created_at,
                     updated_at=node.updated_at
                 )
                 for node in nodes
             ]
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -90,10 +118,20 @@ async def get_node(node_id: int):
                 id=node.id,
                 node_name=node.node_name,
                 virtual_ip=node.virtual_ip,
+                virtual_ip6=node.virtual_ip6,
                 public_key=node.public_key,
                 private_key=node.private_key,
                 platform=node.platform,
                 description=node.description,
+                hub_id=node.hub_id,
+                region=node.region,
+                endpoint=node.endpoint,
+                routed_subnets=node.routes,
+                group_id=node.group_id,
+                policy_id=node.policy_id,
+                network_id=node.network_id,
+                expires_at=node.expires_at,
+                disabled_at=node.disabled_at,
                 created_at=node.created_at,
                 updated_at=node.updated_at
             )
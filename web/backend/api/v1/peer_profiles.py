@@ -0,0 +1,151 @@
+"""
+对端参数API
+"""
+from typing import List
+from fastapi import APIRouter, HTTPException, status
+from core.models.database import Database
+from core.services.peer_profile_service import PeerProfileService
+from web.backend.schemas.node import NodeResponse
+from web.backend.schemas.peer_profile import (
+    PeerProfileCreateRequest, PeerProfileUpdateRequest, PeerProfileResponse,
+    PeerProfileAssignRequest, KeepaliveModeRequest, KeepaliveModeResponse,
+    KeepaliveRecommendation, ObserveResponse
+)
+from web.backend.schemas.common import MessageResponse
+
+router = APIRouter()
+
+
+@router.get("/peer-profiles", response_model=List[PeerProfileResponse])
+async def list_peer_profiles():
+    """获取所有对端参数配置"""
+    try:
+        with Database() as db:
+            return [PeerProfileResponse(**profile.to_dict()) for profile in PeerProfileService(db).list_profiles()]
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post("/peer-profiles", response_model=PeerProfileResponse, status_code=status.HTTP_201_CREATED)
+async def create_peer_profile(request: PeerProfileCreateRequest):
+    """创建对端参数配置"""
+    try:
+        with Database() as db:
+            profile = PeerProfileService(db).create_profile(
+                request.name, request.keepalive, request.mtu, request.description
+            )
+            return PeerProfileResponse(**profile.to_dict())
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/peer-profiles/mode", response_model=KeepaliveModeResponse)
+async def get_keepalive_mode():
+    """获取保活建议模式"""
+    try:
+        with Database() as db:
+            return KeepaliveModeResponse(mode=PeerProfileService(db).get_mode())
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.put("/peer-profiles/mode", response_model=KeepaliveModeResponse)
+async def set_keepalive_mode(request: KeepaliveModeRequest):
+    """设置保活建议模式"""
+    try:
+        with Database() as db:
+            peer_service = PeerProfileService(db)
+            peer_service.set_mode(request.mode)
+            return KeepaliveModeResponse(mode=peer_service.get_mode())
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post("/peer-profiles/observe", response_model=ObserveResponse)
+async def observe_endpoints():
+    """采样一次节点公网地址（auto 模式下随即应用保活建议）"""
+    try:
+        with Database() as db:
+            return ObserveResponse(**PeerProfileService(db).observe())
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/peer-profiles/recommendations", response_model=List[KeepaliveRecommendation])
+async def list_keepalive_recommendations():
+    """根据地址观测结果获取保活建议"""
+    try:
+        with Database() as db:
+            return [KeepaliveRecommendation(**item) for item in PeerProfileService(db).recommend()]
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post("/peer-profiles/recommendations/apply", response_model=List[KeepaliveRecommendation])
+async def apply_keepalive_recommendations():
+    """应用保活建议并重载受影响的接口"""
+    try:
+        with Database() as db:
+            return [KeepaliveRecommendation(**item) for item in PeerProfileService(db).apply_recommendations()]
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.put("/peer-profiles/{name}", response_model=PeerProfileResponse)
+async def update_peer_profile(name: str, request: PeerProfileUpdateRequest):
+    """修改对端参数配置并重载接口"""
+    try:
+        with Database() as db:
+            profile = PeerProfileService(db).update_profile(
+                name, request.keepalive, request.mtu, request.description
+            )
+            return PeerProfileResponse(**profile.to_dict())
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.delete("/peer-profiles/{name}", response_model=MessageResponse)
+async def delete_peer_profile(name: str):
+    """删除对端参数配置"""
+    try:
+        with Database() as db:
+            PeerProfileService(db).delete_profile(name)
+            return MessageResponse(message=f"对端参数配置 '{name}' 已删除")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.put("/nodes/{node_id}/peer-profile", response_model=NodeResponse)
+async def set_node_peer_profile(node_id: int, request: PeerProfileAssignRequest):
+    """设置节点自身的对端参数配置"""
+    try:
+        with Database() as db:
+            node = PeerProfileService(db).set_node_profile(node_id, request.profile)
+            return NodeResponse(**node.to_dict())
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.put("/platforms/{platform}/peer-profile", response_model=MessageResponse)
+async def set_platform_peer_profile(platform: str, request: PeerProfileAssignRequest):
+    """设置平台默认的对端参数配置"""
+    try:
+        with Database() as db:
+            PeerProfileService(db).set_platform_profile(platform, request.profile)
+            if request.profile:
+                return MessageResponse(message=f"平台 {platform} 已使用对端参数配置 '{request.profile}'")
+            return MessageResponse(message=f"已清除平台 {platform} 的对端参数配置")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -0,0 +1,173 @@
+"""
+分流策略和节点组API
+"""
+from typing import List
+from fastapi import APIRouter, HTTPException, status
+from core.models.database import Database
+from core.services.policy_service import PolicyService
+from web.backend.schemas.node import NodeResponse
+from web.backend.schemas.policy import (
+    PolicyCreateRequest, PolicyUpdateRequest, PolicyResponse, PolicyPreviewRequest,
+    PolicyAssignRequest, GroupCreateRequest, GroupAssignRequest, GroupResponse
+)
+from web.backend.schemas.common import MessageResponse
+
+router = APIRouter()
+
+
+def _policy_response(policy_service: PolicyService, policy) -> PolicyResponse:
+    """策略实体 -> 响应（附带编译结果）"""
+    return PolicyResponse(**policy.to_dict(), compiled=policy_service.compile_policy(policy))
+
+
+@router.get("/policies", response_model=List[PolicyResponse])
+async def list_policies():
+    """获取所有分流策略"""
+    try:
+        with Database() as db:
+            policy_service = PolicyService(db)
+            return [_policy_response(policy_service, policy) for policy in policy_service.list_policies()]
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post("/policies", response_model=PolicyResponse, status_code=status.HTTP_201_CREATED)
+async def create_policy(request: PolicyCreateRequest):
+    """创建分流策略"""
+    try:
+        with Database() as db:
+            policy_service = PolicyService(db)
+            policy = policy_service.create_policy(
+                request.name, request.include, request.exclude, request.description
+            )
+            return _policy_response(policy_service, policy)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post("/policies/preview", response_model=List[str])
+async def preview_policy(request: PolicyPreviewRequest):
+    """不保存，直接计算包含/排除前缀的压缩结果"""
+    try:
+        return PolicyService.preview(request.include, request.exclude)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/policies/{name}", response_model=PolicyResponse)
+async def get_policy(name: str):
+    """获取分流策略及编译结果"""
+    try:
+        with Database() as db:
+            policy_service = PolicyService(db)
+            return _policy_response(policy_service, policy_service.get_policy(name))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.put("/policies/{name}", response_model=PolicyResponse)
+async def update_policy(name: str, request: PolicyUpdateRequest):
+    """修改分流策略（版本号递增）"""
+    try:
+        with Database() as db:
+            policy_service = PolicyService(db)
+            policy = policy_service.update_policy(
+                name, request.include, request.exclude, request.description
+            )
+            return _policy_response(policy_service, policy)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.delete("/policies/{name}", response_model=MessageResponse)
+async def delete_policy(name: str):
+    """删除分流策略"""
+    try:
+        with Database() as db:
+            PolicyService(db).delete_policy(name)
+            return MessageResponse(message=f"分流策略 '{name}' 已删除")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.put("/nodes/{node_id}/policy", response_model=NodeResponse)
+async def set_node_policy(node_id: int, request: PolicyAssignRequest):
+    """设置节点自身的分流策略"""
+    try:
+        with Database() as db:
+            node = PolicyService(db).set_node_policy(node_id, request.policy)
+            return NodeResponse(**node.to_dict())
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/groups", response_model=List[GroupResponse])
+async def list_groups():
+    """获取所有节点组"""
+    try:
+        with Database() as db:
+            return [GroupResponse(**group) for group in PolicyService(db).list_groups()]
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post("/groups", response_model=GroupResponse, status_code=status.HTTP_201_CREATED)
+async def create_group(request: GroupCreateRequest):
+    """创建节点组"""
+    try:
+        with Database() as db:
+            group = PolicyService(db).create_group(request.name, request.policy, request.description)
+            return GroupResponse(**group.to_dict(), policy=request.policy)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.delete("/groups/{name}", response_model=MessageResponse)
+async def delete_group(name: str):
+    """删除节点组（组内节点变为未分组）"""
+    try:
+        with Database() as db:
+            PolicyService(db).delete_group(name)
+            return MessageResponse(message=f"节点组 '{name}' 已删除")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.put("/groups/{name}/policy", response_model=GroupResponse)
+async def set_group_policy(name: str, request: PolicyAssignRequest):
+    """设置节点组的分流策略"""
+    try:
+        with Database() as db:
+            group = PolicyService(db).set_group_policy(name, request.policy)
+            return GroupResponse(**group.to_dict(), policy=request.policy)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.put("/nodes/{node_id}/group", response_model=NodeResponse)
+async def set_node_group(node_id: int, request: GroupAssignRequest):
+    """设置节点所属节点组"""
+    try:
+        with Database() as db:
+            node = PolicyService(db).assign_group(node_id, request.group)
+            return NodeResponse(**node.to_dict())
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
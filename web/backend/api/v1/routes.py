@@ -0,0 +1,50 @@
+"""
+路由子网API
+"""
+from typing import List
+from fastapi import APIRouter, HTTPException, status
+from core.models.database import Database
+from core.services.route_service import RouteService
+from web.backend.schemas.node import NodeResponse
+from web.backend.schemas.route import NodeRoutesRequest, RouteResponse, WhoisResponse
+
+router = APIRouter()
+
+
+@router.get("/routes", response_model=List[RouteResponse])
+async def list_routes():
+    """获取所有路由子网"""
+    try:
+        with Database() as db:
+            return [RouteResponse(**route) for route in RouteService(db).list_routes()]
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.put("/nodes/{node_id}/routes", response_model=NodeResponse)
+async def set_node_routes(node_id: int, request: NodeRoutesRequest):
+    """替换节点路由的全部子网"""
+    try:
+        with Database() as db:
+            node = RouteService(db).set_routes(node_id, request.routed_subnets)
+            return NodeResponse(**node.to_dict())
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/whois/{address}", response_model=WhoisResponse)
+async def whois(address: str):
+    """查询 IP 地址归属的节点、路由子网或网络段"""
+    try:
+        with Database() as db:
+            result = RouteService(db).whois(address)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+    
+    if result['kind'] is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"地址 {address} 不属于任何节点或网络段")
+    return WhoisResponse(**result)
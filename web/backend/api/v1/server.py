@@ -4,12 +4,31 @@
 from fastapi import APIRouter, HTTPException, status
 from core.models.database import Database
 from core.services.server_service import ServerService
-from web.backend.schemas.server import ServerInitRequest, ServerResponse, ServerStatusResponse
+from web.backend.schemas.server import (
+    ServerInitRequest, ServerResponse, ServerStatusResponse,
+    InterfaceResponse, InterfaceStatusResponse, Ipv6EnableRequest, Ipv6EnableResponse
+)
 from web.backend.schemas.common import MessageResponse
 
 router = APIRouter()
 
 
+def _interface_responses(server_service: ServerService) -> list:
+    """转换接口分片列表为响应模型"""
+    return [
+        InterfaceResponse(
+            name=interface.name,
+            listen_port=interface.listen_port,
+            virtual_ip=interface.virtual_ip,
+            network_cidr=interface.network_cidr,
+            public_key=interface.public_key,
+            virtual_ip6=interface.virtual_ip6,
+            network6_cidr=interface.network6_cidr
+        )
+        for interface in server_service.list_interfaces()
+    ]
+
+
 @router.post("/server/init", response_model=ServerResponse, status_code=status.HTTP_201_CREATED)
 async def initialize_server(request: ServerInitRequest):
     """初始化服务端"""
@@ -21,7 +40,9 @@ async def initialize_server(request: ServerInitRequest):
                 network_cidr=request.network_cidr,
                 server_ip=request.server_ip,
                 public_endpoint=request.public_endpoint,
-                force=request.force
+                force=request.force,
+                shards=request.shards,
+                ipv6=request.ipv6
             )
             
             return ServerResponse(
@@ -31,7 +52,10 @@ async def initialize_server(request: ServerInitRequest):
                 network_cidr=server.network_cidr,
                 public_key=server.public_key,
                 public_endpoint=server.public_endpoint,
-                created_at=server.created_at
+                virtual_ip6=server.virtual_ip6,
+                network6_cidr=server.network6_cidr,
+                created_at=server.created_at,
+                interfaces=_interface_responses(server_service)
             )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -60,12 +84,27 @@ async def get_server_info():
                 network_cidr=server.network_cidr,
                 public_key=server.public_key,
                 public_endpoint=server.public_endpoint,
-                created_at=server.created_at
+                virtual_ip6=server.virtual_ip6,
+                network6_cidr=server.network6_cidr,
+                created_at=server.created_at,
+                interfaces=_interface_responses(server_service)
             )
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
+@router.post("/server/ipv6", response_model=Ipv6EnableResponse)
+async def enable_ipv6(request: Ipv6EnableRequest):
+    """启用 IPv6 双栈，并为已有节点批量分配地址"""
+    try:
+        with Database() as db:
+            return Ipv6EnableResponse(**ServerService(db).enable_ipv6(request.prefix))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
 @router.post("/server/reload", response_model=MessageResponse)
 async def reload_wireguard():
     """重载WireGuard配置"""
@@ -90,7 +129,10 @@ async def get_server_status():
                 wireguard_running=status_info['wireguard_running'],
                 interface_name=status_info['interface_name'],
                 total_nodes=status_info['total_nodes'],
-                connected_peers=status_info['connected_peers']
+                connected_peers=status_info['connected_peers'],
+                interfaces=[
+                    InterfaceStatusResponse(**item) for item in status_info['interfaces']
+                ]
             )
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -0,0 +1,127 @@
+"""
+带宽限速API
+"""
+from typing import List
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from core.models.database import Database
+from core.services.shaping_service import ShapingService
+from web.backend.schemas.node import NodeResponse
+from web.backend.schemas.policy import GroupResponse
+from web.backend.schemas.shaping import (
+    ShapingProfileCreateRequest, ShapingProfileUpdateRequest, ShapingProfileResponse,
+    ShapingAssignRequest
+)
+from web.backend.schemas.common import MessageResponse
+
+router = APIRouter()
+
+
+def _profile_response(shaping_service: ShapingService, profile_id: int) -> ShapingProfileResponse:
+    """限速配置 ID -> 响应（附带使用该配置的节点组）"""
+    for profile in shaping_service.describe_profiles():
+        if profile['id'] == profile_id:
+            return ShapingProfileResponse(**profile)
+    raise ValueError(f"限速配置 ID {profile_id} 不存在")
+
+
+@router.get("/shaping/profiles", response_model=List[ShapingProfileResponse])
+async def list_shaping_profiles():
+    """获取所有限速配置"""
+    try:
+        with Database() as db:
+            return [ShapingProfileResponse(**profile) for profile in ShapingService(db).describe_profiles()]
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post("/shaping/profiles", response_model=ShapingProfileResponse, status_code=status.HTTP_201_CREATED)
+async def create_shaping_profile(request: ShapingProfileCreateRequest):
+    """创建限速配置"""
+    try:
+        with Database() as db:
+            shaping_service = ShapingService(db)
+            profile = shaping_service.create_profile(
+                request.name, request.download, request.upload, request.description
+            )
+            return _profile_response(shaping_service, profile.id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.put("/shaping/profiles/{name}", response_model=ShapingProfileResponse)
+async def update_shaping_profile(name: str, request: ShapingProfileUpdateRequest):
+    """修改限速配置并重新下发"""
+    try:
+        with Database() as db:
+            shaping_service = ShapingService(db)
+            profile = shaping_service.update_profile(
+                name, request.download, request.upload, request.description
+            )
+            return _profile_response(shaping_service, profile.id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.delete("/shaping/profiles/{name}", response_model=MessageResponse)
+async def delete_shaping_profile(name: str):
+    """删除限速配置"""
+    try:
+        with Database() as db:
+            ShapingService(db).delete_profile(name)
+            return MessageResponse(message=f"限速配置 '{name}' 已删除")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.put("/nodes/{node_id}/shaping", response_model=NodeResponse)
+async def set_node_shaping(node_id: int, request: ShapingAssignRequest):
+    """设置节点自身的限速配置"""
+    try:
+        with Database() as db:
+            node = ShapingService(db).set_node_profile(node_id, request.profile)
+            return NodeResponse(**node.to_dict())
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.put("/groups/{name}/shaping", response_model=GroupResponse)
+async def set_group_shaping(name: str, request: ShapingAssignRequest):
+    """设置节点组的限速配置"""
+    try:
+        with Database() as db:
+            group = ShapingService(db).set_group_profile(name, request.profile)
+            return GroupResponse(**group.to_dict())
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/shaping/batch", response_class=PlainTextResponse)
+async def get_shaping_batch():
+    """获取编译后的 tc 批处理语句（不下发）"""
+    try:
+        with Database() as db:
+            return ShapingService(db).render()
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post("/shaping/apply", response_model=MessageResponse)
+async def apply_shaping():
+    """重建全部接口的限速规则"""
+    try:
+        with Database() as db:
+            count = ShapingService(db).apply()
+            return MessageResponse(message=f"已重建 {count} 个接口的限速规则")
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
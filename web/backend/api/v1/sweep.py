@@ -0,0 +1,81 @@
+"""
+节点清理API
+"""
+from typing import List
+from fastapi import APIRouter, HTTPException, status
+from core.models.database import Database
+from core.services.sweep_service import SweepService, get_node_sweeper
+from web.backend.schemas.node import NodeResponse
+from web.backend.schemas.sweep import (
+    SweepPolicyRequest, SweepPolicyResponse, SweepReport, SweepAuditEntry, NodeExpiryRequest
+)
+
+router = APIRouter()
+
+
+@router.get("/sweep/policy", response_model=SweepPolicyResponse)
+async def get_sweep_policy():
+    """获取清理策略"""
+    try:
+        with Database() as db:
+            return SweepPolicyResponse(**SweepService(db).get_policy())
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.put("/sweep/policy", response_model=SweepPolicyResponse)
+async def set_sweep_policy(request: SweepPolicyRequest):
+    """设置清理策略"""
+    try:
+        with Database() as db:
+            return SweepPolicyResponse(**SweepService(db).set_policy(request.action, request.idle_after))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post("/sweep/run", response_model=SweepReport)
+async def run_sweep(dry_run: bool = False):
+    """执行一轮清理（dry_run=true 仅报告将被清理的节点）"""
+    try:
+        with Database() as db:
+            return SweepReport(**get_node_sweeper().run_once(db, dry_run=dry_run))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/sweep/history", response_model=List[SweepAuditEntry])
+async def get_sweep_history(limit: int = 100):
+    """获取最近的清理记录（最新的在前）"""
+    try:
+        with Database() as db:
+            return [SweepAuditEntry(**entry) for entry in SweepService(db).history(limit)]
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.put("/nodes/{node_id}/expiry", response_model=NodeResponse)
+async def set_node_expiry(node_id: int, request: NodeExpiryRequest):
+    """设置节点有效期"""
+    try:
+        with Database() as db:
+            node = SweepService(db).set_ttl(node_id, request.ttl)
+            return NodeResponse(**node.to_dict())
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post("/nodes/{node_id}/restore", response_model=NodeResponse)
+async def restore_node(node_id: int):
+    """恢复已停用的节点"""
+    try:
+        with Database() as db:
+            node = SweepService(db).restore(node_id)
+            return NodeResponse(**node.to_dict())
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
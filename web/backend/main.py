@@ -10,11 +10,24 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 import os
-from web.backend.api.v1 import nodes, server, downloads
+from web.backend.api.v1 import nodes, server, downloads, hubs, mesh, routes, policies, networks, acl, shaping, peer_profiles, sweep, debug, events, changes
+from core.services.change_service import get_change_compactor, get_change_relay
+from core.services.mesh_analyzer import get_mesh_analyzer
+from core.services.peer_monitor import get_peer_monitor
+from core.services.sweep_service import get_node_sweeper
+from core.services.metrics_service import render_metrics
+from core.utils.log import setup_logging
+from core.utils.metrics import get_metrics_flusher
+from web.backend.middleware.metrics import MetricsMiddleware
+from web.backend.middleware.profiler import ProfilerMiddleware
+from web.backend.middleware.request_context import RequestContextMiddleware
 from config import web as config
 
+# 结构化日志：每行一个 JSON 对象，由后台线程写出
+setup_logging('json')
+
 # 创建FastAPI应用
 app = FastAPI(
     title="WireGuard Network Toolkit API",
@@ -33,10 +46,51 @@ app.add_middleware(
     allow_headers=config.CORS_ALLOW_HEADERS,
 )
 
+# 请求耗时指标、慢请求剖析（默认关闭）
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ProfilerMiddleware)
+# 最后添加的中间件在最外层：请求 ID 覆盖整个请求的处理过程
+app.add_middleware(RequestContextMiddleware)
+
 # 注册路由
 app.include_router(nodes.router, prefix=config.API_PREFIX, tags=["nodes"])
 app.include_router(server.router, prefix=config.API_PREFIX, tags=["server"])
 app.include_router(downloads.router, prefix=config.API_PREFIX, tags=["downloads"])
+app.include_router(hubs.router, prefix=config.API_PREFIX, tags=["hubs"])
+app.include_router(mesh.router, prefix=config.API_PREFIX, tags=["mesh"])
+app.include_router(routes.router, prefix=config.API_PREFIX, tags=["routes"])
+app.include_router(policies.router, prefix=config.API_PREFIX, tags=["policies"])
+app.include_router(networks.router, prefix=config.API_PREFIX, tags=["networks"])
+app.include_router(acl.router, prefix=config.API_PREFIX, tags=["acl"])
+app.include_router(shaping.router, prefix=config.API_PREFIX, tags=["shaping"])
+app.include_router(peer_profiles.router, prefix=config.API_PREFIX, tags=["peer-profiles"])
+app.include_router(sweep.router, prefix=config.API_PREFIX, tags=["sweep"])
+app.include_router(debug.router, prefix=config.API_PREFIX, tags=["debug"])
+app.include_router(events.router, prefix=config.API_PREFIX, tags=["events"])
+app.include_router(changes.router, prefix=config.API_PREFIX, tags=["changes"])
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    """启动后台任务：直连流量分析器（仅 auto 模式下实际采样）、节点清理、指标快照写入（多进程模式）、
+    peer 状态采集和变更日志推进检查（仅有事件订阅者时实际运行）、变更日志压缩"""
+    get_mesh_analyzer().start()
+    get_node_sweeper().start()
+    get_metrics_flusher().start()
+    get_peer_monitor().start()
+    get_change_compactor().start()
+    get_change_relay().start()
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    """停止后台任务"""
+    get_mesh_analyzer().stop()
+    get_node_sweeper().stop()
+    get_metrics_flusher().stop()
+    get_peer_monitor().stop()
+    get_change_compactor().stop()
+    get_change_relay().stop()
 
 
 @app.get("/")
@@ -56,6 +110,12 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus 指标（设置 WG_METRICS_DIR 时合并所有 worker 进程）"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 # 静态文件托管
 frontend_dist_path = Path(__file__).parent.parent / "frontend" / "dist"
 if frontend_dist_path.exists():
@@ -86,5 +146,6 @@ if __name__ == "__main__":
         "main:app",
         host=config.API_HOST,
         port=config.API_PORT,
-        reload=config.API_RELOAD
+        reload=config.API_RELOAD,
+        timeout_graceful_shutdown=config.API_SHUTDOWN_TIMEOUT
     )
@@ -0,0 +1,54 @@
+"""
+请求指标中间件
+按路由模板记录每个 HTTP 请求的处理耗时
+"""
+import time
+from core.utils.metrics import HTTP_REQUEST_SECONDS
+
+
+class MetricsMiddleware:
+    """ASGI 中间件：记录请求耗时直方图（标签：方法、路由模板、状态码）
+
+    使用路由模板（如 /api/v1/nodes/{node_id}）而不是实际路径，标签数量有界；
+    未匹配任何路由的请求统一记为 unmatched。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_SECONDS.observe(
+                (scope['method'], route_template(scope), str(status[0])),
+                time.perf_counter() - start
+            )
+
+
+def route_template(scope) -> str:
+    """请求路径 -> 路由模板：把路径参数的值替换回 {参数名}"""
+    if scope.get('route') is None:
+        return 'unmatched'
+    names = {str(value): name for name, value in scope.get('path_params', {}).items()}
+    if not names:
+        return scope['path']
+    if any('/' in value for value in names):
+        # 路径型参数（如前端静态文件）跨越多段，直接使用路由自身的模板
+        return getattr(scope['route'], 'path', 'unmatched')
+    return '/'.join(
+        f'{{{names[segment]}}}' if segment in names else segment
+        for segment in scope['path'].split('/')
+    )
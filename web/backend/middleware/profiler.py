@@ -0,0 +1,30 @@
+"""
+请求剖析中间件
+剖析器开启时为每个请求记录跨度树，超过阈值的请求保存 cProfile 结果
+"""
+from core.utils.profiler import get_profiler
+from web.backend.middleware.metrics import route_template
+from config import web as config
+
+# 长连接和长轮询的持续时间由客户端决定，不剖析（否则会长期占用 cProfile 并被记为慢请求）
+UNPROFILED_PATHS = (f"{config.API_PREFIX}/events", f"{config.API_PREFIX}/changes")
+
+
+class ProfilerMiddleware:
+    """ASGI 中间件：剖析器关闭时直接放行，开启与否在每个请求时检查，可运行时切换"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        profiler = get_profiler()
+        if scope['type'] != 'http' or not profiler.enabled or scope['path'] in UNPROFILED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        with profiler.trace(f"{scope['method']} {scope['path']}") as trace:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                trace.name = f"{scope['method']} {route_template(scope)}"
+                trace.root.detail = scope['path']
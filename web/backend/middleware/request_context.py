@@ -0,0 +1,45 @@
+"""
+请求上下文中间件
+为每个请求分配请求 ID，写入日志上下文并通过 X-Request-ID 响应头返回
+"""
+import re
+from core.utils.log import new_id, request_context
+
+REQUEST_ID_HEADER = b'x-request-id'
+
+# 只接受调用方传入的简单 ID，避免把任意内容写入日志
+_VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._:-]{1,64}$')
+
+
+class RequestContextMiddleware:
+    """ASGI 中间件：沿用调用方的 X-Request-ID（格式合法时），否则生成新的请求 ID"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get('headers', ()):
+            if name == REQUEST_ID_HEADER:
+                value = value.decode('latin-1')
+                if _VALID_REQUEST_ID.match(value):
+                    request_id = value
+                break
+        request_id = request_id or new_id()
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                headers = [
+                    (name, value) for name, value in message.get('headers', ())
+                    if name.lower() != REQUEST_ID_HEADER
+                ]
+                headers.append((REQUEST_ID_HEADER, request_id.encode('latin-1')))
+                message['headers'] = headers
+            await send(message)
+
+        with request_context(request_id):
+            await self.app(scope, receive, send_wrapper)
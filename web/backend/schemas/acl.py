@@ -0,0 +1,34 @@
+"""
+访问控制相关数据模型
+"""
+from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class AclModeRequest(BaseModel):
+    """设置访问控制模式请求"""
+    mode: str = Field(..., pattern="^(off|enforce)$", description="访问控制模式")
+
+
+class AclModeResponse(BaseModel):
+    """访问控制模式响应"""
+    mode: str
+
+
+class AclRuleRequest(BaseModel):
+    """放行规则请求（允许源节点组访问目的节点组）"""
+    src_group: str = Field(..., min_length=1, description="源节点组名称")
+    dst_group: str = Field(..., min_length=1, description="目的节点组名称")
+    description: Optional[str] = Field(None, max_length=500, description="规则描述")
+
+
+class AclRuleResponse(BaseModel):
+    """放行规则响应"""
+    id: int
+    src_group_id: int
+    dst_group_id: int
+    src_group: Optional[str] = None
+    dst_group: Optional[str] = None
+    description: Optional[str] = None
+    created_at: Optional[datetime] = None
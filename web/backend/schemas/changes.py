@@ -0,0 +1,22 @@
+"""
+变更日志相关数据模型
+"""
+from typing import Any, Dict, List
+from pydantic import BaseModel, Field
+
+
+class ChangeItem(BaseModel):
+    """一条变更"""
+    seq: int = Field(..., description="变更序号")
+    entity: str = Field(..., description="对象类型：node 节点，server 服务端")
+    id: int = Field(..., description="对象 ID")
+    op: str = Field(..., description="upsert 新建或修改，delete 删除")
+    data: Dict[str, Any] = Field(..., description="upsert 为对象的当前数据，delete 为节点的标识字段")
+
+
+class ChangeFeed(BaseModel):
+    """增量同步响应"""
+    changes: List[ChangeItem] = Field(default_factory=list)
+    next: int = Field(..., description="下次请求的 since")
+    reset: bool = Field(..., description="无法增量同步，记下 next 后重新拉取完整数据")
+    more: bool = Field(..., description="还有未返回的变更，应立即以 next 继续请求")
@@ -0,0 +1,50 @@
+"""
+调试相关数据模型（剖析器、日志级别）
+"""
+from typing import List, Optional
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class ProfilerSettings(BaseModel):
+    """剖析器状态"""
+    enabled: bool
+    threshold_ms: int = Field(..., description="耗时超过此值（毫秒）的请求保存剖析结果")
+    directory: str = Field(..., description="剖析结果目录")
+
+
+class ProfilerUpdateRequest(BaseModel):
+    """开启或关闭剖析器"""
+    enabled: bool
+    threshold_ms: Optional[int] = Field(None, ge=0, description="慢操作阈值（毫秒），为空表示保持不变")
+
+
+class SlowOperation(BaseModel):
+    """慢操作概要"""
+    id: str
+    name: str
+    started_at: datetime
+    duration_ms: float
+    spans: int = Field(..., description="记录的跨度数量")
+    dropped_spans: int = Field(..., description="超过上限未记录的跨度数量")
+    profile_path: Optional[str] = Field(None, description="cProfile 结果文件（并发请求时可能没有）")
+
+
+class SpanNode(BaseModel):
+    """调用跨度"""
+    name: str
+    kind: str = Field(..., description="request / service / repo / db / command")
+    detail: Optional[str] = None
+    offset_ms: float = Field(..., description="相对请求开始的时刻")
+    duration_ms: float
+    children: List['SpanNode'] = Field(default_factory=list)
+
+
+class SlowOperationDetail(SlowOperation):
+    """慢操作跨度树"""
+    root: SpanNode
+
+
+class LogLevelSettings(BaseModel):
+    """日志级别（仅作用于处理该请求的工作进程）"""
+    level: str = Field(..., description="DEBUG / INFO / WARNING / ERROR / CRITICAL")
@@ -0,0 +1,38 @@
+"""
+中心节点相关数据模型
+"""
+from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class HubCreateRequest(BaseModel):
+    """添加远端中心节点请求"""
+    name: str = Field(..., min_length=1, max_length=100, description="中心节点名称")
+    public_endpoint: str = Field(..., description="公网地址（IP:Port 或域名:Port）")
+    public_key: str = Field(..., min_length=1, description="中心节点公钥")
+    network_cidr: str = Field(..., description="中心节点负责的网络段")
+    virtual_ip: Optional[str] = Field(None, description="中心节点虚拟 IP")
+    capacity_weight: float = Field(1.0, gt=0, description="容量权重")
+    region: Optional[str] = Field(None, max_length=100, description="区域标签")
+
+
+class HubTrafficRequest(BaseModel):
+    """中心节点流量上报请求"""
+    recent_traffic: int = Field(..., ge=0, description="最近统计周期内的流量（字节）")
+
+
+class HubResponse(BaseModel):
+    """中心节点响应"""
+    id: Optional[int] = None
+    name: str
+    public_endpoint: Optional[str] = None
+    public_key: str
+    virtual_ip: str
+    network_cidr: str
+    capacity_weight: float
+    region: Optional[str] = None
+    recent_traffic: int = 0
+    total_nodes: int = 0
+    is_local: bool = False
+    created_at: Optional[datetime] = None
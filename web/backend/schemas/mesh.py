@@ -0,0 +1,35 @@
+"""
+网状拓扑相关数据模型
+"""
+from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class MeshModeRequest(BaseModel):
+    """设置拓扑模式请求"""
+    mode: str = Field(..., pattern="^(off|full|partial|auto)$", description="拓扑模式")
+
+
+class MeshModeResponse(BaseModel):
+    """拓扑模式响应"""
+    mode: str
+
+
+class NodeEndpointRequest(BaseModel):
+    """设置节点公网地址请求"""
+    endpoint: Optional[str] = Field(None, description="节点公网地址（IP:Port），为空表示清除")
+
+
+class MeshLinkRequest(BaseModel):
+    """直连节点对请求"""
+    node_a: int = Field(..., description="节点 ID")
+    node_b: int = Field(..., description="节点 ID")
+
+
+class MeshLinkResponse(BaseModel):
+    """直连节点对响应"""
+    node_a: int
+    node_b: int
+    source: str
+    created_at: Optional[datetime] = None
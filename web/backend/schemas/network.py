@@ -0,0 +1,26 @@
+"""
+租户网络相关数据模型
+"""
+from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class NetworkCreateRequest(BaseModel):
+    """创建租户网络请求"""
+    name: str = Field(..., min_length=1, max_length=100, description="网络名称")
+    network_cidr: str = Field(..., description="网络段（IPv4，不得与已有网络段重叠）")
+    listen_port: Optional[int] = Field(None, ge=1, le=65535, description="监听端口，默认取已用端口的下一个")
+    description: Optional[str] = Field(None, max_length=500, description="网络描述")
+
+
+class NetworkResponse(BaseModel):
+    """租户网络响应（默认网络的 id 为空）"""
+    id: Optional[int] = None
+    name: str
+    network_cidr: str
+    description: Optional[str] = None
+    interface: Optional[str] = None
+    listen_port: Optional[int] = None
+    node_count: int = 0
+    created_at: Optional[datetime] = None
@@ -1,7 +1,7 @@
 """
 节点相关数据模型
 """
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel, Field
 
@@ -11,6 +11,12 @@ class NodeCreateRequest(BaseModel):
     node_name: str = Field(..., min_length=1, max_length=100, description="节点名称")
     platform: str = Field(..., pattern="^(linux|windows)$", description="平台类型")
     description: Optional[str] = Field(None, max_length=500, description="节点描述")
+    region: Optional[str] = Field(None, max_length=100, description="区域标签（多中心部署按区域选择中心节点）")
+    endpoint: Optional[str] = Field(None, description="节点公网地址（IP:Port），网状模式下可被其他节点直连")
+    routed_subnets: List[str] = Field(default_factory=list, description="节点后方的子网（CIDR），经该节点路由")
+    group: Optional[str] = Field(None, description="所属节点组名称")
+    network: Optional[str] = Field(None, description="所属租户网络名称，默认网络可省略")
+    ttl: Optional[str] = Field(None, description="有效期（如 12h、7d），到期后由节点清理删除或停用")
 
 
 class NodeResponse(BaseModel):
@@ -18,9 +24,21 @@ class NodeResponse(BaseModel):
     id: int
     node_name: str
     virtual_ip: str
+    virtual_ip6: Optional[str] = None
     public_key: str
     platform: str
     description: Optional[str] = None
+    hub_id: Optional[int] = None
+    region: Optional[str] = None
+    endpoint: Optional[str] = None
+    routed_subnets: List[str] = []
+    group_id: Optional[int] = None
+    policy_id: Optional[int] = None
+    network_id: Optional[int] = None
+    shaping_profile_id: Optional[int] = None
+    peer_profile_id: Optional[int] = None
+    expires_at: Optional[datetime] = None
+    disabled_at: Optional[datetime] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
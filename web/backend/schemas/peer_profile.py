@@ -0,0 +1,65 @@
+"""
+对端参数相关数据模型
+"""
+from typing import List, Optional
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class PeerProfileCreateRequest(BaseModel):
+    """创建对端参数配置请求（字段为空表示继承）"""
+    name: str = Field(..., min_length=1, max_length=100, description="配置名称")
+    keepalive: Optional[str] = Field(None, description="保活间隔（秒，off 表示关闭）")
+    mtu: Optional[int] = Field(None, description="客户端接口 MTU")
+    description: Optional[str] = Field(None, max_length=500, description="配置描述")
+
+
+class PeerProfileUpdateRequest(BaseModel):
+    """修改对端参数配置请求（未提供的字段保持不变，none 表示改为继承）"""
+    keepalive: Optional[str] = Field(None, description="保活间隔")
+    mtu: Optional[str] = Field(None, description="客户端接口 MTU")
+    description: Optional[str] = Field(None, max_length=500, description="配置描述")
+
+
+class PeerProfileResponse(BaseModel):
+    """对端参数配置响应"""
+    id: int
+    name: str
+    persistent_keepalive: Optional[int] = None
+    mtu: Optional[int] = None
+    platform: Optional[str] = Field(None, description="作为默认配置的平台")
+    description: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
+class PeerProfileAssignRequest(BaseModel):
+    """设置对端参数配置请求"""
+    profile: Optional[str] = Field(None, description="配置名称，为空表示清除")
+
+
+class KeepaliveModeRequest(BaseModel):
+    """设置保活建议模式请求"""
+    mode: str = Field(..., pattern="^(manual|auto)$", description="manual 仅给出建议，auto 观测后自动应用")
+
+
+class KeepaliveModeResponse(BaseModel):
+    """保活建议模式响应"""
+    mode: str
+
+
+class KeepaliveRecommendation(BaseModel):
+    """保活建议"""
+    node_id: int
+    node_name: str
+    endpoint: Optional[str] = None
+    samples: int
+    changes: int
+    observed_seconds: float
+    keepalive: int = Field(..., description="当前生效的保活间隔")
+    action: str = Field(..., description="disable 关闭保活，restore 恢复继承")
+
+
+class ObserveResponse(BaseModel):
+    """地址采样响应"""
+    observed: int
+    applied: List[KeepaliveRecommendation] = Field(default_factory=list)
@@ -0,0 +1,69 @@
+"""
+分流策略和节点组相关数据模型
+"""
+from typing import List, Optional
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class PolicyCreateRequest(BaseModel):
+    """创建分流策略请求"""
+    name: str = Field(..., min_length=1, max_length=100, description="策略名称")
+    include: List[str] = Field(..., min_length=1, description="经隧道转发的前缀（可用别名，如 any、rfc1918）")
+    exclude: List[str] = Field(default_factory=list, description="排除的前缀")
+    description: Optional[str] = Field(None, max_length=500, description="策略描述")
+
+
+class PolicyUpdateRequest(BaseModel):
+    """修改分流策略请求（未提供的字段保持不变）"""
+    include: Optional[List[str]] = Field(None, description="经隧道转发的前缀")
+    exclude: Optional[List[str]] = Field(None, description="排除的前缀")
+    description: Optional[str] = Field(None, max_length=500, description="策略描述")
+
+
+class PolicyResponse(BaseModel):
+    """分流策略响应"""
+    id: int
+    name: str
+    include: List[str]
+    exclude: List[str]
+    version: int
+    description: Optional[str] = None
+    compiled: List[str] = Field(default_factory=list, description="编译后的 CIDR 列表")
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class PolicyPreviewRequest(BaseModel):
+    """分流策略预览请求"""
+    include: List[str] = Field(..., min_length=1, description="包含的前缀")
+    exclude: List[str] = Field(default_factory=list, description="排除的前缀")
+
+
+class PolicyAssignRequest(BaseModel):
+    """设置节点或节点组分流策略请求"""
+    policy: Optional[str] = Field(None, description="策略名称，为空表示清除")
+
+
+class GroupCreateRequest(BaseModel):
+    """创建节点组请求"""
+    name: str = Field(..., min_length=1, max_length=100, description="节点组名称")
+    policy: Optional[str] = Field(None, description="组内节点默认使用的分流策略")
+    description: Optional[str] = Field(None, max_length=500, description="节点组描述")
+
+
+class GroupAssignRequest(BaseModel):
+    """设置节点所属节点组请求"""
+    group: Optional[str] = Field(None, description="节点组名称，为空表示移出节点组")
+
+
+class GroupResponse(BaseModel):
+    """节点组响应"""
+    id: int
+    name: str
+    policy_id: Optional[int] = None
+    policy: Optional[str] = None
+    shaping_profile_id: Optional[int] = None
+    description: Optional[str] = None
+    node_count: int = 0
+    created_at: Optional[datetime] = None
@@ -0,0 +1,27 @@
+"""
+路由子网相关数据模型
+"""
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class NodeRoutesRequest(BaseModel):
+    """设置节点路由子网请求"""
+    routed_subnets: List[str] = Field(..., description="节点后方的子网（CIDR），空列表表示清除")
+
+
+class RouteResponse(BaseModel):
+    """路由子网响应"""
+    subnet: str
+    node_id: int
+    node_name: Optional[str] = None
+    hub_id: Optional[int] = None
+
+
+class WhoisResponse(BaseModel):
+    """地址归属响应"""
+    address: str
+    prefix: Optional[str] = Field(None, description="匹配到的最具体前缀")
+    kind: Optional[str] = Field(None, description="归属类型：node/route/network，未知地址为空")
+    id: Optional[int] = Field(None, description="节点 ID；网络段为中心节点 ID（本地为空）")
+    name: Optional[str] = None
@@ -1,7 +1,7 @@
 """
 服务端相关数据模型
 """
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 from pydantic import BaseModel, Field
 
@@ -13,6 +13,31 @@ class ServerInitRequest(BaseModel):
     server_ip: Optional[str] = Field("10.0.0.1", description="服务端虚拟IP")
     public_endpoint: Optional[str] = Field(None, description="公网地址")
     force: bool = Field(False, description="强制重新初始化")
+    shards: Optional[int] = Field(1, ge=1, le=64, description="接口分片数量")
+    ipv6: Optional[str] = Field(None, description="启用 IPv6 双栈：IPv6 网络段，或 auto 生成随机 ULA 网络段")
+
+
+class Ipv6EnableRequest(BaseModel):
+    """启用 IPv6 请求"""
+    prefix: str = Field("auto", description="IPv6 网络段，auto 表示生成随机 ULA 网络段")
+
+
+class Ipv6EnableResponse(BaseModel):
+    """启用 IPv6 响应"""
+    network6_cidr: str
+    virtual_ip6: str
+    assigned: int
+
+
+class InterfaceResponse(BaseModel):
+    """接口分片响应"""
+    name: str
+    listen_port: int
+    virtual_ip: str
+    network_cidr: str
+    public_key: str
+    virtual_ip6: Optional[str] = None
+    network6_cidr: Optional[str] = None
 
 
 class ServerResponse(BaseModel):
@@ -23,15 +48,28 @@ class ServerResponse(BaseModel):
     network_cidr: str
     public_key: str
     public_endpoint: Optional[str] = None
+    virtual_ip6: Optional[str] = None
+    network6_cidr: Optional[str] = None
     created_at: Optional[datetime] = None
+    interfaces: List[InterfaceResponse] = []
 
     class Config:
         from_attributes = True
 
 
+class InterfaceStatusResponse(BaseModel):
+    """接口分片状态响应"""
+    name: str
+    listen_port: int
+    network_cidr: str
+    running: bool
+    total_nodes: int
+
+
 class ServerStatusResponse(BaseModel):
     """服务端状态响应"""
     wireguard_running: bool
     interface_name: str
     total_nodes: int
     connected_peers: int
+    interfaces: List[InterfaceStatusResponse] = []
@@ -0,0 +1,37 @@
+"""
+带宽限速相关数据模型
+"""
+from typing import List, Optional
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class ShapingProfileCreateRequest(BaseModel):
+    """创建限速配置请求（速率如 50mbit、800kbit，为空表示该方向不限速）"""
+    name: str = Field(..., min_length=1, max_length=100, description="配置名称")
+    download: Optional[str] = Field(None, description="下行（中心节点 -> 节点）速率上限")
+    upload: Optional[str] = Field(None, description="上行（节点 -> 中心节点）速率上限")
+    description: Optional[str] = Field(None, max_length=500, description="配置描述")
+
+
+class ShapingProfileUpdateRequest(BaseModel):
+    """修改限速配置请求（未提供的字段保持不变，none 表示该方向不限速）"""
+    download: Optional[str] = Field(None, description="下行速率上限")
+    upload: Optional[str] = Field(None, description="上行速率上限")
+    description: Optional[str] = Field(None, max_length=500, description="配置描述")
+
+
+class ShapingProfileResponse(BaseModel):
+    """限速配置响应（速率单位 kbit/s）"""
+    id: int
+    name: str
+    download_kbit: Optional[int] = None
+    upload_kbit: Optional[int] = None
+    groups: List[str] = Field(default_factory=list, description="使用该配置的节点组")
+    description: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
+class ShapingAssignRequest(BaseModel):
+    """设置限速配置请求"""
+    profile: Optional[str] = Field(None, description="限速配置名称，为空表示清除")
@@ -0,0 +1,55 @@
+"""
+节点清理相关数据模型
+"""
+from typing import List, Optional
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class SweepPolicyRequest(BaseModel):
+    """设置清理策略请求（未提供的字段保持不变）"""
+    action: Optional[str] = Field(None, pattern="^(delete|disable)$", description="处理方式：删除或停用")
+    idle_after: Optional[str] = Field(None, description="闲置阈值（如 7d，off 表示不按闲置清理）")
+
+
+class SweepPolicyResponse(BaseModel):
+    """清理策略响应"""
+    action: str
+    idle_after: int = Field(..., description="闲置阈值（秒），0 表示不按闲置清理")
+
+
+class SweepCandidate(BaseModel):
+    """被清理（或将被清理）的节点"""
+    node_id: int
+    node_name: str
+    virtual_ip: str
+    reason: str = Field(..., description="expired 过期，idle 闲置")
+    detail: str
+
+
+class SweepReport(BaseModel):
+    """清理报告"""
+    dry_run: bool
+    action: str
+    idle_after: int
+    nodes: List[SweepCandidate] = Field(default_factory=list)
+    swept: int = Field(..., description="实际处理的节点数量")
+    batches: int = Field(..., description="数据库批次数量")
+
+
+class SweepAuditEntry(BaseModel):
+    """清理记录"""
+    id: int
+    node_id: int
+    node_name: str
+    virtual_ip: Optional[str] = None
+    public_key: Optional[str] = None
+    action: str
+    reason: str
+    detail: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
+class NodeExpiryRequest(BaseModel):
+    """设置节点有效期请求"""
+    ttl: Optional[str] = Field(None, description="有效期（如 12h、7d，从现在起算），为空表示永不过期")
@@ -0,0 +1,16 @@
+/**
+ * 变更日志API（增量同步）
+ */
+import http from './http'
+import type { ChangeFeed } from '@/types/api'
+
+/**
+ * 获取序号 since 之后的变更
+ *
+ * reset 为 true 时无法增量同步：记下 next，重新拉取完整数据后从 next 继续。
+ *
+ * @param since 已同步到的序号（上次响应的 next），0 表示首次同步
+ */
+export function getChanges(since: number): Promise<ChangeFeed> {
+  return http.get<ChangeFeed>('/changes', { params: { since } }).then(res => res.data)
+}
@@ -0,0 +1,29 @@
+/**
+ * 事件流API（Server-Sent Events）
+ */
+
+export type EventHandler = (data: any) => void
+
+/**
+ * 订阅服务端事件
+ *
+ * 断线后浏览器自动重连，并通过 Last-Event-ID 补发断线期间的事件；
+ * 无法补发时服务端发送 resync 事件，调用方应重新拉取完整数据。
+ *
+ * @param handlers 事件类型 -> 处理函数（参数为解析后的事件数据）
+ * @param types 只接收这些类型的事件（前缀匹配），省略表示全部
+ * @returns 取消订阅的函数
+ */
+export function subscribeEvents(handlers: Record<string, EventHandler>, types?: string[]): () => void {
+  const baseURL = import.meta.env.VITE_API_BASE_URL || '/api/v1'
+  const query = types?.length ? `?types=${encodeURIComponent(types.join(','))}` : ''
+  const source = new EventSource(`${baseURL}/events${query}`)
+
+  for (const [type, handler] of Object.entries(handlers)) {
+    source.addEventListener(type, (event) => {
+      handler(JSON.parse((event as MessageEvent).data))
+    })
+  }
+
+  return () => source.close()
+}
@@ -4,7 +4,10 @@
 import { defineStore } from 'pinia'
 import { ref } from 'vue'
 import type { Node, NodeDetail, NodeCreateRequest } from '@/types/node'
+import type { ChangeFeed } from '@/types/api'
 import * as nodesApi from '@/api/nodes'
+import { getChanges } from '@/api/changes'
+import { subscribeEvents } from '@/api/events'
 import { ElMessage } from 'element-plus'
 
 export const useNodesStore = defineStore('nodes', () => {
@@ -14,12 +17,20 @@ export const useNodesStore = defineStore('nodes', () => {
   const loading = ref(false)
   const error = ref<string | null>(null)
 
+  // 事件流的取消订阅函数
+  let closeEvents: (() => void) | null = null
+  // 列表已同步到的变更日志序号，正在进行的增量同步
+  let changeSeq = 0
+  let syncing: Promise<void> | null = null
+
   // 获取节点列表
   async function fetchNodes(): Promise<void> {
     loading.value = true
     error.value = null
     
     try {
+      // 先记下变更日志序号再拉取列表，之后的变化由增量同步补上
+      changeSeq = (await getChanges(0)).next
       const data = await nodesApi.getNodeList()
       nodeList.value = data
     } catch (err: any) {
@@ -54,10 +65,9 @@ export const useNodesStore = defineStore('nodes', () => {
     error.value = null
     
     try {
-      await nodesApi.createNode(params)
+      const node = await nodesApi.createNode(params)
       ElMessage.success('节点创建成功')
-      // 刷新列表
-      await fetchNodes()
+      addNode(node)
       return true
     } catch (err: any) {
       error.value = err.message || '创建节点失败'
@@ -75,8 +85,7 @@ export const useNodesStore = defineStore('nodes', () => {
     try {
       await nodesApi.deleteNode(id)
       ElMessage.success('节点删除成功')
-      // 刷新列表
-      await fetchNodes()
+      removeNode(id)
       return true
     } catch (err: any) {
       error.value = err.message || '删除节点失败'
@@ -86,6 +95,80 @@ export const useNodesStore = defineStore('nodes', () => {
     }
   }
 
+  // 列表中加入或更新节点（事件、创建响应和增量同步可能先后到达，按 ID 去重）
+  function addNode(node: Node): void {
+    const index = nodeList.value.findIndex(item => item.id === node.id)
+    if (index === -1) {
+      nodeList.value.push(node)
+    } else {
+      nodeList.value[index] = node
+    }
+  }
+
+  // 从列表中移除节点
+  function removeNode(id: number): void {
+    nodeList.value = nodeList.value.filter(item => item.id !== id)
+  }
+
+  // 从变更日志拉取 changeSeq 之后的节点变化；无法增量同步时重新拉取完整列表
+  async function syncChanges(): Promise<void> {
+    let feed: ChangeFeed
+    do {
+      feed = await getChanges(changeSeq)
+      if (feed.reset) {
+        await fetchNodes()
+        return
+      }
+      for (const change of feed.changes) {
+        if (change.entity !== 'node') {
+          continue
+        }
+        if (change.op === 'delete') {
+          removeNode(change.id)
+        } else {
+          addNode(change.data as Node)
+        }
+      }
+      changeSeq = feed.next
+    } while (feed.more)
+  }
+
+  // 变更日志推进：同一时间只进行一次增量同步，期间的推进在同步结束后再处理
+  function onChanges(seq: number): void {
+    if (seq <= changeSeq) {
+      return
+    }
+    if (syncing) {
+      syncing.then(() => onChanges(seq))
+      return
+    }
+    syncing = syncChanges()
+      .catch(() => fetchNodes())
+      .finally(() => { syncing = null })
+  }
+
+  // 订阅节点变化事件，列表随之增量更新，无需轮询
+  // 先订阅再拉取列表，避免遗漏两者之间发生的变化
+  // node.* 事件只包含 Web 服务本进程的修改；CLI 和其他进程的修改通过 changes 事件从变更日志同步
+  function subscribe(): void {
+    if (closeEvents) {
+      return
+    }
+    closeEvents = subscribeEvents({
+      'node.created': (node: Node) => addNode(node),
+      'node.deleted': ({ id }: { id: number }) => removeNode(id),
+      changes: ({ seq }: { seq: number }) => onChanges(seq),
+      // 断线期间的事件无法补发，重新拉取完整列表
+      resync: () => fetchNodes()
+    }, ['node.created', 'node.deleted', 'changes'])
+  }
+
+  // 取消订阅
+  function unsubscribe(): void {
+    closeEvents?.()
+    closeEvents = null
+  }
+
   // 重置当前节点
   function resetCurrentNode(): void {
     currentNode.value = null
@@ -110,6 +193,8 @@ export const useNodesStore = defineStore('nodes', () => {
     fetchNodeDetail,
     createNode,
     deleteNode,
+    subscribe,
+    unsubscribe,
     resetCurrentNode,
     resetState
   }
@@ -31,3 +31,20 @@ export interface MessageResponse {
 export interface ErrorResponse {
   detail: string
 }
+
+// 一条变更（upsert 附带对象的当前数据，delete 附带节点的标识字段）
+export interface ChangeItem {
+  seq: number
+  entity: 'node' | 'server'
+  id: number
+  op: 'upsert' | 'delete'
+  data: Record<string, any>
+}
+
+// 增量同步响应
+export interface ChangeFeed {
+  changes: ChangeItem[]
+  next: number
+  reset: boolean
+  more: boolean
+}
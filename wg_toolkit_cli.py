@@ -10,17 +10,25 @@ from pathlib import Path
 # 添加项目根目录到路径
 sys.path.insert(0, str(Path(__file__).parent))
 
-from cli.commands import init, node, server, export as export_cmd
+from cli.commands import register_commands
 from config import base as config_base, web as config_web
+from core.utils.log import setup_logging, operation
 
 
-def create_cli_subcommands(subparsers):
-    """创建 CLI 子命令组"""
-    # 注册所有 CLI 命令
-    init.register_command(subparsers)
-    node.register_command(subparsers)
-    server.register_command(subparsers)
-    export_cmd.register_command(subparsers)
+def create_cli_subcommands(subparsers, command=None):
+    """创建 CLI 子命令组（只导入将要执行的命令所在的模块）"""
+    register_commands(subparsers, command)
+
+
+def requested_commands(argv):
+    """从命令行参数中找出将要执行的命令：(命令, cli 组内的子命令)
+
+    全局选项（--profile、-h）都不带值，第一个非选项参数即命令名。
+    """
+    positional = [arg for arg in argv if not arg.startswith('-')]
+    command = positional[0] if positional else None
+    cli_command = positional[1] if command == 'cli' and len(positional) > 1 else None
+    return command, cli_command
 
 
 def create_web_subcommands(subparsers):
@@ -51,7 +59,8 @@ def cmd_web_start(args):
             "web.backend.main:app",
             host=args.host,
             port=args.port,
-            reload=args.reload
+            reload=args.reload,
+            timeout_graceful_shutdown=config_web.API_SHUTDOWN_TIMEOUT
         )
         return 0
     except KeyboardInterrupt:
@@ -62,6 +71,26 @@ def cmd_web_start(args):
         return 1
 
 
+def run_profiled(args):
+    """剖析执行命令：结束后向 stderr 输出调用耗时树（省略占比不足 1% 的调用）"""
+    from core.utils.profiler import get_profiler, format_span_tree
+    
+    profiler = get_profiler()
+    profiler.enable()
+    with profiler.trace(' '.join(['wg-toolkit'] + sys.argv[1:]), force=True) as trace:
+        result = args.func(args)
+    
+    detail = trace.to_dict()
+    print("\n========== 剖析结果 ==========", file=sys.stderr)
+    for line in format_span_tree(detail['root'], min_ms=detail['duration_ms'] * 0.01):
+        print(line, file=sys.stderr)
+    if trace.dropped:
+        print(f"（另有 {trace.dropped} 个调用超出记录上限）", file=sys.stderr)
+    if trace.profile_path:
+        print(f"cProfile 结果: {trace.profile_path}", file=sys.stderr)
+    return result
+
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(
@@ -74,10 +103,34 @@ def main():
   wg-toolkit init --endpoint YOUR_IP:51820
   wg-toolkit register node1 linux --export
   wg-toolkit list
+  wg-toolkit list -o jsonl > nodes.jsonl
   wg-toolkit show --name node1
   wg-toolkit delete 1
   wg-toolkit export 1
   wg-toolkit server-info
+  wg-toolkit status
+  wg-toolkit ipv6 enable
+  wg-toolkit hub add hub-eu --endpoint EU_IP:51820 --public-key KEY --network 10.1.0.0/24
+  wg-toolkit hub list
+  wg-toolkit route add node1 192.168.10.0/24
+  wg-toolkit whois 10.0.0.5
+  wg-toolkit policy add split --include any4 --exclude rfc1918
+  wg-toolkit group add office --policy split
+  wg-toolkit acl allow office servers
+  wg-toolkit acl mode enforce
+  wg-toolkit shaping add backup --download 20mbit --upload 20mbit
+  wg-toolkit shaping attach backup --group backups
+  wg-toolkit peer-profile add lan --keepalive off --mtu 1380
+  wg-toolkit peer-profile recommend --apply
+  wg-toolkit register ci-runner linux --ttl 12h
+  wg-toolkit sweep policy --idle-after 30d --action disable
+  wg-toolkit sweep run --dry-run
+  wg-toolkit network add tenant-a 10.20.0.0/24
+  wg-toolkit register node2 linux --network tenant-a
+  wg-toolkit --profile register node3 linux
+  wg-toolkit bench http --rps 500 --mix download=80,status=15,register=5 --duration 60
+  wg-toolkit run nodes.txt
+  wg-toolkit shell
   
   # Web 服务
   wg-toolkit web start
@@ -94,13 +147,17 @@ def main():
         """
     )
     
+    parser.add_argument('--profile', action='store_true',
+                        help='剖析本次命令：输出调用耗时树，并保存 cProfile 结果')
+    
     subparsers = parser.add_subparsers(dest='command', help='可用命令')
+    command, cli_command = requested_commands(sys.argv[1:])
     
     # 方式一：创建 cli 和 web 子命令组（显式分组）
     # CLI 子命令组
     parser_cli = subparsers.add_parser('cli', help='CLI 命令组（节点和服务端管理）')
     cli_subparsers = parser_cli.add_subparsers(dest='cli_command', help='CLI 子命令')
-    create_cli_subcommands(cli_subparsers)
+    create_cli_subcommands(cli_subparsers, cli_command)
     
     # Web 子命令组
     parser_web = subparsers.add_parser('web', help='Web 服务命令组')
@@ -109,7 +166,7 @@ def main():
     
     # 方式二：在主解析器层面直接注册 CLI 命令（向后兼容，简化使用）
     # 这样用户可以直接使用 `wg-toolkit init` 而不需要 `wg-toolkit cli init`
-    create_cli_subcommands(subparsers)
+    create_cli_subcommands(subparsers, command)
     
     # 解析参数
     args = parser.parse_args()
@@ -131,7 +188,13 @@ def main():
     
     # 执行命令
     if hasattr(args, 'func'):
-        return args.func(args)
+        if args.command != 'web':
+            # Web 服务在 web.backend.main 中按 JSON 格式配置日志
+            setup_logging('console', queued=False)
+        with operation(getattr(args, 'cli_command', None) or args.command):
+            if args.profile:
+                return run_profiled(args)
+            return args.func(args)
     else:
         parser.print_help()
         return 1